@@ -0,0 +1,289 @@
+"""
+Asset Catalog
+Local SQLite catalog of generated images and videos.
+
+Generated files used to be just files under outputs/images and outputs/videos; the
+prompt, model, cost and provider ids only existed in the tool's text response, so
+agents found earlier assets by listing directories. Every generation tool now
+records its output here as it is saved, and search_assets answers "is there
+already a clip of X?" from the catalog in milliseconds instead of regenerating.
+
+Location: MARKETING_TEAM/memory/asset_catalog.db
+- assets       one row per output file (upserted by path)
+- assets_fts   FTS5 full-text index over prompt, style, product and platform
+- indexes on kind, style, platform, product and created_at for filtered queries
+
+Search results skip (and drop from the catalog) files that no longer exist.
+If this SQLite build lacks FTS5, text search falls back to LIKE matching.
+
+Configuration (MARKETING_TEAM/.env, optional):
+- MARKETING_ASSET_CATALOG: catalog database path
+"""
+
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+DEFAULT_CATALOG_PATH = Path(__file__).parent.parent / "memory" / "asset_catalog.db"
+
+KINDS = ("image", "video")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    tool TEXT,
+    model TEXT,
+    prompt TEXT,
+    style TEXT,
+    platform TEXT,
+    product TEXT,
+    aspect_ratio TEXT,
+    duration REAL,
+    cost REAL,
+    provider_id TEXT,
+    sha256 TEXT,
+    created_at REAL NOT NULL,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS assets_kind ON assets(kind, created_at);
+CREATE INDEX IF NOT EXISTS assets_style ON assets(style, created_at);
+CREATE INDEX IF NOT EXISTS assets_platform ON assets(platform, created_at);
+CREATE INDEX IF NOT EXISTS assets_product ON assets(product, created_at);
+CREATE INDEX IF NOT EXISTS assets_created ON assets(created_at);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS assets_fts USING fts5(
+    prompt, style, product, platform, content='assets', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS assets_fts_insert AFTER INSERT ON assets BEGIN
+    INSERT INTO assets_fts(rowid, prompt, style, product, platform)
+    VALUES (new.id, new.prompt, new.style, new.product, new.platform);
+END;
+CREATE TRIGGER IF NOT EXISTS assets_fts_delete AFTER DELETE ON assets BEGIN
+    INSERT INTO assets_fts(assets_fts, rowid, prompt, style, product, platform)
+    VALUES ('delete', old.id, old.prompt, old.style, old.product, old.platform);
+END;
+CREATE TRIGGER IF NOT EXISTS assets_fts_update AFTER UPDATE ON assets BEGIN
+    INSERT INTO assets_fts(assets_fts, rowid, prompt, style, product, platform)
+    VALUES ('delete', old.id, old.prompt, old.style, old.product, old.platform);
+    INSERT INTO assets_fts(rowid, prompt, style, product, platform)
+    VALUES (new.id, new.prompt, new.style, new.product, new.platform);
+END;
+"""
+
+
+@dataclass
+class Asset:
+    """One generated file and what produced it."""
+    path: str
+    kind: str                           # image | video
+    tool: Optional[str] = None
+    model: Optional[str] = None
+    prompt: Optional[str] = None
+    style: Optional[str] = None         # UGC style (testimonial, unboxing, ...)
+    platform: Optional[str] = None      # tiktok, instagram, ...
+    product: Optional[str] = None
+    aspect_ratio: Optional[str] = None
+    duration: Optional[float] = None    # Seconds (videos)
+    cost: Optional[float] = None        # USD
+    provider_id: Optional[str] = None   # Sora video id / Veo operation name
+    sha256: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {k: v for k, v in asdict(self).items() if v not in (None, {})}
+        data["created_at"] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.created_at))
+        return data
+
+
+_COLUMNS = [f.name for f in fields(Asset)]
+
+
+def _fts_query(text: str) -> str:
+    # Quoted terms OR'ed together, ranked by bm25 (no FTS syntax from the caller)
+    return " OR ".join(f'"{term}"' for term in re.findall(r"\w+", text.lower()))
+
+
+def _label(value: Optional[str]) -> Optional[str]:
+    # Filters compare case-insensitively: store style/platform/product lowercased
+    return value.strip().lower() if value else None
+
+
+class AssetCatalog:
+    """SQLite catalog of generated assets with full-text prompt search."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or os.getenv("MARKETING_ASSET_CATALOG") or DEFAULT_CATALOG_PATH)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.fts = False
+        self.records = 0
+        self.errors = 0
+        self.searches = 0
+        self.search_ms = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            try:
+                conn.executescript(_FTS_SCHEMA)
+                self.fts = True
+            except sqlite3.OperationalError:  # SQLite built without FTS5
+                self.fts = False
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def record(self, path, kind: str, **details) -> Optional[Asset]:
+        """
+        Catalog a saved output (re-recording the same path replaces its row).
+
+        Unknown keyword arguments are kept in the asset's `extra` JSON. Never raises:
+        a catalog failure must not fail the generation, so errors go to stderr.
+        """
+        extra = {k: details.pop(k) for k in list(details) if k not in _COLUMNS}
+        asset = Asset(path=str(Path(path).resolve()), kind=kind, **details)
+        asset.extra.update({k: v for k, v in extra.items() if v is not None})
+        for name in ("style", "platform", "product"):
+            setattr(asset, name, _label(getattr(asset, name)))
+
+        row = asdict(asset)
+        row["extra"] = json.dumps(asset.extra) if asset.extra else None
+        assignments = ", ".join(f"{c} = excluded.{c}" for c in _COLUMNS if c != "path")
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.execute(
+                        f"INSERT INTO assets ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))}) "
+                        f"ON CONFLICT(path) DO UPDATE SET {assignments}",
+                        [row[c] for c in _COLUMNS]
+                    )
+            self.records += 1
+            return asset
+        except (sqlite3.Error, OSError) as e:
+            self.errors += 1
+            print(f"⚠️  Asset catalog write failed for {asset.path}: {e}", file=sys.stderr)
+            return None
+
+    def forget(self, paths: List[str]):
+        """Drop catalog rows (e.g. files deleted from disk)."""
+        if not paths:
+            return
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany("DELETE FROM assets WHERE path = ?", [(p,) for p in paths])
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        kind: Optional[str] = None,
+        style: Optional[str] = None,
+        platform: Optional[str] = None,
+        product: Optional[str] = None,
+        since: Optional[float] = None,
+        limit: int = 10
+    ) -> List[Asset]:
+        """
+        Find existing assets, best text match first (newest first without a query).
+
+        Args:
+            query: Free text matched against prompt, style, product and platform
+            kind: "image" or "video"
+            style / platform / product: Exact (case-insensitive) filters
+            since: Only assets created at or after this UNIX timestamp
+            limit: Maximum results
+
+        Returns:
+            Assets whose files still exist on disk
+        """
+        start = time.perf_counter()
+        where, params = [], []
+        for column, value in (("kind", kind), ("style", _label(style)),
+                              ("platform", _label(platform)), ("product", _label(product))):
+            if value:
+                where.append(f"a.{column} = ?")
+                params.append(value)
+        if since is not None:
+            where.append("a.created_at >= ?")
+            params.append(since)
+
+        match = _fts_query(query) if query else ""
+        with self._lock:
+            conn = self._connect()
+            if match and self.fts:
+                sql = "SELECT a.* FROM assets_fts JOIN assets a ON a.id = assets_fts.rowid WHERE assets_fts MATCH ?"
+                params.insert(0, match)
+                order = "bm25(assets_fts), a.created_at DESC"
+            else:
+                sql = "SELECT a.* FROM assets a WHERE 1=1"
+                if match:
+                    terms = re.findall(r"\w+", query.lower())
+                    where.append("(" + " OR ".join("lower(a.prompt) LIKE ?" for _ in terms) + ")")
+                    params.extend(f"%{term}%" for term in terms)
+                order = "a.created_at DESC"
+            if where:
+                sql += " AND " + " AND ".join(where)
+
+            results, missing = [], []
+            for row in conn.execute(f"{sql} ORDER BY {order}", params):
+                if not Path(row["path"]).exists():
+                    missing.append(row["path"])
+                    continue
+                data = dict(row)
+                data.pop("id")
+                data["extra"] = json.loads(data["extra"]) if data["extra"] else {}
+                results.append(Asset(**data))
+                if len(results) >= max(limit, 1):
+                    break
+
+        self.forget(missing)
+        self.searches += 1
+        self.search_ms += (time.perf_counter() - start) * 1000
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            with self._lock:
+                counts = dict(self._connect().execute("SELECT kind, COUNT(*) FROM assets GROUP BY kind").fetchall())
+        except (sqlite3.Error, OSError):
+            counts = {}
+        return {
+            "assets": sum(counts.values()),
+            "by_kind": counts,
+            "full_text": self.fts,
+            "records": self.records,
+            "errors": self.errors,
+            "searches": self.searches,
+            "avg_search_ms": round(self.search_ms / self.searches, 2) if self.searches else 0.0
+        }
@@ -0,0 +1,110 @@
+"""
+Micro-benchmark for email template rendering
+
+Compares, on the same personalised bodies:
+- legacy: re-parse memory/email_templates.json twice per email, then .replace passes
+  (how render_email_html worked before templates were compiled)
+- render_email_html: cached, compiled template per call
+- render_many: one compiled template, shared CTA bound once, batch of bodies
+
+Usage:
+    python benchmark_email_templates.py [--count 5000] [--template branded_light] [--repeat 5]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from email_template_renderer import TEMPLATES_PATH, render_email_html, render_many
+
+BODY = """Hi {name},
+
+QUARTERLY RESULTS
+
+Your campaign reached {reach:,} people this quarter, with {clicks:,} clicks.
+
+WHAT'S NEXT
+
+We'll send the full breakdown on Monday.
+
+Best regards,
+Your Marketing Team"""
+
+
+def legacy_render(body, template, cta_text, cta_link):
+    """Pre-compilation renderer, kept here only as the benchmark baseline"""
+    with open(TEMPLATES_PATH, 'r', encoding='utf-8') as f:
+        templates_data = json.load(f)
+    with open(TEMPLATES_PATH, 'r', encoding='utf-8') as f:
+        template_html = json.load(f)['templates'][template]['html_template']
+
+    processed_lines = []
+    for line in body.split('\n'):
+        stripped = line.strip()
+        if stripped and stripped.isupper() and any(c.isalpha() for c in stripped):
+            processed_lines.append(f'<strong>{line}</strong>')
+        else:
+            processed_lines.append(line)
+    html_body = '\n'.join(processed_lines)
+    html_body = html_body.replace('\n\n', '<PARAGRAPH_BREAK>')
+    html_body = html_body.replace('\n', '<br>')
+    html_body = html_body.replace('<PARAGRAPH_BREAK>', '<br><br>')
+
+    cta_section = ''
+    if cta_text and cta_link and template in templates_data.get('cta_templates', {}):
+        cta_section = templates_data['cta_templates'][template]
+        cta_section = cta_section.replace('{{CTA_TEXT}}', cta_text)
+        cta_section = cta_section.replace('{{CTA_LINK}}', cta_link)
+
+    final_html = template_html.replace('{{BODY_CONTENT}}', html_body)
+    return final_html.replace('{{CTA_SECTION}}', cta_section)
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--count', type=int, default=5000, help='personalised bodies per run')
+    parser.add_argument('--template', default='branded_light')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per variant (best is reported)')
+    args = parser.parse_args()
+
+    cta = ('View Report', 'https://example.com/report')
+    bodies = [BODY.format(name=f"Customer {i}", reach=1000 + i * 37, clicks=50 + i) for i in range(args.count)]
+
+    variants = [
+        ('legacy', lambda: [legacy_render(b, args.template, *cta) for b in bodies]),
+        ('render_email_html', lambda: [render_email_html(b, args.template, *cta) for b in bodies]),
+        ('render_many', lambda: render_many(bodies, args.template, *cta)),
+    ]
+
+    print("=" * 60)
+    print(f"EMAIL TEMPLATE RENDERING ({args.count} bodies, template={args.template})")
+    print("=" * 60)
+
+    baseline, expected = None, None
+    for name, fn in variants:
+        seconds, output = best_of(args.repeat, fn)
+        expected = expected or output
+        assert output == expected, f"{name} output differs from legacy"
+        baseline = baseline or seconds
+        print(f"  {name:<18} {seconds * 1000:9.1f} ms  "
+              f"{seconds / args.count * 1e6:7.2f} us/email  {baseline / seconds:6.1f}x")
+
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,357 @@
+"""
+FFmpeg Pipeline
+Async ffmpeg / ffprobe stitching for multi-clip videos.
+
+The video tools used to call subprocess.run for ffmpeg inside async tools, blocking
+the event loop for the whole encode, and fell back to re-encoding every clip with
+libx264 whenever a stream-copy concat failed. Here:
+
+- ffmpeg runs as an asyncio subprocess; "-progress pipe:1" output is parsed into a
+  0-1 fraction for callers, and cancelling the awaiting task kills ffmpeg
+- every clip is probed up front with ffprobe (codec, resolution, pixel format,
+  frame rate, timebase, audio layout)
+- the most common stream layout becomes the target; only clips that differ are
+  normalised to it, in parallel (one ffmpeg per core pair by default)
+- all clips are then joined losslessly with the concat demuxer (-c copy)
+
+A full re-encode happens only if the lossless concat still fails.
+
+Configuration (MARKETING_TEAM/.env, optional):
+- MARKETING_FFMPEG_PARALLEL: clips normalised at once (default: half the CPU cores)
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Deque, List, Optional, Sequence, Tuple
+
+
+# FFmpeg path detection for Windows
+FFMPEG_CMD = "ffmpeg"  # Default for Linux/Mac
+if os.name == 'nt':  # Windows
+    # Check common Windows installation paths
+    windows_ffmpeg_paths = [
+        r"C:\Users\sabaa\AppData\Local\Microsoft\WinGet\Packages\Gyan.FFmpeg_Microsoft.Winget.Source_8wekyb3d8bbwe\ffmpeg-8.0-full_build\bin\ffmpeg.exe",
+        r"C:\ffmpeg\bin\ffmpeg.exe",
+        r"C:\Program Files\ffmpeg\bin\ffmpeg.exe",
+    ]
+    for path in windows_ffmpeg_paths:
+        if Path(path).exists():
+            FFMPEG_CMD = path
+            break
+
+# ffprobe ships next to ffmpeg
+FFPROBE_CMD = str(Path(FFMPEG_CMD).with_name(Path(FFMPEG_CMD).name.replace("ffmpeg", "ffprobe")))
+
+# Encoder used to normalise a clip to the target's codec
+ENCODERS = {"h264": "libx264", "hevc": "libx265", "vp9": "libvpx-vp9", "av1": "libaom-av1"}
+
+Progress = Callable[[float], None]
+
+
+class FFmpegError(Exception):
+    """ffmpeg / ffprobe exited non-zero; carries the tail of its stderr."""
+
+    def __init__(self, message: str, returncode: Optional[int] = None, stderr: str = ""):
+        super().__init__(f"{message}: {stderr}" if stderr else message)
+        self.returncode = returncode
+        self.stderr = stderr
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+@dataclass
+class ClipInfo:
+    """Stream layout of one clip (from ffprobe)."""
+    path: Path
+    video_codec: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    pix_fmt: Optional[str] = None
+    frame_rate: Optional[str] = None     # e.g. "30/1"
+    time_base: Optional[str] = None      # e.g. "1/15360"
+    audio_codec: Optional[str] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+    duration: float = 0.0
+
+    def signature(self) -> Tuple:
+        """Everything that must match for a lossless (-c copy) concat."""
+        return (
+            self.video_codec, self.width, self.height, self.pix_fmt, self.frame_rate, self.time_base,
+            self.audio_codec, self.sample_rate, self.channels,
+        )
+
+
+@dataclass
+class StitchResult:
+    output_path: Path
+    clips: int
+    normalised: List[str] = field(default_factory=list)  # Clips re-encoded to the target layout
+    full_reencode: bool = False                          # Lossless concat failed, everything re-encoded
+    seconds: float = 0.0
+
+
+def parse_probe(path: Path, data: dict) -> ClipInfo:
+    """Build a ClipInfo from `ffprobe -print_format json -show_streams -show_format` output."""
+    info = ClipInfo(path=Path(path))
+    streams = data.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+    if video:
+        info.video_codec = video.get("codec_name")
+        info.width = video.get("width")
+        info.height = video.get("height")
+        info.pix_fmt = video.get("pix_fmt")
+        info.frame_rate = video.get("r_frame_rate")
+        info.time_base = video.get("time_base")
+    if audio:
+        info.audio_codec = audio.get("codec_name")
+        info.sample_rate = int(audio["sample_rate"]) if audio.get("sample_rate") else None
+        info.channels = audio.get("channels")
+    try:
+        info.duration = float(data.get("format", {}).get("duration") or (video or {}).get("duration") or 0)
+    except ValueError:
+        info.duration = 0.0
+    return info
+
+
+def plan_normalisation(infos: Sequence[ClipInfo]) -> Tuple[ClipInfo, List[int]]:
+    """
+    Pick the target layout (the most common one; ties go to the earliest clip) and
+    return it with the indexes of the clips that must be normalised to it.
+    """
+    counts = Counter(info.signature() for info in infos)
+    best = max(counts.values())
+    target = next(info for info in infos if counts[info.signature()] == best)
+    mismatched = [i for i, info in enumerate(infos) if info.signature() != target.signature()]
+    return target, mismatched
+
+
+async def run_ffmpeg(
+    args: Sequence[str],
+    cwd: Optional[Path] = None,
+    duration: Optional[float] = None,
+    on_progress: Optional[Progress] = None,
+    cmd: Optional[str] = None
+) -> None:
+    """
+    Run ffmpeg without blocking the event loop.
+
+    Progress comes from "-progress pipe:1" (out_time_us) as a 0-1 fraction of
+    duration. Cancelling the caller kills ffmpeg. Raises FFmpegError on failure.
+    """
+    process = await asyncio.create_subprocess_exec(
+        cmd or FFMPEG_CMD, "-hide_banner", "-nostats", "-progress", "pipe:1", *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=str(cwd) if cwd else None
+    )
+    stderr_tail: Deque[str] = deque(maxlen=30)
+
+    async def drain_stderr():
+        # Keep reading so a chatty encode can't fill the pipe and stall
+        async for line in process.stderr:
+            stderr_tail.append(line.decode("utf-8", "replace").rstrip())
+
+    async def read_progress():
+        async for line in process.stdout:
+            key, _, value = line.decode("utf-8", "replace").strip().partition("=")
+            if key in ("out_time_us", "out_time_ms") and on_progress and duration:
+                try:
+                    # out_time_ms is (despite its name) microseconds too
+                    on_progress(min(max(int(value) / 1_000_000 / duration, 0.0), 1.0))
+                except ValueError:
+                    continue
+            elif key == "progress" and value == "end" and on_progress:
+                on_progress(1.0)
+
+    try:
+        await asyncio.gather(drain_stderr(), read_progress())
+        returncode = await process.wait()
+    except asyncio.CancelledError:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
+
+    if returncode != 0:
+        raise FFmpegError("ffmpeg failed", returncode, "\n".join(stderr_tail))
+
+
+async def probe(path: Path, cmd: Optional[str] = None) -> ClipInfo:
+    """Probe a clip's streams with ffprobe."""
+    process = await asyncio.create_subprocess_exec(
+        cmd or FFPROBE_CMD, "-v", "error", "-print_format", "json", "-show_streams", "-show_format", str(path),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise FFmpegError(f"ffprobe failed for {Path(path).name}", process.returncode, stderr.decode("utf-8", "replace").strip())
+    return parse_probe(path, json.loads(stdout or b"{}"))
+
+
+async def ffmpeg_available(cmd: Optional[str] = None) -> bool:
+    """True if ffmpeg can be started."""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            cmd or FFMPEG_CMD, "-version",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        return await process.wait() == 0
+    except (FileNotFoundError, PermissionError):
+        return False
+
+
+def normalise_args(info: ClipInfo, target: ClipInfo, output: Path) -> List[str]:
+    """ffmpeg arguments re-encoding one clip to the target stream layout."""
+    args = ["-i", str(info.path)]
+    add_silence = target.audio_codec and not info.audio_codec
+    if add_silence:
+        layout = "mono" if target.channels == 1 else "stereo"
+        args += ["-f", "lavfi", "-i", f"anullsrc=channel_layout={layout}:sample_rate={target.sample_rate or 48000}"]
+
+    filters = []
+    if target.width and target.height:
+        filters.append(
+            f"scale={target.width}:{target.height}:force_original_aspect_ratio=decrease,"
+            f"pad={target.width}:{target.height}:(ow-iw)/2:(oh-ih)/2,setsar=1"
+        )
+    if target.frame_rate:
+        filters.append(f"fps={target.frame_rate}")
+    if target.pix_fmt:
+        filters.append(f"format={target.pix_fmt}")
+    if filters:
+        args += ["-vf", ",".join(filters)]
+
+    args += ["-map", "0:v:0"]
+    args += ["-c:v", ENCODERS.get(target.video_codec, "libx264"), "-preset", "medium", "-crf", "23"]
+    if target.time_base and "/" in target.time_base:
+        args += ["-video_track_timescale", target.time_base.split("/", 1)[1]]
+
+    if target.audio_codec:
+        args += ["-map", "1:a:0" if add_silence else "0:a:0"]
+        args += ["-c:a", "aac" if target.audio_codec == "aac" else target.audio_codec]
+        if target.sample_rate:
+            args += ["-ar", str(target.sample_rate)]
+        if target.channels:
+            args += ["-ac", str(target.channels)]
+        if add_silence:
+            args += ["-shortest"]
+    else:
+        args += ["-an"]
+
+    return args + ["-y", str(output)]
+
+
+def _concat_line(path: Path) -> str:
+    escaped = str(Path(path).resolve()).replace("'", "'\\''")
+    return f"file '{escaped}'\n"
+
+
+async def stitch(
+    clips: Sequence[Path],
+    output_path: Path,
+    on_progress: Optional[Progress] = None,
+    max_parallel: Optional[int] = None,
+    ffmpeg_cmd: Optional[str] = None,
+    ffprobe_cmd: Optional[str] = None
+) -> StitchResult:
+    """
+    Stitch clips into output_path: probe, normalise only mismatched clips (in
+    parallel), then concat losslessly. Falls back to a full re-encode if needed.
+
+    on_progress receives the overall 0-1 fraction (normalising, then concat).
+    """
+    start = time.monotonic()
+    clips = [Path(clip) for clip in clips]
+    output_path = Path(output_path)
+    workdir = output_path.parent
+    stem = output_path.stem
+
+    infos = await asyncio.gather(*(probe(clip, ffprobe_cmd) for clip in clips))
+    target, mismatched = plan_normalisation(infos)
+    result = StitchResult(output_path=output_path, clips=len(clips))
+
+    # Progress: normalising weighted by clip duration, the concat counts as one more share
+    total = sum(infos[i].duration for i in mismatched) + sum(info.duration for info in infos) * 0.1 or 1.0
+    done = {i: 0.0 for i in mismatched}
+    done["concat"] = 0.0
+
+    def report(part, weight):
+        def update(fraction: float):
+            done[part] = fraction * weight
+            if on_progress:
+                on_progress(min(sum(done.values()) / total, 1.0))
+        return update
+
+    # 1. Normalise only the clips whose layout differs from the target
+    parallel = max(max_parallel or _env_int("MARKETING_FFMPEG_PARALLEL", max((os.cpu_count() or 2) // 2, 1)), 1)
+    semaphore = asyncio.Semaphore(parallel)
+    inputs = list(clips)
+    temp_files: List[Path] = []
+
+    async def normalise(i: int):
+        normalised = workdir / f".{stem}_norm_{i + 1}.mp4"
+        temp_files.append(normalised)
+        async with semaphore:
+            await run_ffmpeg(
+                normalise_args(infos[i], target, normalised),
+                duration=infos[i].duration,
+                on_progress=report(i, infos[i].duration),
+                cmd=ffmpeg_cmd
+            )
+        inputs[i] = normalised
+
+    concat_file = workdir / f".{stem}_concat_list.txt"
+    temp_files.append(concat_file)
+    try:
+        tasks = [asyncio.ensure_future(normalise(i)) for i in mismatched]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # One clip failed (or we were cancelled): stop the other encodes too
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        result.normalised = [clips[i].name for i in mismatched]
+
+        # 2. Lossless concat of matching streams
+        concat_file.write_text("".join(_concat_line(path) for path in inputs), encoding="utf-8")
+        concat_weight = sum(info.duration for info in infos) * 0.1
+        concat_duration = sum(info.duration for info in infos)
+        try:
+            await run_ffmpeg(
+                ["-f", "concat", "-safe", "0", "-i", str(concat_file), "-c", "copy", "-y", str(output_path)],
+                duration=concat_duration,
+                on_progress=report("concat", concat_weight),
+                cmd=ffmpeg_cmd
+            )
+        except FFmpegError:
+            # Last resort: the previous behaviour, re-encoding everything
+            result.full_reencode = True
+            await run_ffmpeg(
+                ["-f", "concat", "-safe", "0", "-i", str(concat_file),
+                 "-c:v", "libx264", "-preset", "medium", "-crf", "23", "-y", str(output_path)],
+                duration=concat_duration,
+                on_progress=report("concat", concat_weight),
+                cmd=ffmpeg_cmd
+            )
+    finally:
+        for path in temp_files:
+            path.unlink(missing_ok=True)
+
+    result.seconds = time.monotonic() - start
+    return result
@@ -0,0 +1,244 @@
+"""
+Image Result Cache
+Content-addressed on-disk cache for the image generation tools (GPT-4o, Nano Banana).
+
+Agents often re-issue an identical image request when they retry a workflow. The
+cache keys each request on its normalised form (tool, model, whitespace-collapsed
+prompt, provider parameters) and keeps the generated bytes, so a repeat is served
+from disk instead of paying for, and waiting on, a new generation.
+
+Location: MARKETING_TEAM/outputs/.cache/images/
+- <sha256>.<ext>   generated image bytes (the source of truth for what is cached)
+- index.json       last-use time per key (for LRU eviction)
+
+Every MCP session runs its own server process on this directory, so the index is
+rebuilt from the blobs on load and re-merged with the directory and index.json
+before each write: entries (and bytes) stored by another process are never lost
+from the size bound. Hits only bump last-use in memory; it is persisted with the
+next put() or flush(). Calls are serialised by a lock, so the MCP server can run
+them in worker threads (asyncio.to_thread) and keep the scans off the event loop.
+
+Per-call cache modes:
+- "use"     (default) serve a hit, otherwise generate and store
+- "refresh" always generate, then overwrite the cached entry
+- "bypass"  neither read nor write the cache
+
+Configuration (MARKETING_TEAM/.env, optional):
+- MARKETING_IMAGE_CACHE_MB: total size before least-recently-used entries are evicted (default: 500)
+"""
+
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+CACHE_MODES = ("use", "refresh", "bypass")
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "outputs" / ".cache" / "images"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def normalise_prompt(prompt: str) -> str:
+    """Collapse whitespace so trivially reformatted prompts share a cache entry."""
+    return " ".join(prompt.split())
+
+
+@dataclass
+class CachedImage:
+    key: str
+    path: Path
+    mime_type: str
+    bytes: int
+
+    def read(self) -> bytes:
+        return self.path.read_bytes()
+
+
+class ImageResultCache:
+    """Size-bounded LRU cache of generated images, keyed by request digest."""
+
+    def __init__(self, root: Path = DEFAULT_CACHE_DIR, max_bytes: Optional[int] = None):
+        self.root = Path(root)
+        self.max_bytes = max_bytes if max_bytes is not None else _env_int("MARKETING_IMAGE_CACHE_MB", 500) * 1024 * 1024
+        self._index: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dirty = False
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.bypasses = 0
+        self.evictions = 0
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def key_for(tool: str, model: str, prompt: str, **params) -> str:
+        """Digest of the normalised request (only parameters sent to the provider)."""
+        request = {
+            "tool": tool,
+            "model": model,
+            "prompt": normalise_prompt(prompt),
+            "params": {k: params[k] for k in sorted(params)},
+        }
+        return hashlib.sha256(json.dumps(request, sort_keys=True).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def check_mode(mode: str) -> str:
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Invalid cache mode '{mode}'. Use one of: {', '.join(CACHE_MODES)}")
+        return mode
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    @property
+    def _index_path(self) -> Path:
+        return self.root / "index.json"
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._index is None:
+            self._index = self._scan()
+        return self._index
+
+    def _read_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _scan(self) -> Dict[str, Dict[str, Any]]:
+        """Index rebuilt from the blobs on disk, with last-use times from index.json where known."""
+        saved = self._read_index()
+        index = {}
+        if not self.root.is_dir():
+            return index
+        for path in self.root.iterdir():
+            if path.name.startswith(".") or path.name.startswith("index.json"):
+                continue  # Partial writes and the index itself
+            try:
+                stat = path.stat()
+            except FileNotFoundError:  # Evicted by another process mid-scan
+                continue
+            known = saved.get(path.stem, {})
+            index[path.stem] = {
+                "mime_type": mimetypes.guess_type(path.name)[0] or "application/octet-stream",
+                "bytes": stat.st_size,
+                "created": known.get("created", stat.st_mtime),
+                "last_used": known.get("last_used", stat.st_mtime),
+            }
+        return index
+
+    def _sync(self):
+        """Merge this process's view with the directory and index.json written by others."""
+        current = self._scan()
+        for key, entry in current.items():
+            mine = (self._index or {}).get(key)
+            if mine is not None:
+                entry["last_used"] = max(entry["last_used"], mine["last_used"])
+        self._index = current
+
+    def _save(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        temp_path = self._index_path.with_name(f"index.json.{os.getpid()}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(temp_path, self._index_path)
+        self._dirty = False
+
+    def flush(self):
+        """Persist last-use times bumped by hits since the last write (e.g. on shutdown)."""
+        with self._lock:
+            if self._dirty:
+                self._sync()
+                self._save()
+
+    def _blob_path(self, key: str, mime_type: str) -> Path:
+        extension = mimetypes.guess_extension(mime_type) or ".bin"
+        return self.root / f"{key}{extension}"
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[CachedImage]:
+        """Return a cached image and mark it recently used in memory (counts a hit or miss)."""
+        with self._lock:
+            entry = self._load().get(key)
+            path = self._blob_path(key, entry["mime_type"]) if entry else None
+
+            if entry is None or not path.exists():
+                if entry is not None:
+                    del self._index[key]  # Evicted by another process
+                self.misses += 1
+                return None
+
+            entry["last_used"] = time.time()
+            self._dirty = True
+            self.hits += 1
+            return CachedImage(key=key, path=path, mime_type=entry["mime_type"], bytes=entry["bytes"])
+
+    def put(self, key: str, data: bytes, mime_type: str = "image/png") -> CachedImage:
+        """Store generated bytes under key, then evict LRU entries beyond max_bytes."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._blob_path(key, mime_type)
+        temp_path = path.with_name(f".{path.name}.part")
+        temp_path.write_bytes(data)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            now = time.time()
+            self._sync()
+            self._index[key] = {"mime_type": mime_type, "bytes": len(data), "created": now, "last_used": now}
+            self._evict()
+            self._save()
+        return CachedImage(key=key, path=path, mime_type=mime_type, bytes=len(data))
+
+    def _evict(self):
+        total = sum(entry["bytes"] for entry in self._index.values())
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            self._blob_path(key, entry["mime_type"]).unlink(missing_ok=True)
+            del self._index[key]
+            total -= entry["bytes"]
+            self.evictions += 1
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def record(self, mode: str):
+        """Count a refresh / bypass call (hits and misses are counted by get)."""
+        if mode == "refresh":
+            self.refreshes += 1
+        elif mode == "bypass":
+            self.bypasses += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            index = self._load()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "bypasses": self.bypasses,
+                "evictions": self.evictions,
+                "entries": len(index),
+                "bytes": sum(entry["bytes"] for entry in index.values()),
+            }
@@ -0,0 +1,284 @@
+"""
+Image Dedup
+Perceptual hashes of generated images with a BK-tree for near-duplicate lookup.
+
+Campaigns accumulate thousands of near-identical Nano Banana and GPT-4o images, and
+the video tools would regenerate (and re-analyse) from inputs that look the same as
+ones already used. Every saved image now gets two 64-bit perceptual hashes,
+computed with NumPy:
+
+- pHash: low-frequency 8x8 block of a 32x32 DCT, thresholded at its median
+  (robust to resizing, re-encoding and small colour shifts)
+- dHash: sign of horizontal gradients on a 9x8 thumbnail
+
+Candidates within MARKETING_IMAGE_DEDUP_DISTANCE bits of the pHash come from a
+BK-tree (a metric tree over Hamming distance: lookups visit a small fraction of
+the index), then are confirmed with the dHash so both hashes must agree.
+
+Matches carry the earlier file's SHA-256, so the GPT-4o Vision cache can serve
+its analysis (vision_analysis.analyze_image, opt-in via MARKETING_VISION_NEAR_DUPLICATES)
+instead of paying for a new one.
+
+Location: MARKETING_TEAM/memory/image_hashes.jsonl (append-only, loaded on first use)
+
+Configuration (MARKETING_TEAM/.env, optional):
+- MARKETING_IMAGE_DEDUP_DISTANCE: max differing bits (of 64) for a near-duplicate (default: 6)
+
+Hashing needs NumPy and Pillow (imported on first use); without them, `available`
+is False and callers skip dedup.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Generic, List, Optional, Tuple, TypeVar
+
+if TYPE_CHECKING:  # NumPy is imported on first hash, not when the MCP server starts
+    import numpy as np
+
+
+DEFAULT_INDEX_PATH = Path(__file__).parent.parent / "memory" / "image_hashes.jsonl"
+
+T = TypeVar("T")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _module_available(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    value = 0
+    for bit in bits.ravel():
+        value = (value << 1) | int(bit)
+    return value
+
+
+def _resize(gray: np.ndarray, height: int, width: int) -> np.ndarray:
+    """Area-average downscale (nearest-neighbour for dimensions smaller than the target)."""
+    import numpy as np
+
+    def axis_bins(size: int, target: int) -> np.ndarray:
+        return np.linspace(0, size, target + 1).astype(int)[:-1] if size >= target else None
+
+    out = gray.astype(np.float64)
+    for axis, target in ((0, height), (1, width)):
+        size = out.shape[axis]
+        starts = axis_bins(size, target)
+        if starts is None:
+            out = np.take(out, (np.arange(target) * size) // target, axis=axis)
+        else:
+            counts = np.diff(np.append(starts, size))
+            sums = np.add.reduceat(out, starts, axis=axis)
+            out = sums / (counts[:, None] if axis == 0 else counts[None, :])
+    return out
+
+
+@lru_cache(maxsize=None)
+def _dct_matrix(n: int) -> np.ndarray:
+    import numpy as np
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * x + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+
+def phash_pixels(gray: np.ndarray) -> int:
+    """64-bit DCT perceptual hash of a 2-D grayscale array."""
+    import numpy as np
+    dct = _dct_matrix(32)
+    small = _resize(gray, 32, 32)
+    coeffs = dct @ small @ dct.T
+    block = coeffs[:8, :8].ravel()
+    median = np.median(block[1:])  # Exclude the DC term (overall brightness)
+    return _bits_to_int(block > median)
+
+
+def dhash_pixels(gray: np.ndarray) -> int:
+    """64-bit difference hash of a 2-D grayscale array."""
+    small = _resize(gray, 8, 9)
+    return _bits_to_int(small[:, 1:] > small[:, :-1])
+
+
+def decode_gray(data: bytes) -> np.ndarray:
+    """Decode image bytes to a grayscale array (requires Pillow)."""
+    import numpy as np
+    from PIL import Image
+    with Image.open(io.BytesIO(data)) as image:
+        return np.asarray(image.convert("L"), dtype=np.float64)
+
+
+class BKTree(Generic[T]):
+    """Burkhard-Keller tree over 64-bit hashes with Hamming distance."""
+
+    def __init__(self):
+        self._root: Optional[Tuple[int, List[T], Dict[int, Any]]] = None
+        self.size = 0
+
+    def add(self, value: int, item: T):
+        self.size += 1
+        if self._root is None:
+            self._root = (value, [item], {})
+            return
+        node = self._root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (value, [item], {})
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> List[Tuple[int, T]]:
+        """Items within max_distance bits, closest first."""
+        found: List[Tuple[int, T]] = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= max_distance:
+                found.extend((distance, item) for item in node[1])
+            # Triangle inequality: only children at edge distance d +/- max_distance can match
+            for edge, child in node[2].items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        found.sort(key=lambda match: match[0])
+        return found
+
+
+@dataclass
+class ImageFingerprint:
+    path: str
+    sha256: str
+    phash: int
+    dhash: int
+
+    def to_record(self) -> Dict[str, str]:
+        return {"path": self.path, "sha256": self.sha256, "phash": f"{self.phash:016x}", "dhash": f"{self.dhash:016x}"}
+
+    @classmethod
+    def from_record(cls, record: Dict[str, str]) -> "ImageFingerprint":
+        return cls(record["path"], record["sha256"], int(record["phash"], 16), int(record["dhash"], 16))
+
+
+@dataclass
+class ImageMatch:
+    """A previously saved image that looks like the query."""
+    path: str
+    sha256: str
+    distance: int  # pHash bits that differ (0 = perceptually identical)
+
+
+def fingerprint(data: bytes, path) -> ImageFingerprint:
+    gray = decode_gray(data)
+    return ImageFingerprint(
+        path=str(Path(path).resolve()),
+        sha256=hashlib.sha256(data).hexdigest(),
+        phash=phash_pixels(gray),
+        dhash=dhash_pixels(gray)
+    )
+
+
+class ImageDedupIndex:
+    """Persistent perceptual-hash index of saved images."""
+
+    def __init__(self, path: Optional[Path] = None, max_distance: Optional[int] = None):
+        self.path = Path(path or DEFAULT_INDEX_PATH)
+        self.max_distance = max_distance if max_distance is not None else _env_int("MARKETING_IMAGE_DEDUP_DISTANCE", 6)
+        self._tree: Optional[BKTree[ImageFingerprint]] = None
+        self._latest: Dict[str, ImageFingerprint] = {}
+        self._lock = threading.Lock()
+        self.available = _module_available("numpy") and _module_available("PIL")
+        self.lookups = 0
+        self.duplicates = 0
+        self.lookup_ms = 0.0
+
+    def _load(self) -> BKTree[ImageFingerprint]:
+        if self._tree is None:
+            self._tree = BKTree()
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            self._insert(ImageFingerprint.from_record(json.loads(line)))
+                        except (ValueError, KeyError):
+                            continue  # Torn final line from a crash mid-write
+            except FileNotFoundError:
+                pass
+        return self._tree
+
+    def _insert(self, fp: ImageFingerprint):
+        self._latest[fp.path] = fp
+        self._tree.add(fp.phash, fp)
+
+    def add(self, fp: ImageFingerprint):
+        """Index a fingerprint (re-adding a path supersedes its earlier hashes)."""
+        with self._lock:
+            self._load()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(fp.to_record()) + "\n")
+            self._insert(fp)
+
+    def find(self, fp: ImageFingerprint, max_distance: Optional[int] = None) -> List[ImageMatch]:
+        """Near-duplicates of fp still on disk (its own path excluded), closest first."""
+        max_distance = self.max_distance if max_distance is None else max_distance
+        start = time.perf_counter()
+        with self._lock:
+            candidates = self._load().search(fp.phash, max_distance)
+        matches, seen = [], set()
+        for distance, other in candidates:
+            # Skip superseded hashes, the query itself, and pHash-only lookalikes
+            if self._latest.get(other.path) is not other or other.path == fp.path or other.path in seen:
+                continue
+            if hamming(fp.dhash, other.dhash) > max_distance * 2 or not Path(other.path).exists():
+                continue
+            seen.add(other.path)
+            matches.append(ImageMatch(other.path, other.sha256, distance))
+        self.lookups += 1
+        self.duplicates += bool(matches)
+        self.lookup_ms += (time.perf_counter() - start) * 1000
+        return matches
+
+    def check_and_add(self, data: bytes, path) -> List[ImageMatch]:
+        """Fingerprint a saved image, return its near-duplicates, then index it."""
+        fp = fingerprint(data, path)
+        matches = self.find(fp)
+        self.add(fp)
+        return matches
+
+    def lookup(self, data: bytes) -> List[ImageMatch]:
+        """Near-duplicates of image bytes without indexing them."""
+        return self.find(fingerprint(data, "<query>"))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "available": self.available,
+            "entries": len(self._latest),
+            "lookups": self.lookups,
+            "lookups_with_duplicates": self.duplicates,
+            "avg_lookup_ms": round(self.lookup_ms / self.lookups, 3) if self.lookups else 0.0
+        }
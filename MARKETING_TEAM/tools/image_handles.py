@@ -0,0 +1,115 @@
+"""
+Image Handle Registry
+In-memory store of generated images that Veo 3.1 can reuse without re-reading them from disk.
+
+generate_nano_banana_image used to park its image Part in one module global for the
+next Veo call, so two agents (or two parallel UGC pipelines) overwrote each other's
+image. Each generated image is now registered under its own handle, which the
+Nano Banana tools return and the Veo UGC tools accept (image_handle=...).
+
+Entries are evicted least-recently-used first once either bound is exceeded:
+- MARKETING_IMAGE_HANDLES_MAX_ENTRIES: number of images kept (default: 64)
+- MARKETING_IMAGE_HANDLES_MB: total image bytes kept (default: 256)
+
+An evicted or unknown handle is reported to the caller, who can fall back to the
+saved file via image_path.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+@dataclass
+class ImageHandle:
+    handle: str
+    data: bytes
+    mime_type: str
+    part: Any = None                 # google.genai Part, when the provider returned one
+    path: Optional[Path] = None      # Where the image was also saved on disk
+    source: Optional[str] = None     # e.g. "generate_nano_banana_image"
+    created: float = field(default_factory=time.time)
+
+    @property
+    def bytes(self) -> int:
+        return len(self.data)
+
+
+class ImageHandleRegistry:
+    """Thread-safe handle -> image map with LRU eviction by count and total bytes."""
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries if max_entries is not None else _env_int("MARKETING_IMAGE_HANDLES_MAX_ENTRIES", 64)
+        self.max_bytes = max_bytes if max_bytes is not None else _env_int("MARKETING_IMAGE_HANDLES_MB", 256) * 1024 * 1024
+        self._entries: "OrderedDict[str, ImageHandle]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def put(
+        self,
+        data: bytes,
+        mime_type: str = "image/png",
+        part: Any = None,
+        path: Optional[Path] = None,
+        source: Optional[str] = None
+    ) -> str:
+        """Register an image and return its new handle."""
+        handle = f"img_{uuid.uuid4().hex[:12]}"
+        entry = ImageHandle(handle, data, mime_type, part, Path(path) if path else None, source)
+        with self._lock:
+            self._entries[handle] = entry
+            self._bytes += entry.bytes
+            self._evict()
+        return handle
+
+    def get(self, handle: str) -> Optional[ImageHandle]:
+        """Look up a handle and mark it recently used (None if unknown or evicted)."""
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(handle)
+            self.hits += 1
+            return entry
+
+    def release(self, handle: str) -> bool:
+        """Drop a handle early. Returns False if it was already gone."""
+        with self._lock:
+            entry = self._entries.pop(handle, None)
+            if entry is None:
+                return False
+            self._bytes -= entry.bytes
+            return True
+
+    def _evict(self):
+        # Always keep the newest entry, even if it alone exceeds max_bytes
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.bytes
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
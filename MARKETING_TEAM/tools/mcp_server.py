@@ -13,10 +13,15 @@ Architecture:
 import sys
 import os
 import asyncio
+import importlib.util
+import inspect
 import json
 import mimetypes
 import traceback
+from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
 # CRITICAL: Load environment variables FIRST (before any OpenAI/Google imports)
 from dotenv import load_dotenv
@@ -24,111 +29,200 @@ env_path = Path(__file__).parent.parent / '.env'
 load_dotenv(env_path)
 
 # NOW safe to import OpenAI/Google (after environment is ready)
-from openai import AsyncOpenAI
-import httpx
 import base64
+from contextlib import asynccontextmanager
 
-# Google Gen AI imports for Veo 3.1 and Nano Banana
-try:
-    from google import genai
-    from google.genai import types
-    GOOGLE_GENAI_AVAILABLE = True
-except ImportError:
-    GOOGLE_GENAI_AVAILABLE = False
-
-# Google Drive imports (optional - graceful degradation if not configured)
-try:
-    from google.oauth2.credentials import Credentials
-    from google_auth_oauthlib.flow import InstalledAppFlow
-    from google.auth.transport.requests import Request
-    from googleapiclient.discovery import build
-    from googleapiclient.http import MediaFileUpload
-    import pickle
-    GOOGLE_DRIVE_AVAILABLE = True
-except ImportError:
-    GOOGLE_DRIVE_AVAILABLE = False
-
-# Global variable to cache the last Nano Banana image for Veo 3.1
-_last_generated_image = None
+# Shared, pooled provider clients (one registry per server process)
+from provider_clients import ProviderClients
 
-# MCP Server imports
-from mcp.server import Server
-from mcp.server.stdio import stdio_server
-from mcp.types import Tool, TextContent
+# Shared video job tracker (one background poller for all Sora/Veo jobs)
+from video_jobs import (
+    VideoJobTracker, VideoJob, JobJournal, ProviderStatus, COMPLETED, FAILED, parse_retry_after,
+    transient_check_status
+)
 
-# Create MCP server
-app = Server("marketing-tools")
+# Streaming video downloads (temp file + atomic rename, shared memory budget)
+import media_downloads
+from media_downloads import stream_download
 
-# Google Drive OAuth scopes
-DRIVE_SCOPES = ['https://www.googleapis.com/auth/drive.file']
+# Content-addressed cache for repeated image generation requests
+from image_cache import ImageResultCache, normalise_prompt
 
-# ============================================================================
-# LOAD UGC PROMPT TEMPLATES FROM MEMORY (DYNAMIC CONFIGURATION)
-# ============================================================================
+# GPT-4o Vision analyses cached by image digest + prompt version
+import vision_analysis
+from vision_analysis import analyze_image
 
-def load_ugc_templates_from_memory():
-    """
-    Load UGC prompt templates from memory/ugc_prompt_templates.json
-    Returns: (ugc_templates_dict, list_of_style_names)
-    """
+# Preloaded UGC prompt templates (hot reload on file change)
+from ugc_templates import UGCTemplateStore
+
+# Generated images kept in memory under handles for Veo 3.1 (no re-read / re-upload)
+from image_handles import ImageHandleRegistry
+
+# SQLite catalog of generated images and videos (search_assets)
+from asset_catalog import AssetCatalog, KINDS as ASSET_KINDS
+
+# Perceptual hashes of saved images (near-duplicate lookup, vision analysis reuse)
+from image_dedup import ImageDedupIndex
+
+# Table-driven tool dispatch with cached schemas and compiled argument validation
+from tool_registry import ToolRegistry
+from single_flight import SingleFlight
+
+# Per provider/model pacing and jittered retries (429 / 5xx / Retry-After)
+from rate_limits import rate_limiter
+
+# Provider SDKs (google-genai, Google Drive/OAuth) are imported on first use of
+# their tools, not at startup: this server is spawned per agent session and most
+# sessions only touch one or two tools. Availability is checked without importing.
+def _module_available(name: str) -> bool:
     try:
-        memory_path = Path(__file__).parent.parent / 'memory' / 'ugc_prompt_templates.json'
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:  # Parent package missing
+        return False
 
-        if not memory_path.exists():
-            print(f"⚠️  UGC templates not found at {memory_path}, using defaults", file=sys.stderr)
-            return None, ["testimonial", "demo", "unboxing", "lifestyle"]
 
-        with open(memory_path, 'r', encoding='utf-8') as f:
-            templates_data = json.load(f)
+# Google Gen AI for Veo 3.1 and Nano Banana
+GOOGLE_GENAI_AVAILABLE = _module_available("google.genai")
+types = None  # google.genai.types, set by _genai_types() on first use
 
-        # Convert JSON format to UGC_TEMPLATES format
-        # Templates are nested under "base_templates" and "expert_optimized_templates"
-        ugc_templates = {}
-        style_names = []
 
-        # Combine both base and expert templates
-        all_templates = {}
-        if 'base_templates' in templates_data and isinstance(templates_data['base_templates'], dict):
-            all_templates.update(templates_data['base_templates'])
+def _genai_types():
+    """Import google.genai.types on first use."""
+    global types
+    if types is None:
+        from google.genai import types as genai_types
+        types = genai_types
+    return types
 
-        if 'expert_optimized_templates' in templates_data and isinstance(templates_data['expert_optimized_templates'], dict):
-            all_templates.update(templates_data['expert_optimized_templates'])
 
-        # Process all templates
-        for style_name, template_data in all_templates.items():
-            # Skip metadata fields (non-dictionary values)
-            if not isinstance(template_data, dict):
-                continue
+# Google Drive (optional - graceful degradation if not configured)
+GOOGLE_DRIVE_AVAILABLE = all(
+    _module_available(name) for name in ("google.oauth2", "google_auth_oauthlib", "googleapiclient")
+)
 
-            # Check if template has platform_optimized field
-            if 'platform_optimized' in template_data and isinstance(template_data['platform_optimized'], dict):
-                style_names.append(style_name)
-                ugc_templates[style_name] = {
-                    'tiktok': template_data['platform_optimized'].get('tiktok', ''),
-                    'instagram': template_data['platform_optimized'].get('instagram', ''),
-                    'facebook': template_data['platform_optimized'].get('facebook', '')
-                }
-            else:
-                print(f"⚠️  Template '{style_name}' missing platform_optimized, skipping", file=sys.stderr)
+# MCP Server imports
+from mcp.server import Server
+from mcp.server.stdio import stdio_server
+from mcp.types import Tool, TextContent
 
-        print(f"✅ Loaded {len(style_names)} UGC styles from memory/ugc_prompt_templates.json", file=sys.stderr)
-        print(f"   Available styles: {', '.join(sorted(style_names)[:10])}{'...' if len(style_names) > 10 else ''}", file=sys.stderr)
+# Process-wide provider clients and video jobs, closed when the server shuts down
+# (video jobs are journaled to MARKETING_TEAM/memory/video_jobs.jsonl and resumed on restart)
+clients = ProviderClients()
+video_jobs = VideoJobTracker(journal=JobJournal())
 
-        return ugc_templates, sorted(style_names)
+# Repeated identical image requests are served from MARKETING_TEAM/outputs/.cache/images
+image_cache = ImageResultCache()
+image_handles = ImageHandleRegistry()
 
-    except Exception as e:
-        print(f"⚠️  Error loading UGC templates: {e}, using defaults", file=sys.stderr)
-        return None, ["testimonial", "demo", "unboxing", "lifestyle"]
+# Every saved image/video is cataloged in MARKETING_TEAM/memory/asset_catalog.db
+asset_catalog = AssetCatalog()
+
+# Saved images are perceptually hashed (MARKETING_TEAM/memory/image_hashes.jsonl) so
+# near-duplicates are reported (and, with MARKETING_VISION_NEAR_DUPLICATES=1, reuse
+# earlier GPT-4o Vision analyses)
+image_dedup = ImageDedupIndex()
+
+
+@asynccontextmanager
+async def server_lifespan(server):
+    """Own the pooled provider clients and video poller for the lifetime of the MCP server."""
+    # Jobs a previous server process submitted but never downloaded
+    recovered = video_jobs.recover()
+    if recovered:
+        print(f"♻️  Resuming {len(recovered)} unfinished video job(s) from the journal", file=sys.stderr)
+    try:
+        yield {"clients": clients, "video_jobs": video_jobs}
+    finally:
+        await video_jobs.aclose()
+        await clients.aclose()
+        image_cache.flush()
+        vision_analysis.analysis_cache.flush()
+
+
+# Create MCP server
+app = Server("marketing-tools", lifespan=server_lifespan)
+
+# Google Drive OAuth scopes
+DRIVE_SCOPES = ['https://www.googleapis.com/auth/drive.file']
+
+# ============================================================================
+# LOAD UGC PROMPT TEMPLATES FROM MEMORY (DYNAMIC CONFIGURATION)
+# ============================================================================
 
-# Load templates at module startup
-LOADED_UGC_TEMPLATES, AVAILABLE_UGC_STYLES = load_ugc_templates_from_memory()
+# Parsed once, indexed by style, reloaded when memory/ugc_prompt_templates.json changes
+ugc_templates = UGCTemplateStore()
 
 
 # ============================================================================
 # MCP-NATIVE TOOL FUNCTIONS (Direct API calls, no @tool decorator)
 # ============================================================================
 
-async def generate_gpt4o_image_mcp(prompt: str, aspect_ratio: str, detail: str, filename: str) -> list[TextContent]:
+# GPT-4o (gpt-image-1) size and price per aspect ratio
+GPT4O_SIZES = {
+    "1:1": "1024x1024",
+    "2:3": "1024x1536",
+    "3:2": "1536x1024"
+}
+GPT4O_COSTS = {
+    "1024x1024": 0.04,
+    "1024x1536": 0.06,
+    "1536x1024": 0.06
+}
+NANO_BANANA_COST = 0.039
+
+
+def _image_cache_report(cache_key: str, status: str) -> dict:
+    """Cache outcome for an image tool result (status plus running hit/miss counters)."""
+    stats = image_cache.stats()
+    return {
+        "status": status,
+        "key": cache_key[:16],
+        "hits": stats["hits"],
+        "misses": stats["misses"]
+    }
+
+
+async def _near_duplicates(output_path: Path, image_bytes: bytes) -> list[dict]:
+    """Index a saved image's perceptual hash and return earlier near-duplicates (never raises)."""
+    if not image_dedup.available:
+        return []
+    try:
+        matches = await asyncio.to_thread(image_dedup.check_and_add, image_bytes, output_path)
+    except Exception as e:  # Undecodable bytes: dedup is best-effort
+        print(f"⚠️  Perceptual hash skipped for {output_path.name}: {e}", file=sys.stderr)
+        return []
+    return [{"path": match.path, "distance": match.distance} for match in matches]
+
+
+async def _gpt4o_images(client, prompt: str, size: str, n: int = 1) -> list[bytes]:
+    """Generate n gpt-image-1 images in a single request."""
+    response = await rate_limiter.submit(
+        "openai", "gpt-image-1", client.images.generate,
+        model="gpt-image-1",
+        prompt=prompt,
+        size=size,
+        n=n
+    )
+
+    images = []
+    for item in response.data:
+        if item.b64_json:
+            # GPT-4o returns base64-encoded images
+            images.append(base64.b64decode(item.b64_json))
+        else:
+            # Fallback to URL if provided
+            image_response = await clients.http("openai").get(item.url, timeout=30.0)
+            images.append(image_response.content)
+    return images
+
+
+async def generate_gpt4o_image_mcp(
+    prompt: str,
+    aspect_ratio: str,
+    detail: str,
+    filename: str,
+    cache: str = "use"
+) -> list[TextContent]:
     """
     Generate image using GPT-4o (gpt-image-1) - MCP native implementation
 
@@ -136,23 +230,19 @@ async def generate_gpt4o_image_mcp(prompt: str, aspect_ratio: str, detail: str,
     - Better text rendering
     - Superior prompt understanding
     - Higher resolution support (up to 4096x4096)
-    """
 
-    # Map aspect ratio to size
-    size_map = {
-        "1:1": "1024x1024",
-        "2:3": "1024x1536",
-        "3:2": "1536x1024"
-    }
-    size = size_map.get(aspect_ratio, "1024x1024")
+    Caching:
+    - cache="use" (default) returns a previous identical request from the image cache
+    - cache="refresh" regenerates and replaces the cached image
+    - cache="bypass" skips the cache entirely
+    """
+    try:
+        ImageResultCache.check_mode(cache)
+    except ValueError as e:
+        return [TextContent(type="text", text=f"❌ Error: {e}")]
 
-    # Cost calculation
-    cost_map = {
-        "1024x1024": 0.04,
-        "1024x1536": 0.06,
-        "1536x1024": 0.06
-    }
-    cost = cost_map.get(size, 0.04)
+    size = GPT4O_SIZES.get(aspect_ratio, "1024x1024")
+    cost = GPT4O_COSTS.get(size, 0.04)
 
     try:
         # Initialize OpenAI client (inside function, not at module level)
@@ -163,29 +253,24 @@ async def generate_gpt4o_image_mcp(prompt: str, aspect_ratio: str, detail: str,
                 text="❌ Error: OPENAI_API_KEY not found in environment variables.\n\nPlease add it to MARKETING_TEAM/.env file."
             )]
 
-        client = AsyncOpenAI(api_key=api_key)
+        # Identical request already generated? Serve it from the image cache
+        cache_key = ImageResultCache.key_for("generate_gpt4o_image", "gpt-image-1", prompt, size=size)
+        image_cache.record(cache)
+        # (index scans, blob reads and index writes run in a worker thread)
+        cached = await asyncio.to_thread(image_cache.get, cache_key) if cache == "use" else None
 
-        # Call GPT-4o image generation
-        response = await client.images.generate(
-            model="gpt-image-1",
-            prompt=prompt,
-            size=size,
-            n=1
-        )
+        if cached:
+            image_data = await asyncio.to_thread(cached.read)
+            cache_status = "hit"
+        else:
+            client = clients.openai(api_key)
 
-        # GPT-4o returns base64-encoded images
-        image_b64 = response.data[0].b64_json
+            # Call GPT-4o image generation
+            image_data = (await _gpt4o_images(client, prompt, size, n=1))[0]
 
-        if image_b64:
-            # Decode base64 image data
-            image_data = base64.b64decode(image_b64)
-            image_url = "Generated via base64 (GPT-4o)"
-        else:
-            # Fallback to URL if provided
-            image_url = response.data[0].url
-            async with httpx.AsyncClient() as http_client:
-                image_response = await http_client.get(image_url, timeout=30.0)
-                image_data = image_response.content
+            if cache != "bypass":
+                await asyncio.to_thread(image_cache.put, cache_key, image_data, "image/png")
+            cache_status = "miss" if cache == "use" else cache
 
         # Save locally
         output_dir = Path("MARKETING_TEAM/outputs/images").resolve()
@@ -195,6 +280,12 @@ async def generate_gpt4o_image_mcp(prompt: str, aspect_ratio: str, detail: str,
         with open(output_path, "wb") as f:
             f.write(image_data)
 
+        asset_catalog.record(
+            output_path, "image", tool="generate_gpt4o_image", model="gpt-image-1", prompt=prompt,
+            aspect_ratio=aspect_ratio, cost=0.0 if cached else cost, detail=detail
+        )
+        near_duplicates = await _near_duplicates(output_path, image_data)
+
         # Prepare result
         result = {
             "status": "success",
@@ -204,8 +295,13 @@ async def generate_gpt4o_image_mcp(prompt: str, aspect_ratio: str, detail: str,
             "size": size,
             "aspect_ratio": aspect_ratio,
             "detail": detail,
-            "cost_usd": cost,
-            "message": f"✅ Image generated successfully and saved to {output_path}"
+            "cost_usd": 0.0 if cached else cost,
+            "cache": _image_cache_report(cache_key, cache_status),
+            **({"near_duplicates": near_duplicates} if near_duplicates else {}),
+            "message": (
+                f"✅ Image served from cache and saved to {output_path}" if cached
+                else f"✅ Image generated successfully and saved to {output_path}"
+            )
         }
 
         return [TextContent(
@@ -233,7 +329,8 @@ async def generate_sora_video_mcp(
     platform: str = "tiktok",
     icp: str = None,
     product_features: str = None,
-    video_setting: str = None
+    video_setting: str = None,
+    async_mode: bool = False
 ) -> list[TextContent]:
     """
     Generate video using Sora-2 - MCP native implementation with UGC support
@@ -251,65 +348,47 @@ async def generate_sora_video_mcp(
     - Automatically builds authentic UGC prompt from templates
     - Requires product_name parameter
     - Optional: platform, icp, product_features, video_setting
+
+    Async mode:
+    - Set async_mode=True to return a job_id as soon as Sora accepts the request
+    - Collect the video later with get_video_job_status / fetch_video_job_result
+
+    Identical requests (e.g. a retry after a client timeout) attach to the job that
+    is still running instead of submitting a second video.
     """
+    # Key the request on its arguments (locals() holds only the parameters here)
+    request_key = SingleFlight.key_for("generate_sora_video", {k: v for k, v in locals().items() if k != "async_mode"})
 
     # Validation: If ugc_style provided, product_name is required
     if ugc_style and not product_name:
         return [TextContent(type="text", text="❌ Error: 'product_name' is required when using 'ugc_style'.")]
 
+    attached = await _join_running_job("generate_sora_video", request_key, async_mode)
+    if attached:
+        return attached
+
     # NEW: Build UGC prompt from template if ugc_style provided
     custom_prompt_addition = prompt  # Save custom prompt for later appending
     if ugc_style:
         try:
-            # Load UGC templates
-            template_path = Path(__file__).parent.parent / "memory" / "ugc_prompt_templates.json"
-            with open(template_path, 'r', encoding='utf-8') as f:
-                templates = json.load(f)
-
-            # Get base template
-            if ugc_style not in templates.get("base_templates", {}):
-                available_styles = ", ".join(templates.get("base_templates", {}).keys())
-                return [TextContent(
-                    type="text",
-                    text=f"❌ Error: Unknown UGC style '{ugc_style}'. Available: {available_styles}"
-                )]
-
-            template = templates["base_templates"][ugc_style]
-
-            # Build UGC prompt (Sora-optimized version - no native audio)
-            platform_desc = template["platform_optimized"].get(platform, template["platform_optimized"]["tiktok"])
-            execution = template["execution_approach"]
-
-            # Start building prompt
-            prompt = f"UGC-STYLE VIDEO ({ugc_style.upper()}):\n\n"
-            prompt += f"{platform_desc}\n\n"
-            prompt += f"PRODUCT: {product_name}\n\n"
-
-            if icp:
-                prompt += f"TARGET AUDIENCE: {icp}\n\n"
-
-            if product_features:
-                prompt += f"KEY FEATURES: {product_features}\n\n"
+            # Build UGC prompt (Sora-optimized version - no native audio) from the preloaded store
+            prompt = ugc_templates.render_sora_prompt(
+                ugc_style,
+                platform,
+                product_name,
+                icp=icp,
+                product_features=product_features,
+                video_setting=video_setting,
+                additional_instructions=custom_prompt_addition
+            )
 
-            if video_setting:
-                prompt += f"SETTING: {video_setting}\n\n"
-
-            prompt += f"EXECUTION: {execution}\n\n"
-            prompt += "AUTHENTICITY REQUIREMENTS:\n"
-            prompt += "- Handheld camera feel (natural shake, not stabilized)\n"
-            prompt += "- Natural lighting (window light, outdoor, no studio)\n"
-            prompt += "- Casual settings (home, kitchen, outdoors, everyday)\n"
-            prompt += "- Real people vibe (casual clothes, relatable environment)\n"
-            prompt += "- NO professional production, NO perfect lighting\n"
-            prompt += "- NO corporate polish (authentic > perfect)\n"
-
-            # Append custom prompt if provided (combine UGC template + custom instructions)
             if custom_prompt_addition:
-                prompt += f"\n\nADDITIONAL INSTRUCTIONS:\n{custom_prompt_addition}\n"
                 print(f"✅ Built UGC prompt from '{ugc_style}' template for {platform} + custom additions", file=sys.stderr)
             else:
                 print(f"✅ Built UGC prompt from '{ugc_style}' template for {platform}", file=sys.stderr)
 
+        except ValueError as e:
+            return [TextContent(type="text", text=f"❌ Error: {e}")]
         except Exception as e:
             return [TextContent(type="text", text=f"❌ Error building UGC prompt: {str(e)}")]
 
@@ -366,182 +445,144 @@ async def generate_sora_video_mcp(
 
             print(f"🔍 Analyzing image with GPT-4o Vision for better consistency...", file=sys.stderr)
             try:
-                # Read and encode image as base64
-                with open(image_path, 'rb') as f:
-                    image_data = base64.b64encode(f.read()).decode('utf-8')
-
-                # Determine image format
-                image_format = image_path.suffix.lower().replace('.', '')
-                if image_format == 'jpg':
-                    image_format = 'jpeg'
-
-                # Create data URL
-                image_url = f"data:image/{image_format};base64,{image_data}"
-
-                # Call GPT-4o Vision
-                vision_client = AsyncOpenAI(api_key=api_key)
-                vision_response = await vision_client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[{
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": "Describe this product in detail for video generation: include colors, shapes, textures, materials, design elements, and overall composition. Focus on visual characteristics that would help maintain consistency in a video."
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {"url": image_url, "detail": "high"}
-                            }
-                        ]
-                    }],
-                    max_tokens=300
+                # Cached by image digest (near-duplicates only if opted in), so a reused product photo is only paid for once
+                image_description, source = await analyze_image(
+                    clients.openai(api_key), str(image_path), prompt="product", dedup=image_dedup
                 )
-
-                image_description = vision_response.choices[0].message.content.strip()
-                print(f"✅ Image analysis complete (+$0.01)", file=sys.stderr)
+                if source == vision_analysis.CACHED:
+                    print(f"✅ Image analysis served from cache (no charge)", file=sys.stderr)
+                elif source == vision_analysis.NEAR_DUPLICATE:
+                    print(f"✅ Image analysis reused from a near-duplicate image (no charge)", file=sys.stderr)
+                else:
+                    print(f"✅ Image analysis complete (+$0.01)", file=sys.stderr)
+                    analysis_cost = 0.01
                 print(f"📝 Description: {image_description[:100]}...", file=sys.stderr)
 
                 # Enhance prompt with image description
                 prompt = f"{prompt}\n\nVisual reference: {image_description}"
-                analysis_cost = 0.01
 
             except Exception as e:
                 print(f"⚠️  Image analysis failed: {str(e)}, continuing with original prompt", file=sys.stderr)
 
-        # Make direct HTTP API call to Sora
-        async with httpx.AsyncClient(timeout=300.0) as http_client:
-            # Step 1: Create video generation request
-            if input_reference:
-                # Image-to-video: Use multipart/form-data
-                image_path = Path(input_reference)
-                with open(image_path, 'rb') as f:
-                    image_file_data = f.read()
-
-                files = {
-                    'input_reference': (image_path.name, image_file_data, 'image/png')
-                }
-                data = {
-                    "model": "sora-2",
-                    "prompt": prompt,
-                    "size": resolution,
-                    "seconds": seconds
-                }
-                headers = {
-                    "Authorization": f"Bearer {api_key}",
-                }
-
-                response = await http_client.post(
-                    "https://api.openai.com/v1/videos",
-                    headers=headers,
-                    data=data,
-                    files=files
-                )
-            else:
-                # Text-to-video: Use JSON
-                headers = {
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json"
-                }
-
-                payload = {
-                    "model": "sora-2",
-                    "prompt": prompt,
-                    "size": resolution,
-                    "seconds": seconds  # Must be string
-                }
+        # Make direct HTTP API call to Sora over the shared keep-alive pool
+        http_client = clients.http("openai")
 
-                response = await http_client.post(
-                    "https://api.openai.com/v1/videos",
-                    headers=headers,
-                    json=payload
-                )
+        # Step 1: Create video generation request
+        if input_reference:
+            # Image-to-video: Use multipart/form-data
+            image_path = Path(input_reference)
+            with open(image_path, 'rb') as f:
+                image_file_data = f.read()
 
-            if response.status_code == 404:
-                return [TextContent(
-                    type="text",
-                    text=(
-                        "❌ Sora API not available (404)\n\n"
-                        "The Sora video API may not be available for your account yet.\n\n"
-                        "**To get access:**\n"
-                        "1. Visit https://platform.openai.com/settings/organization/general\n"
-                        "2. Verify your organization\n"
-                        "3. Apply for Sora access if needed\n\n"
-                        "**Alternative:** Use visual-designer to create storyboard images with GPT-4o"
-                    )
-                )]
+            files = {
+                'input_reference': (image_path.name, image_file_data, 'image/png')
+            }
+            data = {
+                "model": "sora-2",
+                "prompt": prompt,
+                "size": resolution,
+                "seconds": seconds
+            }
+            headers = {
+                "Authorization": f"Bearer {api_key}",
+            }
 
-            if response.status_code != 200:
-                error_detail = response.json() if 'application/json' in response.headers.get('content-type', '') else response.text
-                return [TextContent(
-                    type="text",
-                    text=f"❌ API Error ({response.status_code}):\n\n{json.dumps(error_detail, indent=2)}"
-                )]
+            response = await rate_limiter.submit(
+                "openai", "sora-2", http_client.post,
+                "https://api.openai.com/v1/videos",
+                headers=headers,
+                data=data,
+                files=files
+            )
+        else:
+            # Text-to-video: Use JSON
+            headers = {
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            }
 
-            result = response.json()
-            video_id = result.get('id')
+            payload = {
+                "model": "sora-2",
+                "prompt": prompt,
+                "size": resolution,
+                "seconds": seconds  # Must be string
+            }
 
-            if not video_id:
-                return [TextContent(
-                    type="text",
-                    text=f"⚠️ No video ID in response:\n\n{json.dumps(result, indent=2)}"
-                )]
+            response = await rate_limiter.submit(
+                "openai", "sora-2", http_client.post,
+                "https://api.openai.com/v1/videos",
+                headers=headers,
+                json=payload
+            )
 
-            # Step 2: Poll for completion
-            await _poll_for_video_completion(http_client, headers, video_id)
+        if response.status_code == 404:
+            return [TextContent(
+                type="text",
+                text=(
+                    "❌ Sora API not available (404)\n\n"
+                    "The Sora video API may not be available for your account yet.\n\n"
+                    "**To get access:**\n"
+                    "1. Visit https://platform.openai.com/settings/organization/general\n"
+                    "2. Verify your organization\n"
+                    "3. Apply for Sora access if needed\n\n"
+                    "**Alternative:** Use visual-designer to create storyboard images with GPT-4o"
+                )
+            )]
 
-            # Step 3: Download video
-            output_dir = Path("MARKETING_TEAM/outputs/videos").resolve()
-            output_dir.mkdir(parents=True, exist_ok=True)
+        if response.status_code != 200:
+            error_detail = response.json() if 'application/json' in response.headers.get('content-type', '') else response.text
+            return [TextContent(
+                type="text",
+                text=f"❌ API Error ({response.status_code}):\n\n{json.dumps(error_detail, indent=2)}"
+            )]
 
-            if not filename.endswith('.mp4'):
-                filename = f"{filename}.mp4"
-            output_path = output_dir / filename
+        result = response.json()
+        video_id = result.get('id')
 
-            video_content_response = await http_client.get(
-                f"https://api.openai.com/v1/videos/{video_id}/content",
-                headers=headers
-            )
+        if not video_id:
+            return [TextContent(
+                type="text",
+                text=f"⚠️ No video ID in response:\n\n{json.dumps(result, indent=2)}"
+            )]
 
-            if video_content_response.status_code != 200:
-                return [TextContent(
-                    type="text",
-                    text=f"❌ Failed to download video: {video_content_response.status_code}"
-                )]
+        if not filename.endswith('.mp4'):
+            filename = f"{filename}.mp4"
 
-            output_path.write_bytes(video_content_response.content)
-
-            # Success response
-            generation_type = "Image-to-video" if input_reference else "Text-to-video"
-            total_cost = estimated_cost + analysis_cost
-            cost_breakdown = f"${estimated_cost:.2f}"
-            if analysis_cost > 0:
-                cost_breakdown += f" + ${analysis_cost:.2f} (image analysis)"
-
-            result_text = (
-                f"✅ Video generated successfully!\n\n"
-                f"**Model:** sora-2\n"
-                f"**Type:** {generation_type}\n"
-                f"**Prompt:** {prompt}\n"
-                f"**Duration:** {seconds}s\n"
-                f"**Resolution:** {resolution} ({orientation})\n"
-                f"**Cost:** ${total_cost:.2f} ({cost_breakdown})\n\n"
-            )
+        # Step 2: Hand the job to the shared background poller (polls + downloads)
+        job = video_jobs.submit(
+            "sora",
+            video_id,
+            filename,
+            metadata={
+                "prompt": prompt,
+                "seconds": seconds,
+                "orientation": orientation,
+                "resolution": resolution,
+                "estimated_cost": estimated_cost,
+                "analysis_cost": analysis_cost,
+                "input_reference": input_reference,
+                "image_analyzed": bool(image_description),
+                "auto_analyze_image": auto_analyze_image,
+                "ugc_style": ugc_style,
+                "product_name": product_name,
+                "platform": platform,
+                "request_key": request_key
+            }
+        )
 
-            if input_reference:
-                result_text += f"**Reference Image:** {input_reference}\n"
-                if image_description:
-                    result_text += f"**Visual Analysis:** GPT-4o Vision enabled ✓\n"
+        if async_mode:
+            return [TextContent(type="text", text=_job_submitted_text(job))]
 
-            result_text += (
-                f"\n**Saved to:** {output_path}\n"
-                f"**Video ID:** {video_id}"
-            )
+        # Step 3: Wait for the poller to finish the job
+        job = await video_jobs.wait(job.job_id)
 
-            if input_reference and not auto_analyze_image:
-                result_text += "\n\n💡 Tip: Enable auto_analyze_image=True for better product consistency (+$0.01)"
+        if job.status == FAILED:
+            return [TextContent(
+                type="text",
+                text=f"❌ Error generating video: {job.error}\n\nCheck your OPENAI_API_KEY and Sora API access."
+            )]
 
-            return [TextContent(type="text", text=result_text)]
+        return [TextContent(type="text", text=job.result_text)]
 
     except Exception as e:
         return [TextContent(
@@ -586,48 +627,20 @@ async def analyze_ugc_image_mcp(image_url: str) -> list[TextContent]:
                 text="❌ Error: OPENAI_API_KEY not found in environment variables.\n\nPlease add it to MARKETING_TEAM/.env file."
             )]
 
-        client = AsyncOpenAI(api_key=api_key)
-
-        # Determine if image_url is local file or URL
-        if os.path.exists(image_url):
-            # Local file - read and encode to base64
-            with open(image_url, "rb") as image_file:
-                image_data = base64.b64encode(image_file.read()).decode('utf-8')
-                image_input = f"data:image/png;base64,{image_data}"
-        else:
-            # Assume it's a URL
-            image_input = image_url
-
-        # Call GPT-4o Vision API with N8n-style prompt
-        response = await client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": "Describe what is in the image. Describe the environment and the human who is the focus of the image, as well as what the human is holding."
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": image_input,
-                                "detail": "high"
-                            }
-                        }
-                    ]
-                }
-            ],
-            max_tokens=300
-        )
+        client = clients.openai(api_key)
 
-        description = response.choices[0].message.content
+        # Local files are cached by image digest; URLs are sent to GPT-4o as-is
+        # (N8n-style scene prompt: environment, human and what they are holding)
+        description, source = await analyze_image(client, str(image_url), prompt="ugc_scene", dedup=image_dedup)
+        cost = {
+            vision_analysis.CACHED: "$0.00 (cached analysis)",
+            vision_analysis.NEAR_DUPLICATE: "$0.00 (reused analysis of a near-duplicate image, verify colours)",
+        }.get(source, "~$0.01")
 
         result_text = (
             f"✅ Image Analysis Complete!\n\n"
             f"**Model:** GPT-4o Vision\n"
-            f"**Cost:** ~$0.01\n\n"
+            f"**Cost:** {cost}\n\n"
             f"**Description:**\n{description}\n\n"
             f"Use this description as `reference_image_description` parameter in generate_veo_ugc_from_image for maximum visual consistency."
         )
@@ -641,7 +654,73 @@ async def analyze_ugc_image_mcp(image_url: str) -> list[TextContent]:
         )]
 
 
-async def generate_nano_banana_image_mcp(prompt: str, aspect_ratio: str, filename: str) -> list[TextContent]:
+async def warm_vision_cache_mcp(folder: str, prompt: str = "product") -> list[TextContent]:
+    """
+    Pre-analyze a folder of product images with GPT-4o Vision.
+
+    Later Sora / Veo image-to-video calls and analyze_ugc_image reuse the cached
+    analyses instead of paying for the same image again. Images already cached
+    are skipped.
+
+    Args:
+        folder: Directory of product images (.png, .jpg, .jpeg, .webp, .gif)
+        prompt: "product" (Sora auto_analyze_image) or "ugc_scene" (analyze_ugc_image / Veo UGC)
+
+    Cost: ~$0.01 per newly analyzed image
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return [TextContent(
+            type="text",
+            text="❌ Error: OPENAI_API_KEY not found in environment variables.\n\nPlease add it to MARKETING_TEAM/.env file."
+        )]
+
+    try:
+        summary = await vision_analysis.warm_cache(clients.openai(api_key), folder, prompt=prompt)
+    except ValueError as e:
+        return [TextContent(type="text", text=f"❌ Error: {e}")]
+
+    summary["cost_usd"] = round(summary["analyzed"] * 0.01, 2)
+    summary["message"] = (
+        f"✅ Vision cache warmed: {summary['analyzed']} analyzed, "
+        f"{summary['cached']} already cached, {len(summary['failed'])} failed"
+    )
+    return [TextContent(type="text", text=json.dumps(summary, indent=2))]
+
+
+async def _nano_banana_image(client, types, prompt: str, aspect_ratio: str):
+    """Generate one Nano Banana image. Returns (image Part for Veo 3.1, image bytes, MIME type)."""
+    # Blocking SDK call runs on the provider executor so other tool calls keep flowing
+    response = await rate_limiter.submit(
+        "gemini", "gemini-2.5-flash-image", clients.run_blocking,
+        client.models.generate_content,
+        model="gemini-2.5-flash-image",
+        contents=prompt,
+        config=types.GenerateContentConfig(
+            response_modalities=["IMAGE"],
+            image_config=types.ImageConfig(aspect_ratio=aspect_ratio)
+        )
+    )
+
+    # Extract the Image object from the response (THIS is what Veo 3.1 needs!)
+    image_part = response.candidates[0].content.parts[0]
+    image_data = image_part.inline_data.data
+
+    # Decode base64 if needed
+    if isinstance(image_data, str):
+        image_bytes = base64.b64decode(image_data)
+    else:
+        image_bytes = image_data
+
+    return image_part, image_bytes, image_part.inline_data.mime_type or "image/png"
+
+
+async def generate_nano_banana_image_mcp(
+    prompt: str,
+    aspect_ratio: str,
+    filename: str,
+    cache: str = "use"
+) -> list[TextContent]:
     """
     Generate product image optimized for Veo 3.1 UGC video conversion using Gemini 2.5 Flash Image.
 
@@ -666,10 +745,17 @@ async def generate_nano_banana_image_mcp(prompt: str, aspect_ratio: str, filenam
         prompt: Natural language image description (emphasize: human holding product, selfie-style)
         aspect_ratio: "9:16" (default), "16:9", "1:1", etc.
         filename: Output filename (without extension, .png added automatically)
+        cache: "use" (default) to reuse an identical earlier image, "refresh" to regenerate
+            and replace it, "bypass" to skip the image cache
 
     Returns:
-        Image saved to outputs/images/, ready for Veo 3.1 UGC video generation
+        Image saved to outputs/images/ plus an image handle, ready for Veo 3.1 UGC video
+        generation (pass image_handle to generate_veo_ugc_from_image)
     """
+    try:
+        ImageResultCache.check_mode(cache)
+    except ValueError as e:
+        return [TextContent(type="text", text=f"❌ Error: {e}")]
 
     if not GOOGLE_GENAI_AVAILABLE:
         return [TextContent(
@@ -677,6 +763,8 @@ async def generate_nano_banana_image_mcp(prompt: str, aspect_ratio: str, filenam
             text="❌ Error: google-genai package not installed.\n\nRun: pip install google-genai"
         )]
 
+    types = _genai_types()
+
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         return [TextContent(
@@ -685,26 +773,34 @@ async def generate_nano_banana_image_mcp(prompt: str, aspect_ratio: str, filenam
         )]
 
     try:
-        # Initialize Gemini client
-        client = genai.Client(api_key=api_key)
+        # Identical request already generated? Serve it from the image cache
+        cache_key = ImageResultCache.key_for(
+            "generate_nano_banana_image", "gemini-2.5-flash-image", prompt, aspect_ratio=aspect_ratio
+        )
+        image_cache.record(cache)
+        cached = await asyncio.to_thread(image_cache.get, cache_key) if cache == "use" else None
+
+        if cached:
+            print(f"♻️  Nano Banana image served from cache ({aspect_ratio})", file=sys.stderr)
+            image_bytes = await asyncio.to_thread(cached.read)
+            mime_type = cached.mime_type
+            # Rebuild the Part object Veo 3.1 expects from the cached bytes
+            image_part = types.Part.from_bytes(data=image_bytes, mime_type=mime_type)
+            cache_status = "hit"
+        else:
+            # Initialize Gemini client
+            client = clients.genai(api_key)
 
-        # Generate image
-        print(f"🎨 Generating Nano Banana image ({aspect_ratio})...", file=sys.stderr)
+            # Generate image
+            print(f"🎨 Generating Nano Banana image ({aspect_ratio})...", file=sys.stderr)
 
-        response = client.models.generate_content(
-            model="gemini-2.5-flash-image",
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                response_modalities=["IMAGE"],
-                image_config=types.ImageConfig(aspect_ratio=aspect_ratio)
-            )
-        )
+            image_part, image_bytes, mime_type = await _nano_banana_image(client, types, prompt, aspect_ratio)
 
-        # Extract the Image object from the response (THIS is what Veo 3.1 needs!)
-        image_part = response.candidates[0].content.parts[0]
+            if cache != "bypass":
+                await asyncio.to_thread(image_cache.put, cache_key, image_bytes, mime_type)
+            cache_status = "miss" if cache == "use" else cache
 
         # Also save to disk for user reference
-        image_data = image_part.inline_data.data
         output_dir = Path("outputs/images")
         output_dir.mkdir(parents=True, exist_ok=True)
 
@@ -712,30 +808,37 @@ async def generate_nano_banana_image_mcp(prompt: str, aspect_ratio: str, filenam
             filename = f"{filename}.png"
         output_path = output_dir / filename
 
-        # Decode base64 if needed
-        if isinstance(image_data, str):
-            image_bytes = base64.b64decode(image_data)
-        else:
-            image_bytes = image_data
-
         with open(output_path, "wb") as f:
             f.write(image_bytes)
 
-        # Store the Image Part globally so Veo can use it
-        # For Nano Banana (Gemini Flash Image), the Part is at response.candidates[0].content.parts[0]
-        global _last_generated_image
-        _last_generated_image = image_part
+        asset_catalog.record(
+            output_path, "image", tool="generate_nano_banana_image", model="gemini-2.5-flash-image",
+            prompt=prompt, aspect_ratio=aspect_ratio, cost=0.0 if cached else NANO_BANANA_COST
+        )
+        near_duplicates = await _near_duplicates(output_path, image_bytes)
+
+        # Keep the image Part in memory under its own handle so Veo can reuse it
+        # (parallel pipelines each get their own handle instead of sharing one slot)
+        image_handle = image_handles.put(
+            image_bytes, mime_type, part=image_part, path=output_path, source="generate_nano_banana_image"
+        )
 
+        cache_report = _image_cache_report(cache_key, cache_status)
         result_text = (
             f"✅ Product Image Generated!\n\n"
             f"**Model:** gemini-2.5-flash-image (Nano Banana)\n"
             f"**Aspect ratio:** {aspect_ratio}\n"
-            f"**Cost:** $0.039\n\n"
-            f"**Saved to:** {str(output_path)}\n\n"
+            f"**Cost:** {'$0.00 (cache hit, saved $0.039)' if cached else '$0.039'}\n"
+            f"**Cache:** {cache_status} (hits: {cache_report['hits']}, misses: {cache_report['misses']})\n\n"
+            f"**Saved to:** {str(output_path)}\n"
+            f"**Image handle:** {image_handle}\n\n"
             f"✨ This image is optimized for Veo 3.1 image-to-video conversion.\n"
-            f"✨ Image object cached in memory for immediate Veo 3.1 use.\n\n"
-            f"**Next step:** Use generate_veo_ugc_from_nano_banana to create UGC ad video"
+            f"✨ Image object kept in memory for immediate Veo 3.1 use.\n\n"
+            f"**Next step:** Use generate_veo_ugc_from_image with image_handle=\"{image_handle}\" to create UGC ad video"
         )
+        if near_duplicates:
+            result_text += "\n\n**Near-duplicates of earlier images** (check search_assets for videos already made from them):\n"
+            result_text += "".join(f"- {match['path']} ({match['distance']} bits apart)\n" for match in near_duplicates)
 
         return [TextContent(type="text", text=result_text)]
 
@@ -746,6 +849,289 @@ async def generate_nano_banana_image_mcp(prompt: str, aspect_ratio: str, filenam
         )]
 
 
+# ============================================================================
+# BATCH IMAGE GENERATION (bounded fan-out)
+# ============================================================================
+
+IMAGE_BATCH_MAX_ITEMS = 40
+IMAGE_BATCH_MAX_IMAGES = 100
+GPT4O_MAX_N = 10  # gpt-image-1 images per request
+
+NANO_BANANA_ASPECT_RATIOS = ["1:1", "16:9", "9:16", "2:3", "3:2", "3:4", "4:3", "4:5", "5:4", "21:9"]
+
+
+@dataclass
+class _BatchImage:
+    """One image of a batch item (an item with variants=3 expands to three)."""
+    item: int
+    prompt: str
+    params: dict
+    path: Path
+    cache_key: str
+    status: str = "pending"  # hit | generated | failed
+    error: Optional[str] = None
+    handle: Optional[str] = None  # Nano Banana images: in-memory handle for Veo
+
+
+async def _send_progress(progress: int, total: int, message: str):
+    """Stream a progress notification when the calling MCP client asked for one."""
+    try:
+        context = app.request_context
+    except LookupError:
+        return  # Not inside an MCP request (direct calls, tests)
+
+    token = getattr(context.meta, "progressToken", None) if context.meta else None
+    if token is not None:
+        await context.session.send_progress_notification(token, progress, total=total, message=message)
+
+
+async def generate_image_batch_mcp(
+    items: list,
+    provider: str = "gpt4o",
+    filename_prefix: str = "batch",
+    cache: str = "use"
+) -> list[TextContent]:
+    """
+    Generate many product-shot variants in one tool call.
+
+    Each item is {"prompt", "aspect_ratio"?, "variants"?, "filename"?}; an item with
+    variants=N produces N images (<stem>_v1.png ... <stem>_vN.png).
+
+    Fan-out:
+    - gpt4o: images sharing a prompt and size are merged into provider-side n>1
+      requests (up to 10 images per request)
+    - nano_banana: one request per image (the API returns a single image)
+    - Requests run concurrently under the provider's shared semaphore (clients.limit),
+      so a large batch cannot flood the provider
+    - Each finished item is streamed as an MCP progress notification (when the client
+      sent a progressToken) and logged to stderr
+
+    A failed request only fails the images it was producing; the batch reports
+    per-item status instead of aborting. Images are cached like the single-image
+    tools (variant 1 shares their cache entry). Nano Banana items also report
+    image_handles for generate_veo_ugc_from_image.
+
+    Args:
+        items: Image specs (1-40 items, at most 100 images in total)
+        provider: "gpt4o" (default) or "nano_banana"
+        filename_prefix: Filename stem for items without a filename (<prefix>_01, ...)
+        cache: "use" (default), "refresh" or "bypass" (see generate_gpt4o_image)
+
+    Returns:
+        JSON summary with per-item status in completion order
+    """
+    try:
+        ImageResultCache.check_mode(cache)
+    except ValueError as e:
+        return [TextContent(type="text", text=f"❌ Error: {e}")]
+
+    if provider == "gpt4o":
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            return [TextContent(
+                type="text",
+                text="❌ Error: OPENAI_API_KEY not found in environment variables.\n\nPlease add it to MARKETING_TEAM/.env file."
+            )]
+        client = clients.openai(api_key)
+        pool, model, tool_name, default_aspect = "openai", "gpt-image-1", "generate_gpt4o_image", "1:1"
+        output_dir = Path("MARKETING_TEAM/outputs/images").resolve()
+    elif provider == "nano_banana":
+        if not GOOGLE_GENAI_AVAILABLE:
+            return [TextContent(
+                type="text",
+                text="❌ Error: google-genai package not installed.\n\nRun: pip install google-genai"
+            )]
+        types = _genai_types()
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            return [TextContent(
+                type="text",
+                text="❌ Error: GEMINI_API_KEY not found in environment variables.\n\nPlease add it to MARKETING_TEAM/.env file."
+            )]
+        client = clients.genai(api_key)
+        pool, model, tool_name, default_aspect = "gemini", "gemini-2.5-flash-image", "generate_nano_banana_image", "9:16"
+        output_dir = Path("outputs/images")
+    else:
+        return [TextContent(type="text", text=f"❌ Error: Unknown provider '{provider}'. Use gpt4o or nano_banana")]
+
+    total_images = sum(item.get("variants") or 1 for item in items)
+    if total_images > IMAGE_BATCH_MAX_IMAGES:
+        return [TextContent(
+            type="text",
+            text=f"❌ Error: Batch asks for {total_images} images (max {IMAGE_BATCH_MAX_IMAGES}). Split it into smaller batches."
+        )]
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Expand items into individual images; unsupported specs fail their item only
+    images: list[_BatchImage] = []
+    item_errors: dict[int, str] = {}
+    for index, item in enumerate(items):
+        aspect_ratio = item.get("aspect_ratio") or default_aspect
+        if provider == "gpt4o" and aspect_ratio not in GPT4O_SIZES:
+            item_errors[index] = f"GPT-4o supports aspect ratios {', '.join(GPT4O_SIZES)} (got {aspect_ratio})"
+            continue
+        params = {"size": GPT4O_SIZES[aspect_ratio]} if provider == "gpt4o" else {"aspect_ratio": aspect_ratio}
+
+        stem = item.get("filename") or f"{filename_prefix}_{index + 1:02d}"
+        stem = stem[:-4] if stem.endswith(".png") else stem
+        variants = item.get("variants") or 1
+        for variant in range(variants):
+            # Variant 1 shares its cache key with the single-image tools
+            extra = {"variant": variant} if variant else {}
+            images.append(_BatchImage(
+                item=index,
+                prompt=item["prompt"],
+                params=params,
+                path=output_dir / (f"{stem}_v{variant + 1}.png" if variants > 1 else f"{stem}.png"),
+                cache_key=ImageResultCache.key_for(tool_name, model, item["prompt"], **params, **extra)
+            ))
+
+    # Serve cache hits first
+    image_cache.record(cache)
+    pending = []
+    for image in images:
+        cached = await asyncio.to_thread(image_cache.get, image.cache_key) if cache == "use" else None
+        if cached:
+            try:
+                data = await asyncio.to_thread(cached.read)
+                image.path.write_bytes(data)
+            except OSError as e:
+                image.status, image.error = "failed", f"Could not save cached image: {e}"
+                continue
+            image.status = "hit"
+            if provider == "nano_banana":
+                image.handle = image_handles.put(data, cached.mime_type, path=image.path, source="generate_image_batch")
+        else:
+            pending.append(image)
+
+    # Group the rest into provider requests
+    if provider == "gpt4o":
+        groups: dict[tuple, list[_BatchImage]] = {}
+        for image in pending:
+            groups.setdefault((normalise_prompt(image.prompt), image.params["size"]), []).append(image)
+        requests = [
+            group[start:start + GPT4O_MAX_N]
+            for group in groups.values()
+            for start in range(0, len(group), GPT4O_MAX_N)
+        ]
+    else:
+        requests = [[image] for image in pending]
+
+    semaphore = clients.limit(pool)
+
+    async def run_request(batch: list[_BatchImage]) -> list[_BatchImage]:
+        first = batch[0]
+        try:
+            async with semaphore:
+                if provider == "gpt4o":
+                    results = [
+                        (data, "image/png")
+                        for data in await _gpt4o_images(client, first.prompt, first.params["size"], n=len(batch))
+                    ]
+                else:
+                    part, data, mime_type = await _nano_banana_image(client, types, first.prompt, first.params["aspect_ratio"])
+                    first.handle = image_handles.put(data, mime_type, part=part, path=first.path, source="generate_image_batch")
+                    results = [(data, mime_type)]
+        except Exception as e:
+            for image in batch:
+                image.status, image.error = "failed", str(e)
+            return batch
+
+        # Saving is per image: one bad write must not abort the batch (or lose its siblings)
+        for image, (data, mime_type) in zip(batch, results):
+            try:
+                image.path.write_bytes(data)
+            except OSError as e:
+                image.status, image.error = "failed", f"Generated but not saved: {e}"
+                continue
+            image.status = "generated"
+            if cache != "bypass":
+                try:
+                    await asyncio.to_thread(image_cache.put, image.cache_key, data, mime_type)
+                except Exception as e:
+                    print(f"⚠️  Image cache write skipped for {image.path.name}: {e}", file=sys.stderr)
+        for image in batch[len(results):]:
+            image.status, image.error = "failed", f"Provider returned {len(results)} of {len(batch)} images"
+        return batch
+
+    by_item: dict[int, list[_BatchImage]] = {}
+    for image in images:
+        by_item.setdefault(image.item, []).append(image)
+    remaining = {index: sum(image.status == "pending" for image in group) for index, group in by_item.items()}
+    completed: list[dict] = []
+
+    async def report_item(index: int):
+        group = by_item.get(index, [])
+        errors = sorted({image.error for image in group if image.error})
+        if index in item_errors:
+            errors.append(item_errors[index])
+        saved = [str(image.path) for image in group if image.status != "failed"]
+        handles = [image.handle for image in group if image.handle and image.status != "failed"]
+        status = "success" if saved and not errors else ("partial" if saved else "failed")
+        completed.append({
+            "index": index,
+            "prompt": items[index]["prompt"],
+            "status": status,
+            "image_paths": saved,
+            "cache_hits": sum(image.status == "hit" for image in group),
+            **({"image_handles": handles} if handles else {}),
+            **({"errors": errors} if errors else {})
+        })
+        print(f"🖼️  Batch item {index + 1}/{len(items)}: {status} ({len(saved)} image(s))", file=sys.stderr)
+        await _send_progress(len(completed), len(items), f"Item {index + 1}: {status}")
+
+    # Items that need no provider request (all cached, or rejected) finish first
+    for index in range(len(items)):
+        if remaining.get(index, 0) == 0:
+            await report_item(index)
+
+    tasks = [asyncio.create_task(run_request(batch)) for batch in requests]
+    for next_done in asyncio.as_completed(tasks):
+        for image in await next_done:
+            remaining[image.item] -= 1
+            if remaining[image.item] == 0:
+                await report_item(image.item)
+
+    generated = [image for image in images if image.status == "generated"]
+    failed = sum(image.status == "failed" for image in images) + sum(
+        (items[index].get("variants") or 1) for index in item_errors
+    )
+    if provider == "gpt4o":
+        cost = sum(GPT4O_COSTS.get(image.params["size"], 0.04) for image in generated)
+    else:
+        cost = NANO_BANANA_COST * len(generated)
+    saved = sum(image.status != "failed" for image in images)
+
+    for image in images:
+        if image.status == "failed":
+            continue
+        if image.status == "hit":
+            image_cost = 0.0
+        else:
+            image_cost = GPT4O_COSTS.get(image.params["size"], 0.04) if provider == "gpt4o" else NANO_BANANA_COST
+        asset_catalog.record(
+            image.path, "image", tool=tool_name, model=model, prompt=image.prompt,
+            aspect_ratio=items[image.item].get("aspect_ratio") or default_aspect, cost=image_cost
+        )
+
+    result = {
+        "status": "success" if not failed else ("partial" if saved else "failed"),
+        "provider": provider,
+        "model": model,
+        "images_requested": total_images,
+        "images_saved": saved,
+        "images_failed": failed,
+        "cache_hits": sum(image.status == "hit" for image in images),
+        "provider_requests": len(requests),
+        "cost_usd": round(cost, 3),
+        "items": completed,
+        "message": f"✅ {saved}/{total_images} images saved to {output_dir}" if saved else "❌ No images were generated"
+    }
+
+    return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+
 async def generate_veo_text_to_video_mcp(
     prompt: str,
     seconds: str,
@@ -755,7 +1141,8 @@ async def generate_veo_text_to_video_mcp(
     negative_prompt: str = None,
     icp: str = None,
     product_features: str = None,
-    video_setting: str = None
+    video_setting: str = None,
+    async_mode: bool = False
 ) -> list[TextContent]:
     """
     Generate video from text prompt using Veo 3.1 text-to-video with native audio.
@@ -785,11 +1172,16 @@ async def generate_veo_text_to_video_mcp(
         product_features: Features to visualize in video
         video_setting: Environment description
 
+        async_mode: Return a job_id immediately instead of waiting for the video
+
     Returns:
         Video saved to outputs/videos/, cost summary, technical specs
+        (or a job_id in async mode - collect with fetch_video_job_result)
 
     Cost: $3.00 (4s), $4.50 (6s), $6.00 (8s)
     """
+    # Key the request on its arguments (locals() holds only the parameters here)
+    request_key = SingleFlight.key_for("generate_veo_text_to_video", {k: v for k, v in locals().items() if k != "async_mode"})
 
     if not GOOGLE_GENAI_AVAILABLE:
         return [TextContent(
@@ -797,6 +1189,8 @@ async def generate_veo_text_to_video_mcp(
             text="❌ Error: google-genai package not installed.\n\nRun: pip install google-genai"
         )]
 
+    types = _genai_types()
+
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         return [TextContent(
@@ -819,8 +1213,12 @@ async def generate_veo_text_to_video_mcp(
     cost = float(seconds) * 0.75
 
     try:
+        attached = await _join_running_job("generate_veo_text_to_video", request_key, async_mode)
+        if attached:
+            return attached
+
         # Initialize Gemini client
-        client = genai.Client(api_key=api_key)
+        client = clients.genai(api_key)
 
         print(f"🎬 Starting Veo 3.1 text-to-video generation...", file=sys.stderr)
         print(f"   Duration: {seconds}s | Resolution: {resolution} | Aspect: {aspect_ratio}", file=sys.stderr)
@@ -852,59 +1250,43 @@ async def generate_veo_text_to_video_mcp(
             print(f"   ✨ Using enhanced parameters for targeted messaging", file=sys.stderr)
 
         # Start generation
-        operation = client.models.generate_videos(
+        operation = await rate_limiter.submit(
+            "gemini", "veo-3.1-generate-preview", clients.run_blocking,
+            client.models.generate_videos,
             model="veo-3.1-generate-preview",
             prompt=enhanced_prompt,
             config=config
         )
 
-        # Poll for completion
+        if not filename.endswith('.mp4'):
+            filename = f"{filename}.mp4"
+
+        # Hand the operation to the shared background poller (polls + downloads)
+        job = video_jobs.submit(
+            "veo",
+            operation.name,
+            filename,
+            metadata={
+                "prompt": prompt,
+                "seconds": seconds,
+                "cost": cost,
+                "resolution": resolution,
+                "aspect_ratio": aspect_ratio,
+                "request_key": request_key
+            },
+            handle=operation
+        )
+
+        if async_mode:
+            return [TextContent(type="text", text=_job_submitted_text(job))]
+
         print("⏳ Video generating (this takes 11s - 6 minutes)...", file=sys.stderr)
-        poll_count = 0
+        job = await video_jobs.wait(job.job_id)
 
-        while not operation.done:
-            await asyncio.sleep(10)
-            operation = client.operations.get(operation)
-            poll_count += 1
-            if poll_count % 6 == 0:
-                print(f"   Still generating... ({poll_count * 10}s elapsed)", file=sys.stderr)
+        if job.status == FAILED:
+            return [TextContent(type="text", text=f"❌ {job.error}")]
 
-        # Check if blocked by safety
-        if not hasattr(operation.response, 'generated_videos') or not operation.response.generated_videos:
-            return [TextContent(
-                type="text",
-                text="❌ Video generation blocked by safety filters (no charge)"
-            )]
-
-        # Get video
-        video = operation.response.generated_videos[0]
-
-        # Download video
-        client.files.download(file=video.video)
-
-        # Save to outputs
-        output_dir = Path("MARKETING_TEAM/outputs/videos").resolve()
-        output_dir.mkdir(parents=True, exist_ok=True)
-
-        if not filename.endswith('.mp4'):
-            filename = f"{filename}.mp4"
-        output_path = output_dir / filename
-
-        video.video.save(str(output_path))
-
-        result_text = (
-            f"✅ Veo 3.1 Video Generated!\n\n"
-            f"**Model:** veo-3.1-generate-preview\n"
-            f"**Duration:** {seconds} seconds\n"
-            f"**Cost:** ${cost:.2f}\n"
-            f"**Resolution:** {resolution} {aspect_ratio}\n"
-            f"**Audio:** Native audio included\n"
-            f"**Generation time:** {poll_count * 10}s\n\n"
-            f"**Saved to:** {output_path}\n\n"
-            f"Next: Upload to Google Drive or review video"
-        )
-
-        return [TextContent(type="text", text=result_text)]
+        return [TextContent(type="text", text=job.result_text)]
 
     except Exception as e:
         return [TextContent(
@@ -925,7 +1307,8 @@ async def generate_veo_ugc_from_image_mcp(
     product_features: str = None,
     video_setting: str = None,
     reference_image_description: str = None,
-    auto_analyze_image: bool = True
+    auto_analyze_image: bool = True,
+    image_handle: str = None
 ) -> list[TextContent]:
     """
     Generate authentic UGC-style ad video from product image using Veo 3.1 image-to-video.
@@ -959,6 +1342,8 @@ async def generate_veo_ugc_from_image_mcp(
         video_setting: Custom environment (e.g., "Bright modern bathroom, morning")
         reference_image_description: Manual override for image description (auto-analyzed if None)
         auto_analyze_image: Automatically analyze image with GPT-4o Vision for maximum visual consistency (default: True, +$0.01)
+        image_handle: Handle returned by generate_nano_banana_image; uses the in-memory image
+            instead of reading image_path from disk (image_path may then be omitted)
 
     Returns:
         Video saved to outputs/videos/, cost summary, platform specs
@@ -974,6 +1359,8 @@ async def generate_veo_ugc_from_image_mcp(
             text="❌ Error: google-genai package not installed.\n\nRun: pip install google-genai"
         )]
 
+    types = _genai_types()
+
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         return [TextContent(
@@ -981,502 +1368,11 @@ async def generate_veo_ugc_from_image_mcp(
             text="❌ Error: GEMINI_API_KEY not found in environment variables.\n\nPlease add it to MARKETING_TEAM/.env file."
         )]
 
-    # UGC prompt templates - Load from memory or use hardcoded fallback
-    # Priority: LOADED_UGC_TEMPLATES (from JSON) → Hardcoded UGC_TEMPLATES (fallback)
-    if LOADED_UGC_TEMPLATES:
-        UGC_TEMPLATES = LOADED_UGC_TEMPLATES
-        print(f"   Using {len(UGC_TEMPLATES)} UGC styles from memory/ugc_prompt_templates.json", file=sys.stderr)
-    else:
-        # FALLBACK: Hardcoded templates if JSON loading failed
-        print(f"   Using hardcoded UGC templates (JSON load failed)", file=sys.stderr)
-        UGC_TEMPLATES = {
-        # ===== ORIGINAL 4 CORE STYLES =====
-        "testimonial": {
-            "tiktok": f"""Authentic selfie video, person excitedly talking to camera about {product_name},
-holding product naturally with genuine enthusiasm. 'This changed my morning routine!'
-Casual clothes, natural home lighting, slight handheld camera shake.
-Native audio: person speaking naturally with enthusiasm, ambient home sounds.""",
-            "instagram": f"""Person holding {product_name} in golden hour natural lighting,
-talking to camera casually with genuine excitement. 'I've been using this every day.'
-Authentic testimonial style, real emotions, handheld phone aesthetic.
-Native audio: clear dialogue, warm tone, ambient sounds.""",
-            "facebook": f"""Authentic customer testimonial, person with {product_name} in natural home setting,
-conversational tone sharing real experience. 'It actually works, here's why...'
-Genuine reactions, casual environment. Native audio: friendly conversational dialogue."""
-        },
-        "demo": {
-            "tiktok": f"""Quick hands-on demo, person using {product_name}, showing key feature with enthusiasm.
-Fast-paced, natural environment, handheld phone camera. Sound effects: product use sounds,
-quick verbal callouts 'Watch this!' Authentic interaction.""",
-            "instagram": f"""Casual demonstration of {product_name}, hands showing product use in natural lighting,
-real-time application. Authentic interaction, phone-filmed aesthetic.
-Native audio: ambient sounds, brief verbal cues, product interaction sounds.""",
-            "facebook": f"""Real user demonstrating {product_name} benefits, natural home setting,
-hands showing product with genuine reactions. 'Let me show you how this works.'
-Native audio: clear explanation, ambient home sounds."""
-        },
-        "unboxing": {
-            "tiktok": f"""Excited unboxing of {product_name}, hands opening package with genuine surprise.
-'Oh wow!' Fast-paced reveal, natural lighting, phone camera.
-Sound effects: package rustling, tape pulling, excited verbal reactions.""",
-            "instagram": f"""Unboxing {product_name} with authentic first reactions, natural lighting,
-handheld camera following hands. 'This looks amazing!' Genuine excitement.
-Native audio: package sounds, spontaneous reactions, ambient room noise.""",
-            "facebook": f"""Unboxing experience with {product_name}, casual home setting, genuine first impressions.
-'Let's see what's inside!' Natural reactions. Native audio: package opening sounds,
-authentic commentary."""
-        },
-        "lifestyle": {
-            "tiktok": f"""Person casually using {product_name} in morning routine, natural home environment,
-authentic lifestyle integration. Handheld camera, natural movement.
-Native audio: ambient morning sounds, brief casual comments.""",
-            "instagram": f"""Everyday moment with {product_name}, natural setting showing real-life usage,
-casual authentic vibe, gentle camera movement. Native audio: ambient sounds,
-natural environment audio.""",
-            "facebook": f"""{product_name} integrated into daily life, natural home environment,
-real everyday use showing product naturally. Native audio: ambient home sounds,
-brief natural commentary."""
-        },
-
-        # ===== EDUCATIONAL & TUTORIAL STYLES =====
-        "tutorial": {
-            "tiktok": f"""Step-by-step tutorial using {product_name}, hands-only demonstration with quick cuts.
-'Here's how to do it!' Fast-paced, educational. Native audio: clear instructions,
-upbeat energy, product interaction sounds.""",
-            "instagram": f"""Quick how-to guide with {product_name}, hands showing each step clearly.
-'Follow along!' Tutorial style, phone camera. Native audio: friendly teaching voice,
-step callouts, ambient sounds.""",
-            "facebook": f"""Detailed tutorial demonstrating {product_name} use, hands-on instruction.
-'Let me teach you the right way.' Native audio: patient explanation, product sounds."""
-        },
-        "how_to": {
-            "tiktok": f"""Quick how-to video, hands using {product_name} to solve a problem.
-'Want to know the trick?' Fast solution reveal. Native audio: excited explanation,
-'aha moment' reactions.""",
-            "instagram": f"""Problem-solving how-to with {product_name}, hands demonstrating the solution.
-Natural lighting, casual setting. Native audio: helpful tips, product sounds.""",
-            "facebook": f"""Comprehensive how-to guide using {product_name}, detailed demonstration.
-'Here's the easiest way.' Native audio: clear instructions, ambient sounds."""
-        },
-        "quick_tips": {
-            "tiktok": f"""Rapid-fire tips using {product_name}, hands showing each hack quickly.
-'Tip #1!' Fast cuts, energetic. Native audio: enthusiastic voiceover, quick callouts.""",
-            "instagram": f"""Quick tips and tricks with {product_name}, hands demonstrating each one.
-Snappy editing, helpful vibe. Native audio: friendly advice, product interaction.""",
-            "facebook": f"""Practical tips using {product_name}, hands-on demonstrations.
-'Here are my top tips.' Native audio: helpful commentary, ambient sounds."""
-        },
-
-        # ===== COMPARISON & TRANSFORMATION STYLES =====
-        "before_after": {
-            "tiktok": f"""Before and after using {product_name}, split screen showing transformation.
-'Watch the difference!' Dramatic reveal. Native audio: excited commentary,
-transition sound effects.""",
-            "instagram": f"""Transformation with {product_name}, before/after comparison with hands.
-'The results speak for themselves.' Native audio: amazed reactions, ambient sounds.""",
-            "facebook": f"""Before and after demonstration using {product_name}, clear comparison.
-'See the change for yourself.' Native audio: detailed explanation, product sounds."""
-        },
-        "comparison": {
-            "tiktok": f"""Side-by-side comparison, hands testing {product_name} vs alternative.
-'Let's compare!' Quick test results. Native audio: objective commentary,
-comparison reactions.""",
-            "instagram": f"""Product comparison featuring {product_name}, hands showing differences.
-'Which one wins?' Fair test, natural setting. Native audio: honest review, ambient sounds.""",
-            "facebook": f"""Detailed comparison with {product_name}, hands demonstrating each option.
-'Here's what I found.' Native audio: balanced commentary, product interaction."""
-        },
-        "transformation": {
-            "tiktok": f"""Amazing transformation using {product_name}, time-lapse style.
-'Wait for it!' Dramatic change reveal. Native audio: buildup music, reveal reactions.""",
-            "instagram": f"""Product transformation showcase with {product_name}, hands showing progress.
-'The glow up!' Natural lighting. Native audio: excited commentary, ambient sounds.""",
-            "facebook": f"""Complete transformation using {product_name}, detailed process.
-'From start to finish.' Native audio: narrated journey, product sounds."""
-        },
-
-        # ===== EXPERIENCE & REACTION STYLES =====
-        "first_time": {
-            "tiktok": f"""First time trying {product_name}, hands opening with genuine curiosity.
-'Let's try this!' Authentic first reactions. Native audio: surprise reactions,
-honest commentary.""",
-            "instagram": f"""First impressions of {product_name}, hands exploring product naturally.
-'Never tried this before!' Real-time discovery. Native audio: genuine reactions, ambient sounds.""",
-            "facebook": f"""First-time user experience with {product_name}, hands testing carefully.
-'My honest first impression.' Native audio: unfiltered reactions, product interaction."""
-        },
-        "reaction": {
-            "tiktok": f"""Real reaction to {product_name} results, hands showing outcome with surprise.
-'I can't believe it!' Genuine shock. Native audio: spontaneous reactions,
-excited exclamations.""",
-            "instagram": f"""Authentic reaction using {product_name}, hands revealing results.
-'This is insane!' Unscripted response. Native audio: real emotions, ambient sounds.""",
-            "facebook": f"""Honest reaction to {product_name}, hands demonstrating while responding.
-'Wow, just wow.' Native audio: genuine commentary, product sounds."""
-        },
-        "challenge": {
-            "tiktok": f"""Challenge accepted with {product_name}, hands attempting trending test.
-'Let's see if it works!' Competitive energy. Native audio: challenge commentary,
-success reactions.""",
-            "instagram": f"""Product challenge featuring {product_name}, hands following trend.
-'Challenge mode activated!' Fun vibe. Native audio: playful commentary, ambient sounds.""",
-            "facebook": f"""Testing {product_name} in a challenge, hands showing each step.
-'Can it pass the test?' Native audio: engaging narration, product interaction."""
-        },
-
-        # ===== ROUTINE & INTEGRATION STYLES =====
-        "morning_routine": {
-            "tiktok": f"""Morning routine with {product_name}, hands incorporating product naturally.
-'5 AM essentials!' Quick cuts, energetic. Native audio: upbeat morning vibes,
-product use sounds.""",
-            "instagram": f"""Morning ritual featuring {product_name}, hands showing daily integration.
-'Part of my morning.' Golden hour lighting. Native audio: calm morning commentary, ambient sounds.""",
-            "facebook": f"""Complete morning routine including {product_name}, hands demonstrating flow.
-'How I start my day.' Native audio: relaxed narration, morning ambience."""
-        },
-        "night_routine": {
-            "tiktok": f"""Night routine with {product_name}, hands winding down with product.
-'PM ritual!' Cozy lighting, relaxed pace. Native audio: calming commentary,
-nighttime ambience.""",
-            "instagram": f"""Evening routine featuring {product_name}, hands showing nighttime use.
-'Before bed essentials.' Soft lighting. Native audio: soothing voiceover, ambient sounds.""",
-            "facebook": f"""Nighttime routine with {product_name}, hands demonstrating evening ritual.
-'My nightly must-have.' Native audio: peaceful commentary, product sounds."""
-        },
-        "grwm": {
-            "tiktok": f"""Get ready with me using {product_name}, hands prepping in real-time.
-'GRWM!' Fast-paced, energetic. Native audio: upbeat commentary, product application sounds.""",
-            "instagram": f"""GRWM featuring {product_name}, hands getting ready naturally.
-'Come get ready!' Casual vibe. Native audio: chatty commentary, ambient sounds.""",
-            "facebook": f"""Get ready with me showcasing {product_name}, hands in preparation mode.
-'Join my routine!' Native audio: friendly narration, product interaction."""
-        },
-        "day_in_life": {
-            "tiktok": f"""Day in the life with {product_name}, hands using product throughout day.
-'24 hours!' Quick montage style. Native audio: voiceover narration, ambient sounds.""",
-            "instagram": f"""A day with {product_name}, hands showing multiple use moments.
-'From AM to PM.' Natural progression. Native audio: casual commentary, environment sounds.""",
-            "facebook": f"""Full day featuring {product_name}, hands demonstrating various scenarios.
-'How I use it daily.' Native audio: detailed narration, product sounds."""
-        },
-
-        # ===== SHOWCASE & FEATURE STYLES =====
-        "product_showcase": {
-            "tiktok": f"""Product showcase of {product_name}, hands highlighting every angle.
-'Check this out!' Dynamic camera movement. Native audio: enthusiastic presentation,
-product details.""",
-            "instagram": f"""Detailed showcase of {product_name}, hands revealing features slowly.
-'Let me show you everything.' Clean aesthetic. Native audio: thorough commentary, ambient sounds.""",
-            "facebook": f"""Complete product showcase for {product_name}, hands demonstrating capabilities.
-'Full tour!' Native audio: comprehensive explanation, product interaction."""
-        },
-        "feature_highlight": {
-            "tiktok": f"""Highlighting best feature of {product_name}, hands focusing on one aspect.
-'This feature though!' Close-up shots. Native audio: excited feature callout,
-demonstration sounds.""",
-            "instagram": f"""Feature spotlight on {product_name}, hands showing specific benefit.
-'My favorite part!' Focused demonstration. Native audio: detailed feature explanation, ambient sounds.""",
-            "facebook": f"""Key feature demonstration of {product_name}, hands isolating one element.
-'Here's why it's special.' Native audio: feature-focused commentary, product sounds."""
-        },
-        "results_showcase": {
-            "tiktok": f"""Results showcase using {product_name}, hands revealing final outcome.
-'The results!' Satisfying reveal. Native audio: amazed commentary,
-success reactions.""",
-            "instagram": f"""Showing results with {product_name}, hands displaying achievement.
-'Look at this!' Natural lighting. Native audio: proud presentation, ambient sounds.""",
-            "facebook": f"""Results demonstration using {product_name}, hands proving effectiveness.
-'Here's proof it works.' Native audio: results-focused narration, product sounds."""
-        },
-
-        # ===== PROBLEM-SOLVING STYLES =====
-        "problem_solving": {
-            "tiktok": f"""Solving a problem with {product_name}, hands showing pain point then solution.
-'Here's the fix!' Quick problem reveal. Native audio: relatable frustration,
-solution excitement.""",
-            "instagram": f"""Problem to solution using {product_name}, hands demonstrating the answer.
-'Finally found the fix!' Natural progression. Native audio: helpful commentary, ambient sounds.""",
-            "facebook": f"""Problem-solving demonstration with {product_name}, hands addressing common issue.
-'No more struggles!' Native audio: solution-focused narration, product interaction."""
-        },
-        "hack": {
-            "tiktok": f"""Product hack using {product_name}, hands showing unexpected use.
-'This hack!' Mind-blown energy. Native audio: excited discovery sharing,
-'you need to try this!' reactions.""",
-            "instagram": f"""Life hack featuring {product_name}, hands demonstrating clever use.
-'Game changer hack!' Creative application. Native audio: enthusiastic hack reveal, ambient sounds.""",
-            "facebook": f"""Useful hack with {product_name}, hands showing alternative application.
-'Genius hack alert!' Native audio: detailed hack explanation, product sounds."""
-        },
-        "myth_busting": {
-            "tiktok": f"""Myth busting with {product_name}, hands testing common misconception.
-'Let's test this myth!' Experiment vibe. Native audio: testing commentary,
-myth reveal reactions.""",
-            "instagram": f"""Busting myths about {product_name}, hands proving facts.
-'Truth time!' Evidence-based demonstration. Native audio: factual commentary, ambient sounds.""",
-            "facebook": f"""Myth vs reality using {product_name}, hands showing actual performance.
-'Setting the record straight.' Native audio: honest testing narration, product interaction."""
-        },
-
-        # ===== HAUL & COLLECTION STYLES =====
-        "haul": {
-            "tiktok": f"""Product haul featuring {product_name}, hands showing acquisition excitement.
-'New haul!' Fast reveals, high energy. Native audio: shopping excitement,
-package opening sounds.""",
-            "instagram": f"""Shopping haul with {product_name}, hands displaying new purchase.
-'What I got!' Satisfying unpack. Native audio: haul commentary, ambient sounds.""",
-            "facebook": f"""Product haul showcasing {product_name}, hands revealing shopping results.
-'Haul time!' Native audio: purchase story, product sounds."""
-        },
-        "favorites": {
-            "tiktok": f"""Current favorites featuring {product_name}, hands showing top pick.
-'My fave!' Quick highlights. Native audio: enthusiastic endorsement,
-favorite callouts.""",
-            "instagram": f"""Favorite products including {product_name}, hands demonstrating why it's loved.
-'All-time favorite!' Genuine appreciation. Native audio: heartfelt commentary, ambient sounds.""",
-            "facebook": f"""Top favorites with {product_name}, hands explaining preference.
-'Why I love this.' Native audio: detailed favorite explanation, product interaction."""
-        },
-        "must_haves": {
-            "tiktok": f"""Must-have products featuring {product_name}, hands showing essentials.
-'You NEED this!' Urgent energy. Native audio: must-have emphasis,
-convincing commentary.""",
-            "instagram": f"""Essential must-haves with {product_name}, hands displaying necessities.
-'Can't live without!' Strong recommendation. Native audio: passionate endorsement, ambient sounds.""",
-            "facebook": f"""Must-have demonstration of {product_name}, hands proving necessity.
-'Absolute essential!' Native audio: necessity-focused narration, product sounds."""
-        },
-
-        # ===== REVIEW & OPINION STYLES =====
-        "honest_review": {
-            "tiktok": f"""Brutally honest review of {product_name}, hands showing real testing.
-'The truth!' No-filter approach. Native audio: candid commentary,
-honest reactions.""",
-            "instagram": f"""Honest review of {product_name}, hands demonstrating actual experience.
-'My real thoughts.' Authentic testing. Native audio: unbiased commentary, ambient sounds.""",
-            "facebook": f"""Comprehensive honest review using {product_name}, hands showing pros and cons.
-'Here's what you should know.' Native audio: balanced review narration, product interaction."""
-        },
-        "worth_it": {
-            "tiktok": f"""Is it worth it? Testing {product_name}, hands showing value assessment.
-'Worth the hype?' Value test. Native audio: skeptical then convinced commentary,
-verdict reactions.""",
-            "instagram": f"""Worth it or not with {product_name}, hands evaluating value.
-'Let's find out!' Fair assessment. Native audio: value-focused commentary, ambient sounds.""",
-            "facebook": f"""Worth it review of {product_name}, hands demonstrating cost-benefit.
-'My verdict.' Native audio: value analysis narration, product sounds."""
-        },
-        "hype_test": {
-            "tiktok": f"""Testing the hype around {product_name}, hands putting claims to test.
-'Does it live up?' Skeptical energy. Native audio: testing commentary,
-hype validation reactions.""",
-            "instagram": f"""Hype test for {product_name}, hands verifying viral claims.
-'Is the hype real?' Honest testing. Native audio: fair assessment commentary, ambient sounds.""",
-            "facebook": f"""Testing {product_name} hype, hands demonstrating actual performance.
-'Separating hype from reality.' Native audio: objective testing narration, product interaction."""
-        },
-
-        # ===== INSTALLATION & SETUP STYLES =====
-        "setup": {
-            "tiktok": f"""Quick setup of {product_name}, hands showing easy installation.
-'Setup in seconds!' Fast assembly. Native audio: setup instructions,
-completion satisfaction.""",
-            "instagram": f"""Setting up {product_name}, hands demonstrating installation process.
-'Easy setup!' Step-by-step. Native audio: helpful setup guide, ambient sounds.""",
-            "facebook": f"""Complete setup guide for {product_name}, hands showing full installation.
-'How to set it up.' Native audio: detailed setup narration, product sounds."""
-        },
-        "installation": {
-            "tiktok": f"""Installing {product_name}, hands showing mounting/assembly.
-'Installation time!' DIY energy. Native audio: installation commentary,
-tool sounds.""",
-            "instagram": f"""Installation process with {product_name}, hands demonstrating placement.
-'Let me install this!' Hands-on approach. Native audio: installation tips, ambient sounds.""",
-            "facebook": f"""Full installation of {product_name}, hands showing complete process.
-'Installation guide.' Native audio: thorough installation narration, product interaction."""
-        },
-        "maintenance": {
-            "tiktok": f"""Maintaining {product_name}, hands showing care routine.
-'Keep it fresh!' Maintenance tips. Native audio: care instructions,
-cleaning sounds.""",
-            "instagram": f"""Product maintenance for {product_name}, hands demonstrating upkeep.
-'How I care for it.' Regular maintenance. Native audio: care commentary, ambient sounds.""",
-            "facebook": f"""Maintenance guide for {product_name}, hands showing proper care.
-'Maintenance made easy.' Native audio: care routine narration, product sounds."""
-        },
-
-        # ===== TREND & VIRAL STYLES =====
-        "trending": {
-            "tiktok": f"""Trending use of {product_name}, hands following viral format.
-'On trend!' Viral energy. Native audio: trend audio overlay,
-participation excitement.""",
-            "instagram": f"""Trending content with {product_name}, hands joining popular format.
-'Hopping on the trend!' Current vibe. Native audio: trend-aware commentary, ambient sounds.""",
-            "facebook": f"""Trending demonstration of {product_name}, hands showing popular use.
-'What's trending.' Native audio: trend explanation narration, product interaction."""
-        },
-        "viral": {
-            "tiktok": f"""Viral moment with {product_name}, hands recreating viral sensation.
-'Going viral!' High energy. Native audio: viral audio snippet,
-excited participation.""",
-            "instagram": f"""Viral product moment featuring {product_name}, hands showing why it's viral.
-'Viral for a reason!' Shareable content. Native audio: viral context commentary, ambient sounds.""",
-            "facebook": f"""Viral demonstration using {product_name}, hands explaining viral appeal.
-'Why everyone's talking about this.' Native audio: viral analysis narration, product sounds."""
-        },
-        "duet_response": {
-            "tiktok": f"""Duet response using {product_name}, hands showing reaction/addition.
-'Duet this!' Interactive energy. Native audio: response commentary,
-interaction sounds.""",
-            "instagram": f"""Response video with {product_name}, hands adding to conversation.
-'My take!' Conversation participation. Native audio: response commentary, ambient sounds.""",
-            "facebook": f"""Video response featuring {product_name}, hands demonstrating answer.
-'Here's my response.' Native audio: response narration, product interaction."""
-        },
-
-        # ===== SEASONAL & OCCASION STYLES =====
-        "seasonal": {
-            "tiktok": f"""Seasonal use of {product_name}, hands showing timely application.
-'Perfect for [season]!' Seasonal energy. Native audio: seasonal commentary,
-relevant ambience.""",
-            "instagram": f"""Seasonal showcase with {product_name}, hands demonstrating seasonal fit.
-'[Season] essential!' Time-appropriate. Native audio: seasonal context, ambient sounds.""",
-            "facebook": f"""Seasonal demonstration using {product_name}, hands showing occasion use.
-'Just in time for [season].' Native audio: seasonal narration, product sounds."""
-        },
-        "holiday": {
-            "tiktok": f"""Holiday special featuring {product_name}, hands showing festive use.
-'Holiday must-have!' Festive vibes. Native audio: holiday excitement,
-celebration sounds.""",
-            "instagram": f"""Holiday content with {product_name}, hands demonstrating festive application.
-'Holiday edition!' Celebratory mood. Native audio: holiday commentary, ambient sounds.""",
-            "facebook": f"""Holiday demonstration using {product_name}, hands showing seasonal gift.
-'Perfect holiday gift!' Native audio: festive narration, product interaction."""
-        },
-        "gift_guide": {
-            "tiktok": f"""Gift guide featuring {product_name}, hands showing perfect gift.
-'Gift idea!' Gifting excitement. Native audio: gift suggestion commentary,
-wrapping sounds.""",
-            "instagram": f"""Gift recommendation with {product_name}, hands presenting as ideal gift.
-'Great gift alert!' Thoughtful presentation. Native audio: gift commentary, ambient sounds.""",
-            "facebook": f"""Gift guide showcasing {product_name}, hands demonstrating gift appeal.
-'Gift guide favorite.' Native audio: gift explanation narration, product sounds."""
-        },
-
-        # ===== BEHIND-THE-SCENES & AUTHENTIC STYLES =====
-        "behind_scenes": {
-            "tiktok": f"""Behind the scenes with {product_name}, hands showing real usage off-camera.
-'BTS!' Authentic peek. Native audio: candid commentary,
-real-life sounds.""",
-            "instagram": f"""Behind-the-scenes featuring {product_name}, hands in natural workflow.
-'What you don't see!' Raw authenticity. Native audio: honest BTS commentary, ambient sounds.""",
-            "facebook": f"""BTS demonstration with {product_name}, hands showing actual use.
-'The real story.' Native audio: authentic narration, product interaction."""
-        },
-        "real_talk": {
-            "tiktok": f"""Real talk about {product_name}, hands showing while being honest.
-'Let's be real!' No filter energy. Native audio: candid honest commentary,
-real reactions.""",
-            "instagram": f"""Real talk featuring {product_name}, hands demonstrating with honesty.
-'The honest truth!' Authentic conversation. Native audio: real talk commentary, ambient sounds.""",
-            "facebook": f"""Real talk review of {product_name}, hands showing genuine experience.
-'Being completely honest.' Native audio: truthful narration, product sounds."""
-        },
-        "unpopular_opinion": {
-            "tiktok": f"""Unpopular opinion on {product_name}, hands showing controversial take.
-'Hot take!' Bold energy. Native audio: confident opinion sharing,
-debate-worthy reactions.""",
-            "instagram": f"""Unpopular opinion about {product_name}, hands demonstrating unique view.
-'Might be unpopular but...' Honest perspective. Native audio: opinion commentary, ambient sounds.""",
-            "facebook": f"""Unpopular opinion review using {product_name}, hands proving point.
-'My unpopular take.' Native audio: opinion explanation narration, product interaction."""
-        },
-
-        # ===== EDUCATIONAL DEEP-DIVE STYLES =====
-        "explainer": {
-            "tiktok": f"""Quick explainer on {product_name}, hands showing how it works.
-'Let me explain!' Educational energy. Native audio: clear explanation,
-teaching tone.""",
-            "instagram": f"""Explainer video for {product_name}, hands demonstrating mechanics.
-'Here's how!' Educational approach. Native audio: informative commentary, ambient sounds.""",
-            "facebook": f"""Detailed explainer using {product_name}, hands showing inner workings.
-'Understanding [product].' Native audio: thorough explanation narration, product sounds."""
-        },
-        "science_behind": {
-            "tiktok": f"""The science behind {product_name}, hands showing technical aspects.
-'Science time!' Educational but fun. Native audio: simplified science explanation,
-'aha' reactions.""",
-            "instagram": f"""Science explanation for {product_name}, hands demonstrating principles.
-'The science!' Informative content. Native audio: educational commentary, ambient sounds.""",
-            "facebook": f"""Science behind {product_name}, hands showing technical demonstration.
-'How it actually works.' Native audio: scientific narration, product interaction."""
-        },
-        "ingredients_breakdown": {
-            "tiktok": f"""Ingredients breakdown of {product_name}, hands showing what's inside.
-'What's in it?' Transparency focus. Native audio: ingredient callouts,
-education commentary.""",
-            "instagram": f"""Ingredient analysis for {product_name}, hands highlighting components.
-'Breaking down ingredients!' Informed content. Native audio: ingredient commentary, ambient sounds.""",
-            "facebook": f"""Complete ingredients breakdown using {product_name}, hands showing details.
-'Ingredient deep dive.' Native audio: ingredient explanation narration, product sounds."""
-        },
-
-        # ===== SPECIALTY & NICHE STYLES =====
-        "asmr": {
-            "tiktok": f"""ASMR unboxing of {product_name}, hands moving slowly with product.
-'ASMR vibes!' Whisper-quiet energy. Native audio: soft whispers, product sounds amplified,
-crinkling, tapping.""",
-            "instagram": f"""ASMR product experience with {product_name}, hands exploring textures.
-'Satisfying sounds!' Gentle movements. Native audio: whispered commentary, enhanced product sounds.""",
-            "facebook": f"""ASMR demonstration using {product_name}, hands creating relaxing sounds.
-'ASMR edition.' Native audio: soft-spoken narration, amplified product interaction."""
-        },
-        "pov": {
-            "tiktok": f"""POV using {product_name}, hands showing first-person perspective.
-'POV:' Immersive angle. Native audio: situational commentary,
-first-person reactions.""",
-            "instagram": f"""POV content with {product_name}, hands from user perspective.
-'POV experience!' Personal viewpoint. Native audio: POV narration, ambient sounds.""",
-            "facebook": f"""POV demonstration of {product_name}, hands showing personal angle.
-'From my POV.' Native audio: first-person narration, product interaction."""
-        },
-        "satisfying": {
-            "tiktok": f"""Oddly satisfying {product_name} moment, hands creating perfect action.
-'So satisfying!' Perfect execution. Native audio: satisfying sound emphasis,
-completion reactions.""",
-            "instagram": f"""Satisfying content featuring {product_name}, hands in perfect motion.
-'Satisfying to watch!' Visual pleasure. Native audio: satisfaction commentary, ambient sounds.""",
-            "facebook": f"""Satisfying demonstration with {product_name}, hands showing perfect result.
-'Perfectly satisfying.' Native audio: satisfaction narration, product sounds."""
-        },
-        "minimalist": {
-            "tiktok": f"""Minimalist approach to {product_name}, hands showing simple use.
-'Keep it simple!' Clean aesthetic. Native audio: minimal commentary,
-essential sounds only.""",
-            "instagram": f"""Minimalist showcase of {product_name}, hands in clean presentation.
-'Less is more!' Simple elegance. Native audio: quiet commentary, ambient sounds.""",
-            "facebook": f"""Minimalist demonstration using {product_name}, hands showing essentials.
-'Minimalist lifestyle.' Native audio: simple narration, product sounds."""
-        },
-        "luxury": {
-            "tiktok": f"""Luxury unboxing of {product_name}, hands treating product preciously.
-'Luxury vibes!' Premium feel. Native audio: appreciative commentary,
-elegant ambience.""",
-            "instagram": f"""Luxury experience with {product_name}, hands showcasing premium quality.
-'Luxury edition!' High-end presentation. Native audio: sophisticated commentary, ambient sounds.""",
-            "facebook": f"""Luxury demonstration of {product_name}, hands highlighting premium features.
-'Premium experience.' Native audio: luxury-focused narration, product interaction."""
-        },
-        "budget_friendly": {
-            "tiktok": f"""Budget-friendly option {product_name}, hands showing affordable value.
-'Budget win!' Value excitement. Native audio: price-conscious commentary,
-savings celebration.""",
-            "instagram": f"""Budget-friendly showcase of {product_name}, hands demonstrating affordability.
-'Affordable find!' Value content. Native audio: budget commentary, ambient sounds.""",
-            "facebook": f"""Budget-friendly review using {product_name}, hands proving value.
-'Won't break the bank.' Native audio: value-focused narration, product sounds."""
-        }
-        }  # End of hardcoded UGC_TEMPLATES fallback
+    # UGC prompt templates come from the shared store (memory JSON, or built-in defaults)
+    try:
+        ugc_templates.get(ugc_style)
+    except ValueError as e:
+        return [TextContent(type="text", text=f"❌ Error: {e}")]
 
     # Platform settings
     platform_config = {
@@ -1489,32 +1385,51 @@ savings celebration.""",
     cost = float(seconds) * 0.75
 
     try:
-        # Load image file
-        if not Path(image_path).exists():
+        handle_entry = None
+        if image_handle:
+            handle_entry = image_handles.get(image_handle)
+            if handle_entry is None:
+                return [TextContent(
+                    type="text",
+                    text=(
+                        f"❌ Error: Image handle {image_handle} is unknown or was evicted from memory.\n\n"
+                        "Pass image_path (the saved image file) instead."
+                    )
+                )]
+            if not image_path and handle_entry.path:
+                image_path = str(handle_entry.path)
+        elif not image_path:
+            return [TextContent(type="text", text="❌ Error: Provide image_path or image_handle")]
+        elif not Path(image_path).exists():
             return [TextContent(
                 type="text",
                 text=f"❌ Error: Image not found at {image_path}"
             )]
 
         # Initialize client
-        client = genai.Client(api_key=api_key)
+        client = clients.genai(api_key)
 
-        # Upload image file to get File object (required for reference images from disk)
-        print(f"🖼️  Uploading reference image: {image_path}", file=sys.stderr)
+        if handle_entry:
+            # Fast path: bytes are already in memory (no disk read)
+            image_bytes, mime_type = handle_entry.data, handle_entry.mime_type
+            print(f"♻️  Using in-memory image {image_handle} ({len(image_bytes)} bytes)", file=sys.stderr)
+        else:
+            # Upload image file to get File object (required for reference images from disk)
+            print(f"🖼️  Uploading reference image: {image_path}", file=sys.stderr)
 
-        # Determine mime type
-        mime_type, _ = mimetypes.guess_type(image_path)
-        if not mime_type:
-            mime_type = "image/png"
+            # Determine mime type
+            mime_type, _ = mimetypes.guess_type(image_path)
+            if not mime_type:
+                mime_type = "image/png"
 
-        # Read image bytes
-        with open(image_path, "rb") as f:
-            image_bytes = f.read()
+            # Read image bytes
+            with open(image_path, "rb") as f:
+                image_bytes = f.read()
 
-        print(f"✅ Image loaded ({len(image_bytes)} bytes)", file=sys.stderr)
+            print(f"✅ Image loaded ({len(image_bytes)} bytes)", file=sys.stderr)
 
         # Automatic image analysis if not provided and enabled
-        if reference_image_description is None and auto_analyze_image:
+        if reference_image_description is None and auto_analyze_image and image_path and Path(image_path).exists():
             print(f"🔍 Automatically analyzing image for visual consistency...", file=sys.stderr)
             try:
                 analysis_result = await analyze_ugc_image_mcp(image_path)
@@ -1537,7 +1452,7 @@ savings celebration.""",
                 return custom_prompt
 
             # Start with base template
-            base_prompt = UGC_TEMPLATES[ugc_style][platform]
+            base_prompt = ugc_templates.render(ugc_style, platform, product_name=product_name)
 
             # Build comprehensive N8n-style system prompt
             system_instructions = []
@@ -1655,7 +1570,7 @@ savings celebration.""",
         # 3-RETRY LOGIC: Automatically retry with prompt variations if blocked
         max_retries = 3
         operation = None
-        poll_count = 0
+        job = None
 
         for retry_attempt in range(max_retries):
             # Build prompt with retry variation
@@ -1665,7 +1580,9 @@ savings celebration.""",
                 print(f"\n🔄 Retry attempt {retry_attempt + 1}/{max_retries} with modified prompt...", file=sys.stderr)
 
             # Generate video with image as first frame (image-to-video animation)
-            operation = client.models.generate_videos(
+            operation = await rate_limiter.submit(
+                "gemini", "veo-3.1-generate-preview", clients.run_blocking,
+                client.models.generate_videos,
                 model="veo-3.1-generate-preview",
                 prompt=final_prompt,
                 image=image_param,  # types.Image with imageBytes field
@@ -1677,19 +1594,22 @@ savings celebration.""",
                 )
             )
 
-            # Poll for completion
+            # Poll for completion on the shared background poller
             print("⏳ Video generating (1-6 minutes for image-to-video)...", file=sys.stderr)
-            poll_count = 0
-
-            while not operation.done:
-                await asyncio.sleep(10)
-                operation = client.operations.get(operation)
-                poll_count += 1
-                if poll_count % 6 == 0:
-                    print(f"   Still generating... ({poll_count * 10}s elapsed)", file=sys.stderr)
+            job = video_jobs.submit(
+                "veo_ugc", operation.name, filename,
+                metadata=_ugc_metadata(
+                    "generate_veo_ugc_from_image", final_prompt, ugc_style, platform, product_name, seconds, cost,
+                    config_settings
+                ),
+                handle=operation
+            )
+            job = await video_jobs.wait(job.job_id)
+            if job.status == FAILED and not _veo_blocked(job.handle):
+                raise Exception(job.error)
 
-            # Check result
-            if hasattr(operation.response, 'generated_videos') and operation.response.generated_videos:
+            # Check result (the finalizer has already saved a successful video)
+            if job.status == COMPLETED:
                 # SUCCESS! Video generated
                 if retry_attempt > 0:
                     print(f"✅ Success on retry attempt {retry_attempt + 1}", file=sys.stderr)
@@ -1711,21 +1631,7 @@ savings celebration.""",
                     )]
 
         # If we get here, operation succeeded (either first try or after retry)
-
-        # Download and save
-        video = operation.response.generated_videos[0]
-        client.files.download(file=video.video)
-
-        # Use absolute path from the script location
-        script_dir = Path(__file__).parent.parent  # MARKETING_TEAM folder
-        output_dir = script_dir / "outputs" / "videos"
-        output_dir.mkdir(parents=True, exist_ok=True)
-
-        if not filename.endswith('.mp4'):
-            filename = f"{filename}.mp4"
-        output_path = output_dir / filename
-
-        video.video.save(str(output_path))
+        output_path = job.output_path
 
         # Calculate total cost including automatic analysis
         total_cost = cost
@@ -1745,7 +1651,7 @@ savings celebration.""",
             f"**Cost:** ${total_cost:.2f} (Veo 3.1{analysis_cost_note})\n"
             f"**Resolution:** {config_settings['resolution']} {config_settings['aspect_ratio']}\n"
             f"**Audio:** Native dialogue + sound effects + ambient\n"
-            f"**Generation time:** {poll_count * 10}s\n\n"
+            f"**Generation time:** {int(job.elapsed())}s\n\n"
             f"**Saved to:** {output_path}\n\n"
             f"✨ UGC Characteristics:\n"
             f"- Handheld camera aesthetic\n"
@@ -1765,20 +1671,20 @@ savings celebration.""",
         )]
 
 
-@app.call_tool()
 async def generate_veo_ugc_from_nano_banana(
     ugc_style: str,
     platform: str,
     seconds: str,
     product_name: str,
-    filename: str
+    filename: str,
+    image_handle: str
 ) -> list[TextContent]:
     """
     Generate UGC video ad using cached Nano Banana image + Veo 3.1
 
     THIS IS THE CORRECT WORKFLOW:
-    1. First call generate_nano_banana_image_mcp to create product image
-    2. Then immediately call this function to convert to UGC video
+    1. First call generate_nano_banana_image_mcp to create product image (returns an image handle)
+    2. Then call this function with that handle to convert it to UGC video
     3. The image Part object is passed directly from Nano Banana to Veo
 
     Args:
@@ -1787,32 +1693,30 @@ async def generate_veo_ugc_from_nano_banana(
         seconds: "4", "6", or "8"
         product_name: Name of product for context
         filename: Output filename (without .mp4)
+        image_handle: Handle returned by generate_nano_banana_image_mcp
     """
     try:
         from google.genai import types
-        import base64
-        from pathlib import Path
-        import tempfile
-
-        global _last_generated_image
 
-        if _last_generated_image is None:
+        handle_entry = image_handles.get(image_handle)
+        if handle_entry is None:
             return [TextContent(
                 type="text",
                 text=(
-                    "❌ No cached image found!\n\n"
+                    f"❌ No in-memory image for handle {image_handle}!\n\n"
                     "**Required workflow:**\n"
                     "1. First call generate_nano_banana_image_mcp to create a product image\n"
-                    "2. Then immediately call this function to convert it to UGC video\n\n"
-                    "The image must be freshly generated from Nano Banana - cannot load from disk."
+                    "2. Then call this function with the image handle it returns\n\n"
+                    "Evicted handles can use generate_veo_ugc_from_image with the saved image_path."
                 )
             )]
+        image_part = handle_entry.part or types.Part.from_bytes(data=handle_entry.data, mime_type=handle_entry.mime_type)
 
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
             return [TextContent(type="text", text="❌ GEMINI_API_KEY not found")]
 
-        client = genai.Client(api_key=api_key)
+        client = clients.genai(api_key)
 
         # Platform-specific configurations
         platform_configs = {
@@ -1845,67 +1749,43 @@ async def generate_veo_ugc_from_nano_banana(
             person_generation="allow_adult"  # For UGC videos with people
         )
 
-        # Start generation - Veo 3.1 requires uploading the image as a File first
-        # The Part object from Nano Banana needs to be uploaded to Google's servers
-        print("📤 Uploading image to Google's servers for Veo 3.1...", file=sys.stderr)
-
-        # Extract image data from the cached Part object
-        image_data = _last_generated_image.inline_data.data
-        mime_type = _last_generated_image.inline_data.mime_type
-
-        # Decode base64 if needed
-        if isinstance(image_data, str):
-            image_bytes = base64.b64decode(image_data)
-        else:
-            image_bytes = image_data
-
-        print(f"✅ Using cached image from Nano Banana ({len(image_bytes)} bytes)", file=sys.stderr)
+        # Start generation - the image Part registered by Nano Banana is sent inline with
+        # the request, so there is no separate upload step
+        print(f"📎 Sending image {image_handle} from the handle registry to Veo 3.1 ({handle_entry.bytes} bytes)...", file=sys.stderr)
 
         # Use the cached Part object directly from Nano Banana
         # The SDK should accept Part objects for image-to-video
-        operation = client.models.generate_videos(
+        operation = await rate_limiter.submit(
+            "gemini", "veo-3.1-generate-preview", clients.run_blocking,
+            client.models.generate_videos,
             model="veo-3.1-generate-preview",
             prompt=prompt,
-            image=_last_generated_image,  # Use the Part object from Nano Banana cache
+            image=image_part,  # Use the Part object from Nano Banana (via its handle)
             config=veo_config
         )
 
-        # Poll for completion (same pattern as text-to-video)
+        # Poll for completion on the shared background poller
         print("⏳ UGC video generating (this takes 11s - 6 minutes)...", file=sys.stderr)
-        poll_count = 0
-
-        while not operation.done:
-            await asyncio.sleep(10)
-            operation = client.operations.get(operation)
-            poll_count += 1
-            if poll_count % 6 == 0:
-                print(f"   Still generating... ({poll_count * 10}s elapsed)", file=sys.stderr)
+        job = video_jobs.submit(
+            "veo_ugc", operation.name, filename,
+            metadata=_ugc_metadata(
+                "generate_veo_ugc_from_nano_banana", prompt, ugc_style, platform, product_name, seconds, cost, config
+            ),
+            handle=operation
+        )
+        job = await video_jobs.wait(job.job_id)
+        if job.status == FAILED and not _veo_blocked(job.handle):
+            raise Exception(job.error)
 
         # Check if blocked by safety
-        if not hasattr(operation.response, 'generated_videos') or not operation.response.generated_videos:
+        if job.status != COMPLETED:
             return [TextContent(
                 type="text",
                 text="❌ Video generation blocked by safety filters (no charge)"
             )]
 
-        # Get video
-        video = operation.response.generated_videos[0]
-
-        # Download video
-        client.files.download(file=video.video)
-
-        # Save to outputs
-        output_dir = Path("MARKETING_TEAM/outputs/videos").resolve()
-        output_dir.mkdir(parents=True, exist_ok=True)
-
-        if not filename.endswith('.mp4'):
-            filename = f"{filename}.mp4"
-        output_path = output_dir / filename
-
-        video.video.save(str(output_path))
-
-        # Clear the cached image after successful use
-        _last_generated_image = None
+        # Saved and cataloged by the finalizer before the job was journaled complete
+        output_path = job.output_path
 
         result_text = (
             f"✅ UGC Video Generated Successfully!\n\n"
@@ -1915,7 +1795,7 @@ async def generate_veo_ugc_from_nano_banana(
             f"**Cost:** ${cost:.2f} (Veo 3.1)\n"
             f"**Resolution:** {config['resolution']} {config['aspect_ratio']}\n"
             f"**Audio:** Native dialogue + sound effects + ambient\n"
-            f"**Generation time:** {poll_count * 10}s\n\n"
+            f"**Generation time:** {int(job.elapsed())}s\n\n"
             f"**Saved to:** {output_path}\n\n"
             f"✨ UGC Characteristics:\n"
             f"- Handheld camera aesthetic\n"
@@ -1935,379 +1815,949 @@ async def generate_veo_ugc_from_nano_banana(
         )]
 
 
-async def _poll_for_video_completion(http_client, headers, video_id, max_wait=300):
-    """Poll the API for video generation completion"""
-    import time
-    start_time = time.time()
+async def search_assets_mcp(
+    query: str = None,
+    kind: str = None,
+    style: str = None,
+    platform: str = None,
+    product: str = None,
+    since: str = None,
+    limit: int = 10
+) -> list[TextContent]:
+    """
+    Search the catalog of previously generated images and videos.
+
+    Use before generating: an existing asset with a matching prompt, style, platform
+    or product can be reused at no cost. Text queries are ranked by relevance;
+    filter-only queries return the newest assets first.
+    """
+    try:
+        since_ts = datetime.fromisoformat(since).timestamp() if since else None
+    except ValueError:
+        return [TextContent(type="text", text=f"❌ Error: since must be an ISO date like 2025-01-31 (got {since})")]
+
+    assets = await asyncio.to_thread(
+        asset_catalog.search,
+        query=query, kind=kind, style=style, platform=platform, product=product, since=since_ts, limit=limit
+    )
+    return [TextContent(type="text", text=json.dumps({
+        "results": len(assets),
+        "assets": [asset.to_dict() for asset in assets],
+        "hint": (
+            "Reuse a matching asset by its path instead of regenerating" if assets
+            else "No matching assets - generate a new one"
+        )
+    }, indent=2))]
+
+
+async def get_server_metrics_mcp() -> list[TextContent]:
+    """
+    Report server performance counters for this MCP server process.
+
+    Sections:
+    - clients: pooled connection usage per provider (requests, new connections, pool hits)
+    - video_jobs: background poller counters per provider (polls per completed video,
+      Retry-After waits, typical completion time)
+    - downloads: streamed video downloads (bytes, Range resumes, peak chunk memory)
+    - image_cache: image result cache hits, misses and size
+    - vision_cache: GPT-4o Vision analysis cache hits (exact and near-duplicate), misses and entries
+    - tools: calls per tool and calls rejected by schema validation
+    - rate_limits: requests, throttle wait time, retries and 429s per provider/model
+    - image_handles: in-memory Nano Banana images available to Veo (entries, bytes, evictions)
+    - single_flight: identical generation requests coalesced onto a running call or job
+    - asset_catalog: cataloged images/videos, catalog write errors and search latency
+    - image_dedup: perceptual-hash index size, lookups that found near-duplicates, lookup latency
+    """
+    metrics = {
+        "clients": clients.stats(),
+        "video_jobs": video_jobs.stats(),
+        "downloads": media_downloads.stats(),
+        "image_cache": image_cache.stats(),
+        "vision_cache": vision_analysis.analysis_cache.stats(),
+        "tools": registry.stats(),
+        "rate_limits": rate_limiter.stats(),
+        "image_handles": image_handles.stats(),
+        "single_flight": registry.single_flight.stats(),
+        "asset_catalog": asset_catalog.stats(),
+        "image_dedup": image_dedup.stats()
+    }
+
+    return [TextContent(type="text", text=json.dumps(metrics, indent=2))]
+
+
+# ============================================================================
+# VIDEO JOB TRACKING (shared background poller + async job mode)
+# ============================================================================
+
+def _openai_headers() -> dict:
+    return {"Authorization": f"Bearer {os.getenv('OPENAI_API_KEY')}"}
 
-    while True:
-        elapsed = time.time() - start_time
-        if elapsed > max_wait:
-            raise TimeoutError(f"Video generation timed out after {max_wait} seconds")
 
-        response = await http_client.get(
-            f"https://api.openai.com/v1/videos/{video_id}",
-            headers=headers
+async def _check_sora_job(job: VideoJob) -> ProviderStatus:
+    """One Sora status request for the background poller."""
+    try:
+        response = await clients.http("openai").get(
+            f"https://api.openai.com/v1/videos/{job.provider_job_id}",
+            headers=_openai_headers()
         )
+    except Exception as e:
+        # Timeouts / dropped connections say nothing about the job: keep it and back off
+        status = transient_check_status(e)
+        if status is None:
+            raise
+        return status
+    retry_after = parse_retry_after(response.headers.get("retry-after"))
+
+    # Rate limited / overloaded (429, 5xx): keep the job and back off
+    transient = transient_check_status(response)
+    if transient is not None:
+        return transient
+
+    if response.status_code != 200:
+        raise Exception(f"Failed to check video status: {response.text}")
+
+    result = response.json()
+    status = result.get('status')
+
+    if status == 'completed':
+        return ProviderStatus(COMPLETED, progress=100)
+    elif status == 'failed':
+        return ProviderStatus(FAILED, error=f"Video generation failed: {result.get('error', 'Unknown error')}")
+
+    return ProviderStatus("running", progress=result.get('progress'), retry_after=retry_after)
+
+
+async def _finalize_sora_job(job: VideoJob):
+    """Download a completed Sora video and build the tool result text."""
+    output_dir = Path("MARKETING_TEAM/outputs/videos").resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = output_dir / job.filename
+
+    download = await stream_download(
+        clients.http("openai"),
+        f"https://api.openai.com/v1/videos/{job.provider_job_id}/content",
+        output_path,
+        headers=_openai_headers(),
+        checksum=True
+    )
+    job.metadata["sha256"] = download.sha256
+    job.output_path = str(output_path)
+
+    meta = job.metadata
+    asset_catalog.record(
+        output_path, "video", tool="generate_sora_video", model="sora-2", prompt=meta.get("prompt"),
+        style=meta.get("ugc_style"), platform=meta.get("platform"), product=meta.get("product_name"),
+        aspect_ratio=meta.get("orientation"), duration=_seconds(meta.get("seconds")),
+        cost=(meta.get("estimated_cost") or 0) + (meta.get("analysis_cost") or 0),
+        provider_id=job.provider_job_id, sha256=download.sha256,
+        resolution=meta.get("resolution"), input_reference=meta.get("input_reference")
+    )
+    if meta.get("recovered"):
+        job.result_text = _recovered_result_text(job, "sora-2")
+        return
+
+    input_reference = meta.get("input_reference")
+    generation_type = "Image-to-video" if input_reference else "Text-to-video"
+    total_cost = meta["estimated_cost"] + meta["analysis_cost"]
+    cost_breakdown = f"${meta['estimated_cost']:.2f}"
+    if meta["analysis_cost"] > 0:
+        cost_breakdown += f" + ${meta['analysis_cost']:.2f} (image analysis)"
+
+    result_text = (
+        f"✅ Video generated successfully!\n\n"
+        f"**Model:** sora-2\n"
+        f"**Type:** {generation_type}\n"
+        f"**Prompt:** {meta['prompt']}\n"
+        f"**Duration:** {meta['seconds']}s\n"
+        f"**Resolution:** {meta['resolution']} ({meta['orientation']})\n"
+        f"**Cost:** ${total_cost:.2f} ({cost_breakdown})\n\n"
+    )
+
+    if input_reference:
+        result_text += f"**Reference Image:** {input_reference}\n"
+        if meta.get("image_analyzed"):
+            result_text += f"**Visual Analysis:** GPT-4o Vision enabled ✓\n"
+
+    result_text += (
+        f"\n**Saved to:** {output_path}\n"
+        f"**Video ID:** {job.provider_job_id}"
+    )
+
+    if input_reference and not meta.get("auto_analyze_image"):
+        result_text += "\n\n💡 Tip: Enable auto_analyze_image=True for better product consistency (+$0.01)"
+
+    job.result_text = result_text
+
+
+async def _check_veo_job(job: VideoJob) -> ProviderStatus:
+    """One Veo operation refresh for the background poller."""
+    client = clients.genai(os.getenv("GEMINI_API_KEY"))
+    if job.handle is None:
+        # Recovered from the journal: rebuild the operation from its name
+        job.handle = _genai_types().GenerateVideosOperation(name=job.provider_job_id)
+    try:
+        job.handle = await clients.run_blocking(client.operations.get, job.handle)
+    except Exception as e:
+        # Rate limited / server errors (google.genai.errors.APIError 429, 5xx) and
+        # network failures: keep the job and back off
+        status = transient_check_status(e)
+        if status is None:
+            raise
+        return status
 
-        if response.status_code != 200:
-            raise Exception(f"Failed to check video status: {response.text}")
+    if not job.handle.done:
+        return ProviderStatus("running")
+
+    if getattr(job.handle, 'error', None):
+        return ProviderStatus(FAILED, error=f"Video generation failed: {job.handle.error}")
+
+    return ProviderStatus(COMPLETED, progress=100)
 
-        result = response.json()
-        status = result.get('status')
 
-        if status == 'completed':
-            return  # Video is ready
-        elif status == 'failed':
-            raise Exception(f"Video generation failed: {result.get('error', 'Unknown error')}")
+async def _save_veo_video(client, api_key: str, video, output_path: Path) -> Optional[str]:
+    """
+    Write a generated Veo video to output_path.
+
+    Gemini API results carry a file URI, which is streamed to disk through the
+    pooled "gemini" client. Results with inline bytes (no URI) fall back to the SDK.
+
+    Returns:
+        SHA-256 of the streamed file (None for the SDK fallback)
+    """
+    uri = getattr(video.video, "uri", None)
+    if uri:
+        download = await stream_download(
+            clients.http("gemini"),
+            uri,
+            output_path,
+            headers={"x-goog-api-key": api_key},
+            checksum=True
+        )
+        return download.sha256
+
+    await clients.run_blocking(client.files.download, file=video.video)
+    await clients.run_blocking(video.video.save, str(output_path))
+    return None
+
+
+async def _finalize_veo_job(job: VideoJob):
+    """Download a completed Veo video and build the tool result text."""
+    operation = job.handle
+
+    # Check if blocked by safety
+    if not hasattr(operation.response, 'generated_videos') or not operation.response.generated_videos:
+        raise Exception("Video generation blocked by safety filters (no charge)")
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    client = clients.genai(api_key)
+    video = operation.response.generated_videos[0]
+
+    output_dir = Path("MARKETING_TEAM/outputs/videos").resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = output_dir / job.filename
+
+    job.metadata["sha256"] = await _save_veo_video(client, api_key, video, output_path)
+
+    meta = job.metadata
+    job.output_path = str(output_path)
+    asset_catalog.record(
+        output_path, "video",
+        # Jobs journaled before "tool" was recorded fall back to the primary UGC tool
+        tool=meta.get("tool", "generate_veo_ugc_from_image") if job.provider == "veo_ugc" else "generate_veo_text_to_video",
+        model="veo-3.1-generate-preview", prompt=meta.get("prompt"),
+        style=meta.get("ugc_style"), platform=meta.get("platform"), product=meta.get("product_name"),
+        aspect_ratio=meta.get("aspect_ratio"), duration=_seconds(meta.get("seconds")),
+        cost=meta.get("cost"), provider_id=job.provider_job_id, sha256=meta["sha256"],
+        resolution=meta.get("resolution")
+    )
+    if meta.get("recovered"):
+        job.result_text = _recovered_result_text(job, "veo-3.1-generate-preview")
+        return
+
+    job.result_text = (
+        f"✅ Veo 3.1 Video Generated!\n\n"
+        f"**Model:** veo-3.1-generate-preview\n"
+        f"**Duration:** {meta['seconds']} seconds\n"
+        f"**Cost:** ${meta['cost']:.2f}\n"
+        f"**Resolution:** {meta['resolution']} {meta['aspect_ratio']}\n"
+        f"**Audio:** Native audio included\n"
+        f"**Generation time:** {int(job.elapsed())}s\n\n"
+        f"**Saved to:** {output_path}\n\n"
+        f"Next: Upload to Google Drive or review video"
+    )
+
+
+async def _finalize_veo_ugc_job(job: VideoJob):
+    """
+    Download a finished UGC video before the job is journaled complete.
+
+    A crash or failed download therefore leaves the job for claim_orphans to
+    recover instead of a COMPLETED record with no file. Handlers report
+    job.output_path; a safety block fails the job with job.handle done.
+    """
+    if not job.filename.endswith(".mp4"):
+        job.filename = f"{job.filename}.mp4"
+    await _finalize_veo_job(job)
+
+
+def _veo_blocked(operation) -> bool:
+    """A finished Veo operation without videos (blocked by safety filters, no charge)."""
+    return bool(operation.done) and not getattr(operation.response, 'generated_videos', None)
+
+
+def _seconds(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _ugc_metadata(tool: str, prompt: str, ugc_style: str, platform: str, product_name: str, seconds: str, cost: float, config: dict) -> dict:
+    """Veo UGC job metadata (journaled, and cataloged with the finished video under tool)."""
+    return {
+        "tool": tool,
+        "prompt": prompt,
+        "ugc_style": ugc_style,
+        "platform": platform,
+        "product_name": product_name,
+        "seconds": seconds,
+        "cost": cost,
+        "resolution": config.get("resolution"),
+        "aspect_ratio": config.get("aspect_ratio")
+    }
+
+
+def _recovered_result_text(job: VideoJob, model: str) -> str:
+    return (
+        f"✅ Recovered video job finished after a server restart\n\n"
+        f"**Model:** {model}\n"
+        f"**Job ID:** {job.job_id}\n"
+        f"**Provider job:** {job.provider_job_id}\n"
+        f"**Submitted:** {datetime.fromtimestamp(job.submitted_at).isoformat(sep=' ', timespec='seconds')}\n\n"
+        f"**Saved to:** {job.output_path}"
+    )
+
+
+video_jobs.register_provider(
+    "sora", _check_sora_job, _finalize_sora_job, poll_interval=5.0, max_interval=20.0, max_wait=300
+)
+video_jobs.register_provider("veo", _check_veo_job, _finalize_veo_job, poll_interval=10.0, max_interval=30.0)
+video_jobs.register_provider("veo_ugc", _check_veo_job, _finalize_veo_ugc_job, poll_interval=10.0, max_interval=30.0)
+
+
+def _job_submitted_text(job: VideoJob) -> str:
+    return json.dumps({
+        "status": "submitted",
+        "job_id": job.job_id,
+        "provider": job.provider,
+        "provider_job_id": job.provider_job_id,
+        "filename": job.filename,
+        "message": (
+            "✅ Video job submitted. Check progress with get_video_job_status and collect "
+            "the video with fetch_video_job_result."
+        )
+    }, indent=2)
+
+
+async def _join_running_job(tool_name: str, request_key: str, async_mode: bool) -> Optional[list[TextContent]]:
+    """Attach a duplicate request to its identical, still-running video job (None if there is none)."""
+    job = video_jobs.active_job(request_key)
+    if job is None:
+        return None
+
+    registry.single_flight.record(tool_name, "attached_to_job")
+    print(f"🔗 Identical request already running as {job.job_id} - attaching instead of resubmitting", file=sys.stderr)
+    if async_mode:
+        return [TextContent(type="text", text=_job_submitted_text(job))]
+
+    job = await video_jobs.wait(job.job_id)
+    if job.status == FAILED:
+        return [TextContent(type="text", text=f"❌ Error generating video: {job.error}")]
+    return [TextContent(type="text", text=job.result_text)]
+
+
+async def get_video_job_status_mcp(job_id: str = None) -> list[TextContent]:
+    """
+    Report progress of async video jobs.
+
+    Args:
+        job_id: Job to inspect (omit to list every job tracked by this server)
+    """
+    if job_id:
+        job = video_jobs.get(job_id)
+        if job is None:
+            return [TextContent(type="text", text=f"❌ Error: Unknown video job '{job_id}'")]
+        return [TextContent(type="text", text=json.dumps(job.to_dict(), indent=2))]
+
+    jobs = [job.to_dict() for job in video_jobs.jobs()]
+    return [TextContent(type="text", text=json.dumps({"jobs": jobs}, indent=2))]
+
+
+async def list_recovered_video_jobs_mcp() -> list[TextContent]:
+    """
+    List video jobs this server resumed from the job journal after a restart.
+
+    Each entry carries the normal job status; finished jobs include where the video
+    was saved. Collect a full result with fetch_video_job_result.
+    """
+    jobs = [
+        {**job.to_dict(), "submitted_at": datetime.fromtimestamp(job.submitted_at).isoformat(timespec="seconds")}
+        for job in video_jobs.recovered_jobs()
+    ]
+    return [TextContent(type="text", text=json.dumps({
+        "journal": str(video_jobs.journal.path) if video_jobs.journal else None,
+        "recovered": len(jobs),
+        "jobs": jobs
+    }, indent=2))]
+
 
-        # Wait before polling again
-        await asyncio.sleep(5)
+async def fetch_video_job_result_mcp(job_id: str, wait: bool = False, timeout_seconds: int = 300) -> list[TextContent]:
+    """
+    Collect the result of an async video job.
+
+    Args:
+        job_id: Job returned by an async_mode video tool
+        wait: Block until the job finishes (up to timeout_seconds)
+        timeout_seconds: Max seconds to wait when wait=True
+
+    Returns:
+        The normal video tool result once finished, otherwise the current job status
+    """
+    job = video_jobs.get(job_id)
+    if job is None:
+        return [TextContent(type="text", text=f"❌ Error: Unknown video job '{job_id}'")]
+
+    if wait and not job.done:
+        try:
+            job = await video_jobs.wait(job_id, timeout=timeout_seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    if job.status == COMPLETED:
+        return [TextContent(type="text", text=job.result_text)]
+
+    if job.status == FAILED:
+        return [TextContent(type="text", text=f"❌ Video job {job_id} failed: {job.error}")]
+
+    return [TextContent(
+        type="text",
+        text=f"⏳ Video job still in progress\n\n{json.dumps(job.to_dict(), indent=2)}"
+    )]
 
 
 # ============================================================================
 # MCP SERVER TOOL REGISTRATION
 # ============================================================================
 
-@app.list_tools()
-async def list_tools() -> list[Tool]:
-    """List all available marketing tools"""
-    return [
-        Tool(
-            name="generate_gpt4o_image",
-            description="Generate high-quality image using GPT-4o (gpt-image-1) - latest multimodal model with superior text rendering",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "prompt": {
-                        "type": "string",
-                        "description": "Detailed image generation prompt (style, colors, composition, text)"
-                    },
-                    "aspect_ratio": {
-                        "type": "string",
-                        "description": "Aspect ratio: 1:1 (square), 2:3 (portrait), or 3:2 (landscape)",
-                        "enum": ["1:1", "2:3", "3:2"],
-                        "default": "1:1"
-                    },
-                    "detail": {
-                        "type": "string",
-                        "description": "Detail level: low, medium, or high",
-                        "enum": ["low", "medium", "high"],
-                        "default": "high"
-                    },
-                    "filename": {
-                        "type": "string",
-                        "description": "Output filename (without .png extension)"
-                    }
-                },
-                "required": ["prompt", "filename"]
+# Handlers, schemas and argument defaults are registered once at import time;
+# list_tools serves the cached Tool list and call_tool is a dict lookup
+registry = ToolRegistry()
+
+
+def _veo_ugc_schema() -> dict:
+    """Veo UGC input schema; the style enum reflects the current template file"""
+    ugc_styles = ugc_templates.styles()
+    return {
+        "type": "object",
+        "properties": {
+            "image_path": {
+                "type": "string",
+                "description": "Path to product image (e.g., MARKETING_TEAM/outputs/images/product.png) - required unless image_handle is given"
+            },
+            "image_handle": {
+                "type": "string",
+                "description": "Optional: Image handle returned by generate_nano_banana_image (uses the in-memory image, no disk read)"
+            },
+            "ugc_style": {
+                "type": "string",
+                "description": f"UGC style - {len(ugc_styles)} styles available from memory/ugc_prompt_templates.json",
+                "enum": ugc_styles,  # Reflects the current template file
+                "default": "testimonial"
+            },
+            "platform": {
+                "type": "string",
+                "description": "Target platform (auto-optimizes aspect ratio and duration)",
+                "enum": ["tiktok", "instagram", "facebook"],
+                "default": "tiktok"
+            },
+            "seconds": {
+                "type": "string",
+                "description": "Video duration: '6' or '8' (MUST be string, 8 recommended)",
+                "enum": ["6", "8"],
+                "default": "8"
+            },
+            "product_name": {
+                "type": "string",
+                "description": "Product name for UGC prompt generation"
+            },
+            "filename": {
+                "type": "string",
+                "description": "Output filename (without extension, .mp4 will be added)"
+            },
+            "custom_prompt": {
+                "type": "string",
+                "description": "Optional: Override default UGC template with custom prompt"
+            },
+            "icp": {
+                "type": "string",
+                "description": "Optional: Ideal Customer Profile (e.g., 'Young women 25-35, health-conscious')"
+            },
+            "product_features": {
+                "type": "string",
+                "description": "Optional: Specific features to highlight (e.g., 'Increases shine, lightweight')"
+            },
+            "video_setting": {
+                "type": "string",
+                "description": "Optional: Custom environment (e.g., 'Bright modern bathroom, morning')"
+            },
+            "reference_image_description": {
+                "type": "string",
+                "description": "Optional: Manual override for image description (auto-analyzed if None)"
+            },
+            "auto_analyze_image": {
+                "type": "boolean",
+                "description": "Automatically analyze image with GPT-4o Vision for maximum visual consistency (default: true, +$0.01)",
+                "default": True
             }
-        ),
-        Tool(
-            name="generate_sora_video",
-            description="Generate video using OpenAI's Sora-2 model ($0.10/second, 720p) - supports text-to-video, image-to-video with GPT-4o Vision analysis, AND 50 UGC styles",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "prompt": {
-                        "type": "string",
-                        "description": "Optional: Custom video prompt. Can be used ALONE (manual prompt) OR WITH ugc_style (adds custom instructions to UGC template)."
-                    },
-                    "seconds": {
-                        "type": "string",
-                        "description": "Video duration: '4', '8', or '12' (MUST be string)",
-                        "enum": ["4", "8", "12"],
-                        "default": "4"
-                    },
-                    "orientation": {
-                        "type": "string",
-                        "description": "Video orientation: portrait (720x1280) or landscape (1280x720)",
-                        "enum": ["portrait", "landscape"],
-                        "default": "landscape"
-                    },
-                    "filename": {
-                        "type": "string",
-                        "description": "Output filename (will add .mp4 extension)"
-                    },
-                    "input_reference": {
-                        "type": "string",
-                        "description": "Optional: path to reference image for image-to-video generation"
-                    },
-                    "auto_analyze_image": {
-                        "type": "boolean",
-                        "description": "Analyze image with GPT-4o Vision for better consistency (default: false, +$0.01)",
-                        "default": False
-                    },
-                    "ugc_style": {
-                        "type": "string",
-                        "description": "Optional: UGC style (testimonial, demo, unboxing, lifestyle, tutorial, how_to, quick_tips, before_after, comparison, transformation, first_time, reaction, challenge, morning_routine, night_routine, grwm, day_in_life, product_showcase, feature_highlight, results_showcase, problem_solving, hack, myth_busting, haul, favorites, must_haves, honest_review, worth_it, hype_test, setup, installation, maintenance, trending, viral, duet_response, seasonal, holiday, gift_guide, behind_scenes, real_talk, unpopular_opinion, explainer, science_behind, ingredients_breakdown, asmr, pov, satisfying, minimalist, luxury, budget_friendly). Automatically builds authentic UGC prompt. Can be combined with 'prompt' parameter to add custom instructions."
-                    },
-                    "product_name": {
-                        "type": "string",
-                        "description": "Required if ugc_style used: Product name for UGC video"
-                    },
-                    "platform": {
-                        "type": "string",
-                        "description": "Platform optimization: tiktok, instagram, facebook (default: tiktok)",
-                        "enum": ["tiktok", "instagram", "facebook"],
-                        "default": "tiktok"
-                    },
-                    "icp": {
-                        "type": "string",
-                        "description": "Optional: Ideal Customer Profile (e.g., 'Young women 25-35, health-conscious')"
-                    },
-                    "product_features": {
-                        "type": "string",
-                        "description": "Optional: Product features to highlight (e.g., 'Increases energy, natural ingredients')"
-                    },
-                    "video_setting": {
-                        "type": "string",
-                        "description": "Optional: Custom environment (e.g., 'Bright modern kitchen, morning light')"
-                    }
-                },
-                "required": ["filename"]
+        },
+        "required": ["ugc_style", "platform", "product_name", "filename"]
+    }
+
+
+registry.register(
+    name="generate_gpt4o_image",
+    description="Generate high-quality image using GPT-4o (gpt-image-1) - latest multimodal model with superior text rendering",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "prompt": {
+                "type": "string",
+                "description": "Detailed image generation prompt (style, colors, composition, text)"
+            },
+            "aspect_ratio": {
+                "type": "string",
+                "description": "Aspect ratio: 1:1 (square), 2:3 (portrait), or 3:2 (landscape)",
+                "enum": ["1:1", "2:3", "3:2"],
+                "default": "1:1"
+            },
+            "detail": {
+                "type": "string",
+                "description": "Detail level: low, medium, or high",
+                "enum": ["low", "medium", "high"],
+                "default": "high"
+            },
+            "filename": {
+                "type": "string",
+                "description": "Output filename (without .png extension)"
+            },
+            "cache": {
+                "type": "string",
+                "description": "Image cache: use (reuse identical earlier request), refresh (regenerate and replace), bypass (skip cache)",
+                "enum": ["use", "refresh", "bypass"],
+                "default": "use"
             }
-        ),
-        Tool(
-            name="generate_nano_banana_image",
-            description="Generate image using Nano Banana (Gemini 2.5 Flash Image) - $0.039/image, excellent character consistency, optimized for Veo 3.1 image-to-video",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "prompt": {
-                        "type": "string",
-                        "description": "Image generation prompt with natural language description"
-                    },
-                    "aspect_ratio": {
-                        "type": "string",
-                        "description": "Aspect ratio: 1:1, 16:9, 9:16, 2:3, 3:2, 3:4, 4:3, 4:5, 5:4, 21:9",
-                        "enum": ["1:1", "16:9", "9:16", "2:3", "3:2", "3:4", "4:3", "4:5", "5:4", "21:9"],
-                        "default": "9:16"
-                    },
-                    "filename": {
-                        "type": "string",
-                        "description": "Output filename (without extension, .png will be added)"
-                    }
-                },
-                "required": ["prompt", "filename"]
+        },
+        "required": ["prompt", "filename"]
+    },
+    handler=generate_gpt4o_image_mcp
+)
+
+registry.register(
+    name="generate_sora_video",
+    description="Generate video using OpenAI's Sora-2 model ($0.10/second, 720p) - supports text-to-video, image-to-video with GPT-4o Vision analysis, AND 50 UGC styles",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "prompt": {
+                "type": "string",
+                "description": "Optional: Custom video prompt. Can be used ALONE (manual prompt) OR WITH ugc_style (adds custom instructions to UGC template)."
+            },
+            "seconds": {
+                "type": "string",
+                "description": "Video duration: '4', '8', or '12' (MUST be string)",
+                "enum": ["4", "8", "12"],
+                "default": "4"
+            },
+            "orientation": {
+                "type": "string",
+                "description": "Video orientation: portrait (720x1280) or landscape (1280x720)",
+                "enum": ["portrait", "landscape"],
+                "default": "landscape"
+            },
+            "filename": {
+                "type": "string",
+                "description": "Output filename (will add .mp4 extension)"
+            },
+            "input_reference": {
+                "type": "string",
+                "description": "Optional: path to reference image for image-to-video generation"
+            },
+            "auto_analyze_image": {
+                "type": "boolean",
+                "description": "Analyze image with GPT-4o Vision for better consistency (default: false, +$0.01)",
+                "default": False
+            },
+            "ugc_style": {
+                "type": "string",
+                "description": "Optional: UGC style (testimonial, demo, unboxing, lifestyle, tutorial, how_to, quick_tips, before_after, comparison, transformation, first_time, reaction, challenge, morning_routine, night_routine, grwm, day_in_life, product_showcase, feature_highlight, results_showcase, problem_solving, hack, myth_busting, haul, favorites, must_haves, honest_review, worth_it, hype_test, setup, installation, maintenance, trending, viral, duet_response, seasonal, holiday, gift_guide, behind_scenes, real_talk, unpopular_opinion, explainer, science_behind, ingredients_breakdown, asmr, pov, satisfying, minimalist, luxury, budget_friendly). Automatically builds authentic UGC prompt. Can be combined with 'prompt' parameter to add custom instructions."
+            },
+            "product_name": {
+                "type": "string",
+                "description": "Required if ugc_style used: Product name for UGC video"
+            },
+            "platform": {
+                "type": "string",
+                "description": "Platform optimization: tiktok, instagram, facebook (default: tiktok)",
+                "enum": ["tiktok", "instagram", "facebook"],
+                "default": "tiktok"
+            },
+            "icp": {
+                "type": "string",
+                "description": "Optional: Ideal Customer Profile (e.g., 'Young women 25-35, health-conscious')"
+            },
+            "product_features": {
+                "type": "string",
+                "description": "Optional: Product features to highlight (e.g., 'Increases energy, natural ingredients')"
+            },
+            "video_setting": {
+                "type": "string",
+                "description": "Optional: Custom environment (e.g., 'Bright modern kitchen, morning light')"
+            },
+            "async_mode": {
+                "type": "boolean",
+                "description": "Return a job_id immediately instead of waiting for the video (collect with fetch_video_job_result)",
+                "default": False
             }
-        ),
-        Tool(
-            name="analyze_ugc_image",
-            description="Analyze UGC image with GPT-4o Vision for consistent Veo video generation - ~$0.01/analysis",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "image_url": {
-                        "type": "string",
-                        "description": "URL or local path to generated image (from Nano Banana or GPT-4o)"
-                    }
-                },
-                "required": ["image_url"]
+        },
+        "required": ["filename"]
+    },
+    handler=generate_sora_video_mcp,
+    coalesce=True
+)
+
+registry.register(
+    name="generate_nano_banana_image",
+    description="Generate image using Nano Banana (Gemini 2.5 Flash Image) - $0.039/image, excellent character consistency, optimized for Veo 3.1 image-to-video",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "prompt": {
+                "type": "string",
+                "description": "Image generation prompt with natural language description"
+            },
+            "aspect_ratio": {
+                "type": "string",
+                "description": "Aspect ratio: 1:1, 16:9, 9:16, 2:3, 3:2, 3:4, 4:3, 4:5, 5:4, 21:9",
+                "enum": NANO_BANANA_ASPECT_RATIOS,
+                "default": "9:16"
+            },
+            "filename": {
+                "type": "string",
+                "description": "Output filename (without extension, .png will be added)"
+            },
+            "cache": {
+                "type": "string",
+                "description": "Image cache: use (reuse identical earlier request), refresh (regenerate and replace), bypass (skip cache)",
+                "enum": ["use", "refresh", "bypass"],
+                "default": "use"
             }
-        ),
-        Tool(
-            name="generate_veo_text_to_video",
-            description="Generate video from text using Veo 3.1 ($0.75/second, 720p/1080p, native audio with dialogue and sound effects)",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "prompt": {
-                        "type": "string",
-                        "description": "Video prompt with dialogue cues (quotes), sound effects, ambient audio descriptions"
-                    },
-                    "seconds": {
-                        "type": "string",
-                        "description": "Video duration: '4', '6', or '8' (MUST be string)",
-                        "enum": ["4", "6", "8"],
-                        "default": "8"
-                    },
-                    "orientation": {
-                        "type": "string",
-                        "description": "Video orientation",
-                        "enum": ["portrait", "landscape"],
-                        "default": "portrait"
-                    },
-                    "resolution": {
-                        "type": "string",
-                        "description": "Video resolution (1080p only available for 8s videos)",
-                        "enum": ["720p", "1080p"],
-                        "default": "720p"
-                    },
-                    "filename": {
-                        "type": "string",
-                        "description": "Output filename (without extension, .mp4 will be added)"
-                    },
-                    "negative_prompt": {
-                        "type": "string",
-                        "description": "Optional: Elements to exclude from generation"
-                    },
-                    "icp": {
-                        "type": "string",
-                        "description": "Optional: Ideal Customer Profile for scene composition"
-                    },
-                    "product_features": {
-                        "type": "string",
-                        "description": "Optional: Features to visualize in video"
+        },
+        "required": ["prompt", "filename"]
+    },
+    handler=generate_nano_banana_image_mcp
+)
+
+registry.register(
+    name="generate_image_batch",
+    description="Generate many image variants in one call (GPT-4o or Nano Banana) - merges identical GPT-4o requests into multi-image calls, runs the rest concurrently per provider, and reports partial failures per item",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "items": {
+                "type": "array",
+                "description": f"Image specs (max {IMAGE_BATCH_MAX_ITEMS} items, {IMAGE_BATCH_MAX_IMAGES} images in total)",
+                "minItems": 1,
+                "maxItems": IMAGE_BATCH_MAX_ITEMS,
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "prompt": {
+                            "type": "string",
+                            "description": "Image prompt"
+                        },
+                        "aspect_ratio": {
+                            "type": "string",
+                            "description": "GPT-4o: 1:1, 2:3 or 3:2 (default 1:1). Nano Banana: any listed ratio (default 9:16)",
+                            "enum": NANO_BANANA_ASPECT_RATIOS
+                        },
+                        "variants": {
+                            "type": "integer",
+                            "description": "Images to generate for this prompt (default 1)",
+                            "minimum": 1,
+                            "maximum": GPT4O_MAX_N
+                        },
+                        "filename": {
+                            "type": "string",
+                            "description": "Output filename stem (without .png; _v1, _v2... added for variants)"
+                        }
                     },
-                    "video_setting": {
-                        "type": "string",
-                        "description": "Optional: Environment description"
-                    }
-                },
-                "required": ["prompt", "filename"]
+                    "required": ["prompt"]
+                }
+            },
+            "provider": {
+                "type": "string",
+                "description": "gpt4o (gpt-image-1) or nano_banana (gemini-2.5-flash-image)",
+                "enum": ["gpt4o", "nano_banana"],
+                "default": "gpt4o"
+            },
+            "filename_prefix": {
+                "type": "string",
+                "description": "Filename stem for items without a filename (<prefix>_01, <prefix>_02, ...)",
+                "default": "batch"
+            },
+            "cache": {
+                "type": "string",
+                "description": "Image cache: use (reuse identical earlier request), refresh (regenerate and replace), bypass (skip cache)",
+                "enum": ["use", "refresh", "bypass"],
+                "default": "use"
             }
-        ),
-        Tool(
-            name="generate_veo_ugc_from_image",
-            description="PRIMARY UGC TOOL: Generate authentic UGC-style ad video from product image using Veo 3.1 image-to-video ($0.75/second, native audio, 4 styles, 3 platforms)",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "image_path": {
-                        "type": "string",
-                        "description": "Path to product image (e.g., MARKETING_TEAM/outputs/images/product.png)"
-                    },
-                    "ugc_style": {
-                        "type": "string",
-                        "description": f"UGC style - {len(AVAILABLE_UGC_STYLES)} styles available from memory/ugc_prompt_templates.json",
-                        "enum": AVAILABLE_UGC_STYLES,  # Dynamically loaded from JSON!
-                        "default": "testimonial"
-                    },
-                    "platform": {
-                        "type": "string",
-                        "description": "Target platform (auto-optimizes aspect ratio and duration)",
-                        "enum": ["tiktok", "instagram", "facebook"],
-                        "default": "tiktok"
-                    },
-                    "seconds": {
-                        "type": "string",
-                        "description": "Video duration: '6' or '8' (MUST be string, 8 recommended)",
-                        "enum": ["6", "8"],
-                        "default": "8"
-                    },
-                    "product_name": {
-                        "type": "string",
-                        "description": "Product name for UGC prompt generation"
-                    },
-                    "filename": {
-                        "type": "string",
-                        "description": "Output filename (without extension, .mp4 will be added)"
-                    },
-                    "custom_prompt": {
-                        "type": "string",
-                        "description": "Optional: Override default UGC template with custom prompt"
-                    },
-                    "icp": {
-                        "type": "string",
-                        "description": "Optional: Ideal Customer Profile (e.g., 'Young women 25-35, health-conscious')"
-                    },
-                    "product_features": {
-                        "type": "string",
-                        "description": "Optional: Specific features to highlight (e.g., 'Increases shine, lightweight')"
-                    },
-                    "video_setting": {
-                        "type": "string",
-                        "description": "Optional: Custom environment (e.g., 'Bright modern bathroom, morning')"
-                    },
-                    "reference_image_description": {
-                        "type": "string",
-                        "description": "Optional: Manual override for image description (auto-analyzed if None)"
-                    },
-                    "auto_analyze_image": {
-                        "type": "boolean",
-                        "description": "Automatically analyze image with GPT-4o Vision for maximum visual consistency (default: true, +$0.01)",
-                        "default": True
-                    }
-                },
-                "required": ["image_path", "ugc_style", "platform", "product_name", "filename"]
+        },
+        "required": ["items"]
+    },
+    handler=generate_image_batch_mcp
+)
+
+registry.register(
+    name="analyze_ugc_image",
+    description="Analyze UGC image with GPT-4o Vision for consistent Veo video generation - ~$0.01/analysis",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "image_url": {
+                "type": "string",
+                "description": "URL or local path to generated image (from Nano Banana or GPT-4o)"
             }
-        ),
-    ]
-
-
-@app.call_tool()
-async def call_tool(name: str, arguments: dict) -> list[TextContent]:
-    """Execute a marketing tool"""
-
-    try:
-        if name == "generate_gpt4o_image":
-            return await generate_gpt4o_image_mcp(
-                prompt=arguments["prompt"],
-                aspect_ratio=arguments.get("aspect_ratio", "1:1"),
-                detail=arguments.get("detail", "high"),
-                filename=arguments["filename"]
-            )
+        },
+        "required": ["image_url"]
+    },
+    handler=analyze_ugc_image_mcp
+)
+
+registry.register(
+    name="warm_vision_cache",
+    description="Pre-analyze a folder of product images with GPT-4o Vision so later image-to-video and analyze_ugc_image calls reuse cached analyses - ~$0.01 per new image",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "folder": {
+                "type": "string",
+                "description": "Directory containing product images"
+            },
+            "prompt": {
+                "type": "string",
+                "description": "Analysis prompt: product (Sora auto_analyze_image) or ugc_scene (analyze_ugc_image / Veo UGC)",
+                "enum": ["product", "ugc_scene"],
+                "default": "product"
+            }
+        },
+        "required": ["folder"]
+    },
+    handler=warm_vision_cache_mcp
+)
+
+registry.register(
+    name="generate_veo_text_to_video",
+    description="Generate video from text using Veo 3.1 ($0.75/second, 720p/1080p, native audio with dialogue and sound effects)",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "prompt": {
+                "type": "string",
+                "description": "Video prompt with dialogue cues (quotes), sound effects, ambient audio descriptions"
+            },
+            "seconds": {
+                "type": "string",
+                "description": "Video duration: '4', '6', or '8' (MUST be string)",
+                "enum": ["4", "6", "8"],
+                "default": "8"
+            },
+            "orientation": {
+                "type": "string",
+                "description": "Video orientation",
+                "enum": ["portrait", "landscape"],
+                "default": "portrait"
+            },
+            "resolution": {
+                "type": "string",
+                "description": "Video resolution (1080p only available for 8s videos)",
+                "enum": ["720p", "1080p"],
+                "default": "720p"
+            },
+            "filename": {
+                "type": "string",
+                "description": "Output filename (without extension, .mp4 will be added)"
+            },
+            "negative_prompt": {
+                "type": "string",
+                "description": "Optional: Elements to exclude from generation"
+            },
+            "icp": {
+                "type": "string",
+                "description": "Optional: Ideal Customer Profile for scene composition"
+            },
+            "product_features": {
+                "type": "string",
+                "description": "Optional: Features to visualize in video"
+            },
+            "video_setting": {
+                "type": "string",
+                "description": "Optional: Environment description"
+            },
+            "async_mode": {
+                "type": "boolean",
+                "description": "Return a job_id immediately instead of waiting for the video (collect with fetch_video_job_result)",
+                "default": False
+            }
+        },
+        "required": ["prompt", "filename"]
+    },
+    handler=generate_veo_text_to_video_mcp,
+    coalesce=True
+)
+
+registry.register(
+    name="generate_veo_ugc_from_image",
+    description="PRIMARY UGC TOOL: Generate authentic UGC-style ad video from product image using Veo 3.1 image-to-video ($0.75/second, native audio, 4 styles, 3 platforms)",
+    input_schema=_veo_ugc_schema,
+    handler=generate_veo_ugc_from_image_mcp,
+    defaults={"image_path": None},
+    coalesce=True
+)
+
+registry.register(
+    name="get_video_job_status",
+    description="Check progress of async video jobs (Sora/Veo) - omit job_id to list all jobs",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "job_id": {
+                "type": "string",
+                "description": "Job ID returned by a video tool called with async_mode=true"
+            }
+        }
+    },
+    handler=get_video_job_status_mcp
+)
+
+registry.register(
+    name="fetch_video_job_result",
+    description="Collect the finished video (saved path, cost, specs) for an async video job",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "job_id": {
+                "type": "string",
+                "description": "Job ID returned by a video tool called with async_mode=true"
+            },
+            "wait": {
+                "type": "boolean",
+                "description": "Wait for the job to finish instead of returning its current status",
+                "default": False
+            },
+            "timeout_seconds": {
+                "type": "integer",
+                "description": "Max seconds to wait when wait=true",
+                "default": 300
+            }
+        },
+        "required": ["job_id"]
+    },
+    handler=fetch_video_job_result_mcp
+)
+
+registry.register(
+    name="list_recovered_video_jobs",
+    description="List video jobs resumed from the job journal after a server restart (status and saved paths)",
+    input_schema={
+        "type": "object",
+        "properties": {}
+    },
+    handler=list_recovered_video_jobs_mcp
+)
+
+registry.register(
+    name="search_assets",
+    description="Search previously generated images and videos (prompt text, style, platform, product, date) to reuse an existing asset instead of regenerating - free, milliseconds",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "query": {
+                "type": "string",
+                "description": "Free text matched against prompts, style, product and platform (e.g. 'coffee mug unboxing')"
+            },
+            "kind": {
+                "type": "string",
+                "description": "Asset type",
+                "enum": list(ASSET_KINDS)
+            },
+            "style": {
+                "type": "string",
+                "description": "UGC style, e.g. testimonial, unboxing, demo, lifestyle"
+            },
+            "platform": {
+                "type": "string",
+                "description": "Target platform, e.g. tiktok, instagram, youtube"
+            },
+            "product": {
+                "type": "string",
+                "description": "Product name"
+            },
+            "since": {
+                "type": "string",
+                "description": "Only assets created on or after this ISO date (YYYY-MM-DD)"
+            },
+            "limit": {
+                "type": "integer",
+                "description": "Maximum results",
+                "default": 10,
+                "minimum": 1,
+                "maximum": 100
+            }
+        }
+    },
+    handler=search_assets_mcp
+)
 
-        elif name == "generate_sora_video":
-            return await generate_sora_video_mcp(
-                prompt=arguments.get("prompt"),
-                seconds=arguments.get("seconds", "4"),
-                orientation=arguments.get("orientation", "landscape"),
-                filename=arguments["filename"],
-                input_reference=arguments.get("input_reference"),
-                auto_analyze_image=arguments.get("auto_analyze_image", False),
-                # NEW UGC parameters:
-                ugc_style=arguments.get("ugc_style"),
-                product_name=arguments.get("product_name"),
-                platform=arguments.get("platform", "tiktok"),
-                icp=arguments.get("icp"),
-                product_features=arguments.get("product_features"),
-                video_setting=arguments.get("video_setting")
-            )
+registry.register(
+    name="get_server_metrics",
+    description="Report marketing-tools server metrics (connection pool hits per provider, video poller polls per completed video)",
+    input_schema={
+        "type": "object",
+        "properties": {}
+    },
+    handler=get_server_metrics_mcp
+)
 
-        elif name == "generate_nano_banana_image":
-            return await generate_nano_banana_image_mcp(
-                prompt=arguments["prompt"],
-                aspect_ratio=arguments.get("aspect_ratio", "9:16"),
-                filename=arguments["filename"]
-            )
 
-        elif name == "analyze_ugc_image":
-            return await analyze_ugc_image_mcp(
-                image_url=arguments["image_url"]
-            )
+@app.list_tools()
+async def list_tools() -> list[Tool]:
+    """List all available marketing tools (rebuilt only when the UGC templates reload)"""
+    ugc_templates.styles()  # Picks up template file changes
+    return registry.list_tools(cache_key=ugc_templates.version)
 
-        elif name == "generate_veo_text_to_video":
-            return await generate_veo_text_to_video_mcp(
-                prompt=arguments["prompt"],
-                seconds=arguments.get("seconds", "8"),
-                orientation=arguments.get("orientation", "portrait"),
-                resolution=arguments.get("resolution", "720p"),
-                filename=arguments["filename"],
-                negative_prompt=arguments.get("negative_prompt"),
-                icp=arguments.get("icp"),
-                product_features=arguments.get("product_features"),
-                video_setting=arguments.get("video_setting")
-            )
 
-        elif name == "generate_veo_ugc_from_image":
-            return await generate_veo_ugc_from_image_mcp(
-                image_path=arguments["image_path"],
-                ugc_style=arguments.get("ugc_style", "testimonial"),
-                platform=arguments.get("platform", "tiktok"),
-                seconds=arguments.get("seconds", "8"),
-                product_name=arguments["product_name"],
-                filename=arguments["filename"],
-                custom_prompt=arguments.get("custom_prompt"),
-                icp=arguments.get("icp"),
-                product_features=arguments.get("product_features"),
-                video_setting=arguments.get("video_setting"),
-                reference_image_description=arguments.get("reference_image_description"),
-                auto_analyze_image=arguments.get("auto_analyze_image", True)
-            )
+# Arguments are checked by the registry's compiled validators; skip the SDK's own
+# per-call jsonschema pass where this mcp version supports turning it off
+if "validate_input" in inspect.signature(Server.call_tool).parameters:
+    _call_tool_decorator = app.call_tool(validate_input=False)
+else:
+    _call_tool_decorator = app.call_tool()
 
-        else:
-            return [TextContent(
-                type="text",
-                text=f"❌ Unknown tool: {name}"
-            )]
 
-    except Exception as e:
-        return [TextContent(
-            type="text",
-            text=f"❌ Error executing {name}: {str(e)}\n\nArguments: {json.dumps(arguments, indent=2)}"
-        )]
+@_call_tool_decorator
+async def call_tool(name: str, arguments: dict) -> list[TextContent]:
+    """Execute a marketing tool"""
+    return await registry.call(name, arguments)
 
 
 # ============================================================================
@@ -2320,7 +2770,41 @@ async def main():
         await app.run(read_stream, write_stream, app.create_initialization_options())
 
 
+def profile_startup(limit: int = 15):
+    """
+    Print where a cold server start spends its time.
+
+    Imports this module in a fresh interpreter with -X importtime and reports the
+    wall-clock import time plus self time grouped by top-level package, slowest first.
+    Usage: python mcp_server.py --profile-startup
+    """
+    import subprocess
+
+    code = "import time; start = time.perf_counter(); import mcp_server; print(time.perf_counter() - start)"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=Path(__file__).parent, capture_output=True, text=True, check=True
+    )
+
+    totals = {}
+    for line in result.stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Header or unrelated output
+        package = fields[2].strip().split(".")[0]
+        totals[package] = totals.get(package, 0) + int(fields[0])
+
+    print(f"Cold start: {float(result.stdout.strip()) * 1000:.0f} ms", file=sys.stderr)
+    print(f"{'package':<30} {'self ms':>10}", file=sys.stderr)
+    for package, micros in sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]:
+        print(f"{package:<30} {micros / 1000:>10.1f}", file=sys.stderr)
+
+
 if __name__ == "__main__":
+    if "--profile-startup" in sys.argv:
+        profile_startup()
+        sys.exit(0)
+
     print("🚀 Marketing Tools MCP Server starting...", file=sys.stderr)
     print(f"   Environment loaded from: {env_path}", file=sys.stderr)
     print(f"   OpenAI API Key: {'✓ Found' if os.getenv('OPENAI_API_KEY') else '✗ Missing'}", file=sys.stderr)
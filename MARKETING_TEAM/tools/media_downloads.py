@@ -0,0 +1,223 @@
+"""
+Streaming Media Downloads
+Writes generated videos (Sora /content, Veo file URIs) straight to disk.
+
+Instead of buffering a whole MP4 in memory (response.content / write_bytes):
+- Chunks stream into a hidden temp file next to the destination, which is renamed
+  into place atomically (os.replace), so a failed download never leaves a
+  half-written video under its final name
+- An optional SHA-256 is computed (and verified, when one is expected)
+- A dropped connection resumes from the bytes already on disk with a Range request
+- Every concurrent download shares one bounded in-memory chunk budget
+
+Configuration (MARKETING_TEAM/.env, all optional):
+- MARKETING_DOWNLOAD_CHUNK_KB: chunk size per read (default: 1024)
+- MARKETING_DOWNLOAD_BUFFER_MB: total chunk memory across concurrent downloads (default: 32)
+- MARKETING_DOWNLOAD_RETRIES: resume attempts after a dropped connection (default: 3)
+"""
+
+import asyncio
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+import httpx
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class DownloadError(Exception):
+    """A download failed, was truncated past its retries, or failed its checksum."""
+
+
+class ByteBudget:
+    """
+    Shared cap on chunk memory held by concurrent downloads.
+
+    Each download reserves one chunk for as long as it streams; downloads that
+    would exceed the cap wait for another to finish.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        self.peak = 0
+        self._cond: Optional[asyncio.Condition] = None
+        self._loop = None
+
+    def _condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._cond is None or self._loop is not loop:
+            self._cond = asyncio.Condition()
+            self._loop = loop
+        return self._cond
+
+    async def acquire(self, size: int) -> int:
+        """Reserve size bytes (clamped to the limit). Returns the amount reserved."""
+        size = min(size, self.limit)
+        cond = self._condition()
+        async with cond:
+            await cond.wait_for(lambda: self.in_use + size <= self.limit)
+            self.in_use += size
+            self.peak = max(self.peak, self.in_use)
+        return size
+
+    async def release(self, size: int):
+        cond = self._condition()
+        async with cond:
+            self.in_use -= size
+            cond.notify_all()
+
+
+@dataclass
+class DownloadResult:
+    path: Path
+    bytes: int
+    sha256: Optional[str] = None
+    resumes: int = 0
+
+
+download_budget = ByteBudget(_env_int("MARKETING_DOWNLOAD_BUFFER_MB", 32) * 1024 * 1024)
+
+_stats = {"completed": 0, "failed": 0, "bytes": 0, "resumes": 0}
+
+
+def stats() -> Dict[str, int]:
+    """Download counters plus current / peak chunk memory."""
+    return {
+        **_stats,
+        "buffer_in_use_bytes": download_budget.in_use,
+        "buffer_peak_bytes": download_budget.peak,
+        "buffer_limit_bytes": download_budget.limit,
+    }
+
+
+def _temp_path(destination: Path) -> Path:
+    return destination.with_name(f".{destination.name}.part")
+
+
+def _sha256_file(path: Path, chunk_size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _expected_total(response: httpx.Response, offset: int) -> Optional[int]:
+    """Full file size from Content-Range (206) or Content-Length (200), when sent."""
+    content_range = response.headers.get("content-range", "")
+    try:
+        if "/" in content_range:
+            return int(content_range.rsplit("/", 1)[1])
+        length = response.headers.get("content-length")
+        if length is not None:
+            return offset + int(length)
+    except ValueError:  # "bytes 0-99/*" or a malformed header: size unknown
+        pass
+    return None
+
+
+async def stream_download(
+    client: httpx.AsyncClient,
+    url: str,
+    destination,
+    headers: Optional[dict] = None,
+    checksum: bool = False,
+    expected_sha256: Optional[str] = None,
+    budget: Optional[ByteBudget] = None,
+    chunk_size: Optional[int] = None,
+    max_retries: Optional[int] = None
+) -> DownloadResult:
+    """
+    Stream url to destination via a temp file and atomic rename.
+
+    Args:
+        client: Pooled httpx.AsyncClient (e.g. ProviderClients.http("openai"))
+        url: File URL (redirects are followed)
+        destination: Final file path
+        headers: Request headers (auth)
+        checksum: Compute the SHA-256 of the finished file
+        expected_sha256: Fail (and discard the file) if the SHA-256 differs
+        budget: Shared chunk memory budget (default: module-wide download_budget)
+        chunk_size: Bytes per read (default: MARKETING_DOWNLOAD_CHUNK_KB)
+        max_retries: Range-resume attempts after a dropped connection
+
+    Returns:
+        DownloadResult with the final path, size, optional SHA-256 and resume count
+
+    Raises:
+        DownloadError: non-2xx response, retries exhausted, or checksum mismatch
+    """
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = _temp_path(destination)
+    temp_path.unlink(missing_ok=True)
+
+    budget = budget or download_budget
+    chunk_size = chunk_size or _env_int("MARKETING_DOWNLOAD_CHUNK_KB", 1024) * 1024
+    max_retries = _env_int("MARKETING_DOWNLOAD_RETRIES", 3) if max_retries is None else max_retries
+
+    reserved = await budget.acquire(chunk_size)
+    resumes = 0
+    try:
+        while True:
+            offset = temp_path.stat().st_size if temp_path.exists() else 0
+            request_headers = dict(headers or {})
+            if offset:
+                request_headers["Range"] = f"bytes={offset}-"
+
+            try:
+                async with client.stream("GET", url, headers=request_headers, follow_redirects=True) as response:
+                    if response.status_code == 206 and offset:
+                        mode = "ab"
+                    elif response.status_code == 200:
+                        mode, offset = "wb", 0  # Server ignored the Range header: start over
+                    else:
+                        await response.aread()
+                        raise DownloadError(f"Failed to download video: {response.status_code}")
+
+                    total = _expected_total(response, offset)
+                    with open(temp_path, mode) as f:
+                        async for chunk in response.aiter_bytes(reserved):
+                            f.write(chunk)
+
+                written = temp_path.stat().st_size
+                if total is not None and written < total:
+                    raise httpx.ReadError(f"Connection closed at {written} of {total} bytes")
+                break
+
+            except httpx.TransportError as e:
+                if resumes >= max_retries:
+                    raise DownloadError(f"Download interrupted after {resumes} resumes: {e}") from e
+                resumes += 1
+                await asyncio.sleep(min(2 ** (resumes - 1), 10) * 0.5)
+
+        digest = None
+        if checksum or expected_sha256:
+            digest = await asyncio.to_thread(_sha256_file, temp_path, reserved)
+            if expected_sha256 and digest != expected_sha256.lower():
+                raise DownloadError(f"Checksum mismatch for {destination.name}: expected {expected_sha256}, got {digest}")
+
+        size = temp_path.stat().st_size
+        os.replace(temp_path, destination)
+
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        _stats["failed"] += 1
+        raise
+    finally:
+        await budget.release(reserved)
+
+    _stats["completed"] += 1
+    _stats["bytes"] += size
+    _stats["resumes"] += resumes
+    return DownloadResult(path=destination, bytes=size, sha256=digest, resumes=resumes)
+
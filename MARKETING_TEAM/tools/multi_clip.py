@@ -0,0 +1,110 @@
+"""
+Multi-Clip Generation
+Runs the independent clips of a multi-clip video concurrently.
+
+generate_multi_clip_video used to generate its segments one after another, so a
+4-segment ad took four times the single-clip latency. Here every clip is submitted
+at once under a concurrency limit, and wall-clock time approaches that of the
+slowest clip:
+
+- each clip is retried on its own; clips that already finished are never regenerated
+- a clip already on disk from an earlier, partly failed run is reused as-is; callers
+  name clips with clip_key() of the generation request, so a clip is only reused when
+  its prompt, style, orientation, duration and reference are unchanged
+- progress is reported as each clip lands (on_progress callback)
+- the call returns as soon as the last clip lands, so stitching can start right away
+
+Configuration (MARKETING_TEAM/.env, optional):
+- MARKETING_MULTI_CLIP_CONCURRENCY: clips generated at once (default: 4)
+- MARKETING_MULTI_CLIP_ATTEMPTS: attempts per clip, including the first (default: 2)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def clip_key(request: Dict[str, Any]) -> str:
+    """Short stable hash of a clip's generation request, for use in its file name."""
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:10]
+
+
+@dataclass
+class ClipResult:
+    """Outcome of one clip."""
+    index: int
+    path: Path
+    status: str = "pending"   # generated | reused | failed
+    attempts: int = 0
+    error: Optional[str] = None
+    seconds: float = 0.0      # Wall-clock time spent on this clip
+
+    @property
+    def ok(self) -> bool:
+        return self.status in ("generated", "reused")
+
+
+async def generate_clips(
+    paths: List[Path],
+    generate: Callable[[int, Path], Awaitable[None]],
+    max_concurrent: Optional[int] = None,
+    max_attempts: Optional[int] = None,
+    on_progress: Optional[Callable[[int, int, ClipResult], None]] = None
+) -> List[ClipResult]:
+    """
+    Generate every clip concurrently.
+
+    Args:
+        paths: Output path of each clip, in segment order
+        generate: Coroutine producing clip i at paths[i]; raising (or leaving no file) fails the attempt
+        max_concurrent: Clips in flight at once (default: MARKETING_MULTI_CLIP_CONCURRENCY)
+        max_attempts: Attempts per clip (default: MARKETING_MULTI_CLIP_ATTEMPTS)
+        on_progress: Called as (finished_count, total, result) when each clip finishes
+
+    Returns:
+        One ClipResult per clip, in segment order (check .ok; failures carry .error)
+    """
+    max_concurrent = max(max_concurrent or _env_int("MARKETING_MULTI_CLIP_CONCURRENCY", 4), 1)
+    max_attempts = max(max_attempts or _env_int("MARKETING_MULTI_CLIP_ATTEMPTS", 2), 1)
+    semaphore = asyncio.Semaphore(max_concurrent)
+    results = [ClipResult(index=i, path=Path(path)) for i, path in enumerate(paths)]
+    finished = 0
+
+    async def run(result: ClipResult):
+        nonlocal finished
+        start = time.monotonic()
+        if result.path.exists() and result.path.stat().st_size > 0:
+            result.status = "reused"
+        else:
+            while result.attempts < max_attempts:
+                result.attempts += 1
+                try:
+                    async with semaphore:
+                        await generate(result.index, result.path)
+                    if not result.path.exists():
+                        raise RuntimeError("no video file was produced")
+                    result.status, result.error = "generated", None
+                    break
+                except Exception as e:
+                    result.status, result.error = "failed", str(e) or type(e).__name__
+        result.seconds = time.monotonic() - start
+
+        finished += 1
+        if on_progress is not None:
+            on_progress(finished, len(results), result)
+
+    await asyncio.gather(*(run(result) for result in results))
+    return results
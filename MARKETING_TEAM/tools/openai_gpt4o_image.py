@@ -10,6 +10,7 @@ import httpx
 import os
 from pathlib import Path
 from dotenv import load_dotenv
+from rate_limits import rate_limiter
 
 # Ensure environment variables (including OPENAI_API_KEY) are loaded before use
 BASE_DIR = Path(__file__).resolve().parents[1]
@@ -23,7 +24,8 @@ def _get_openai_client() -> AsyncOpenAI:
         raise RuntimeError(
             "OPENAI_API_KEY not found. Add it to MARKETING_TEAM/.env or export it before running."
         )
-    return AsyncOpenAI(api_key=api_key)
+    # SDK retries off: rate_limits decides what may be resent (never a timed-out create)
+    return AsyncOpenAI(api_key=api_key, max_retries=0)
 
 
 @tool(
@@ -69,8 +71,9 @@ async def generate_gpt4o_image(args):
     try:
         client = _get_openai_client()
 
-        # Call GPT-4o image generation
-        response = await client.images.generate(
+        # Call GPT-4o image generation (paced per model; only 429s are retried, a billed create is never resent)
+        response = await rate_limiter.submit(
+            "openai", "gpt-image-1", client.images.generate,
             model="gpt-image-1",  # GPT-4o image model
             prompt=prompt,
             size=size,
@@ -1,12 +1,44 @@
 """
 Perplexity Research Tool
 Comprehensive research capabilities using Perplexity API
+
+Requests go through one PerplexityClient per process:
+- pooled HTTP connections (httpx, async and sync) instead of a new connection per call
+- paced and retried by the shared "perplexity" rate limit (rate_limits.py)
+- successful responses cached in memory for a TTL, keyed on the whitespace-normalised
+  query, model, search recency and request options; identical queries already in
+  flight share one request (single_flight.py)
+- research_many runs a brief's related queries concurrently and merges their
+  citations (deduplicated by URL) into one numbered source list; research_many_sync
+  does the same on worker threads, for synchronous callers (safe inside a running
+  event loop, unlike asyncio.run)
+- research_stream consumes the server-sent event stream and yields content as it
+  arrives (citations come with the final result); the caller can stop once it has
+  enough, and the connection is closed right away
+
+Configuration (MARKETING_TEAM/.env, optional):
+- MARKETING_PERPLEXITY_CACHE_TTL: seconds a response is reused, 0 disables caching (default: 3600)
+- MARKETING_PERPLEXITY_CACHE_SIZE: responses kept in memory (default: 256)
 """
 
+import asyncio
+import hashlib
+import json
 import os
-import requests
-from typing import Optional, Dict, Any
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, AsyncIterator, List, Sequence, Tuple, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
 from dotenv import load_dotenv
+from image_cache import normalise_prompt
+from provider_clients import pool_limits
+from rate_limits import RateLimiter, rate_limiter
+from single_flight import SingleFlight
 
 # Load environment variables
 load_dotenv()
@@ -14,6 +46,525 @@ load_dotenv()
 # API Configuration
 PERPLEXITY_API_KEY = os.getenv('PERPLEXITY_API_KEY')
 API_URL = "https://api.perplexity.ai/chat/completions"
+TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+
+RESEARCH_SYSTEM_PROMPT = (
+    "You are a research assistant. Provide comprehensive, well-cited research "
+    "on the given topic. Include statistics, trends, and actionable insights. "
+    "Format your response clearly with sections, bullet points, and data."
+)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def build_payload(
+    query: str,
+    model: str,
+    max_tokens: int,
+    search_recency: str,
+    include_related_questions: bool,
+    system_prompt: str = RESEARCH_SYSTEM_PROMPT
+) -> Dict[str, Any]:
+    """Chat completions request body for a research query."""
+    return {
+        "model": model,
+        "messages": [
+            {
+                "role": "system",
+                "content": system_prompt
+            },
+            {
+                "role": "user",
+                "content": query
+            }
+        ],
+        "max_tokens": max_tokens,
+        "temperature": 0.2,  # Lower for factual accuracy
+        "top_p": 0.9,
+        "search_recency_filter": search_recency,
+        "return_related_questions": include_related_questions,
+        "return_images": False,
+        "stream": False,
+        "presence_penalty": 0,
+        "frequency_penalty": 1
+    }
+
+
+def cache_key(payload: Dict[str, Any]) -> str:
+    """Digest of a request: query whitespace is collapsed, every other option must match."""
+    normalised = dict(payload, messages=[
+        dict(message, content=normalise_prompt(message["content"])) for message in payload["messages"]
+    ])
+    return hashlib.sha256(json.dumps(normalised, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def parse_response(status_code: int, text: str, data: Optional[Dict[str, Any]], model: str) -> Dict[str, Any]:
+    """Turn an API response into the perplexity_research() result dict."""
+    if status_code == 200:
+        return {
+            "success": True,
+            "content": data['choices'][0]['message']['content'],
+            "citations": data.get('citations', []),
+            "related_questions": data.get('related_questions', []),
+            "usage": data.get('usage', {}),
+            "model": model
+        }
+
+    return {
+        "success": False,
+        "error": f"API request failed with status {status_code}",
+        "status_code": status_code,
+        "details": text,
+        "content": None
+    }
+
+
+def _failure(error: str, error_type: str) -> Dict[str, Any]:
+    return {"success": False, "error": error, "error_type": error_type, "content": None}
+
+
+class ResponseCache:
+    """In-memory LRU of successful research results with a time-to-live."""
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.ttl = _env_int("MARKETING_PERPLEXITY_CACHE_TTL", 3600) if ttl is None else ttl
+        self.max_entries = _env_int("MARKETING_PERPLEXITY_CACHE_SIZE", 256) if max_entries is None else max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+
+    def put(self, key: str, result: Dict[str, Any]):
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, dict(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "ttl_seconds": self.ttl}
+
+
+def normalise_citation(url: str) -> str:
+    """Dedupe key for a source URL: scheme/host case, www., fragments, tracking params and trailing / ignored."""
+    parts = urlsplit(url.strip())
+    if not parts.netloc:
+        return url.strip()
+    host = parts.netloc.lower()
+    host = host[4:] if host.startswith("www.") else host
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not k.lower().startswith("utm_")])
+    return urlunsplit(("https" if parts.scheme in ("http", "https") else parts.scheme, host, parts.path.rstrip("/"), query, ""))
+
+
+def merge_citations(results: Sequence[Dict[str, Any]]) -> Tuple[List[str], List[List[int]]]:
+    """
+    Merge citations across results, first occurrence wins.
+
+    Returns:
+        (merged citation URLs, per result: its citations' 1-based numbers in the merged list)
+    """
+    merged: List[str] = []
+    numbers: Dict[str, int] = {}
+    mapping: List[List[int]] = []
+    for result in results:
+        result_numbers = []
+        for citation in result.get("citations") or []:
+            key = normalise_citation(citation)
+            if key not in numbers:
+                merged.append(citation)
+                numbers[key] = len(merged)
+            result_numbers.append(numbers[key])
+        mapping.append(result_numbers)
+    return merged, mapping
+
+
+_CITATION_MARKER = re.compile(r"\[(\d+)\]")
+
+
+def renumber_citations(content: str, numbers: Sequence[int]) -> str:
+    """Rewrite an answer's [n] markers to its citations' numbers in the merged list (one pass)."""
+    def replace(match: "re.Match[str]") -> str:
+        n = int(match.group(1))
+        return f"[{numbers[n - 1]}]" if 1 <= n <= len(numbers) else match.group(0)
+    return _CITATION_MARKER.sub(replace, content)
+
+
+class PerplexityClient:
+    """Pooled, rate-limited, cached Perplexity chat completions client."""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        api_url: str = API_URL,
+        cache: Optional[ResponseCache] = None,
+        limiter: Optional[RateLimiter] = None,
+        transport: Optional[httpx.BaseTransport] = None,
+        async_transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.api_key = api_key
+        self.api_url = api_url
+        self.cache = cache or ResponseCache()
+        self.limiter = limiter or rate_limiter
+        self.single_flight = SingleFlight()
+        self._transport = transport
+        self._async_transport = async_transport
+        self._http: Optional[httpx.Client] = None
+        self._async_http: Optional[httpx.AsyncClient] = None
+        self._async_loop = None
+        self._closing: set = set()
+        self._lock = threading.Lock()
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.api_key or PERPLEXITY_API_KEY}",
+            "Content-Type": "application/json"
+        }
+
+    def http(self) -> httpx.Client:
+        """Shared blocking client (for the synchronous research tools)."""
+        with self._lock:
+            if self._http is None or self._http.is_closed:
+                self._http = httpx.Client(limits=pool_limits(), timeout=TIMEOUT, transport=self._transport)
+            return self._http
+
+    def async_http(self) -> httpx.AsyncClient:
+        """Shared async client; rebuilt (and the old one closed) when the running event loop changes."""
+        loop = asyncio.get_running_loop()
+        if self._async_http is None or self._async_http.is_closed or self._async_loop is not loop:
+            if self._async_http is not None and not self._async_http.is_closed:
+                self._close_stale(self._async_http, self._async_loop, loop)
+            self._async_http = httpx.AsyncClient(limits=pool_limits(), timeout=TIMEOUT, transport=self._async_transport)
+            self._async_loop = loop
+        return self._async_http
+
+    def _close_stale(self, stale: httpx.AsyncClient, old_loop, loop):
+        """Close a client bound to another event loop so its pooled sockets are released."""
+        async def close():
+            try:
+                await stale.aclose()
+            except Exception:  # Its loop is gone: the connections cannot be closed cleanly
+                pass
+
+        if old_loop is not None and old_loop.is_running():
+            asyncio.run_coroutine_threadsafe(close(), old_loop)
+        else:
+            task = loop.create_task(close())
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    def _prepare(self, query, model, max_tokens, search_recency, include_related_questions, system_prompt):
+        payload = build_payload(query, model, max_tokens, search_recency, include_related_questions, system_prompt)
+        return payload, cache_key(payload)
+
+    def _finish(self, key: str, response: httpx.Response, model: str) -> Dict[str, Any]:
+        data = response.json() if response.status_code == 200 else None
+        result = parse_response(response.status_code, response.text, data, model)
+        if result["success"]:
+            self.cache.put(key, result)
+        return dict(result, cached=False)
+
+    async def research(
+        self,
+        query: str,
+        model: str = "sonar-pro",
+        max_tokens: int = 4000,
+        search_recency: str = "month",
+        include_related_questions: bool = True,
+        system_prompt: str = RESEARCH_SYSTEM_PROMPT,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """Async perplexity_research(); the result also carries cached=True/False."""
+        if not (self.api_key or PERPLEXITY_API_KEY):
+            return _failure("PERPLEXITY_API_KEY not found in environment variables", "configuration")
+
+        payload, key = self._prepare(query, model, max_tokens, search_recency, include_related_questions, system_prompt)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return dict(cached, cached=True)
+
+        async def request():
+            try:
+                # Paced per model and retried on 429 / 5xx / connection errors (honours Retry-After)
+                response = await self.limiter.call(
+                    "perplexity", model, self.async_http().post, self.api_url, headers=self._headers(), json=payload
+                )
+            except httpx.TimeoutException:
+                return _failure("Request timed out after 60 seconds", "timeout")
+            except Exception as e:
+                return _failure(f"Unexpected error: {str(e)}", "unexpected")
+            return self._finish(key, response, model)
+
+        return dict(await self.single_flight.do(key, "perplexity_research", request))
+
+    def research_sync(
+        self,
+        query: str,
+        model: str = "sonar-pro",
+        max_tokens: int = 4000,
+        search_recency: str = "month",
+        include_related_questions: bool = True,
+        system_prompt: str = RESEARCH_SYSTEM_PROMPT,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """Blocking research() over the shared sync connection pool."""
+        if not (self.api_key or PERPLEXITY_API_KEY):
+            return _failure("PERPLEXITY_API_KEY not found in environment variables", "configuration")
+
+        payload, key = self._prepare(query, model, max_tokens, search_recency, include_related_questions, system_prompt)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return dict(cached, cached=True)
+
+        try:
+            # Paced per model and retried on 429 / 5xx / connection errors (honours Retry-After)
+            response = self.limiter.call_sync(
+                "perplexity", model, self.http().post, self.api_url, headers=self._headers(), json=payload
+            )
+        except httpx.TimeoutException:
+            return _failure("Request timed out after 60 seconds", "timeout")
+        except Exception as e:
+            return _failure(f"Unexpected error: {str(e)}", "unexpected")
+        return self._finish(key, response, model)
+
+    async def _open_stream(self, payload: Dict[str, Any]) -> httpx.Response:
+        """Send a streaming request; error responses are read and closed so retries can reuse the connection."""
+        http = self.async_http()
+        headers = dict(self._headers(), Accept="text/event-stream")
+        response = await http.send(http.build_request("POST", self.api_url, headers=headers, json=payload), stream=True)
+        if response.status_code != 200:
+            await response.aread()
+            await response.aclose()
+        return response
+
+    async def research_stream(
+        self,
+        query: str,
+        model: str = "sonar-pro",
+        max_tokens: int = 4000,
+        search_recency: str = "month",
+        include_related_questions: bool = True,
+        system_prompt: str = RESEARCH_SYSTEM_PROMPT,
+        use_cache: bool = True,
+        max_chars: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming research(): yields events while the report is generated.
+
+        Events:
+            {"type": "delta", "delta": "<new text>"}   as content arrives
+            {"type": "result", "result": {...}}        last, shaped like perplexity_research()
+                                                       plus partial=True when stopped early
+
+        Args:
+            max_chars: Stop reading (and close the stream) once this much content has
+                       arrived; the result is then partial and not cached
+            (other args as in perplexity_research)
+
+        Breaking out of the loop also closes the stream. Completed streams share the
+        response cache with research(), so a cached report is yielded as one delta.
+        """
+        if not (self.api_key or PERPLEXITY_API_KEY):
+            yield {"type": "result", "result": _failure("PERPLEXITY_API_KEY not found in environment variables", "configuration")}
+            return
+
+        payload, key = self._prepare(query, model, max_tokens, search_recency, include_related_questions, system_prompt)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield {"type": "delta", "delta": cached["content"]}
+                yield {"type": "result", "result": dict(cached, cached=True, partial=False)}
+                return
+
+        try:
+            # Only opening the stream is retried: once content has been yielded it can't be taken back
+            response = await self.limiter.call("perplexity", model, self._open_stream, dict(payload, stream=True))
+        except httpx.TimeoutException:
+            yield {"type": "result", "result": _failure("Request timed out after 60 seconds", "timeout")}
+            return
+        except Exception as e:
+            yield {"type": "result", "result": _failure(f"Unexpected error: {str(e)}", "unexpected")}
+            return
+
+        if response.status_code != 200:
+            yield {"type": "result", "result": dict(parse_response(response.status_code, response.text, None, model), cached=False)}
+            return
+
+        parts: List[str] = []
+        received = 0
+        last: Dict[str, Any] = {}    # Latest chunk: carries citations, related questions and usage
+        finished = stopped_early = False
+        error = None
+        try:
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    finished = True
+                    break
+                try:
+                    chunk = json.loads(data)
+                except ValueError:
+                    continue
+                last = chunk
+                choice = (chunk.get("choices") or [{}])[0]
+                delta = (choice.get("delta") or {}).get("content")
+                if delta:
+                    parts.append(delta)
+                    received += len(delta)
+                    yield {"type": "delta", "delta": delta}
+                if choice.get("finish_reason"):
+                    finished = True
+                elif max_chars is not None and received >= max_chars:
+                    stopped_early = True
+                    break
+            else:
+                finished = True
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            error = f"Stream interrupted: {str(e)}"
+        finally:
+            await response.aclose()
+
+        result = {
+            "success": error is None,
+            "content": "".join(parts),
+            "citations": last.get("citations", []),
+            "related_questions": last.get("related_questions", []),
+            "usage": last.get("usage", {}),
+            "model": model,
+            "cached": False,
+            "partial": not finished or stopped_early
+        }
+        if error is not None:
+            result.update(error=error, error_type="stream")
+        elif not result["partial"]:
+            self.cache.put(key, {name: value for name, value in result.items() if name not in ("cached", "partial")})
+        yield {"type": "result", "result": result}
+
+    async def research_many(
+        self,
+        queries: Sequence[Union[str, Dict[str, Any]]],
+        model: str = "sonar-pro",
+        max_tokens: int = 4000,
+        search_recency: str = "month",
+        include_related_questions: bool = True,
+        system_prompt: str = RESEARCH_SYSTEM_PROMPT,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Run related queries concurrently (under the "perplexity" rate limit) and merge them.
+
+        Args:
+            queries: Query strings, or dicts with 'query' and per-query overrides
+                     (model, max_tokens, search_recency, ...)
+            (remaining args are defaults for every query, as in perplexity_research)
+
+        Returns:
+            Dictionary containing:
+                - results: one perplexity_research() result per query, in order, each
+                  with citation_numbers mapping its [n] references into `citations`
+                - citations: merged sources, deduplicated by URL across all results
+                - related_questions: merged follow-up questions (deduplicated)
+                - usage: summed token usage of the results not served from cache
+                - succeeded / failed / cached: counts
+        """
+        defaults = dict(model=model, max_tokens=max_tokens, search_recency=search_recency,
+                        include_related_questions=include_related_questions,
+                        system_prompt=system_prompt, use_cache=use_cache)
+        specs = [dict(defaults, query=q) if isinstance(q, str) else dict(defaults, **q) for q in queries]
+
+        results = list(await asyncio.gather(*(self.research(**spec) for spec in specs)))
+        return self._brief(specs, results)
+
+    def research_many_sync(
+        self,
+        queries: Sequence[Union[str, Dict[str, Any]]],
+        model: str = "sonar-pro",
+        max_tokens: int = 4000,
+        search_recency: str = "month",
+        include_related_questions: bool = True,
+        system_prompt: str = RESEARCH_SYSTEM_PROMPT,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """Blocking research_many() over the shared sync pool (callable from inside an event loop)."""
+        defaults = dict(model=model, max_tokens=max_tokens, search_recency=search_recency,
+                        include_related_questions=include_related_questions,
+                        system_prompt=system_prompt, use_cache=use_cache)
+        specs = [dict(defaults, query=q) if isinstance(q, str) else dict(defaults, **q) for q in queries]
+
+        # Identical queries in one brief share a request, as single_flight does for research_many
+        keys = [self._prepare(spec["query"], spec["model"], spec["max_tokens"], spec["search_recency"],
+                              spec["include_related_questions"], spec["system_prompt"])[1] for spec in specs]
+        unique = {}
+        for key, spec in zip(keys, specs):
+            unique.setdefault(key, spec)
+        if not unique:
+            return self._brief(specs, [])
+        with ThreadPoolExecutor(max_workers=min(len(unique), 16), thread_name_prefix="perplexity") as pool:
+            done = dict(zip(unique, pool.map(lambda spec: self.research_sync(**spec), unique.values())))
+        return self._brief(specs, [dict(done[key]) for key in keys])
+
+    @staticmethod
+    def _brief(specs: List[Dict[str, Any]], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        citations, mapping = merge_citations(results)
+        related, seen = [], set()
+        usage: Dict[str, int] = {}
+        for spec, result, numbers in zip(specs, results, mapping):
+            result["query"] = spec["query"]
+            result["citation_numbers"] = numbers
+            for question in result.get("related_questions") or []:
+                if normalise_prompt(question).lower() not in seen:
+                    seen.add(normalise_prompt(question).lower())
+                    related.append(question)
+            if result.get("success") and not result.get("cached"):
+                for name, value in (result.get("usage") or {}).items():
+                    if isinstance(value, (int, float)):
+                        usage[name] = usage.get(name, 0) + value
+
+        return {
+            "results": results,
+            "citations": citations,
+            "related_questions": related,
+            "usage": usage,
+            "succeeded": sum(bool(r.get("success")) for r in results),
+            "failed": sum(not r.get("success") for r in results),
+            "cached": sum(bool(r.get("cached")) for r in results)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {"cache": self.cache.stats(), "single_flight": self.single_flight.stats()}
+
+    async def aclose(self):
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+        if self._async_http is not None:
+            await self._async_http.aclose()
+        if self._http is not None:
+            self._http.close()
+
+
+# Shared by every research tool in this process
+client = PerplexityClient()
 
 
 def perplexity_research(
@@ -47,6 +598,7 @@ def perplexity_research(
             - related_questions: Follow-up research questions (if enabled)
             - usage: Token usage stats
             - success: Whether the request succeeded
+            - cached: Whether the result was served from the response cache
 
     Example:
         result = perplexity_research(
@@ -58,83 +610,51 @@ def perplexity_research(
         print(result['content'])  # Research report
         print(result['citations'])  # Sources
     """
+    return client.research_sync(query, model, max_tokens, search_recency, include_related_questions)
 
-    if not PERPLEXITY_API_KEY:
-        return {
-            "success": False,
-            "error": "PERPLEXITY_API_KEY not found in environment variables",
-            "content": None
-        }
 
-    headers = {
-        "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
-        "Content-Type": "application/json"
-    }
-
-    payload = {
-        "model": model,
-        "messages": [
-            {
-                "role": "system",
-                "content": (
-                    "You are a research assistant. Provide comprehensive, well-cited research "
-                    "on the given topic. Include statistics, trends, and actionable insights. "
-                    "Format your response clearly with sections, bullet points, and data."
-                )
-            },
-            {
-                "role": "user",
-                "content": query
-            }
-        ],
-        "max_tokens": max_tokens,
-        "temperature": 0.2,  # Lower for factual accuracy
-        "top_p": 0.9,
-        "search_recency_filter": search_recency,
-        "return_related_questions": include_related_questions,
-        "return_images": False,
-        "stream": False,
-        "presence_penalty": 0,
-        "frequency_penalty": 1
-    }
+async def research_many(
+    queries: Sequence[Union[str, Dict[str, Any]]],
+    model: str = "sonar-pro",
+    search_recency: str = "month",
+    **options
+) -> Dict[str, Any]:
+    """
+    Research several related queries concurrently with merged citations
 
-    try:
-        response = requests.post(API_URL, headers=headers, json=payload, timeout=60)
-
-        if response.status_code == 200:
-            data = response.json()
-
-            result = {
-                "success": True,
-                "content": data['choices'][0]['message']['content'],
-                "citations": data.get('citations', []),
-                "related_questions": data.get('related_questions', []),
-                "usage": data.get('usage', {}),
-                "model": model
-            }
+    Example:
+        brief = asyncio.run(research_many([
+            "B2B SaaS content marketing benchmarks 2025",
+            "LinkedIn organic reach trends for B2B",
+            "Average webinar conversion rates B2B",
+        ]))
+
+        for result in brief['results']:
+            print(result['content'])
+        print(brief['citations'])  # One deduplicated source list
+    """
+    return await client.research_many(queries, model=model, search_recency=search_recency, **options)
 
-            return result
 
-        else:
-            return {
-                "success": False,
-                "error": f"API request failed with status {response.status_code}",
-                "details": response.text,
-                "content": None
-            }
+def research_stream(
+    query: str,
+    model: str = "sonar-pro",
+    search_recency: str = "month",
+    max_chars: Optional[int] = None,
+    **options
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream a research report as it is written (see PerplexityClient.research_stream)
 
-    except requests.exceptions.Timeout:
-        return {
-            "success": False,
-            "error": "Request timed out after 60 seconds",
-            "content": None
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": f"Unexpected error: {str(e)}",
-            "content": None
-        }
+    Example:
+        async def brief():
+            async for event in research_stream("Top B2B webinar formats in 2025", model="sonar-reasoning"):
+                if event["type"] == "delta":
+                    print(event["delta"], end="", flush=True)
+                else:
+                    print(format_research_output(event["result"]))
+    """
+    return client.research_stream(query, model=model, search_recency=search_recency, max_chars=max_chars, **options)
 
 
 def format_research_output(result: Dict[str, Any]) -> str:
@@ -142,25 +662,32 @@ def format_research_output(result: Dict[str, Any]) -> str:
     Format research results for display
 
     Args:
-        result: Dictionary from perplexity_research()
+        result: Dictionary from perplexity_research() or research_stream(); a partial
+                result (stream stopped early, interrupted, or still in progress) is
+                rendered with whatever content and citations it has so far
 
     Returns:
         Formatted string with research content and citations
     """
 
-    if not result.get('success'):
+    if not result.get('success') and not result.get('content'):
         return f"[ERROR] Research failed: {result.get('error', 'Unknown error')}"
 
     output = []
 
     # Research content
     output.append("="*60)
-    output.append("RESEARCH RESULTS")
+    output.append("RESEARCH RESULTS (PARTIAL)" if result.get('partial') else "RESEARCH RESULTS")
     output.append("="*60)
     output.append("")
     output.append(result['content'])
     output.append("")
 
+    if result.get('partial'):
+        reason = result.get('error') or "stopped before the report was complete"
+        output.append(f"[... {reason}]")
+        output.append("")
+
     # Citations
     if result.get('citations'):
         output.append("-"*60)
@@ -1,19 +1,44 @@
 """
 Perplexity Research Tool - Claude SDK Integration
 Comprehensive research capabilities for marketing agents
+
+All tools share perplexity_research.client (pooled connections, rate limit,
+response cache); multi_research runs a brief's related queries concurrently.
 """
 
-import os
-import requests
+from typing import List
+
 from anthropic import tool
 
-# Load environment variables
-from dotenv import load_dotenv
-load_dotenv()
+from perplexity_research import client, renumber_citations
+
+# System prompt optimized for marketing research
+MARKETING_SYSTEM_PROMPT = """You are a marketing research assistant.
+
+Provide comprehensive, well-structured research with:
+1. Executive summary (2-3 sentences)
+2. Key findings with data and statistics
+3. Detailed analysis organized into sections
+4. Actionable insights and recommendations
+5. Future trends and predictions
+
+Format guidelines:
+- Use clear section headers
+- Include specific numbers and percentages
+- Cite sources inline [1][2][3]
+- Use bullet points for clarity
+- Highlight key takeaways
+- Keep insights actionable for marketers"""
+
 
-# API Configuration
-PERPLEXITY_API_KEY = os.getenv('PERPLEXITY_API_KEY')
-API_URL = "https://api.perplexity.ai/chat/completions"
+def _error_message(result: dict) -> str:
+    if result.get("error_type") == "configuration":
+        return "[ERROR] PERPLEXITY_API_KEY not found in environment variables. Add to MARKETING_TEAM/.env file."
+    if result.get("error_type") == "timeout":
+        return "[ERROR] Research request timed out after 60 seconds. Try a more focused query or try again."
+    if "status_code" in result:
+        return f"[ERROR] Perplexity API request failed (Status {result['status_code']})\n\nDetails: {result['details']}"
+    return f"[ERROR] {result['error']}"
 
 
 @tool
@@ -65,100 +90,53 @@ def conduct_research(
         )
     """
 
-    if not PERPLEXITY_API_KEY:
-        return "[ERROR] PERPLEXITY_API_KEY not found in environment variables. Add to MARKETING_TEAM/.env file."
-
-    headers = {
-        "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
-        "Content-Type": "application/json"
-    }
-
-    # System prompt optimized for marketing research
-    system_prompt = """You are a marketing research assistant.
-
-Provide comprehensive, well-structured research with:
-1. Executive summary (2-3 sentences)
-2. Key findings with data and statistics
-3. Detailed analysis organized into sections
-4. Actionable insights and recommendations
-5. Future trends and predictions
-
-Format guidelines:
-- Use clear section headers
-- Include specific numbers and percentages
-- Cite sources inline [1][2][3]
-- Use bullet points for clarity
-- Highlight key takeaways
-- Keep insights actionable for marketers"""
-
-    payload = {
-        "model": model,
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": query}
-        ],
-        "max_tokens": 4000,
-        "temperature": 0.2,  # Lower for factual accuracy
-        "top_p": 0.9,
-        "search_recency_filter": search_recency,
-        "return_related_questions": True,
-        "return_images": False,
-        "stream": False,
-        "presence_penalty": 0,
-        "frequency_penalty": 1
-    }
-
-    try:
-        response = requests.post(API_URL, headers=headers, json=payload, timeout=60)
-
-        if response.status_code == 200:
-            data = response.json()
-
-            # Build formatted output
-            output = []
-
-            # Main research content
-            output.append("="*70)
-            output.append("PERPLEXITY RESEARCH REPORT")
-            output.append("="*70)
-            output.append("")
-            output.append(data['choices'][0]['message']['content'])
-            output.append("")
-
-            # Citations
-            if 'citations' in data and data['citations']:
-                output.append("-"*70)
-                output.append("SOURCES & CITATIONS:")
-                output.append("-"*70)
-                for i, citation in enumerate(data['citations'], 1):
-                    output.append(f"[{i}] {citation}")
-                output.append("")
-
-            # Related research questions
-            if 'related_questions' in data and data['related_questions']:
-                output.append("-"*70)
-                output.append("RECOMMENDED FOLLOW-UP RESEARCH:")
-                output.append("-"*70)
-                for q in data['related_questions']:
-                    output.append(f"  • {q}")
-                output.append("")
-
-            # Metadata
-            usage = data.get('usage', {})
-            output.append("-"*70)
-            output.append(f"Model: {model} | Tokens: {usage.get('total_tokens', 'N/A')} | Recency: {search_recency}")
-            output.append("="*70)
-
-            return "\n".join(output)
-
-        else:
-            return f"[ERROR] Perplexity API request failed (Status {response.status_code})\n\nDetails: {response.text}"
-
-    except requests.exceptions.Timeout:
-        return "[ERROR] Research request timed out after 60 seconds. Try a more focused query or try again."
+    result = client.research_sync(
+        query=query,
+        model=model,
+        search_recency=search_recency,
+        system_prompt=MARKETING_SYSTEM_PROMPT
+    )
 
-    except Exception as e:
-        return f"[ERROR] Unexpected error during research: {str(e)}"
+    if not result["success"]:
+        return _error_message(result)
+
+    # Build formatted output
+    output = []
+
+    # Main research content
+    output.append("="*70)
+    output.append("PERPLEXITY RESEARCH REPORT")
+    output.append("="*70)
+    output.append("")
+    output.append(result['content'])
+    output.append("")
+
+    # Citations
+    if result['citations']:
+        output.append("-"*70)
+        output.append("SOURCES & CITATIONS:")
+        output.append("-"*70)
+        for i, citation in enumerate(result['citations'], 1):
+            output.append(f"[{i}] {citation}")
+        output.append("")
+
+    # Related research questions
+    if result['related_questions']:
+        output.append("-"*70)
+        output.append("RECOMMENDED FOLLOW-UP RESEARCH:")
+        output.append("-"*70)
+        for q in result['related_questions']:
+            output.append(f"  • {q}")
+        output.append("")
+
+    # Metadata
+    usage = result['usage']
+    cached = " | Cached" if result.get('cached') else ""
+    output.append("-"*70)
+    output.append(f"Model: {model} | Tokens: {usage.get('total_tokens', 'N/A')} | Recency: {search_recency}{cached}")
+    output.append("="*70)
+
+    return "\n".join(output)
 
 
 @tool
@@ -224,6 +202,80 @@ def strategic_analysis(query: str) -> str:
     )
 
 
+@tool
+def multi_research(
+    queries: List[str],
+    model: str = "sonar-pro",
+    search_recency: str = "month"
+) -> str:
+    """
+    Research several related questions at once with one merged source list
+
+    Use this when a brief needs 3-15 related queries (e.g. market size, competitor
+    pricing, channel benchmarks). Queries run concurrently and sources are numbered
+    once across all answers, so the same article cited by two answers appears once.
+
+    Args:
+        queries: Related research questions (each specific and self-contained)
+        model: Perplexity model for every query ("sonar-pro", "sonar", "sonar-reasoning")
+        search_recency: How recent sources should be ("month", "week", "day", "year")
+
+    Returns:
+        One section per query (its [n] citations renumbered into the merged list),
+        followed by the merged sources and follow-up questions
+
+    Example:
+        result = multi_research([
+            "B2B SaaS content marketing benchmarks 2025",
+            "LinkedIn organic reach trends for B2B",
+            "Average webinar conversion rates for B2B SaaS"
+        ])
+    """
+    # Worker threads rather than asyncio.run: tools may be called from inside a running event loop
+    brief = client.research_many_sync(
+        queries, model=model, search_recency=search_recency, system_prompt=MARKETING_SYSTEM_PROMPT
+    )
+
+    output = []
+    output.append("="*70)
+    output.append(f"PERPLEXITY MULTI-QUERY RESEARCH ({brief['succeeded']}/{len(queries)} succeeded)")
+    output.append("="*70)
+
+    for i, result in enumerate(brief['results'], 1):
+        output.append("")
+        output.append("-"*70)
+        output.append(f"QUERY {i}: {result['query']}")
+        output.append("-"*70)
+        if not result['success']:
+            output.append(_error_message(result))
+            continue
+        output.append(renumber_citations(result['content'], result['citation_numbers']))
+
+    if brief['citations']:
+        output.append("")
+        output.append("-"*70)
+        output.append("SOURCES & CITATIONS (merged):")
+        output.append("-"*70)
+        for i, citation in enumerate(brief['citations'], 1):
+            output.append(f"[{i}] {citation}")
+
+    if brief['related_questions']:
+        output.append("")
+        output.append("-"*70)
+        output.append("RECOMMENDED FOLLOW-UP RESEARCH:")
+        output.append("-"*70)
+        for q in brief['related_questions']:
+            output.append(f"  • {q}")
+
+    output.append("")
+    output.append("-"*70)
+    output.append(f"Model: {model} | Tokens: {brief['usage'].get('total_tokens', 'N/A')} | "
+                  f"Recency: {search_recency} | Cached: {brief['cached']}")
+    output.append("="*70)
+
+    return "\n".join(output)
+
+
 # For testing
 if __name__ == "__main__":
     print("Testing Perplexity Research Tool...\n")
@@ -0,0 +1,271 @@
+"""
+Provider Client Registry
+Process-wide pooled clients for OpenAI (GPT-4o, Sora) and Google GenAI (Veo, Nano Banana).
+
+Every MCP tool handler asks this registry for its client instead of constructing
+a fresh AsyncOpenAI / httpx.AsyncClient / genai.Client per call, so TLS sessions
+and keep-alive connections are reused across the whole server session.
+
+The registry is owned by the MCP server lifecycle (see mcp_server.server_lifespan),
+which closes every pool on shutdown.
+
+Pool configuration (MARKETING_TEAM/.env, all optional):
+- MARKETING_HTTP_MAX_CONNECTIONS: max open connections per provider (default: 20)
+- MARKETING_HTTP_MAX_KEEPALIVE: idle keep-alive connections per provider (default: 10)
+- MARKETING_HTTP_KEEPALIVE_EXPIRY: seconds an idle connection is kept (default: 60)
+- MARKETING_HTTP2: "1" to negotiate HTTP/2 when the h2 package is installed (default: "1")
+- MARKETING_BLOCKING_WORKERS: threads for blocking SDK calls, e.g. google-genai (default: 8)
+- MARKETING_OPENAI_CONCURRENCY / MARKETING_GEMINI_CONCURRENCY: concurrent generation
+  calls per provider during batch fan-out (default: 4)
+
+Observability:
+    registry.stats() -> {"openai": {"requests": 12, "new_connections": 1, "pool_hits": 11, ...}}
+"""
+
+import os
+import asyncio
+import functools
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+import httpx
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def pool_limits() -> httpx.Limits:
+    """Build connection pool limits from environment configuration."""
+    return httpx.Limits(
+        max_connections=_env_int("MARKETING_HTTP_MAX_CONNECTIONS", 20),
+        max_keepalive_connections=_env_int("MARKETING_HTTP_MAX_KEEPALIVE", 10),
+        keepalive_expiry=_env_float("MARKETING_HTTP_KEEPALIVE_EXPIRY", 60.0),
+    )
+
+
+def http2_enabled() -> bool:
+    """HTTP/2 is used when requested and the optional h2 package is installed."""
+    if os.getenv("MARKETING_HTTP2", "1").lower() in ("0", "false", "no"):
+        return False
+    return importlib.util.find_spec("h2") is not None
+
+
+# Default timeouts per provider (individual calls may still override)
+PROVIDER_TIMEOUTS = {
+    "openai": httpx.Timeout(300.0, connect=10.0),   # Sora create/poll/download
+    "gemini": httpx.Timeout(300.0, connect=10.0),   # Veo / Nano Banana
+}
+
+
+class ProviderStats:
+    """Counters for one provider's connection pool."""
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.clients_created = 0
+        self.client_reuses = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "pool_hits": max(self.requests - self.new_connections, 0),
+            "clients_created": self.clients_created,
+            "client_reuses": self.client_reuses,
+        }
+
+
+class ProviderClients:
+    """
+    Lazily-built, shared clients keyed by provider.
+
+    - http(provider): pooled httpx.AsyncClient (raw REST calls, e.g. Sora /v1/videos)
+    - openai(api_key): AsyncOpenAI bound to the shared "openai" pool
+    - genai(api_key): google-genai Client bound to a shared sync "gemini" pool
+    - run_blocking(func, ...): await a blocking SDK call on a bounded thread pool
+    - limit(provider): semaphore capping concurrent generation calls per provider
+    """
+
+    def __init__(self, limits: Optional[httpx.Limits] = None, http2: Optional[bool] = None):
+        self._limits = limits
+        self._http2 = http2
+        self._http: Dict[str, httpx.AsyncClient] = {}
+        self._sync_http: Dict[str, httpx.Client] = {}
+        self._openai: Dict[str, object] = {}
+        self._genai: Dict[str, object] = {}
+        self._stats: Dict[str, ProviderStats] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._limits_by_provider: Dict[str, tuple] = {}
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def _stat(self, provider: str) -> ProviderStats:
+        if provider not in self._stats:
+            self._stats[provider] = ProviderStats()
+        return self._stats[provider]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Snapshot of pool counters per provider."""
+        return {provider: stat.as_dict() for provider, stat in sorted(self._stats.items())}
+
+    def _async_hooks(self, provider: str) -> dict:
+        stat = self._stat(provider)
+
+        async def on_connection_event(event_name, info):
+            if event_name == "connection.connect_tcp.complete":
+                stat.new_connections += 1
+
+        async def on_request(request: httpx.Request):
+            stat.requests += 1
+            request.extensions["trace"] = on_connection_event
+
+        return {"request": [on_request]}
+
+    def _sync_hooks(self, provider: str) -> dict:
+        stat = self._stat(provider)
+
+        def on_connection_event(event_name, info):
+            if event_name == "connection.connect_tcp.complete":
+                stat.new_connections += 1
+
+        def on_request(request: httpx.Request):
+            stat.requests += 1
+            request.extensions["trace"] = on_connection_event
+
+        return {"request": [on_request]}
+
+    # ------------------------------------------------------------------
+    # Clients
+    # ------------------------------------------------------------------
+
+    def http(self, provider: str) -> httpx.AsyncClient:
+        """Shared async HTTP client for a provider (created on first use)."""
+        client = self._http.get(provider)
+        if client is not None and not client.is_closed:
+            self._stat(provider).client_reuses += 1
+            return client
+
+        client = httpx.AsyncClient(
+            limits=self._limits or pool_limits(),
+            http2=http2_enabled() if self._http2 is None else self._http2,
+            timeout=PROVIDER_TIMEOUTS.get(provider, httpx.Timeout(60.0, connect=10.0)),
+            event_hooks=self._async_hooks(provider),
+        )
+        self._http[provider] = client
+        self._stat(provider).clients_created += 1
+        return client
+
+    def sync_http(self, provider: str) -> httpx.Client:
+        """Shared sync HTTP client (for SDKs without an async transport, e.g. google-genai)."""
+        client = self._sync_http.get(provider)
+        if client is not None and not client.is_closed:
+            return client
+
+        client = httpx.Client(
+            limits=self._limits or pool_limits(),
+            http2=http2_enabled() if self._http2 is None else self._http2,
+            timeout=PROVIDER_TIMEOUTS.get(provider, httpx.Timeout(60.0, connect=10.0)),
+            event_hooks=self._sync_hooks(provider),
+        )
+        self._sync_http[provider] = client
+        return client
+
+    def openai(self, api_key: str):
+        """AsyncOpenAI client sharing the "openai" connection pool."""
+        client = self._openai.get(api_key)
+        if client is not None:
+            self._stat("openai").client_reuses += 1
+            return client
+
+        from openai import AsyncOpenAI
+        # SDK retries off: rate_limits decides what may be resent (never a timed-out create)
+        client = AsyncOpenAI(api_key=api_key, http_client=self.http("openai"), max_retries=0)
+        self._openai[api_key] = client
+        return client
+
+    def genai(self, api_key: str):
+        """google-genai Client sharing the "gemini" connection pool."""
+        client = self._genai.get(api_key)
+        if client is not None:
+            self._stat("gemini").client_reuses += 1
+            return client
+
+        from google import genai
+        from google.genai import types
+
+        http_options = None
+        # httpx_client injection is only available in newer google-genai releases
+        if "httpx_client" in getattr(types.HttpOptions, "model_fields", {}):
+            http_options = types.HttpOptions(httpx_client=self.sync_http("gemini"))
+
+        client = genai.Client(api_key=api_key, http_options=http_options)
+        self._genai[api_key] = client
+        self._stat("gemini").clients_created += 1
+        return client
+
+    def run_blocking(self, func, *args, **kwargs):
+        """
+        Run a blocking SDK call off the event loop.
+
+        The synchronous google-genai surface (generate_content, generate_videos,
+        operations.get, files.download, Video.save) would otherwise stall every
+        concurrent MCP request. Calls share one bounded executor so a burst of
+        jobs cannot spawn unbounded threads.
+
+        Returns:
+            Awaitable resolving to func's return value
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=_env_int("MARKETING_BLOCKING_WORKERS", 8),
+                thread_name_prefix="provider-call"
+            )
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    def limit(self, provider: str) -> asyncio.Semaphore:
+        """
+        Shared cap on concurrent generation calls to a provider.
+
+        Sized by MARKETING_<PROVIDER>_CONCURRENCY (default: 4). A new semaphore is
+        created when the running event loop changes.
+        """
+        loop = asyncio.get_running_loop()
+        bound_loop, semaphore = self._limits_by_provider.get(provider, (None, None))
+        if bound_loop is not loop:
+            semaphore = asyncio.Semaphore(max(_env_int(f"MARKETING_{provider.upper()}_CONCURRENCY", 4), 1))
+            self._limits_by_provider[provider] = (loop, semaphore)
+        return semaphore
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def aclose(self):
+        """Close every pooled connection (called on MCP server shutdown)."""
+        for client in self._http.values():
+            await client.aclose()
+        for client in self._sync_http.values():
+            client.close()
+        self._http.clear()
+        self._sync_http.clear()
+        self._openai.clear()
+        self._genai.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,352 @@
+"""
+Provider Rate Limits
+Client-side pacing and retries for OpenAI, Gemini and Perplexity calls.
+
+Each provider (optionally narrowed to a model) gets:
+- a token bucket (requests per minute, small burst) that paces calls before they
+  leave the process, instead of discovering the limit through 429s
+- a cap on concurrent in-flight requests
+- retries on 429 / 408 / 5xx and transient connection errors, with exponential
+  backoff and full jitter; a Retry-After header wins when it asks for longer
+- a shared pause: after a 429 every caller of that provider/model waits out the
+  Retry-After window, so parallel batches do not keep hammering the API
+
+Usage:
+    response = await rate_limiter.call("openai", "gpt-4o", client.chat.completions.create, **kwargs)
+    response = rate_limiter.call_sync("perplexity", "sonar-pro", requests.post, url, json=payload)
+
+Billed, non-idempotent create requests (image / video generation) use submit() instead:
+a timeout or 5xx there may mean the provider already accepted (and charged for) the
+job, so only 429s and failures to connect, which never reach the provider, are retried:
+    job = await rate_limiter.submit("openai", "sora-2", http_client.post, url, json=payload)
+
+A call may raise (SDK errors) or return a response object with a status_code
+(httpx / requests); both are classified the same way. When retries run out the
+last exception is re-raised, or the last response returned for the caller to handle.
+
+Configuration (MARKETING_TEAM/.env, all optional):
+- MARKETING_RATE_LIMITS: overrides as "key=rpm/concurrency" pairs, comma separated,
+  e.g. "openai:gpt-image-1=20/2,perplexity=30/2" (key is provider or provider:model)
+- MARKETING_RETRY_MAX: retries per call (default: 4)
+- MARKETING_RETRY_BASE_SECONDS: first backoff step (default: 1)
+- MARKETING_RETRY_MAX_SECONDS: backoff cap, also the longest Retry-After honoured (default: 60)
+
+Observability:
+    rate_limiter.stats() -> {"openai:gpt-image-1": {"requests": 12, "throttle_wait_seconds": 3.2, ...}}
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from video_jobs import parse_retry_after
+
+
+# (requests per minute, concurrent requests); "provider:model" entries take
+# precedence over the provider-wide default
+DEFAULT_LIMITS: Dict[str, Tuple[int, int]] = {
+    "openai": (500, 16),
+    "openai:gpt-image-1": (50, 8),
+    "openai:sora-2": (30, 4),
+    "gemini": (60, 8),
+    "gemini:gemini-2.5-flash-image": (60, 8),
+    "gemini:veo-3.1-generate-preview": (10, 4),
+    "perplexity": (50, 4),
+}
+
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+# Exception class names (anywhere in the MRO) treated as transient network failures:
+# openai, httpx, requests and builtin variants
+TRANSIENT_ERRORS = frozenset({
+    "APIConnectionError", "APITimeoutError", "TransportError", "TimeoutException",
+    "ConnectionError", "Timeout", "TimeoutError",
+})
+
+# Failures before the request was sent (connect phase, pool wait), safe to retry even
+# for create calls; the exception or anything in its cause chain may carry them
+CONNECT_ERRORS = frozenset({
+    "ConnectError", "ConnectTimeout", "PoolTimeout", "NewConnectionError",
+    "ConnectionRefusedError", "gaierror",
+})
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _parse_overrides(value: str) -> Dict[str, Tuple[int, int]]:
+    """Parse MARKETING_RATE_LIMITS ("key=rpm/concurrency,..."); malformed pairs are skipped."""
+    overrides = {}
+    for pair in filter(None, (part.strip() for part in value.split(","))):
+        try:
+            key, limits = pair.split("=", 1)
+            rpm, _, concurrency = limits.partition("/")
+            default_concurrency = DEFAULT_LIMITS.get(key.strip(), (0, 4))[1]
+            overrides[key.strip()] = (int(rpm), int(concurrency) if concurrency else default_concurrency)
+        except ValueError:
+            continue
+    return overrides
+
+
+def classify(outcome: Any) -> Tuple[bool, Optional[int], Optional[float]]:
+    """
+    Decide whether a call outcome (exception or response) should be retried.
+
+    Returns:
+        (retryable, HTTP status or None, Retry-After seconds or None)
+    """
+    if isinstance(outcome, BaseException):
+        # openai: status_code, google-genai: code, requests/httpx: response.status_code
+        response = getattr(outcome, "response", None)
+        status = getattr(response, "status_code", None)
+        for attr in ("status_code", "code", "status"):
+            value = getattr(outcome, attr, None)
+            if isinstance(value, int):
+                status = value
+                break
+    else:
+        response = outcome
+        status = getattr(outcome, "status_code", None)
+    headers = getattr(response, "headers", None)
+
+    retry_after = None
+    if headers is not None and hasattr(headers, "get"):
+        retry_after = parse_retry_after(headers.get("retry-after"))
+
+    if status is not None:
+        return status in RETRY_STATUSES, status, retry_after
+    if isinstance(outcome, BaseException):
+        transient = any(cls.__name__ in TRANSIENT_ERRORS for cls in type(outcome).__mro__)
+        return transient, None, None
+    return False, None, None
+
+
+def never_sent(outcome: Any) -> bool:
+    """True when outcome is an exception raised before the request reached the provider."""
+    seen = set()
+    while isinstance(outcome, BaseException) and id(outcome) not in seen:
+        seen.add(id(outcome))
+        if any(cls.__name__ in CONNECT_ERRORS for cls in type(outcome).__mro__):
+            return True
+        outcome = outcome.__cause__ or outcome.__context__
+    return False
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. reserve() takes a token immediately and returns how
+    long the caller must wait before using it, so async and sync callers share it.
+    """
+
+    def __init__(self, requests_per_minute: float, burst: Optional[int] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = max(requests_per_minute, 1) / 60.0
+        # Default burst: 10 seconds of traffic, but at least a handful for low-RPM models
+        self.capacity = burst or max(min(int(requests_per_minute), 5), int(requests_per_minute // 6), 1)
+        self._clock = clock
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    def pause(self, seconds: float):
+        """Hold every caller back for seconds (e.g. a provider's Retry-After)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+
+class ProviderLimit:
+    """Bucket, concurrency cap and counters for one provider or provider:model."""
+
+    def __init__(self, key: str, requests_per_minute: int, max_concurrent: int):
+        self.key = key
+        self.requests_per_minute = requests_per_minute
+        self.max_concurrent = max(max_concurrent, 1)
+        self.bucket = TokenBucket(requests_per_minute)
+        self._async_slots: Optional[asyncio.Semaphore] = None
+        self._loop = None
+        self.thread_slots = threading.BoundedSemaphore(self.max_concurrent)
+        self.requests = 0
+        self.throttled = 0
+        self.throttle_wait_seconds = 0.0
+        self.retries = 0
+        self.rate_limited = 0
+        self.server_errors = 0
+        self.gave_up = 0
+
+    def slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._async_slots is None or self._loop is not loop:
+            self._async_slots = asyncio.Semaphore(self.max_concurrent)
+            self._loop = loop
+        return self._async_slots
+
+    def record_wait(self, seconds: float):
+        if seconds > 0:
+            self.throttled += 1
+            self.throttle_wait_seconds += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests_per_minute": self.requests_per_minute,
+            "max_concurrent": self.max_concurrent,
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "throttle_wait_seconds": round(self.throttle_wait_seconds, 3),
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "server_errors": self.server_errors,
+            "gave_up": self.gave_up,
+        }
+
+
+class RateLimiter:
+    """Per provider/model limits plus jittered retries for provider calls."""
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Tuple[int, int]]] = None,
+        max_retries: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None
+    ):
+        self._config = dict(DEFAULT_LIMITS)
+        self._config.update(_parse_overrides(os.getenv("MARKETING_RATE_LIMITS", "")))
+        self._config.update(limits or {})
+        self.max_retries = _env_int("MARKETING_RETRY_MAX", 4) if max_retries is None else max_retries
+        self.base_delay = _env_float("MARKETING_RETRY_BASE_SECONDS", 1.0) if base_delay is None else base_delay
+        self.max_delay = _env_float("MARKETING_RETRY_MAX_SECONDS", 60.0) if max_delay is None else max_delay
+        self._limits: Dict[str, ProviderLimit] = {}
+        self._lock = threading.Lock()
+
+    def limit_for(self, provider: str, model: Optional[str] = None) -> ProviderLimit:
+        """The ProviderLimit for provider:model, falling back to the provider default."""
+        key = f"{provider}:{model}" if model and f"{provider}:{model}" in self._config else provider
+        with self._lock:
+            if key not in self._limits:
+                rpm, concurrency = self._config.get(key, (60, 4))
+                self._limits[key] = ProviderLimit(key, rpm, concurrency)
+            return self._limits[key]
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential delay; a longer Retry-After (capped at max_delay) wins."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    def _should_retry(self, limit: ProviderLimit, outcome: Any, attempt: int, idempotent: bool = True) -> Optional[float]:
+        """Count the outcome; return the delay before retrying, or None to stop."""
+        retryable, status, retry_after = classify(outcome)
+        if not idempotent:
+            retryable = status == 429 or never_sent(outcome)
+        if status == 429:
+            limit.rate_limited += 1
+        elif status is not None and status >= 500:
+            limit.server_errors += 1
+
+        if not retryable:
+            return None
+        if attempt >= self.max_retries:
+            limit.gave_up += 1
+            return None
+
+        delay = self.backoff(attempt, retry_after)
+        if status == 429:
+            limit.bucket.pause(delay)
+        limit.retries += 1
+        return delay
+
+    async def call(self, provider: str, model: Optional[str], func: Callable, /, *args, **kwargs):
+        """Await func(*args, **kwargs) under the provider/model limit, retrying transient failures."""
+        return await self._call(provider, model, func, True, args, kwargs)
+
+    async def submit(self, provider: str, model: Optional[str], func: Callable, /, *args, **kwargs):
+        """Like call(), for billed creates: only 429s and requests that never left are retried."""
+        return await self._call(provider, model, func, False, args, kwargs)
+
+    def call_sync(self, provider: str, model: Optional[str], func: Callable, /, *args, **kwargs):
+        """Blocking variant of call() for synchronous clients (e.g. requests)."""
+        return self._call_sync(provider, model, func, True, args, kwargs)
+
+    def submit_sync(self, provider: str, model: Optional[str], func: Callable, /, *args, **kwargs):
+        """Blocking variant of submit()."""
+        return self._call_sync(provider, model, func, False, args, kwargs)
+
+    async def _call(self, provider, model, func, idempotent, args, kwargs):
+        limit = self.limit_for(provider, model)
+        attempt = 0
+        while True:
+            wait = limit.bucket.reserve()
+            limit.record_wait(wait)
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            limit.requests += 1
+            try:
+                async with limit.slots():
+                    outcome = await func(*args, **kwargs)
+            except Exception as e:
+                delay = self._should_retry(limit, e, attempt, idempotent)
+                if delay is None:
+                    raise
+            else:
+                delay = self._should_retry(limit, outcome, attempt, idempotent)
+                if delay is None:
+                    return outcome
+
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def _call_sync(self, provider, model, func, idempotent, args, kwargs):
+        limit = self.limit_for(provider, model)
+        attempt = 0
+        while True:
+            wait = limit.bucket.reserve()
+            limit.record_wait(wait)
+            if wait > 0:
+                time.sleep(wait)
+
+            limit.requests += 1
+            try:
+                with limit.thread_slots:
+                    outcome = func(*args, **kwargs)
+            except Exception as e:
+                delay = self._should_retry(limit, e, attempt, idempotent)
+                if delay is None:
+                    raise
+            else:
+                delay = self._should_retry(limit, outcome, attempt, idempotent)
+                if delay is None:
+                    return outcome
+
+            attempt += 1
+            time.sleep(delay)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {key: limit.stats() for key, limit in sorted(self._limits.items())}
+
+
+rate_limiter = RateLimiter()
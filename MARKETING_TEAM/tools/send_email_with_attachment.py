@@ -4,17 +4,32 @@ Send Gmail with attachment using Google Workspace API
 PURE UTILITY - No hardcoded content. Always called by gmail-agent with explicit parameters.
 
 Supports branded HTML email templates (plain, branded_light, branded_dark, professional).
+
+Bulk mail-merge (send_bulk) sends one deliverable to many recipients:
+- the Gmail service is authenticated once per process and reused
+- {{field}} placeholders in subject, body and CTA are filled per recipient
+- a shared attachment is read and base64-encoded once, not once per recipient
+- messages go out as Gmail batch requests, a few batches in flight at once, with
+  rate-limited recipients retried and a status reported for every recipient
+
+Configuration (MARKETING_TEAM/.env, optional):
+- MARKETING_GMAIL_BATCH_SIZE: messages per Gmail batch request, max 100 (default: 50)
+- MARKETING_GMAIL_CONCURRENCY: batch requests in flight at once (default: 2)
+- MARKETING_GMAIL_RETRIES: retry rounds for rate-limited or failed recipients (default: 3)
 """
 import os
 import base64
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from typing import Callable, Dict, List, Optional, Sequence, Union
 from email_template_renderer import render_email_html, get_default_template
 
 SCOPES = [
@@ -23,32 +38,125 @@ SCOPES = [
     'https://mail.google.com/'
 ]
 
+# Gmail rejects batch requests with more than 100 calls
+MAX_BATCH_SIZE = 100
+
+MERGE_FIELD = re.compile(r'{{\s*(\w+)\s*}}')
+# Error prefix for sends that failed after the request may have reached Gmail (not resent)
+UNKNOWN_DELIVERY = 'delivery unknown, not resent (check Sent before retrying)'
+
+_lock = threading.Lock()
+_creds = None
+_service = None
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def get_credentials():
+    """Return valid Gmail OAuth credentials (loaded once per process, refreshed when expired)"""
+    global _creds
+    from google.auth.transport.requests import Request
+
+    with _lock:
+        creds = _creds
+        token_path = os.path.join(os.path.dirname(__file__), '..', 'token.pickle')
+        creds_path = os.path.join(os.path.dirname(__file__), '..', 'credentials.json')
+
+        # Load existing credentials
+        if creds is None and os.path.exists(token_path):
+            import pickle
+            with open(token_path, 'rb') as token:
+                creds = pickle.load(token)
+
+        # Refresh or get new credentials
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                creds.refresh(Request())
+            else:
+                from google_auth_oauthlib.flow import InstalledAppFlow
+                flow = InstalledAppFlow.from_client_secrets_file(creds_path, SCOPES)
+                creds = flow.run_local_server(port=0)
+
+            # Save credentials
+            import pickle
+            with open(token_path, 'wb') as token:
+                pickle.dump(creds, token)
+
+        _creds = creds
+        return creds
+
+
 def get_gmail_service():
-    """Authenticate and return Gmail service"""
-    creds = None
-    token_path = os.path.join(os.path.dirname(__file__), '..', 'token.pickle')
-    creds_path = os.path.join(os.path.dirname(__file__), '..', 'credentials.json')
-
-    # Load existing credentials
-    if os.path.exists(token_path):
-        import pickle
-        with open(token_path, 'rb') as token:
-            creds = pickle.load(token)
-
-    # Refresh or get new credentials
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(creds_path, SCOPES)
-            creds = flow.run_local_server(port=0)
-
-        # Save credentials
-        import pickle
-        with open(token_path, 'wb') as token:
-            pickle.dump(creds, token)
-
-    return build('gmail', 'v1', credentials=creds)
+    """Authenticate and return Gmail service (built once per process)"""
+    global _service
+    creds = get_credentials()
+    with _lock:
+        if _service is None:
+            from googleapiclient.discovery import build
+            # The service refreshes these same credentials in place when they expire
+            _service = build('gmail', 'v1', credentials=creds, cache_discovery=False)
+        return _service
+
+
+def _new_http():
+    """Authorized transport for one worker thread (httplib2 connections aren't thread-safe)"""
+    import google_auth_httplib2
+    import httplib2
+    return google_auth_httplib2.AuthorizedHttp(get_credentials(), http=httplib2.Http(timeout=60))
+
+
+def _join_addresses(addresses):
+    return ', '.join(addresses) if isinstance(addresses, list) else addresses
+
+
+def _attachment_part(attachment_path):
+    """Read and base64-encode an attachment into a MIME part (reusable across messages)"""
+    filename = os.path.basename(attachment_path)
+    with open(attachment_path, 'rb') as f:
+        part = MIMEBase('application', 'octet-stream')
+        part.set_payload(f.read())
+
+    encoders.encode_base64(part)
+    part.add_header('Content-Disposition', f'attachment; filename="{filename}"')
+    return part
+
+
+def _build_raw_message(to_email, subject, body, html_email, cc=None, bcc=None, attachment=None):
+    """Assemble the MIME message and return it base64url-encoded for messages.send"""
+    # Create message container with mixed content (body + attachments)
+    message = MIMEMultipart('mixed')
+    message['to'] = to_email
+    message['subject'] = subject
+
+    # Add CC / BCC if provided
+    if cc:
+        message['cc'] = _join_addresses(cc)
+    if bcc:
+        message['bcc'] = _join_addresses(bcc)
+
+    # Create alternative part (for email clients to choose HTML or plaintext)
+    msg_alternative = MIMEMultipart('alternative')
+
+    # Attach plaintext version first (lower priority)
+    msg_alternative.attach(MIMEText(body, 'plain', 'utf-8'))
+
+    # Attach HTML version second (higher priority - email clients will show this)
+    msg_alternative.attach(MIMEText(html_email, 'html', 'utf-8'))
+
+    # Attach the alternative part to the main message
+    message.attach(msg_alternative)
+
+    # Add attachment (already encoded, so shared parts are only serialized here)
+    if attachment is not None:
+        message.attach(attachment)
+
+    return base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+
 
 def send_email_with_attachment(to_email, subject, body, attachment_path, cc=None, bcc=None, template='branded_light', cta_text=None, cta_link=None):
     """Send email with attachment using branded HTML templates
@@ -89,25 +197,6 @@ def send_email_with_attachment(to_email, subject, body, attachment_path, cc=None
 
     service = get_gmail_service()
 
-    # Create message container with mixed content (body + attachments)
-    message = MIMEMultipart('mixed')
-    message['to'] = to_email
-    message['subject'] = subject
-
-    # Add CC if provided
-    if cc:
-        if isinstance(cc, list):
-            message['cc'] = ', '.join(cc)
-        else:
-            message['cc'] = cc
-
-    # Add BCC if provided
-    if bcc:
-        if isinstance(bcc, list):
-            message['bcc'] = ', '.join(bcc)
-        else:
-            message['bcc'] = bcc
-
     # Render HTML email using branded template
     html_email = render_email_html(
         body=body,
@@ -116,30 +205,11 @@ def send_email_with_attachment(to_email, subject, body, attachment_path, cc=None
         cta_link=cta_link
     )
 
-    # Create alternative part (for email clients to choose HTML or plaintext)
-    msg_alternative = MIMEMultipart('alternative')
-
-    # Attach plaintext version first (lower priority)
-    msg_alternative.attach(MIMEText(body, 'plain', 'utf-8'))
-
-    # Attach HTML version second (higher priority - email clients will show this)
-    msg_alternative.attach(MIMEText(html_email, 'html', 'utf-8'))
-
-    # Attach the alternative part to the main message
-    message.attach(msg_alternative)
-
-    # Add attachment
-    filename = os.path.basename(attachment_path)
-    with open(attachment_path, 'rb') as f:
-        part = MIMEBase('application', 'octet-stream')
-        part.set_payload(f.read())
-
-    encoders.encode_base64(part)
-    part.add_header('Content-Disposition', f'attachment; filename="{filename}"')
-    message.attach(part)
-
     # Encode and send
-    raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+    raw_message = _build_raw_message(
+        to_email, subject, body, html_email, cc=cc, bcc=bcc,
+        attachment=_attachment_part(attachment_path)
+    )
 
     try:
         sent_message = service.users().messages().send(
@@ -155,6 +225,216 @@ def send_email_with_attachment(to_email, subject, body, attachment_path, cc=None
         print(f"Error sending email: {str(e)}")
         raise
 
+@dataclass
+class RecipientStatus:
+    """Outcome of one recipient in send_bulk"""
+    email: str
+    status: str = 'pending'  # 'sent' or 'failed'
+    message_id: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int = 0
+
+
+@dataclass
+class BulkSendResult:
+    results: List[RecipientStatus] = field(default_factory=list)
+    batches: int = 0
+    seconds: float = 0.0
+
+    @property
+    def sent(self) -> int:
+        return sum(r.status == 'sent' for r in self.results)
+
+    @property
+    def failed(self) -> int:
+        return sum(r.status == 'failed' for r in self.results)
+
+
+def merge_fields(text, fields):
+    """Fill {{field}} placeholders; raises KeyError naming the first missing field"""
+    if not text:
+        return text
+
+    def replace(match):
+        name = match.group(1)
+        if name not in fields:
+            raise KeyError(name)
+        return str(fields[name])
+
+    return MERGE_FIELD.sub(replace, text)
+
+
+def _retryable(exception) -> bool:
+    """Only rate-limit rejections are safe to resend: Gmail refused them before sending.
+    A transport error or 5xx may come after the message went out, so resending risks a duplicate."""
+    status = getattr(getattr(exception, 'resp', None), 'status', None)
+    if status is None:
+        return False
+    status = int(status)
+    # Gmail reports per-user send rate limits as 403 rateLimitExceeded / userRateLimitExceeded
+    return status == 429 or (status == 403 and 'ratelimitexceeded' in str(exception).lower())
+
+
+def _send_error(exception) -> str:
+    status = getattr(getattr(exception, 'resp', None), 'status', None)
+    if status is None or int(status) >= 500:
+        return f"{UNKNOWN_DELIVERY}: {exception}"
+    return str(exception)
+
+
+def send_bulk(
+    recipients: Sequence[Union[str, Dict[str, str]]],
+    subject: str,
+    body: str,
+    attachment_path: Optional[str] = None,
+    cc=None,
+    bcc=None,
+    template: str = 'branded_light',
+    cta_text: Optional[str] = None,
+    cta_link: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    max_retries: Optional[int] = None,
+    service=None,
+    http_factory: Optional[Callable[[], object]] = None,
+    on_result: Optional[Callable[[RecipientStatus], None]] = None
+) -> BulkSendResult:
+    """Send one email (optionally with a shared attachment) to many recipients
+
+    Args:
+        recipients: Email addresses, or dicts with 'email' plus merge fields
+                    (e.g. {'email': 'ana@example.com', 'first_name': 'Ana'})
+        subject: Email subject, may contain {{field}} placeholders
+        body: Email body text, may contain {{field}} placeholders
+        attachment_path: Optional file attached to every message (encoded once)
+        cc: Optional CC address(es) added to every message
+        bcc: Optional BCC address(es) added to every message
+        template: Email template ('plain', 'branded_light', 'branded_dark', 'professional')
+        cta_text: Optional CTA button text (placeholders allowed)
+        cta_link: Optional CTA button URL (placeholders allowed)
+        batch_size: Messages per Gmail batch request (default: MARKETING_GMAIL_BATCH_SIZE)
+        concurrency: Batch requests in flight at once (default: MARKETING_GMAIL_CONCURRENCY;
+                     always 1 without an http_factory, as the service's one http can't be shared)
+        max_retries: Retry rounds for rate-limited sends (default: MARKETING_GMAIL_RETRIES)
+        service: Gmail service to use (default: this process's cached service)
+        http_factory: Returns a transport per worker thread (default: authorized httplib2
+                      when using the cached service; None executes on the service's own http)
+        on_result: Called with each RecipientStatus once it is final
+
+    Returns:
+        BulkSendResult with one RecipientStatus per recipient, in input order.
+        Recipients with missing merge fields fail without being sent. Only rate-limited
+        sends are retried; after a transport error or 5xx a recipient fails with an
+        UNKNOWN_DELIVERY error instead, since resending could deliver a duplicate.
+    """
+    if not all([recipients, subject, body]):
+        raise ValueError("recipients, subject, and body are required")
+
+    if attachment_path and not os.path.exists(attachment_path):
+        raise FileNotFoundError(f"Attachment not found: {attachment_path}")
+
+    batch_size = min(max(batch_size or _env_int('MARKETING_GMAIL_BATCH_SIZE', 50), 1), MAX_BATCH_SIZE)
+    concurrency = max(concurrency or _env_int('MARKETING_GMAIL_CONCURRENCY', 2), 1)
+    max_retries = max_retries if max_retries is not None else _env_int('MARKETING_GMAIL_RETRIES', 3)
+    if service is None:
+        service = get_gmail_service()
+        http_factory = http_factory or _new_http
+    if http_factory is None:
+        concurrency = 1  # Batches would share the service's non-thread-safe httplib2 transport
+
+    start = time.monotonic()
+    specs = [r if isinstance(r, dict) else {'email': r} for r in recipients]
+    result = BulkSendResult(results=[RecipientStatus(email=spec.get('email', '')) for spec in specs])
+    attachment = _attachment_part(attachment_path) if attachment_path else None
+    rendered = {}  # (body, cta_text, cta_link) -> HTML, so identical merges render once
+    local = threading.local()
+
+    def finish(index, status, message_id=None, error=None):
+        recipient = result.results[index]
+        recipient.status, recipient.message_id, recipient.error = status, message_id, error
+        if on_result is not None:
+            on_result(recipient)
+
+    def build(index):
+        fields = specs[index]
+        merged_body = merge_fields(body, fields)
+        merged_cta = (merge_fields(cta_text, fields), merge_fields(cta_link, fields))
+        key = (merged_body,) + merged_cta
+        if key not in rendered:
+            rendered[key] = render_email_html(
+                body=merged_body, template=template, cta_text=merged_cta[0], cta_link=merged_cta[1]
+            )
+        return _build_raw_message(
+            fields['email'], merge_fields(subject, fields), merged_body, rendered[key],
+            cc=cc, bcc=bcc, attachment=attachment
+        )
+
+    def send_batch(indexes):
+        """Submit one Gmail batch request; returns the indexes worth retrying"""
+        retry = []
+
+        def callback(request_id, response, exception):
+            index = int(request_id)
+            if exception is None:
+                finish(index, 'sent', message_id=response.get('id'))
+            elif _retryable(exception):
+                result.results[index].error = str(exception)
+                retry.append(index)
+            else:
+                finish(index, 'failed', error=_send_error(exception))
+
+        batch = service.new_batch_http_request(callback=callback)
+        for index in indexes:
+            result.results[index].attempts += 1
+            # Messages are encoded per batch, so only batch_size * concurrency are in memory
+            batch.add(service.users().messages().send(userId='me', body={'raw': build(index)}),
+                      request_id=str(index))
+
+        if http_factory is not None and not hasattr(local, 'http'):
+            local.http = http_factory()
+        try:
+            batch.execute(http=getattr(local, 'http', None))
+        except Exception as e:
+            # Whole batch failed (e.g. connection reset): unanswered messages may still have
+            # gone out, so they are reported rather than resent
+            answered = set(retry) | {i for i in indexes if result.results[i].status != 'pending'}
+            for index in indexes:
+                if index not in answered:
+                    finish(index, 'failed', error=f"{UNKNOWN_DELIVERY}: {e}")
+        return retry
+
+    pending = []
+    for index, spec in enumerate(specs):
+        if not spec.get('email'):
+            finish(index, 'failed', error="missing 'email'")
+            continue
+        try:
+            for text in (subject, body, cta_text, cta_link):
+                merge_fields(text, spec)
+        except KeyError as e:
+            finish(index, 'failed', error=f"missing merge field {e}")
+            continue
+        pending.append(index)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='gmail-bulk') as pool:
+        for attempt in range(max_retries + 1):
+            if not pending:
+                break
+            if attempt:
+                time.sleep(random.uniform(0, min(2 ** attempt, 30)))
+            batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+            result.batches += len(batches)
+            pending = sorted(index for retry in pool.map(send_batch, batches) for index in retry)
+
+    for index in pending:
+        finish(index, 'failed', error=result.results[index].error)
+
+    result.seconds = time.monotonic() - start
+    print(f"Bulk send: {result.sent} sent, {result.failed} failed "
+          f"({len(specs)} recipients, {result.batches} batches, {result.seconds:.1f}s)")
+    return result
+
+
 if __name__ == "__main__":
     # Pure utility - no hardcoded content
     print("=" * 70)
@@ -0,0 +1,78 @@
+"""
+Single-Flight Request Coalescing
+Identical generation requests that overlap in time share one provider job.
+
+An agent that retries after a client-side timeout re-sends the same video request
+while the first one is still running, which doubles cost and provider load. Requests
+are keyed on the tool name plus normalised arguments (prompt whitespace collapsed,
+omitted/None arguments dropped), and duplicates attach to the work already running:
+
+- In-flight calls: SingleFlight.do(key, ...) runs the first caller's handler as a
+  task; duplicates arriving before it finishes await the same task and get the same
+  result. The task is shielded, so a caller that gives up does not cancel the job
+  for the others.
+- Submitted jobs: async-mode video tools return before the video exists, so they
+  also tag jobs with metadata["request_key"]; a duplicate that arrives later
+  attaches to the still-running job (VideoJobTracker.active_job) instead of
+  submitting a new one.
+
+Observability:
+    single_flight.stats() -> {"in_flight": 1, "tools": {"generate_sora_video": {"leaders": 3, "coalesced": 2, ...}}}
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict
+
+from image_cache import normalise_prompt
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a request key."""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def key_for(name: str, arguments: Dict[str, Any]) -> str:
+        """Stable digest of a tool call; trivially reformatted prompts share a key."""
+        normalised = {
+            key: normalise_prompt(value) if isinstance(value, str) else value
+            for key, value in arguments.items()
+            if value is not None
+        }
+        payload = json.dumps([name, normalised], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+    async def do(self, key: str, name: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run func() once per key at a time; concurrent duplicates share its result."""
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(key)
+        if task is not None and not task.done() and task.get_loop() is loop:
+            self.record(name, "coalesced")
+            return await asyncio.shield(task)
+
+        task = loop.create_task(func())
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._finished(key, done))
+        self.record(name, "leaders")
+        return await asyncio.shield(task)
+
+    def _finished(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Retrieved here so abandoned failures are not logged as unhandled
+
+    def record(self, name: str, counter: str):
+        """Count an event for a tool ("leaders", "coalesced", "attached_to_job")."""
+        counts = self._counts.setdefault(name, {"leaders": 0, "coalesced": 0, "attached_to_job": 0})
+        counts[counter] = counts.get(counter, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._inflight),
+            "tools": {name: dict(counts) for name, counts in sorted(self._counts.items())},
+        }
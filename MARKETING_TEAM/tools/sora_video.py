@@ -9,12 +9,21 @@ This implementation uses direct HTTP requests until the Python SDK adds native s
 from claude_agent_sdk import tool
 from openai import AsyncOpenAI
 import httpx
-import asyncio
 import json
 import os
-import base64
 from pathlib import Path
 from dotenv import load_dotenv
+from video_jobs import (
+    VideoJobTracker, VideoJob, JobJournal, ProviderStatus, COMPLETED, FAILED, parse_retry_after,
+    transient_check_status
+)
+from media_downloads import stream_download, DownloadError
+from vision_analysis import analyze_image
+from rate_limits import rate_limiter
+from multi_clip import clip_key, generate_clips
+from ffmpeg_pipeline import FFmpegError, StitchResult, ffmpeg_available, stitch
+from video_export import PRESETS as EXPORT_PRESETS, export_variants
+from ugc_templates import UGCTemplateStore
 
 # Import Google Drive upload functionality
 try:
@@ -27,71 +36,26 @@ except ImportError:
 load_dotenv()
 
 # Initialize OpenAI client
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)  # Retries go through rate_limits
 API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_BASE_URL = "https://api.openai.com/v1"
 
-# FFmpeg path detection for Windows
-FFMPEG_CMD = "ffmpeg"  # Default for Linux/Mac
-if os.name == 'nt':  # Windows
-    # Check common Windows installation paths
-    windows_ffmpeg_paths = [
-        r"C:\Users\sabaa\AppData\Local\Microsoft\WinGet\Packages\Gyan.FFmpeg_Microsoft.Winget.Source_8wekyb3d8bbwe\ffmpeg-8.0-full_build\bin\ffmpeg.exe",
-        r"C:\ffmpeg\bin\ffmpeg.exe",
-        r"C:\Program Files\ffmpeg\bin\ffmpeg.exe",
-    ]
-    for path in windows_ffmpeg_paths:
-        if Path(path).exists():
-            FFMPEG_CMD = path
-            break
-
+# UGC templates, parsed once and reloaded only when the JSON file changes
+_ugc_templates = UGCTemplateStore()
 
 async def analyze_image_with_gpt4o_vision(image_path: str) -> str:
     """
     Analyze image with GPT-4o Vision to extract detailed description
     for enhanced video generation prompts.
 
-    Cost: ~$0.01 per analysis
+    Analyses are cached by image digest (shared with the MCP server), so a
+    product photo reused across clips is only analyzed once.
+
+    Cost: ~$0.01 per analysis (cached repeats are free)
     Returns: Detailed description of the image (product, colors, composition, etc.)
     """
     try:
-        # Read and encode image as base64
-        with open(image_path, 'rb') as f:
-            image_data = base64.b64encode(f.read()).decode('utf-8')
-
-        # Determine image format from extension
-        image_format = Path(image_path).suffix.lower().replace('.', '')
-        if image_format == 'jpg':
-            image_format = 'jpeg'
-
-        # Create data URL
-        image_url = f"data:image/{image_format};base64,{image_data}"
-
-        # Call GPT-4o Vision API
-        response = await client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": "Describe this product in detail for video generation: include colors, shapes, textures, materials, design elements, and overall composition. Focus on visual characteristics that would help maintain consistency in a video."
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": image_url,
-                                "detail": "high"
-                            }
-                        }
-                    ]
-                }
-            ],
-            max_tokens=300
-        )
-
-        description = response.choices[0].message.content.strip()
+        description, _ = await analyze_image(client, image_path, prompt="product")
         return description
 
     except Exception as e:
@@ -193,57 +157,19 @@ async def generate_sora_video(args):
     custom_prompt_addition = prompt  # Save custom prompt for later appending
     if ugc_style:
         try:
-            # Load UGC templates
-            template_path = Path(__file__).parent.parent / "memory" / "ugc_prompt_templates.json"
-            with open(template_path, 'r', encoding='utf-8') as f:
-                templates = json.load(f)
-
-            # Get base template
-            if ugc_style not in templates.get("base_templates", {}):
-                available_styles = ", ".join(templates.get("base_templates", {}).keys())
-                return {
-                    "content": [{
-                        "type": "text",
-                        "text": f"❌ Error: Unknown UGC style '{ugc_style}'. Available: {available_styles}"
-                    }]
-                }
-
-            template = templates["base_templates"][ugc_style]
-
-            # Build UGC prompt (Sora-optimized version - no native audio)
-            platform_desc = template["platform_optimized"].get(platform, template["platform_optimized"]["tiktok"])
-            execution = template["execution_approach"]
-
-            # Start building prompt
-            prompt = f"UGC-STYLE VIDEO ({ugc_style.upper()}):\n\n"
-            prompt += f"{platform_desc}\n\n"
-            prompt += f"PRODUCT: {product_name}\n\n"
-
-            if icp:
-                prompt += f"TARGET AUDIENCE: {icp}\n\n"
-
-            if product_features:
-                prompt += f"KEY FEATURES: {product_features}\n\n"
-
-            if video_setting:
-                prompt += f"SETTING: {video_setting}\n\n"
-
-            prompt += f"EXECUTION: {execution}\n\n"
-            prompt += "AUTHENTICITY REQUIREMENTS:\n"
-            prompt += "- Handheld camera feel (natural shake, not stabilized)\n"
-            prompt += "- Natural lighting (window light, outdoor, no studio)\n"
-            prompt += "- Casual settings (home, kitchen, outdoors, everyday)\n"
-            prompt += "- Real people vibe (casual clothes, relatable environment)\n"
-            prompt += "- NO professional production, NO perfect lighting\n"
-            prompt += "- NO corporate polish (authentic > perfect)\n"
-
-            # Append custom prompt if provided (combine UGC template + custom instructions)
-            if custom_prompt_addition:
-                prompt += f"\n\nADDITIONAL INSTRUCTIONS:\n{custom_prompt_addition}\n"
-                print(f"✅ Built UGC prompt from '{ugc_style}' template for {platform} + custom additions")
-            else:
-                print(f"✅ Built UGC prompt from '{ugc_style}' template for {platform}")
-
+            # Indexed, mtime-cached templates: the JSON is parsed once, not per call
+            prompt = _ugc_templates.render_sora_prompt(
+                ugc_style, platform, product_name,
+                icp=icp, product_features=product_features, video_setting=video_setting,
+                additional_instructions=custom_prompt_addition
+            )
+        except ValueError as e:
+            return {
+                "content": [{
+                    "type": "text",
+                    "text": f"❌ Error: {e}"
+                }]
+            }
         except Exception as e:
             return {
                 "content": [{
@@ -251,6 +177,10 @@ async def generate_sora_video(args):
                     "text": f"❌ Error building UGC prompt: {str(e)}"
                 }]
             }
+        if custom_prompt_addition:
+            print(f"✅ Built UGC prompt from '{ugc_style}' template for {platform} + custom additions")
+        else:
+            print(f"✅ Built UGC prompt from '{ugc_style}' template for {platform}")
 
     # Validation: Must have prompt at this point
     if not prompt:
@@ -304,7 +234,8 @@ async def generate_sora_video(args):
     try:
         # Try using the native Python SDK first (in case it gets updated)
         if hasattr(client, 'videos'):
-            video_response = await client.videos.create(
+            video_response = await rate_limiter.submit(
+                "openai", "sora-2", client.videos.create,
                 model=model,
                 prompt=prompt,
                 size=resolution,
@@ -319,8 +250,7 @@ async def generate_sora_video(args):
             output_path = output_dir / filename
 
             async with httpx.AsyncClient() as http_client:
-                video_data = await http_client.get(video_url)
-                output_path.write_bytes(video_data.content)
+                await stream_download(http_client, video_url, output_path)
 
             # Upload to Google Drive if requested
             drive_url = None
@@ -399,7 +329,8 @@ async def generate_sora_video(args):
                         "Authorization": f"Bearer {API_KEY}",
                     }
 
-                    response = await http_client.post(
+                    response = await rate_limiter.submit(
+                        "openai", "sora-2", http_client.post,
                         f"{OPENAI_BASE_URL}/videos",
                         headers=headers,
                         data=data,
@@ -420,7 +351,8 @@ async def generate_sora_video(args):
                     }
 
                     # Make API request to CORRECT endpoint
-                    response = await http_client.post(
+                    response = await rate_limiter.submit(
+                        "openai", "sora-2", http_client.post,
                         f"{OPENAI_BASE_URL}/videos",  # NOT /videos/generations!
                         headers=headers,
                         json=payload
@@ -482,21 +414,21 @@ async def generate_sora_video(args):
                 output_dir.mkdir(parents=True, exist_ok=True)
                 output_path = output_dir / filename
 
-                video_content_response = await http_client.get(
-                    f"{OPENAI_BASE_URL}/videos/{video_id}/content",
-                    headers=headers
-                )
-
-                if video_content_response.status_code != 200:
+                try:
+                    await stream_download(
+                        http_client,
+                        f"{OPENAI_BASE_URL}/videos/{video_id}/content",
+                        output_path,
+                        headers=headers
+                    )
+                except DownloadError as e:
                     return {
                         "content": [{
                             "type": "text",
-                            "text": f"❌ Failed to download video: {video_content_response.status_code}"
+                            "text": f"❌ {e}"
                         }]
                     }
 
-                output_path.write_bytes(video_content_response.content)
-
                 # Upload to Google Drive if requested
                 drive_url = None
                 if upload_to_drive and GOOGLE_DRIVE_AVAILABLE:
@@ -574,36 +506,68 @@ async def generate_sora_video(args):
         }
 
 
-async def _poll_for_video_completion(http_client, headers, video_id, max_wait=300):
-    """
-    Poll the API for video generation completion
-    Max wait: 300 seconds (5 minutes)
-    """
-    start_time = asyncio.get_event_loop().time()
-
-    while True:
-        elapsed = asyncio.get_event_loop().time() - start_time
-        if elapsed > max_wait:
-            raise TimeoutError(f"Video generation timed out after {max_wait} seconds")
-
+async def _check_sora_status(job: VideoJob) -> ProviderStatus:
+    """One Sora status request for the shared poller (job.handle = (http_client, headers))."""
+    http_client, headers = job.handle
+    try:
         response = await http_client.get(
-            f"{OPENAI_BASE_URL}/videos/{video_id}",
+            f"{OPENAI_BASE_URL}/videos/{job.provider_job_id}",
             headers=headers
         )
+    except Exception as e:
+        # Timeouts / dropped connections say nothing about the job: keep it and back off
+        status = transient_check_status(e)
+        if status is None:
+            raise
+        return status
+    retry_after = parse_retry_after(response.headers.get("retry-after"))
 
-        if response.status_code != 200:
-            raise Exception(f"Failed to check video status: {response.text}")
+    # Rate limited / overloaded (429, 5xx): keep the job and back off
+    transient = transient_check_status(response)
+    if transient is not None:
+        return transient
 
-        result = response.json()
-        status = result.get('status')
+    if response.status_code != 200:
+        raise Exception(f"Failed to check video status: {response.text}")
 
-        if status == 'completed':
-            return  # Video is ready, download it separately
-        elif status == 'failed':
-            raise Exception(f"Video generation failed: {result.get('error', 'Unknown error')}")
+    result = response.json()
+    status = result.get('status')
 
-        # Wait before polling again
-        await asyncio.sleep(5)
+    if status == 'completed':
+        return ProviderStatus(COMPLETED, progress=100)
+    elif status == 'failed':
+        return ProviderStatus(FAILED, error=f"Video generation failed: {result.get('error', 'Unknown error')}")
+
+    return ProviderStatus("running", progress=result.get('progress'), retry_after=retry_after)
+
+
+async def _download_separately(job: VideoJob):
+    """Callers download the finished video themselves via /videos/{id}/content."""
+
+
+# One shared poller for every Sora clip in this process (multi-clip jobs poll together).
+# Jobs go to the shared video job journal, so a clip whose process died mid-poll is
+# resumed and downloaded by the MCP server on its next start (list_recovered_video_jobs).
+_video_jobs = VideoJobTracker(journal=JobJournal())
+_video_jobs.register_provider(
+    "sora", _check_sora_status, _download_separately, poll_interval=5.0, max_interval=20.0
+)
+
+
+async def _poll_for_video_completion(http_client, headers, video_id, max_wait=300):
+    """
+    Wait for video generation to complete on the shared adaptive poller
+    Max wait: 300 seconds (5 minutes)
+    """
+    job = _video_jobs.submit(
+        "sora", video_id, f"{video_id}.mp4", handle=(http_client, headers), max_wait=max_wait
+    )
+    job = await _video_jobs.wait(job.job_id)
+
+    if job.status == FAILED:
+        if "timed out" in job.error:
+            raise TimeoutError(job.error)
+        raise Exception(job.error)
 
 
 def _suggest_camera_movement(prompt: str) -> str:
@@ -648,24 +612,25 @@ def _suggest_pacing(duration: int) -> str:
         return "Slow, cinematic pacing with longer holds"
 
 
-def _save_to_video_queue(request_data: dict):
-    """Save video request to queue for future processing"""
-    queue_file = "memory/video_generation_queue.json"
+def _stitch_progress(prefix: str = ""):
+    """Progress callback printing stitch progress in 10% steps"""
+    last = {"step": -1}
 
-    # Load existing queue
-    if os.path.exists(queue_file):
-        with open(queue_file) as f:
-            queue = json.load(f)
-    else:
-        queue = []
+    def report(fraction: float):
+        step = int(fraction * 10)
+        if step > last["step"]:
+            last["step"] = step
+            print(f"{prefix}Stitching... {step * 10}%")
+    return report
 
-    # Add request
-    queue.append(request_data)
 
-    # Save queue
-    Path("memory").mkdir(exist_ok=True)
-    with open(queue_file, 'w') as f:
-        json.dump(queue, f, indent=2)
+def _stitch_summary(stitched: StitchResult) -> str:
+    """One-line description of how the clips were joined"""
+    if stitched.full_reencode:
+        return f"full re-encode ({stitched.seconds:.1f}s)"
+    if stitched.normalised:
+        return f"lossless concat after normalising {', '.join(stitched.normalised)} ({stitched.seconds:.1f}s)"
+    return f"lossless concat, no re-encoding ({stitched.seconds:.1f}s)"
 
 
 @tool(
@@ -688,6 +653,13 @@ async def generate_multi_clip_video(args):
     2. Stitching them together using ffmpeg
     3. Creating seamless 30-second (or longer) ads
 
+    Clips are generated concurrently (MARKETING_MULTI_CLIP_CONCURRENCY, default 4), so
+    the whole ad takes about as long as its slowest clip. A failed clip is retried on
+    its own; if it still fails, the finished clips are kept and reused when the tool
+    is called again with the same output_filename. Clip files are named by a hash of
+    their full request, so a segment whose prompt, style, orientation or duration
+    changed is regenerated rather than stitched from a stale clip.
+
     Example usage for 30-second ad:
     script_segments = [
         {"prompt": "Hook scene description", "duration": "12"},
@@ -727,10 +699,7 @@ async def generate_multi_clip_video(args):
         }
 
     # Check ffmpeg availability
-    import subprocess
-    try:
-        subprocess.run([FFMPEG_CMD, "-version"], capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    if not await ffmpeg_available():
         return {
             "content": [{
                 "type": "text",
@@ -742,108 +711,73 @@ async def generate_multi_clip_video(args):
         output_dir = Path("MARKETING_TEAM/outputs/videos").resolve()
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        # Generate each clip
-        clip_paths = []
-        total_cost = 0.0
-        total_duration = 0
-
-        for i, segment in enumerate(script_segments):
-            segment_prompt = segment["prompt"]
-            segment_duration = segment.get("duration", "12")
-
-            # Add style consistency to each prompt
-            full_prompt = f"{segment_prompt}. {style_consistency}"
-
-            # Generate filename for this clip
-            clip_filename = f"clip_{i+1}_{segment_duration}s.mp4"
-
-            print(f"Generating clip {i+1}/{len(script_segments)}: {segment_duration}s...")
+        # Generate every clip concurrently (per-clip retries, finished clips kept)
+        stem = Path(output_filename).stem
+        durations = [str(segment.get("duration", "12")) for segment in script_segments]
+        requests = [
+            {
+                # Add style consistency to each prompt
+                "prompt": f"{segment['prompt']}. {style_consistency}",
+                "seconds": durations[i],
+                "orientation": orientation
+            }
+            for i, segment in enumerate(script_segments)
+        ]
+        # The request hash in the name means a clip is only reused for an identical segment
+        planned = [
+            output_dir / f"{stem}_clip_{i+1}_{durations[i]}s_{clip_key(request)}.mp4"
+            for i, request in enumerate(requests)
+        ]
 
-            # Generate the clip using existing tool
+        async def generate_clip(i: int, clip_path: Path):
             result = await generate_sora_video({
-                "prompt": full_prompt,
-                "seconds": segment_duration,
-                "orientation": orientation,
-                "filename": clip_filename,
+                **requests[i],
+                "filename": clip_path.name,
                 "upload_to_drive": False  # Don't upload individual clips
             })
-
-            # Extract the file path from result
-            clip_path = output_dir / clip_filename
             if not clip_path.exists():
-                return {
-                    "content": [{
-                        "type": "text",
-                        "text": f"❌ Failed to generate clip {i+1}. Check the error above."
-                    }]
-                }
-
-            clip_paths.append(str(clip_path))
-            total_cost += int(segment_duration) * 0.10
-            total_duration += int(segment_duration)
+                raise RuntimeError(result["content"][0]["text"].strip().splitlines()[0])
 
-            print(f"✅ Clip {i+1} generated: {clip_path}")
+        def report(done: int, total: int, clip):
+            icon = "✅" if clip.ok else "❌"
+            print(f"{icon} Clip {clip.index+1} {clip.status} ({done}/{total} done, {clip.seconds:.0f}s, attempts: {clip.attempts})")
 
-        # Create ffmpeg concat file
-        concat_file = output_dir / "concat_list.txt"
-        with open(concat_file, 'w') as f:
-            for clip_path in clip_paths:
-                f.write(f"file '{os.path.basename(clip_path)}'\n")
+        print(f"Generating {len(planned)} clips concurrently...")
+        clips = await generate_clips(planned, generate_clip, on_progress=report)
 
-        # Stitch videos together using ffmpeg
-        final_output_path = output_dir / output_filename
+        failed = [clip for clip in clips if not clip.ok]
+        if failed:
+            details = "\n".join(f"- Clip {clip.index+1}: {clip.error}" for clip in failed)
+            return {
+                "content": [{
+                    "type": "text",
+                    "text": (
+                        f"❌ Failed to generate {len(failed)} of {len(clips)} clips:\n\n{details}\n\n"
+                        f"The {len(clips) - len(failed)} finished clip(s) are kept in {output_dir} and will be "
+                        f"reused if you call generate_multi_clip_video again with output_filename='{output_filename}'."
+                    )
+                }]
+            }
 
-        ffmpeg_cmd = [
-            FFMPEG_CMD,
-            "-f", "concat",
-            "-safe", "0",
-            "-i", concat_file.name,
-            "-c", "copy",  # Copy without re-encoding for speed
-            "-y",  # Overwrite output file
-            output_filename
-        ]
+        clip_paths = [str(clip.path) for clip in clips]
+        total_duration = sum(int(duration) for duration in durations)
+        total_cost = sum(int(durations[clip.index]) * 0.10 for clip in clips if clip.status == "generated")
+        reused = sum(clip.status == "reused" for clip in clips)
 
+        # Stitch: probe clips, normalise only mismatched ones, then concat losslessly
+        final_output_path = output_dir / output_filename
         print(f"Stitching {len(clip_paths)} clips together...")
-
-        result = subprocess.run(
-            ffmpeg_cmd,
-            cwd=str(output_dir),
-            capture_output=True,
-            text=True
-        )
-
-        if result.returncode != 0:
-            # If copy fails, try re-encoding
-            print("Copy mode failed, trying with re-encoding...")
-            ffmpeg_cmd = [
-                FFMPEG_CMD,
-                "-f", "concat",
-                "-safe", "0",
-                "-i", concat_file.name,
-                "-c:v", "libx264",
-                "-preset", "medium",
-                "-crf", "23",
-                "-y",
-                output_filename
-            ]
-
-            result = subprocess.run(
-                ffmpeg_cmd,
-                cwd=str(output_dir),
-                capture_output=True,
-                text=True
-            )
-
-            if result.returncode != 0:
-                return {
-                    "content": [{
-                        "type": "text",
-                        "text": f"❌ ffmpeg stitching failed:\n\n{result.stderr}"
-                    }]
-                }
+        try:
+            stitched = await stitch(clip_paths, final_output_path, on_progress=_stitch_progress())
+        except FFmpegError as e:
+            return {
+                "content": [{
+                    "type": "text",
+                    "text": f"❌ ffmpeg stitching failed:\n\n{e.stderr or e}"
+                }]
+            }
 
         # Clean up temporary files
-        concat_file.unlink()
         for clip_path in clip_paths:
             Path(clip_path).unlink()
 
@@ -865,8 +799,10 @@ async def generate_multi_clip_video(args):
             f"**Segments:** {len(script_segments)} clips\n"
             f"**Total Duration:** {total_duration} seconds\n"
             f"**Orientation:** {orientation}\n"
-            f"**Total Cost:** ${total_cost:.2f} (@ $0.10/second)\n\n"
-            f"**Saved to:** {final_output_path}\n"
+            f"**Total Cost:** ${total_cost:.2f} (@ $0.10/second)\n"
+            + (f"**Reused clips:** {reused} (from an earlier run, no charge)\n" if reused else "")
+            + f"**Stitching:** {_stitch_summary(stitched)}\n"
+            + f"\n**Saved to:** {final_output_path}\n"
         )
 
         if drive_url:
@@ -1008,8 +944,6 @@ async def stitch_existing_videos(args):
     ]
     output_filename = "final_video_30s.mp4"
     """
-    import subprocess
-
     video_files = args["video_files"]
     output_filename = args.get("output_filename", "stitched_video.mp4")
     upload_to_drive = args.get("upload_to_drive", True)
@@ -1046,9 +980,7 @@ async def stitch_existing_videos(args):
         }
 
     # Check FFmpeg is available
-    try:
-        subprocess.run([FFMPEG_CMD, "-version"], capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    if not await ffmpeg_available():
         return {
             "content": [{
                 "type": "text",
@@ -1062,66 +994,17 @@ async def stitch_existing_videos(args):
         print(f"  {i}. {vf}")
 
     try:
-        # Create ffmpeg concat file
-        concat_file = output_dir / "concat_list.txt"
-        with open(concat_file, 'w', encoding='utf-8') as f:
-            for video_path in video_paths:
-                f.write(f"file '{video_path.name}'\n")
-
-        # Stitch videos together using ffmpeg
+        # Stitch: probe clips, normalise only mismatched ones, then concat losslessly
         final_output_path = output_dir / output_filename
-
-        # Try with copy codec first (fastest, no re-encoding)
-        ffmpeg_cmd = [
-            FFMPEG_CMD,
-            "-f", "concat",
-            "-safe", "0",
-            "-i", str(concat_file),
-            "-c", "copy",  # Copy without re-encoding
-            "-y",  # Overwrite output file
-            str(final_output_path)
-        ]
-
-        print(f"[OK] Running FFmpeg (copy mode)...")
-        result = subprocess.run(
-            ffmpeg_cmd,
-            capture_output=True,
-            text=True
-        )
-
-        if result.returncode != 0:
-            # If copy fails, try re-encoding (slower but more compatible)
-            print("[OK] Copy mode failed, trying with re-encoding...")
-            ffmpeg_cmd = [
-                FFMPEG_CMD,
-                "-f", "concat",
-                "-safe", "0",
-                "-i", str(concat_file),
-                "-c:v", "libx264",
-                "-preset", "medium",
-                "-crf", "23",
-                "-y",
-                str(final_output_path)
-            ]
-
-            result = subprocess.run(
-                ffmpeg_cmd,
-                capture_output=True,
-                text=True
-            )
-
-            if result.returncode != 0:
-                # Clean up and return error
-                concat_file.unlink(missing_ok=True)
-                return {
-                    "content": [{
-                        "type": "text",
-                        "text": f"❌ FFmpeg stitching failed:\n\n{result.stderr}"
-                    }]
-                }
-
-        # Clean up temporary concat file (keep original video files)
-        concat_file.unlink(missing_ok=True)
+        try:
+            stitched = await stitch(video_paths, final_output_path, on_progress=_stitch_progress("[OK] "))
+        except FFmpegError as e:
+            return {
+                "content": [{
+                    "type": "text",
+                    "text": f"❌ FFmpeg stitching failed:\n\n{e.stderr or e}"
+                }]
+            }
 
         print(f"[OK] Video stitching complete: {final_output_path}")
 
@@ -1156,6 +1039,7 @@ async def stitch_existing_videos(args):
         result_text += (
             f"\n**Output File:** {output_filename}\n"
             f"**File Size:** {file_size_mb:.2f} MB\n"
+            f"**Stitching:** {_stitch_summary(stitched)}\n"
             f"**Saved to:** {final_output_path}\n"
         )
 
@@ -1166,7 +1050,7 @@ async def stitch_existing_videos(args):
             "\n[INFO] Tips:\n"
             "- Original segment files are preserved (not deleted)\n"
             "- Use same resolution/codec across segments for best results\n"
-            "- FFmpeg will try copy mode first (fast), then re-encode if needed"
+            "- Only clips that differ from the majority format are re-encoded; the rest are joined losslessly"
         )
 
         return {
@@ -1177,10 +1061,6 @@ async def stitch_existing_videos(args):
         }
 
     except Exception as e:
-        # Clean up on error
-        if concat_file.exists():
-            concat_file.unlink(missing_ok=True)
-
         return {
             "content": [{
                 "type": "text",
@@ -1188,3 +1068,97 @@ async def stitch_existing_videos(args):
             }]
         }
 
+
+
+@tool(
+    "export_video_variants",
+    "Export a finished video to platform variants (TikTok, Reels, Shorts, LinkedIn) with poster frames and thumbnails",
+    {
+        "video_file": str,  # Master video filename in outputs/videos/ folder
+        "presets": list,  # Optional: preset names (default: all of tiktok, reels, shorts, linkedin)
+        "thumbnails": int,  # Optional: evenly spaced thumbnails of the master (default: 4)
+        "upload_to_drive": bool  # Optional: upload variants to Google Drive videos folder (default: False)
+    }
+)
+async def export_video_variants(args):
+    """
+    Transcode one master video to every requested platform preset in parallel.
+
+    Presets set aspect ratio (scale + centre crop), bitrate, duration cap and
+    loudness (see video_export.PRESETS). Outputs are cached by master content hash
+    and preset, so repeating an export only transcodes what changed.
+
+    Example usage:
+    video_file = "final_video_30s.mp4"
+    presets = ["tiktok", "linkedin"]
+    """
+    video_file = args["video_file"]
+    presets = args.get("presets") or list(EXPORT_PRESETS)
+    thumbnails = args.get("thumbnails", 4)
+    upload_to_drive = args.get("upload_to_drive", False)
+
+    output_dir = Path("MARKETING_TEAM/outputs/videos").resolve()
+    master_path = output_dir / video_file
+    if not master_path.exists():
+        return {
+            "content": [{
+                "type": "text",
+                "text": f"❌ Error: Video file not found: {video_file}"
+            }]
+        }
+
+    if not await ffmpeg_available():
+        return {
+            "content": [{
+                "type": "text",
+                "text": "❌ ffmpeg not found. Please install ffmpeg first."
+            }]
+        }
+
+    print(f"[OK] Exporting {video_file} to: {', '.join(presets)}")
+
+    try:
+        exported = await export_variants(master_path, presets, output_dir / "exports", thumbnails=thumbnails)
+    except (ValueError, FFmpegError) as e:
+        return {
+            "content": [{
+                "type": "text",
+                "text": f"❌ Error exporting variants: {str(e)}"
+            }]
+        }
+
+    result_text = f"[OK] Exported {video_file} in {exported.seconds:.1f}s\n\n**Variants:**\n"
+    for variant in exported.variants:
+        preset = EXPORT_PRESETS[variant.preset]
+        if not variant.ok:
+            result_text += f"- {variant.preset}: ❌ {variant.error}\n"
+            continue
+        size_mb = variant.path.stat().st_size / (1024 * 1024)
+        result_text += (
+            f"- **{variant.preset}** ({preset.description}): {variant.path.name} "
+            f"({size_mb:.2f} MB, {variant.status})\n"
+            f"  Poster: {variant.poster.name}\n"
+        )
+
+        if upload_to_drive and GOOGLE_DRIVE_AVAILABLE:
+            try:
+                drive_url = get_drive_manager().upload_file(
+                    str(variant.path),
+                    "videos",
+                    f"{preset.description} export of {video_file}"
+                )
+                result_text += f"  Google Drive: {drive_url}\n"
+            except Exception as e:
+                result_text += f"  Upload failed: {str(e)}\n"
+
+    if exported.thumbnails:
+        result_text += "\n**Thumbnails:**\n" + "".join(f"- {path.name}\n" for path in exported.thumbnails)
+
+    result_text += f"\n**Saved to:** {output_dir / 'exports'}\n"
+
+    return {
+        "content": [{
+            "type": "text",
+            "text": result_text
+        }]
+    }
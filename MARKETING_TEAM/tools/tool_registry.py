@@ -0,0 +1,239 @@
+"""
+Tool Registry
+Table-driven tool registration for the marketing MCP server.
+
+Each tool registers once, at import time, with its handler and JSON input schema;
+argument defaults come from the schema's "default" values (plus any overrides). The server then:
+- dispatches call_tool with a dict lookup instead of an if/elif chain
+- serves list_tools from a cached list of Tool objects, rebuilt only when the
+  caller's cache key changes (e.g. the UGC template store reloaded)
+- validates arguments with checks compiled from each schema, so a bad call fails
+  before any provider round trip
+- coalesces identical concurrent calls of tools registered with coalesce=True
+  (see single_flight.py), so a retried generation joins the one already running
+
+Schemas may be a dict or a zero-argument callable (for parts such as enums that
+depend on hot-reloaded data); callables are re-evaluated when the cache key changes.
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Union
+
+from mcp.types import TextContent, Tool
+
+from single_flight import SingleFlight
+
+
+Schema = Union[Dict[str, Any], Callable[[], Dict[str, Any]]]
+
+# JSON Schema type -> accepted Python types (bool is excluded from numbers below)
+_JSON_TYPES = {
+    "string": (str,),
+    "boolean": (bool,),
+    "integer": (int,),
+    "number": (int, float),
+    "object": (dict,),
+    "array": (list, tuple),
+    "null": (type(None),),
+}
+
+
+def _type_check(prop: Dict[str, Any]):
+    declared = prop.get("type")
+    type_names = tuple(declared) if isinstance(declared, list) else ((declared,) if declared else ())
+    py_types = tuple(t for type_name in type_names for t in _JSON_TYPES.get(type_name, ()))
+    reject_bool = "boolean" not in type_names and bool(py_types)
+    return type_names, py_types, reject_bool
+
+
+def _compile_value(name: str, prop: Dict[str, Any]) -> Callable[[Any], Optional[str]]:
+    """Checker for one property value: type, enum, numeric bounds and array items."""
+    type_names, py_types, reject_bool = _type_check(prop)
+    enum = tuple(prop["enum"]) if "enum" in prop else None
+    minimum, maximum = prop.get("minimum"), prop.get("maximum")
+    min_items, max_items = prop.get("minItems"), prop.get("maxItems")
+    items = prop.get("items")
+    if items and items.get("type") == "object":
+        item_check = compile_validator(items)
+    elif items:
+        item_check = _compile_value("item", items)
+    else:
+        item_check = None
+
+    def check(value: Any) -> Optional[str]:
+        if py_types and (not isinstance(value, py_types) or (reject_bool and isinstance(value, bool))):
+            return f"'{name}' must be {' or '.join(type_names)}, got {type(value).__name__}"
+        if enum is not None and value not in enum:
+            return f"'{name}' must be one of: {', '.join(map(str, enum))} (got {value!r})"
+        if minimum is not None and value < minimum:
+            return f"'{name}' must be >= {minimum} (got {value!r})"
+        if maximum is not None and value > maximum:
+            return f"'{name}' must be <= {maximum} (got {value!r})"
+        if isinstance(value, (list, tuple)):
+            if min_items is not None and len(value) < min_items:
+                return f"'{name}' needs at least {min_items} item(s)"
+            if max_items is not None and len(value) > max_items:
+                return f"'{name}' allows at most {max_items} items (got {len(value)})"
+            if item_check is not None:
+                for i, item in enumerate(value):
+                    error = item_check(item)
+                    if error:
+                        return f"'{name}[{i}]': {error}"
+        return None
+
+    return check
+
+
+def compile_validator(schema: Dict[str, Any]) -> Callable[[Dict[str, Any]], Optional[str]]:
+    """
+    Turn an object schema into a fast argument checker.
+
+    Supports what the marketing tool schemas use: required, per-property type
+    (single or list), enum, minimum/maximum, and arrays (minItems/maxItems, with
+    item schemas checked recursively). Returns a function giving an error message, or None.
+    """
+    required = tuple(schema.get("required", ()))
+    checks = [(name, _compile_value(name, prop)) for name, prop in schema.get("properties", {}).items()]
+
+    def validate(arguments: Dict[str, Any]) -> Optional[str]:
+        if not isinstance(arguments, dict):
+            return "must be an object"
+
+        for name in required:
+            if arguments.get(name) is None:
+                return f"missing required argument '{name}'"
+
+        for name, check in checks:
+            value = arguments.get(name)
+            if value is None:
+                continue
+            error = check(value)
+            if error:
+                return error
+
+        return None
+
+    return validate
+
+
+@dataclass
+class ToolSpec:
+    name: str
+    description: str
+    schema: Schema
+    handler: Callable[..., Awaitable[List[TextContent]]]
+    defaults: Dict[str, Any] = field(default_factory=dict)
+    coalesce: bool = False
+    calls: int = 0
+    rejected: int = 0
+
+
+class ToolRegistry:
+    """Registered marketing tools plus their cached Tool listing and validators."""
+
+    def __init__(self, single_flight: Optional[SingleFlight] = None):
+        self.single_flight = single_flight or SingleFlight()
+        self._specs: Dict[str, ToolSpec] = {}
+        self._tools: Optional[List[Tool]] = None
+        self._validators: Dict[str, Callable[[Dict[str, Any]], Optional[str]]] = {}
+        self._parameters: Dict[str, frozenset] = {}
+        self._defaults: Dict[str, Dict[str, Any]] = {}
+        self._cache_key: Hashable = None
+
+    def register(
+        self,
+        name: str,
+        description: str,
+        input_schema: Schema,
+        handler: Callable[..., Awaitable[List[TextContent]]],
+        defaults: Optional[Dict[str, Any]] = None,
+        coalesce: bool = False
+    ):
+        """
+        Register a tool.
+
+        Args:
+            name: Tool name exposed over MCP
+            description: Tool description
+            input_schema: JSON schema dict, or a callable building it
+            handler: Async function taking the schema properties as keyword arguments
+            defaults: Extra or overriding values for omitted arguments
+                      (schema "default" values are applied automatically)
+            coalesce: Identical calls made while one is running share its result
+                      (for expensive generation tools)
+        """
+        if name in self._specs:
+            raise ValueError(f"Tool '{name}' is already registered")
+        self._specs[name] = ToolSpec(name, description, input_schema, handler, dict(defaults or {}), coalesce)
+        self._tools = None
+
+    def names(self) -> List[str]:
+        return list(self._specs)
+
+    # ------------------------------------------------------------------
+    # Listing (cached)
+    # ------------------------------------------------------------------
+
+    def _build(self, cache_key: Hashable):
+        tools = []
+        for spec in self._specs.values():
+            schema = spec.schema() if callable(spec.schema) else spec.schema
+            tools.append(Tool(name=spec.name, description=spec.description, inputSchema=schema))
+            self._validators[spec.name] = compile_validator(schema)
+            properties = schema.get("properties", {})
+            self._parameters[spec.name] = frozenset(properties)
+            self._defaults[spec.name] = {
+                **{key: prop["default"] for key, prop in properties.items() if "default" in prop},
+                **spec.defaults,
+            }
+        self._tools = tools
+        self._cache_key = cache_key
+
+    def list_tools(self, cache_key: Hashable = None) -> List[Tool]:
+        """Cached Tool objects; rebuilt (and validators recompiled) when cache_key changes."""
+        if self._tools is None or cache_key != self._cache_key:
+            self._build(cache_key)
+        return self._tools
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+
+    async def call(self, name: str, arguments: Optional[Dict[str, Any]]) -> List[TextContent]:
+        """Validate arguments against the compiled schema, then run the handler."""
+        spec = self._specs.get(name)
+        if spec is None:
+            return [TextContent(type="text", text=f"❌ Unknown tool: {name}")]
+
+        if self._tools is None:
+            self._build(self._cache_key)
+
+        arguments = arguments or {}
+        error = self._validators[name](arguments)
+        if error:
+            spec.rejected += 1
+            return [TextContent(type="text", text=f"❌ Invalid arguments for {name}: {error}")]
+
+        parameters = self._parameters[name]
+        kwargs = dict(self._defaults[name])
+        kwargs.update((key, value) for key, value in arguments.items() if key in parameters)
+
+        spec.calls += 1
+        try:
+            if spec.coalesce:
+                key = SingleFlight.key_for(name, kwargs)
+                return await self.single_flight.do(key, name, lambda: spec.handler(**kwargs))
+            return await spec.handler(**kwargs)
+        except Exception as e:
+            return [TextContent(
+                type="text",
+                text=f"❌ Error executing {name}: {str(e)}\n\nArguments: {json.dumps(arguments, indent=2)}"
+            )]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Calls and schema rejections per tool."""
+        return {
+            spec.name: {"calls": spec.calls, "rejected": spec.rejected}
+            for spec in self._specs.values()
+        }
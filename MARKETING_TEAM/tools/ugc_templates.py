@@ -0,0 +1,744 @@
+"""
+UGC Template Store
+One preloaded, indexed source of UGC prompt templates for the Sora and Veo tools.
+
+Templates come from memory/ugc_prompt_templates.json ("base_templates" and
+"expert_optimized_templates", each style with a "platform_optimized" text per
+platform). When the file is missing or unreadable, the built-in
+DEFAULT_UGC_TEMPLATES below are used.
+
+- The file is parsed once and indexed by style; edits are picked up on the next
+  call when its mtime changes (no server restart)
+- Only the requested (style, platform) template is compiled, on first use, into
+  literal/field parts; later renders just join them
+- {product_name} placeholders are filled at render time
+
+Benchmark the render step:
+    python ugc_templates.py --benchmark
+"""
+
+import json
+import re
+import sys
+import timeit
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+TEMPLATE_PATH = Path(__file__).parent.parent / "memory" / "ugc_prompt_templates.json"
+
+PLATFORMS = ("tiktok", "instagram", "facebook")
+
+# Placeholders filled at render time
+_FIELD = re.compile(r"\{(product_name)\}")
+
+
+# ============================================================================
+# BUILT-IN TEMPLATES (used when memory/ugc_prompt_templates.json is unavailable)
+# ============================================================================
+
+DEFAULT_UGC_TEMPLATES = {
+    # ===== ORIGINAL 4 CORE STYLES =====
+    "testimonial": {
+        "tiktok": """Authentic selfie video, person excitedly talking to camera about {product_name},
+holding product naturally with genuine enthusiasm. 'This changed my morning routine!'
+Casual clothes, natural home lighting, slight handheld camera shake.
+Native audio: person speaking naturally with enthusiasm, ambient home sounds.""",
+        "instagram": """Person holding {product_name} in golden hour natural lighting,
+talking to camera casually with genuine excitement. 'I've been using this every day.'
+Authentic testimonial style, real emotions, handheld phone aesthetic.
+Native audio: clear dialogue, warm tone, ambient sounds.""",
+        "facebook": """Authentic customer testimonial, person with {product_name} in natural home setting,
+conversational tone sharing real experience. 'It actually works, here's why...'
+Genuine reactions, casual environment. Native audio: friendly conversational dialogue."""
+    },
+    "demo": {
+        "tiktok": """Quick hands-on demo, person using {product_name}, showing key feature with enthusiasm.
+Fast-paced, natural environment, handheld phone camera. Sound effects: product use sounds,
+quick verbal callouts 'Watch this!' Authentic interaction.""",
+        "instagram": """Casual demonstration of {product_name}, hands showing product use in natural lighting,
+real-time application. Authentic interaction, phone-filmed aesthetic.
+Native audio: ambient sounds, brief verbal cues, product interaction sounds.""",
+        "facebook": """Real user demonstrating {product_name} benefits, natural home setting,
+hands showing product with genuine reactions. 'Let me show you how this works.'
+Native audio: clear explanation, ambient home sounds."""
+    },
+    "unboxing": {
+        "tiktok": """Excited unboxing of {product_name}, hands opening package with genuine surprise.
+'Oh wow!' Fast-paced reveal, natural lighting, phone camera.
+Sound effects: package rustling, tape pulling, excited verbal reactions.""",
+        "instagram": """Unboxing {product_name} with authentic first reactions, natural lighting,
+handheld camera following hands. 'This looks amazing!' Genuine excitement.
+Native audio: package sounds, spontaneous reactions, ambient room noise.""",
+        "facebook": """Unboxing experience with {product_name}, casual home setting, genuine first impressions.
+'Let's see what's inside!' Natural reactions. Native audio: package opening sounds,
+authentic commentary."""
+    },
+    "lifestyle": {
+        "tiktok": """Person casually using {product_name} in morning routine, natural home environment,
+authentic lifestyle integration. Handheld camera, natural movement.
+Native audio: ambient morning sounds, brief casual comments.""",
+        "instagram": """Everyday moment with {product_name}, natural setting showing real-life usage,
+casual authentic vibe, gentle camera movement. Native audio: ambient sounds,
+natural environment audio.""",
+        "facebook": """{product_name} integrated into daily life, natural home environment,
+real everyday use showing product naturally. Native audio: ambient home sounds,
+brief natural commentary."""
+    },
+
+    # ===== EDUCATIONAL & TUTORIAL STYLES =====
+    "tutorial": {
+        "tiktok": """Step-by-step tutorial using {product_name}, hands-only demonstration with quick cuts.
+'Here's how to do it!' Fast-paced, educational. Native audio: clear instructions,
+upbeat energy, product interaction sounds.""",
+        "instagram": """Quick how-to guide with {product_name}, hands showing each step clearly.
+'Follow along!' Tutorial style, phone camera. Native audio: friendly teaching voice,
+step callouts, ambient sounds.""",
+        "facebook": """Detailed tutorial demonstrating {product_name} use, hands-on instruction.
+'Let me teach you the right way.' Native audio: patient explanation, product sounds."""
+    },
+    "how_to": {
+        "tiktok": """Quick how-to video, hands using {product_name} to solve a problem.
+'Want to know the trick?' Fast solution reveal. Native audio: excited explanation,
+'aha moment' reactions.""",
+        "instagram": """Problem-solving how-to with {product_name}, hands demonstrating the solution.
+Natural lighting, casual setting. Native audio: helpful tips, product sounds.""",
+        "facebook": """Comprehensive how-to guide using {product_name}, detailed demonstration.
+'Here's the easiest way.' Native audio: clear instructions, ambient sounds."""
+    },
+    "quick_tips": {
+        "tiktok": """Rapid-fire tips using {product_name}, hands showing each hack quickly.
+'Tip #1!' Fast cuts, energetic. Native audio: enthusiastic voiceover, quick callouts.""",
+        "instagram": """Quick tips and tricks with {product_name}, hands demonstrating each one.
+Snappy editing, helpful vibe. Native audio: friendly advice, product interaction.""",
+        "facebook": """Practical tips using {product_name}, hands-on demonstrations.
+'Here are my top tips.' Native audio: helpful commentary, ambient sounds."""
+    },
+
+    # ===== COMPARISON & TRANSFORMATION STYLES =====
+    "before_after": {
+        "tiktok": """Before and after using {product_name}, split screen showing transformation.
+'Watch the difference!' Dramatic reveal. Native audio: excited commentary,
+transition sound effects.""",
+        "instagram": """Transformation with {product_name}, before/after comparison with hands.
+'The results speak for themselves.' Native audio: amazed reactions, ambient sounds.""",
+        "facebook": """Before and after demonstration using {product_name}, clear comparison.
+'See the change for yourself.' Native audio: detailed explanation, product sounds."""
+    },
+    "comparison": {
+        "tiktok": """Side-by-side comparison, hands testing {product_name} vs alternative.
+'Let's compare!' Quick test results. Native audio: objective commentary,
+comparison reactions.""",
+        "instagram": """Product comparison featuring {product_name}, hands showing differences.
+'Which one wins?' Fair test, natural setting. Native audio: honest review, ambient sounds.""",
+        "facebook": """Detailed comparison with {product_name}, hands demonstrating each option.
+'Here's what I found.' Native audio: balanced commentary, product interaction."""
+    },
+    "transformation": {
+        "tiktok": """Amazing transformation using {product_name}, time-lapse style.
+'Wait for it!' Dramatic change reveal. Native audio: buildup music, reveal reactions.""",
+        "instagram": """Product transformation showcase with {product_name}, hands showing progress.
+'The glow up!' Natural lighting. Native audio: excited commentary, ambient sounds.""",
+        "facebook": """Complete transformation using {product_name}, detailed process.
+'From start to finish.' Native audio: narrated journey, product sounds."""
+    },
+
+    # ===== EXPERIENCE & REACTION STYLES =====
+    "first_time": {
+        "tiktok": """First time trying {product_name}, hands opening with genuine curiosity.
+'Let's try this!' Authentic first reactions. Native audio: surprise reactions,
+honest commentary.""",
+        "instagram": """First impressions of {product_name}, hands exploring product naturally.
+'Never tried this before!' Real-time discovery. Native audio: genuine reactions, ambient sounds.""",
+        "facebook": """First-time user experience with {product_name}, hands testing carefully.
+'My honest first impression.' Native audio: unfiltered reactions, product interaction."""
+    },
+    "reaction": {
+        "tiktok": """Real reaction to {product_name} results, hands showing outcome with surprise.
+'I can't believe it!' Genuine shock. Native audio: spontaneous reactions,
+excited exclamations.""",
+        "instagram": """Authentic reaction using {product_name}, hands revealing results.
+'This is insane!' Unscripted response. Native audio: real emotions, ambient sounds.""",
+        "facebook": """Honest reaction to {product_name}, hands demonstrating while responding.
+'Wow, just wow.' Native audio: genuine commentary, product sounds."""
+    },
+    "challenge": {
+        "tiktok": """Challenge accepted with {product_name}, hands attempting trending test.
+'Let's see if it works!' Competitive energy. Native audio: challenge commentary,
+success reactions.""",
+        "instagram": """Product challenge featuring {product_name}, hands following trend.
+'Challenge mode activated!' Fun vibe. Native audio: playful commentary, ambient sounds.""",
+        "facebook": """Testing {product_name} in a challenge, hands showing each step.
+'Can it pass the test?' Native audio: engaging narration, product interaction."""
+    },
+
+    # ===== ROUTINE & INTEGRATION STYLES =====
+    "morning_routine": {
+        "tiktok": """Morning routine with {product_name}, hands incorporating product naturally.
+'5 AM essentials!' Quick cuts, energetic. Native audio: upbeat morning vibes,
+product use sounds.""",
+        "instagram": """Morning ritual featuring {product_name}, hands showing daily integration.
+'Part of my morning.' Golden hour lighting. Native audio: calm morning commentary, ambient sounds.""",
+        "facebook": """Complete morning routine including {product_name}, hands demonstrating flow.
+'How I start my day.' Native audio: relaxed narration, morning ambience."""
+    },
+    "night_routine": {
+        "tiktok": """Night routine with {product_name}, hands winding down with product.
+'PM ritual!' Cozy lighting, relaxed pace. Native audio: calming commentary,
+nighttime ambience.""",
+        "instagram": """Evening routine featuring {product_name}, hands showing nighttime use.
+'Before bed essentials.' Soft lighting. Native audio: soothing voiceover, ambient sounds.""",
+        "facebook": """Nighttime routine with {product_name}, hands demonstrating evening ritual.
+'My nightly must-have.' Native audio: peaceful commentary, product sounds."""
+    },
+    "grwm": {
+        "tiktok": """Get ready with me using {product_name}, hands prepping in real-time.
+'GRWM!' Fast-paced, energetic. Native audio: upbeat commentary, product application sounds.""",
+        "instagram": """GRWM featuring {product_name}, hands getting ready naturally.
+'Come get ready!' Casual vibe. Native audio: chatty commentary, ambient sounds.""",
+        "facebook": """Get ready with me showcasing {product_name}, hands in preparation mode.
+'Join my routine!' Native audio: friendly narration, product interaction."""
+    },
+    "day_in_life": {
+        "tiktok": """Day in the life with {product_name}, hands using product throughout day.
+'24 hours!' Quick montage style. Native audio: voiceover narration, ambient sounds.""",
+        "instagram": """A day with {product_name}, hands showing multiple use moments.
+'From AM to PM.' Natural progression. Native audio: casual commentary, environment sounds.""",
+        "facebook": """Full day featuring {product_name}, hands demonstrating various scenarios.
+'How I use it daily.' Native audio: detailed narration, product sounds."""
+    },
+
+    # ===== SHOWCASE & FEATURE STYLES =====
+    "product_showcase": {
+        "tiktok": """Product showcase of {product_name}, hands highlighting every angle.
+'Check this out!' Dynamic camera movement. Native audio: enthusiastic presentation,
+product details.""",
+        "instagram": """Detailed showcase of {product_name}, hands revealing features slowly.
+'Let me show you everything.' Clean aesthetic. Native audio: thorough commentary, ambient sounds.""",
+        "facebook": """Complete product showcase for {product_name}, hands demonstrating capabilities.
+'Full tour!' Native audio: comprehensive explanation, product interaction."""
+    },
+    "feature_highlight": {
+        "tiktok": """Highlighting best feature of {product_name}, hands focusing on one aspect.
+'This feature though!' Close-up shots. Native audio: excited feature callout,
+demonstration sounds.""",
+        "instagram": """Feature spotlight on {product_name}, hands showing specific benefit.
+'My favorite part!' Focused demonstration. Native audio: detailed feature explanation, ambient sounds.""",
+        "facebook": """Key feature demonstration of {product_name}, hands isolating one element.
+'Here's why it's special.' Native audio: feature-focused commentary, product sounds."""
+    },
+    "results_showcase": {
+        "tiktok": """Results showcase using {product_name}, hands revealing final outcome.
+'The results!' Satisfying reveal. Native audio: amazed commentary,
+success reactions.""",
+        "instagram": """Showing results with {product_name}, hands displaying achievement.
+'Look at this!' Natural lighting. Native audio: proud presentation, ambient sounds.""",
+        "facebook": """Results demonstration using {product_name}, hands proving effectiveness.
+'Here's proof it works.' Native audio: results-focused narration, product sounds."""
+    },
+
+    # ===== PROBLEM-SOLVING STYLES =====
+    "problem_solving": {
+        "tiktok": """Solving a problem with {product_name}, hands showing pain point then solution.
+'Here's the fix!' Quick problem reveal. Native audio: relatable frustration,
+solution excitement.""",
+        "instagram": """Problem to solution using {product_name}, hands demonstrating the answer.
+'Finally found the fix!' Natural progression. Native audio: helpful commentary, ambient sounds.""",
+        "facebook": """Problem-solving demonstration with {product_name}, hands addressing common issue.
+'No more struggles!' Native audio: solution-focused narration, product interaction."""
+    },
+    "hack": {
+        "tiktok": """Product hack using {product_name}, hands showing unexpected use.
+'This hack!' Mind-blown energy. Native audio: excited discovery sharing,
+'you need to try this!' reactions.""",
+        "instagram": """Life hack featuring {product_name}, hands demonstrating clever use.
+'Game changer hack!' Creative application. Native audio: enthusiastic hack reveal, ambient sounds.""",
+        "facebook": """Useful hack with {product_name}, hands showing alternative application.
+'Genius hack alert!' Native audio: detailed hack explanation, product sounds."""
+    },
+    "myth_busting": {
+        "tiktok": """Myth busting with {product_name}, hands testing common misconception.
+'Let's test this myth!' Experiment vibe. Native audio: testing commentary,
+myth reveal reactions.""",
+        "instagram": """Busting myths about {product_name}, hands proving facts.
+'Truth time!' Evidence-based demonstration. Native audio: factual commentary, ambient sounds.""",
+        "facebook": """Myth vs reality using {product_name}, hands showing actual performance.
+'Setting the record straight.' Native audio: honest testing narration, product interaction."""
+    },
+
+    # ===== HAUL & COLLECTION STYLES =====
+    "haul": {
+        "tiktok": """Product haul featuring {product_name}, hands showing acquisition excitement.
+'New haul!' Fast reveals, high energy. Native audio: shopping excitement,
+package opening sounds.""",
+        "instagram": """Shopping haul with {product_name}, hands displaying new purchase.
+'What I got!' Satisfying unpack. Native audio: haul commentary, ambient sounds.""",
+        "facebook": """Product haul showcasing {product_name}, hands revealing shopping results.
+'Haul time!' Native audio: purchase story, product sounds."""
+    },
+    "favorites": {
+        "tiktok": """Current favorites featuring {product_name}, hands showing top pick.
+'My fave!' Quick highlights. Native audio: enthusiastic endorsement,
+favorite callouts.""",
+        "instagram": """Favorite products including {product_name}, hands demonstrating why it's loved.
+'All-time favorite!' Genuine appreciation. Native audio: heartfelt commentary, ambient sounds.""",
+        "facebook": """Top favorites with {product_name}, hands explaining preference.
+'Why I love this.' Native audio: detailed favorite explanation, product interaction."""
+    },
+    "must_haves": {
+        "tiktok": """Must-have products featuring {product_name}, hands showing essentials.
+'You NEED this!' Urgent energy. Native audio: must-have emphasis,
+convincing commentary.""",
+        "instagram": """Essential must-haves with {product_name}, hands displaying necessities.
+'Can't live without!' Strong recommendation. Native audio: passionate endorsement, ambient sounds.""",
+        "facebook": """Must-have demonstration of {product_name}, hands proving necessity.
+'Absolute essential!' Native audio: necessity-focused narration, product sounds."""
+    },
+
+    # ===== REVIEW & OPINION STYLES =====
+    "honest_review": {
+        "tiktok": """Brutally honest review of {product_name}, hands showing real testing.
+'The truth!' No-filter approach. Native audio: candid commentary,
+honest reactions.""",
+        "instagram": """Honest review of {product_name}, hands demonstrating actual experience.
+'My real thoughts.' Authentic testing. Native audio: unbiased commentary, ambient sounds.""",
+        "facebook": """Comprehensive honest review using {product_name}, hands showing pros and cons.
+'Here's what you should know.' Native audio: balanced review narration, product interaction."""
+    },
+    "worth_it": {
+        "tiktok": """Is it worth it? Testing {product_name}, hands showing value assessment.
+'Worth the hype?' Value test. Native audio: skeptical then convinced commentary,
+verdict reactions.""",
+        "instagram": """Worth it or not with {product_name}, hands evaluating value.
+'Let's find out!' Fair assessment. Native audio: value-focused commentary, ambient sounds.""",
+        "facebook": """Worth it review of {product_name}, hands demonstrating cost-benefit.
+'My verdict.' Native audio: value analysis narration, product sounds."""
+    },
+    "hype_test": {
+        "tiktok": """Testing the hype around {product_name}, hands putting claims to test.
+'Does it live up?' Skeptical energy. Native audio: testing commentary,
+hype validation reactions.""",
+        "instagram": """Hype test for {product_name}, hands verifying viral claims.
+'Is the hype real?' Honest testing. Native audio: fair assessment commentary, ambient sounds.""",
+        "facebook": """Testing {product_name} hype, hands demonstrating actual performance.
+'Separating hype from reality.' Native audio: objective testing narration, product interaction."""
+    },
+
+    # ===== INSTALLATION & SETUP STYLES =====
+    "setup": {
+        "tiktok": """Quick setup of {product_name}, hands showing easy installation.
+'Setup in seconds!' Fast assembly. Native audio: setup instructions,
+completion satisfaction.""",
+        "instagram": """Setting up {product_name}, hands demonstrating installation process.
+'Easy setup!' Step-by-step. Native audio: helpful setup guide, ambient sounds.""",
+        "facebook": """Complete setup guide for {product_name}, hands showing full installation.
+'How to set it up.' Native audio: detailed setup narration, product sounds."""
+    },
+    "installation": {
+        "tiktok": """Installing {product_name}, hands showing mounting/assembly.
+'Installation time!' DIY energy. Native audio: installation commentary,
+tool sounds.""",
+        "instagram": """Installation process with {product_name}, hands demonstrating placement.
+'Let me install this!' Hands-on approach. Native audio: installation tips, ambient sounds.""",
+        "facebook": """Full installation of {product_name}, hands showing complete process.
+'Installation guide.' Native audio: thorough installation narration, product interaction."""
+    },
+    "maintenance": {
+        "tiktok": """Maintaining {product_name}, hands showing care routine.
+'Keep it fresh!' Maintenance tips. Native audio: care instructions,
+cleaning sounds.""",
+        "instagram": """Product maintenance for {product_name}, hands demonstrating upkeep.
+'How I care for it.' Regular maintenance. Native audio: care commentary, ambient sounds.""",
+        "facebook": """Maintenance guide for {product_name}, hands showing proper care.
+'Maintenance made easy.' Native audio: care routine narration, product sounds."""
+    },
+
+    # ===== TREND & VIRAL STYLES =====
+    "trending": {
+        "tiktok": """Trending use of {product_name}, hands following viral format.
+'On trend!' Viral energy. Native audio: trend audio overlay,
+participation excitement.""",
+        "instagram": """Trending content with {product_name}, hands joining popular format.
+'Hopping on the trend!' Current vibe. Native audio: trend-aware commentary, ambient sounds.""",
+        "facebook": """Trending demonstration of {product_name}, hands showing popular use.
+'What's trending.' Native audio: trend explanation narration, product interaction."""
+    },
+    "viral": {
+        "tiktok": """Viral moment with {product_name}, hands recreating viral sensation.
+'Going viral!' High energy. Native audio: viral audio snippet,
+excited participation.""",
+        "instagram": """Viral product moment featuring {product_name}, hands showing why it's viral.
+'Viral for a reason!' Shareable content. Native audio: viral context commentary, ambient sounds.""",
+        "facebook": """Viral demonstration using {product_name}, hands explaining viral appeal.
+'Why everyone's talking about this.' Native audio: viral analysis narration, product sounds."""
+    },
+    "duet_response": {
+        "tiktok": """Duet response using {product_name}, hands showing reaction/addition.
+'Duet this!' Interactive energy. Native audio: response commentary,
+interaction sounds.""",
+        "instagram": """Response video with {product_name}, hands adding to conversation.
+'My take!' Conversation participation. Native audio: response commentary, ambient sounds.""",
+        "facebook": """Video response featuring {product_name}, hands demonstrating answer.
+'Here's my response.' Native audio: response narration, product interaction."""
+    },
+
+    # ===== SEASONAL & OCCASION STYLES =====
+    "seasonal": {
+        "tiktok": """Seasonal use of {product_name}, hands showing timely application.
+'Perfect for [season]!' Seasonal energy. Native audio: seasonal commentary,
+relevant ambience.""",
+        "instagram": """Seasonal showcase with {product_name}, hands demonstrating seasonal fit.
+'[Season] essential!' Time-appropriate. Native audio: seasonal context, ambient sounds.""",
+        "facebook": """Seasonal demonstration using {product_name}, hands showing occasion use.
+'Just in time for [season].' Native audio: seasonal narration, product sounds."""
+    },
+    "holiday": {
+        "tiktok": """Holiday special featuring {product_name}, hands showing festive use.
+'Holiday must-have!' Festive vibes. Native audio: holiday excitement,
+celebration sounds.""",
+        "instagram": """Holiday content with {product_name}, hands demonstrating festive application.
+'Holiday edition!' Celebratory mood. Native audio: holiday commentary, ambient sounds.""",
+        "facebook": """Holiday demonstration using {product_name}, hands showing seasonal gift.
+'Perfect holiday gift!' Native audio: festive narration, product interaction."""
+    },
+    "gift_guide": {
+        "tiktok": """Gift guide featuring {product_name}, hands showing perfect gift.
+'Gift idea!' Gifting excitement. Native audio: gift suggestion commentary,
+wrapping sounds.""",
+        "instagram": """Gift recommendation with {product_name}, hands presenting as ideal gift.
+'Great gift alert!' Thoughtful presentation. Native audio: gift commentary, ambient sounds.""",
+        "facebook": """Gift guide showcasing {product_name}, hands demonstrating gift appeal.
+'Gift guide favorite.' Native audio: gift explanation narration, product sounds."""
+    },
+
+    # ===== BEHIND-THE-SCENES & AUTHENTIC STYLES =====
+    "behind_scenes": {
+        "tiktok": """Behind the scenes with {product_name}, hands showing real usage off-camera.
+'BTS!' Authentic peek. Native audio: candid commentary,
+real-life sounds.""",
+        "instagram": """Behind-the-scenes featuring {product_name}, hands in natural workflow.
+'What you don't see!' Raw authenticity. Native audio: honest BTS commentary, ambient sounds.""",
+        "facebook": """BTS demonstration with {product_name}, hands showing actual use.
+'The real story.' Native audio: authentic narration, product interaction."""
+    },
+    "real_talk": {
+        "tiktok": """Real talk about {product_name}, hands showing while being honest.
+'Let's be real!' No filter energy. Native audio: candid honest commentary,
+real reactions.""",
+        "instagram": """Real talk featuring {product_name}, hands demonstrating with honesty.
+'The honest truth!' Authentic conversation. Native audio: real talk commentary, ambient sounds.""",
+        "facebook": """Real talk review of {product_name}, hands showing genuine experience.
+'Being completely honest.' Native audio: truthful narration, product sounds."""
+    },
+    "unpopular_opinion": {
+        "tiktok": """Unpopular opinion on {product_name}, hands showing controversial take.
+'Hot take!' Bold energy. Native audio: confident opinion sharing,
+debate-worthy reactions.""",
+        "instagram": """Unpopular opinion about {product_name}, hands demonstrating unique view.
+'Might be unpopular but...' Honest perspective. Native audio: opinion commentary, ambient sounds.""",
+        "facebook": """Unpopular opinion review using {product_name}, hands proving point.
+'My unpopular take.' Native audio: opinion explanation narration, product interaction."""
+    },
+
+    # ===== EDUCATIONAL DEEP-DIVE STYLES =====
+    "explainer": {
+        "tiktok": """Quick explainer on {product_name}, hands showing how it works.
+'Let me explain!' Educational energy. Native audio: clear explanation,
+teaching tone.""",
+        "instagram": """Explainer video for {product_name}, hands demonstrating mechanics.
+'Here's how!' Educational approach. Native audio: informative commentary, ambient sounds.""",
+        "facebook": """Detailed explainer using {product_name}, hands showing inner workings.
+'Understanding [product].' Native audio: thorough explanation narration, product sounds."""
+    },
+    "science_behind": {
+        "tiktok": """The science behind {product_name}, hands showing technical aspects.
+'Science time!' Educational but fun. Native audio: simplified science explanation,
+'aha' reactions.""",
+        "instagram": """Science explanation for {product_name}, hands demonstrating principles.
+'The science!' Informative content. Native audio: educational commentary, ambient sounds.""",
+        "facebook": """Science behind {product_name}, hands showing technical demonstration.
+'How it actually works.' Native audio: scientific narration, product interaction."""
+    },
+    "ingredients_breakdown": {
+        "tiktok": """Ingredients breakdown of {product_name}, hands showing what's inside.
+'What's in it?' Transparency focus. Native audio: ingredient callouts,
+education commentary.""",
+        "instagram": """Ingredient analysis for {product_name}, hands highlighting components.
+'Breaking down ingredients!' Informed content. Native audio: ingredient commentary, ambient sounds.""",
+        "facebook": """Complete ingredients breakdown using {product_name}, hands showing details.
+'Ingredient deep dive.' Native audio: ingredient explanation narration, product sounds."""
+    },
+
+    # ===== SPECIALTY & NICHE STYLES =====
+    "asmr": {
+        "tiktok": """ASMR unboxing of {product_name}, hands moving slowly with product.
+'ASMR vibes!' Whisper-quiet energy. Native audio: soft whispers, product sounds amplified,
+crinkling, tapping.""",
+        "instagram": """ASMR product experience with {product_name}, hands exploring textures.
+'Satisfying sounds!' Gentle movements. Native audio: whispered commentary, enhanced product sounds.""",
+        "facebook": """ASMR demonstration using {product_name}, hands creating relaxing sounds.
+'ASMR edition.' Native audio: soft-spoken narration, amplified product interaction."""
+    },
+    "pov": {
+        "tiktok": """POV using {product_name}, hands showing first-person perspective.
+'POV:' Immersive angle. Native audio: situational commentary,
+first-person reactions.""",
+        "instagram": """POV content with {product_name}, hands from user perspective.
+'POV experience!' Personal viewpoint. Native audio: POV narration, ambient sounds.""",
+        "facebook": """POV demonstration of {product_name}, hands showing personal angle.
+'From my POV.' Native audio: first-person narration, product interaction."""
+    },
+    "satisfying": {
+        "tiktok": """Oddly satisfying {product_name} moment, hands creating perfect action.
+'So satisfying!' Perfect execution. Native audio: satisfying sound emphasis,
+completion reactions.""",
+        "instagram": """Satisfying content featuring {product_name}, hands in perfect motion.
+'Satisfying to watch!' Visual pleasure. Native audio: satisfaction commentary, ambient sounds.""",
+        "facebook": """Satisfying demonstration with {product_name}, hands showing perfect result.
+'Perfectly satisfying.' Native audio: satisfaction narration, product sounds."""
+    },
+    "minimalist": {
+        "tiktok": """Minimalist approach to {product_name}, hands showing simple use.
+'Keep it simple!' Clean aesthetic. Native audio: minimal commentary,
+essential sounds only.""",
+        "instagram": """Minimalist showcase of {product_name}, hands in clean presentation.
+'Less is more!' Simple elegance. Native audio: quiet commentary, ambient sounds.""",
+        "facebook": """Minimalist demonstration using {product_name}, hands showing essentials.
+'Minimalist lifestyle.' Native audio: simple narration, product sounds."""
+    },
+    "luxury": {
+        "tiktok": """Luxury unboxing of {product_name}, hands treating product preciously.
+'Luxury vibes!' Premium feel. Native audio: appreciative commentary,
+elegant ambience.""",
+        "instagram": """Luxury experience with {product_name}, hands showcasing premium quality.
+'Luxury edition!' High-end presentation. Native audio: sophisticated commentary, ambient sounds.""",
+        "facebook": """Luxury demonstration of {product_name}, hands highlighting premium features.
+'Premium experience.' Native audio: luxury-focused narration, product interaction."""
+    },
+    "budget_friendly": {
+        "tiktok": """Budget-friendly option {product_name}, hands showing affordable value.
+'Budget win!' Value excitement. Native audio: price-conscious commentary,
+savings celebration.""",
+        "instagram": """Budget-friendly showcase of {product_name}, hands demonstrating affordability.
+'Affordable find!' Value content. Native audio: budget commentary, ambient sounds.""",
+        "facebook": """Budget-friendly review using {product_name}, hands proving value.
+'Won't break the bank.' Native audio: value-focused narration, product sounds."""
+    }
+}
+
+
+# ============================================================================
+# COMPILED TEMPLATES + STORE
+# ============================================================================
+
+class CompiledTemplate:
+    """Template text split once into literal parts and field slots."""
+
+    __slots__ = ("parts",)
+
+    def __init__(self, text: str):
+        # Even indices are literal text, odd indices are field names
+        self.parts: Tuple[str, ...] = tuple(_FIELD.split(text))
+
+    def render(self, **fields) -> str:
+        parts = list(self.parts)
+        for i in range(1, len(parts), 2):
+            value = fields.get(parts[i])
+            parts[i] = "{" + parts[i] + "}" if value is None else str(value)
+        return "".join(parts)
+
+
+@dataclass
+class UGCTemplate:
+    """One indexed UGC style."""
+    style: str
+    platforms: Dict[str, str]
+    execution_approach: str = ""
+    source: str = "default"         # "base", "expert" or "default"
+
+
+def _index_defaults() -> Dict[str, UGCTemplate]:
+    return {
+        style: UGCTemplate(style=style, platforms=dict(platforms))
+        for style, platforms in DEFAULT_UGC_TEMPLATES.items()
+    }
+
+
+def _index_file(data: dict) -> Dict[str, UGCTemplate]:
+    """Index base + expert templates that carry platform_optimized text."""
+    index = {}
+    for section, source in (("base_templates", "base"), ("expert_optimized_templates", "expert")):
+        templates = data.get(section)
+        if not isinstance(templates, dict):
+            continue
+        for style, template in templates.items():
+            # Skip metadata fields (non-dictionary values)
+            if not isinstance(template, dict):
+                continue
+            platforms = template.get("platform_optimized")
+            if not isinstance(platforms, dict):
+                print(f"⚠️  Template '{style}' missing platform_optimized, skipping", file=sys.stderr)
+                continue
+            index[style] = UGCTemplate(
+                style=style,
+                platforms={platform: platforms.get(platform, "") for platform in PLATFORMS},
+                execution_approach=template.get("execution_approach", ""),
+                source=source
+            )
+    return index
+
+
+class UGCTemplateStore:
+    """Indexed UGC templates with mtime-based reload and lazily compiled renders."""
+
+    def __init__(self, path: Path = TEMPLATE_PATH):
+        self.path = Path(path)
+        self._mtime: Optional[int] = None
+        self._index: Dict[str, UGCTemplate] = {}
+        self._compiled: Dict[Tuple[str, str], CompiledTemplate] = {}
+        self.source = "defaults"
+        self.version = 0
+        self.loads = 0
+
+    def _refresh(self):
+        """Re-index when the template file appears, disappears or changes."""
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+
+        if self._index and mtime == self._mtime:
+            return
+
+        if mtime is not None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    index = _index_file(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Error loading UGC templates: {e}", file=sys.stderr)
+                if self._index:
+                    return  # Keep serving the last good templates; retry on the next call
+                index = {}
+            if index:
+                self._install(index, "file", mtime)
+                print(f"✅ Loaded {len(index)} UGC styles from memory/ugc_prompt_templates.json", file=sys.stderr)
+                return
+
+        print(f"⚠️  UGC templates not found at {self.path}, using built-in defaults", file=sys.stderr)
+        self._install(_index_defaults(), "defaults", mtime)
+
+    def _install(self, index: Dict[str, UGCTemplate], source: str, mtime: Optional[int]):
+        self._index = index
+        self._compiled.clear()
+        self._mtime = mtime
+        self.source = source
+        self.version += 1
+        self.loads += 1
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def styles(self) -> List[str]:
+        self._refresh()
+        return sorted(self._index)
+
+    def get(self, style: str) -> UGCTemplate:
+        """Indexed template for a style (raises ValueError for unknown styles)."""
+        self._refresh()
+        template = self._index.get(style)
+        if template is None:
+            raise ValueError(f"Unknown UGC style '{style}'. Available: {', '.join(sorted(self._index))}")
+        return template
+
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+
+    def render(self, style: str, platform: str, **fields) -> str:
+        """Platform text for a style, with placeholders filled (unknown platforms use tiktok)."""
+        template = self.get(style)
+        if not template.platforms.get(platform):
+            platform = "tiktok"
+
+        compiled = self._compiled.get((style, platform))
+        if compiled is None:
+            compiled = CompiledTemplate(template.platforms.get(platform, ""))
+            self._compiled[(style, platform)] = compiled
+        return compiled.render(**fields)
+
+    def render_sora_prompt(
+        self,
+        style: str,
+        platform: str,
+        product_name: str,
+        icp: Optional[str] = None,
+        product_features: Optional[str] = None,
+        video_setting: Optional[str] = None,
+        additional_instructions: Optional[str] = None
+    ) -> str:
+        """Sora-optimized UGC prompt (no native audio) for a style and platform."""
+        platform_desc = self.render(style, platform, product_name=product_name)
+        execution = self.get(style).execution_approach
+
+        # Start building prompt
+        prompt = f"UGC-STYLE VIDEO ({style.upper()}):\n\n"
+        prompt += f"{platform_desc}\n\n"
+        prompt += f"PRODUCT: {product_name}\n\n"
+
+        if icp:
+            prompt += f"TARGET AUDIENCE: {icp}\n\n"
+
+        if product_features:
+            prompt += f"KEY FEATURES: {product_features}\n\n"
+
+        if video_setting:
+            prompt += f"SETTING: {video_setting}\n\n"
+
+        prompt += f"EXECUTION: {execution}\n\n"
+        prompt += "AUTHENTICITY REQUIREMENTS:\n"
+        prompt += "- Handheld camera feel (natural shake, not stabilized)\n"
+        prompt += "- Natural lighting (window light, outdoor, no studio)\n"
+        prompt += "- Casual settings (home, kitchen, outdoors, everyday)\n"
+        prompt += "- Real people vibe (casual clothes, relatable environment)\n"
+        prompt += "- NO professional production, NO perfect lighting\n"
+        prompt += "- NO corporate polish (authentic > perfect)\n"
+
+        # Append custom prompt if provided (combine UGC template + custom instructions)
+        if additional_instructions:
+            prompt += f"\n\nADDITIONAL INSTRUCTIONS:\n{additional_instructions}\n"
+
+        return prompt
+
+    def stats(self) -> Dict[str, object]:
+        self._refresh()
+        return {
+            "source": self.source,
+            "styles": len(self._index),
+            "compiled": len(self._compiled),
+            "version": self.version,
+            "loads": self.loads,
+        }
+
+
+if __name__ == '__main__':
+    if "--benchmark" not in sys.argv:
+        print("Usage: python ugc_templates.py --benchmark")
+        sys.exit(0)
+
+    store = UGCTemplateStore()
+    style = store.styles()[0]
+    iterations = 10000
+
+    cold = timeit.timeit(lambda: CompiledTemplate(store.get(style).platforms["tiktok"]), number=iterations)
+    warm = timeit.timeit(lambda: store.render(style, "tiktok", product_name="Glow Serum"), number=iterations)
+    sora = timeit.timeit(
+        lambda: store.render_sora_prompt(style, "tiktok", "Glow Serum", icp="Women 25-35"),
+        number=iterations
+    )
+
+    print(f"UGC template render benchmark ({store.source}, {len(store.styles())} styles, style '{style}')")
+    print(f"  compile template:     {cold / iterations * 1e6:8.2f} µs")
+    print(f"  render (compiled):    {warm / iterations * 1e6:8.2f} µs")
+    print(f"  render_sora_prompt:   {sora / iterations * 1e6:8.2f} µs")
@@ -13,22 +13,47 @@ Usage:
         file_name="My Presentation.pptx",
         folder_id="1QkAUOP9v4u3DugZjVcYUnaiT7pitN3sv"
     )
+
+Many files at once (concurrent resumable uploads, per-chunk retries):
+    from tools.upload_to_drive import upload_many
+
+    batch = asyncio.run(upload_many(["deck.pptx", "ad.mp4"], folder_id="..."))
+    print(batch.throughput_mbps, [r.web_view_link for r in batch.results])
+
+Credentials and the Drive service are built once per process (not per upload) and
+the OAuth token is refreshed in the background shortly before it expires.
+
+Configuration (MARKETING_TEAM/.env, optional):
+- MARKETING_DRIVE_UPLOAD_CONCURRENCY: files uploaded at once by upload_many (default: 4)
+- MARKETING_DRIVE_CHUNK_MB: resumable chunk size, rounded to 256 KB (default: 8)
+- MARKETING_DRIVE_CHUNK_RETRIES: retries per file for failed chunks (default: 5)
 """
 
+import asyncio
 import os
 import pickle
-from typing import Dict, Optional
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Union
 from pathlib import Path
 
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
-
 # Scopes for Google Drive
 SCOPES = ['https://www.googleapis.com/auth/drive']
 
+TOKEN_PATH = 'token_drive.pickle'  # Separate token for Drive operations
+
+DRIVE_UPLOAD_URL = "https://www.googleapis.com/upload/drive/v3/files"
+
+# Resumable chunks must be multiples of 256 KB (except the last)
+CHUNK_ALIGNMENT = 256 * 1024
+
+# Refresh the token this long before it expires
+REFRESH_MARGIN_SECONDS = 300
+
 # Common MIME types
 MIME_TYPES = {
     '.pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
@@ -45,30 +70,130 @@ MIME_TYPES = {
 }
 
 
-def get_drive_service():
-    """Authenticate and return Google Drive service."""
-    creds = None
-    token_path = 'token_drive.pickle'  # Separate token for Drive operations
-
-    # Load existing credentials
-    if os.path.exists(token_path):
-        with open(token_path, 'rb') as token:
-            creds = pickle.load(token)
-
-    # Refresh or get new credentials
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+# ----------------------------------------------------------------------
+# Process-level credentials and service
+# ----------------------------------------------------------------------
+
+_lock = threading.RLock()          # Credentials and token refreshes
+_service_lock = threading.Lock()   # The shared Drive service (httplib2 isn't thread-safe)
+_creds = None
+_service = None
+_refresh_timer: Optional[threading.Timer] = None
+
+
+def _save_token(creds):
+    with open(TOKEN_PATH, 'wb') as token:
+        pickle.dump(creds, token)
+
+
+def _seconds_until_expiry(creds) -> Optional[float]:
+    expiry = getattr(creds, "expiry", None)  # google-auth uses naive UTC datetimes
+    if expiry is None:
+        return None
+    if expiry.tzinfo is None:
+        expiry = expiry.replace(tzinfo=timezone.utc)
+    return (expiry - datetime.now(timezone.utc)).total_seconds()
+
+
+def _expires_soon(creds) -> bool:
+    seconds_left = _seconds_until_expiry(creds)
+    return seconds_left is not None and seconds_left < REFRESH_MARGIN_SECONDS
+
+
+def _schedule_refresh(creds):
+    """Refresh the token in a daemon thread shortly before it expires."""
+    global _refresh_timer
+    seconds_left = _seconds_until_expiry(creds)
+    if seconds_left is None or not getattr(creds, "refresh_token", None):
+        return
+    delay = max(seconds_left - REFRESH_MARGIN_SECONDS, 30.0)
+    if _refresh_timer is not None:
+        _refresh_timer.cancel()
+    _refresh_timer = threading.Timer(delay, _background_refresh)
+    _refresh_timer.daemon = True
+    _refresh_timer.start()
+
+
+def _background_refresh():
+    global _refresh_timer
+    with _lock:
+        creds = _creds
+        if creds is None:
+            return
+        try:
+            from google.auth.transport.requests import Request
             creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(
-                'credentials.json', SCOPES)
-            creds = flow.run_local_server(port=0)
+            _save_token(creds)
+        except Exception as e:
+            print(f"⚠️  Drive token refresh failed (retrying in 60s): {e}", file=sys.stderr)
+            _refresh_timer = threading.Timer(60.0, _background_refresh)
+            _refresh_timer.daemon = True
+            _refresh_timer.start()
+            return
+        _schedule_refresh(creds)
+
+
+def get_credentials():
+    """Return valid Drive OAuth credentials (loaded once per process, refreshed as needed)."""
+    global _creds
+    from google.auth.transport.requests import Request
+
+    with _lock:
+        creds = _creds
+        if creds is None and os.path.exists(TOKEN_PATH):
+            # Load existing credentials
+            with open(TOKEN_PATH, 'rb') as token:
+                creds = pickle.load(token)
+
+        # Refresh or get new credentials
+        if not creds or not creds.valid or _expires_soon(creds):
+            if creds and creds.refresh_token:
+                creds.refresh(Request())
+            else:
+                from google_auth_oauthlib.flow import InstalledAppFlow
+                flow = InstalledAppFlow.from_client_secrets_file(
+                    'credentials.json', SCOPES)
+                creds = flow.run_local_server(port=0)
+
+            # Save credentials
+            _save_token(creds)
+
+        if creds is not _creds:
+            _creds = creds
+            _schedule_refresh(creds)
+        return creds
 
-        # Save credentials
-        with open(token_path, 'wb') as token:
-            pickle.dump(creds, token)
 
-    return build('drive', 'v3', credentials=creds)
+def get_drive_service():
+    """Authenticate and return the Google Drive service (built once per process)."""
+    global _service
+    with _lock:
+        creds = get_credentials()
+        if _service is None:
+            from googleapiclient.discovery import build
+            # The same credentials object is refreshed in place, so the service stays valid
+            _service = build('drive', 'v3', credentials=creds, cache_discovery=False)
+        return _service
+
+
+def _access_token() -> str:
+    return get_credentials().token
+
+
+def _refresh_access_token():
+    """Force a refresh after Drive rejects the cached token (401)."""
+    from google.auth.transport.requests import Request
+    with _lock:
+        creds = get_credentials()
+        creds.refresh(Request())
+        _save_token(creds)
 
 
 def detect_mime_type(file_path: str) -> str:
@@ -99,6 +224,8 @@ def upload_to_drive(
         FileNotFoundError: If file_path doesn't exist
         Exception: If upload fails
     """
+    from googleapiclient.http import MediaFileUpload
+
     # Validate file exists
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
@@ -120,15 +247,17 @@ def upload_to_drive(
     media = MediaFileUpload(
         file_path,
         mimetype=mime_type,
+        chunksize=_chunk_size(),
         resumable=True
     )
 
-    # Upload file
-    file = service.files().create(
-        body=file_metadata,
-        media_body=media,
-        fields='id, name, webViewLink'
-    ).execute()
+    # Upload file (the shared service isn't thread-safe; credentials stay available meanwhile)
+    with _service_lock:
+        file = service.files().create(
+            body=file_metadata,
+            media_body=media,
+            fields='id, name, webViewLink'
+        ).execute()
 
     return {
         'file_id': file.get('id'),
@@ -137,6 +266,266 @@ def upload_to_drive(
     }
 
 
+# ----------------------------------------------------------------------
+# Concurrent resumable uploads
+# ----------------------------------------------------------------------
+
+class UploadError(Exception):
+    """A resumable upload failed (after its chunk retries, or with a non-retryable status)."""
+
+
+@dataclass
+class UploadResult:
+    """Outcome of one file in upload_many."""
+    file_path: str
+    file_name: str
+    bytes: int = 0
+    file_id: Optional[str] = None
+    web_view_link: Optional[str] = None
+    seconds: float = 0.0
+    chunk_retries: int = 0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.file_id is not None
+
+    @property
+    def throughput_mbps(self) -> float:
+        return round(self.bytes / (1024 * 1024) / self.seconds, 2) if self.seconds else 0.0
+
+
+@dataclass
+class UploadBatch:
+    results: List[UploadResult] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def bytes(self) -> int:
+        return sum(r.bytes for r in self.results if r.ok)
+
+    @property
+    def throughput_mbps(self) -> float:
+        """Aggregate MB/s across all concurrent uploads (wall clock)."""
+        return round(self.bytes / (1024 * 1024) / self.seconds, 2) if self.seconds else 0.0
+
+
+def _chunk_size(chunk_size: Optional[int] = None) -> int:
+    size = chunk_size or _env_int("MARKETING_DRIVE_CHUNK_MB", 8) * 1024 * 1024
+    return max(size // CHUNK_ALIGNMENT, 1) * CHUNK_ALIGNMENT
+
+
+def _committed_offset(response) -> int:
+    # 308 Resume Incomplete: "Range: bytes=0-N" means N + 1 bytes are stored
+    committed = response.headers.get("range")
+    return int(committed.rsplit("-", 1)[1]) + 1 if committed else 0
+
+
+def _retryable(status: int) -> bool:
+    return status == 429 or status >= 500
+
+
+def _read_chunk(path: str, offset: int, size: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(size)
+
+
+async def _resumable_upload(
+    client,
+    result: UploadResult,
+    mime_type: str,
+    folder_id: str,
+    upload_url: str,
+    token_provider: Callable[[], str],
+    chunk_size: int,
+    max_retries: int,
+    on_unauthorized: Optional[Callable[[], None]]
+):
+    total = result.bytes
+
+    async def unauthorized():
+        if on_unauthorized is not None:
+            await asyncio.to_thread(on_unauthorized)
+        await backoff()
+
+    async def backoff():
+        result.chunk_retries += 1
+        if result.chunk_retries > max_retries:
+            raise UploadError(f"gave up after {max_retries} retries")
+        await asyncio.sleep(random.uniform(0, min(0.25 * 2 ** result.chunk_retries, 8.0)))
+
+    async def headers(extra: Dict[str, str]) -> Dict[str, str]:
+        # May load or refresh credentials (blocking I/O), so never on the event loop
+        token = await asyncio.to_thread(token_provider)
+        return {"Authorization": f"Bearer {token}", **extra}
+
+    # 1. Start a resumable session (metadata only)
+    while True:
+        try:
+            response = await client.post(
+                upload_url,
+                params={"uploadType": "resumable", "fields": "id,name,webViewLink", "supportsAllDrives": "true"},
+                headers=await headers({
+                    "X-Upload-Content-Type": mime_type,
+                    "X-Upload-Content-Length": str(total),
+                }),
+                json={"name": result.file_name, "parents": [folder_id]}
+            )
+        except Exception as e:  # Transport error (httpx.TransportError)
+            if not _is_transport_error(e):
+                raise
+            await backoff()
+            continue
+        if response.status_code == 200 and response.headers.get("location"):
+            session = response.headers["location"]
+            break
+        if response.status_code == 401:
+            await unauthorized()
+            continue
+        if _retryable(response.status_code):
+            await backoff()
+            continue
+        raise UploadError(f"starting upload failed ({response.status_code}): {response.text[:200]}")
+
+    # 2. Send chunks; on failure ask the session how much it has and resume from there
+    offset = 0
+    while True:
+        try:
+            if total == 0:
+                response = await client.put(session, headers=await headers({"Content-Range": "bytes */0"}), content=b"")
+            else:
+                chunk = await asyncio.to_thread(_read_chunk, result.file_path, offset, chunk_size)
+                end = offset + len(chunk) - 1
+                response = await client.put(
+                    session,
+                    headers=await headers({"Content-Range": f"bytes {offset}-{end}/{total}"}),
+                    content=chunk
+                )
+        except Exception as e:
+            if not _is_transport_error(e):
+                raise
+            response = None
+
+        if response is not None and response.status_code in (200, 201):
+            file = response.json()
+            result.file_id, result.web_view_link = file.get("id"), file.get("webViewLink")
+            return
+        if response is not None and response.status_code == 308:
+            offset = _committed_offset(response)
+            continue
+        if response is not None and not (_retryable(response.status_code) or response.status_code == 401):
+            raise UploadError(f"chunk at byte {offset} failed ({response.status_code}): {response.text[:200]}")
+
+        # Retryable: back off, then query the session for the committed offset
+        if response is not None and response.status_code == 401:
+            await unauthorized()
+        else:
+            await backoff()
+        try:
+            status = await client.put(session, headers=await headers({"Content-Range": f"bytes */{total}"}), content=b"")
+        except Exception as e:
+            if not _is_transport_error(e):
+                raise
+            continue  # Resend from the last known offset
+        if status.status_code in (200, 201):
+            file = status.json()
+            result.file_id, result.web_view_link = file.get("id"), file.get("webViewLink")
+            return
+        if status.status_code == 308:
+            offset = _committed_offset(status)
+        elif status.status_code in (404, 410):
+            raise UploadError("upload session expired")
+
+
+def _is_transport_error(error: Exception) -> bool:
+    import httpx
+    return isinstance(error, httpx.TransportError)
+
+
+async def upload_many(
+    files: Sequence[Union[str, Path, Dict[str, str]]],
+    folder_id: str,
+    concurrency: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    max_retries: Optional[int] = None,
+    token_provider: Optional[Callable[[], str]] = None,
+    upload_url: str = DRIVE_UPLOAD_URL,
+    client=None,
+    on_progress: Optional[Callable[[int, int, UploadResult], None]] = None
+) -> UploadBatch:
+    """
+    Upload many files to one Drive folder concurrently (resumable, chunk retries).
+
+    Args:
+        files: Paths, or dicts with file_path and optional file_name / mime_type
+        folder_id: Google Drive folder ID
+        concurrency: Files in flight at once (default: MARKETING_DRIVE_UPLOAD_CONCURRENCY)
+        chunk_size: Bytes per chunk, rounded to 256 KB (default: MARKETING_DRIVE_CHUNK_MB)
+        max_retries: Failed chunk/session requests retried per file (default: MARKETING_DRIVE_CHUNK_RETRIES)
+        token_provider: Returns an OAuth access token, called in a worker thread since it may
+                        refresh credentials (default: this process's Drive credentials)
+        upload_url: Drive upload endpoint (override for a local fake in tests)
+        client: httpx.AsyncClient to use (default: a pooled client for this batch)
+        on_progress: Called as (finished_count, total, result) when each file finishes
+
+    Returns:
+        UploadBatch with one UploadResult per file, in input order (check .ok / .error)
+    """
+    import httpx
+
+    concurrency = max(concurrency or _env_int("MARKETING_DRIVE_UPLOAD_CONCURRENCY", 4), 1)
+    chunk_size = _chunk_size(chunk_size)
+    max_retries = max_retries if max_retries is not None else _env_int("MARKETING_DRIVE_CHUNK_RETRIES", 5)
+    token_provider = token_provider or _access_token
+
+    specs = [spec if isinstance(spec, dict) else {"file_path": str(spec)} for spec in files]
+    batch = UploadBatch(results=[
+        UploadResult(file_path=str(spec["file_path"]), file_name=spec.get("file_name") or Path(spec["file_path"]).name)
+        for spec in specs
+    ])
+    semaphore = asyncio.Semaphore(concurrency)
+    finished = 0
+
+    own_client = client is None
+    if own_client:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(120.0, connect=15.0),
+            limits=httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency)
+        )
+
+    async def upload(spec: Dict[str, str], result: UploadResult):
+        nonlocal finished
+        start = time.monotonic()
+        try:
+            if not os.path.exists(result.file_path):
+                raise FileNotFoundError(f"File not found: {result.file_path}")
+            result.bytes = os.path.getsize(result.file_path)
+            async with semaphore:
+                start = time.monotonic()
+                await _resumable_upload(
+                    client, result, spec.get("mime_type") or detect_mime_type(result.file_path),
+                    folder_id, upload_url, token_provider, chunk_size, max_retries,
+                    _refresh_access_token if token_provider is _access_token else None
+                )
+        except Exception as e:
+            result.error = str(e) or type(e).__name__
+        result.seconds = time.monotonic() - start
+
+        finished += 1
+        if on_progress is not None:
+            on_progress(finished, len(batch.results), result)
+
+    start = time.monotonic()
+    try:
+        await asyncio.gather(*(upload(spec, result) for spec, result in zip(specs, batch.results)))
+    finally:
+        if own_client:
+            await client.aclose()
+    batch.seconds = time.monotonic() - start
+    return batch
+
+
 def main():
     """CLI interface for testing."""
     import sys
@@ -0,0 +1,236 @@
+"""
+Video Export
+Platform variants (TikTok, Reels, Shorts, LinkedIn) of a finished master video.
+
+Each platform needs its own aspect ratio, bitrate, duration cap and loudness, which
+used to be transcoded by hand, one ffmpeg run at a time. Here:
+
+- presets describe each platform once (PRESETS)
+- all requested variants are transcoded at once, one ffmpeg process per core
+  (MARKETING_EXPORT_PARALLEL), without blocking the event loop
+- each variant gets a poster frame, and the master gets evenly spaced thumbnails
+- outputs are cached by master content hash + preset: re-exporting an unchanged
+  master (or asking for a preset already exported) costs nothing
+
+Configuration (MARKETING_TEAM/.env, optional):
+- MARKETING_EXPORT_PARALLEL: transcodes run at once (default: number of CPU cores)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from ffmpeg_pipeline import ClipInfo, FFmpegError, probe, run_ffmpeg
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+@dataclass(frozen=True)
+class ExportPreset:
+    """Delivery spec of one platform."""
+    name: str
+    width: int
+    height: int
+    max_duration: int            # Seconds; longer masters are trimmed
+    video_bitrate: str = "6M"
+    audio_bitrate: str = "128k"
+    fps: int = 30
+    loudness: float = -14.0      # Integrated loudness target (LUFS)
+    description: str = ""
+
+
+PRESETS = {
+    "tiktok": ExportPreset("tiktok", 1080, 1920, max_duration=600, video_bitrate="6M",
+                           description="TikTok 9:16, up to 10 min"),
+    "reels": ExportPreset("reels", 1080, 1920, max_duration=90, video_bitrate="5M",
+                          description="Instagram Reels 9:16, up to 90s"),
+    "shorts": ExportPreset("shorts", 1080, 1920, max_duration=60, video_bitrate="8M",
+                           description="YouTube Shorts 9:16, up to 60s"),
+    "linkedin": ExportPreset("linkedin", 1080, 1080, max_duration=600, video_bitrate="5M", audio_bitrate="192k",
+                             description="LinkedIn feed 1:1, up to 10 min"),
+}
+
+
+@dataclass
+class VariantResult:
+    """Outcome of one preset."""
+    preset: str
+    path: Path
+    poster: Path
+    status: str = "pending"   # exported | cached | failed
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status in ("exported", "cached")
+
+
+@dataclass
+class ExportResult:
+    master: Path
+    variants: List[VariantResult] = field(default_factory=list)
+    thumbnails: List[Path] = field(default_factory=list)
+    seconds: float = 0.0
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def file_digest(path: Path) -> str:
+    """sha256 of a file's contents (hashed off the event loop)."""
+    return await asyncio.to_thread(_hash_file, Path(path))
+
+
+def cache_key(master_digest: str, preset: ExportPreset) -> str:
+    """Output key: changes when either the master or any preset setting changes."""
+    spec = json.dumps(asdict(preset), sort_keys=True)
+    return hashlib.sha256(f"{master_digest}:{spec}".encode()).hexdigest()[:12]
+
+
+def variant_args(master: ClipInfo, preset: ExportPreset, output: Path) -> List[str]:
+    """ffmpeg arguments transcoding the master to one preset (scale to cover, centre crop)."""
+    w, h = preset.width, preset.height
+    args = ["-i", str(master.path)]
+    if master.duration > preset.max_duration:
+        args += ["-t", str(preset.max_duration)]
+    args += [
+        "-vf", (
+            f"scale={w}:{h}:force_original_aspect_ratio=increase,crop={w}:{h},setsar=1,"
+            f"fps={preset.fps},format=yuv420p"
+        ),
+        "-c:v", "libx264", "-preset", "medium", "-profile:v", "high",
+        "-b:v", preset.video_bitrate, "-maxrate", preset.video_bitrate,
+        "-bufsize", _double_rate(preset.video_bitrate),
+    ]
+    if master.audio_codec:
+        args += [
+            "-af", f"loudnorm=I={preset.loudness}:TP=-1.5:LRA=11",
+            "-c:a", "aac", "-b:a", preset.audio_bitrate, "-ar", "48000",
+        ]
+    else:
+        args += ["-an"]
+    return args + ["-movflags", "+faststart", "-y", str(output)]
+
+
+def _double_rate(rate: str) -> str:
+    # "6M" -> "12M" (rate-control buffer of two seconds)
+    return f"{int(rate[:-1]) * 2}{rate[-1]}"
+
+
+def _poster_time(duration: float) -> float:
+    # A frame a little way in, past any fade from black
+    return round(min(max(duration * 0.1, 0.0), 1.0), 2)
+
+
+async def export_variants(
+    master_path: Path,
+    presets: Sequence[str],
+    output_dir: Path,
+    thumbnails: int = 4,
+    max_parallel: Optional[int] = None,
+    ffmpeg_cmd: Optional[str] = None,
+    ffprobe_cmd: Optional[str] = None
+) -> ExportResult:
+    """
+    Export the master to every preset in parallel, with poster frames and thumbnails.
+
+    Args:
+        master_path: Finished video to export
+        presets: Preset names (keys of PRESETS)
+        output_dir: Where variants, posters and thumbnails are written
+        thumbnails: Evenly spaced thumbnails of the master (0 for none)
+        max_parallel: Transcodes at once (default: MARKETING_EXPORT_PARALLEL or CPU count)
+
+    Returns:
+        ExportResult with one VariantResult per preset, in the order requested
+
+    Raises:
+        ValueError: unknown preset name
+        FFmpegError: the master can't be probed
+    """
+    presets = list(dict.fromkeys(presets))  # Same preset twice would race on one output file
+    unknown = [name for name in presets if name not in PRESETS]
+    if unknown:
+        raise ValueError(f"Unknown preset(s): {', '.join(unknown)}. Available: {', '.join(PRESETS)}")
+
+    start = time.monotonic()
+    master_path, output_dir = Path(master_path), Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    master, digest = await asyncio.gather(probe(master_path, ffprobe_cmd), file_digest(master_path))
+    stem = master_path.stem
+    result = ExportResult(master=master_path)
+
+    parallel = max(max_parallel or _env_int("MARKETING_EXPORT_PARALLEL", os.cpu_count() or 1), 1)
+    semaphore = asyncio.Semaphore(parallel)
+
+    async def export(name: str) -> VariantResult:
+        preset = PRESETS[name]
+        key = cache_key(digest, preset)
+        variant = VariantResult(
+            preset=name,
+            path=output_dir / f"{stem}_{name}_{key}.mp4",
+            poster=output_dir / f"{stem}_{name}_{key}_poster.jpg"
+        )
+        variant_start = time.monotonic()
+        if variant.path.exists() and variant.path.stat().st_size > 0 and variant.poster.exists():
+            variant.status = "cached"
+            return variant
+
+        partial = variant.path.with_suffix(".part.mp4")
+        try:
+            async with semaphore:
+                await run_ffmpeg(variant_args(master, preset, partial), duration=master.duration, cmd=ffmpeg_cmd)
+                os.replace(partial, variant.path)
+                await run_ffmpeg(
+                    ["-ss", str(_poster_time(master.duration)), "-i", str(variant.path),
+                     "-frames:v", "1", "-q:v", "2", "-y", str(variant.poster)],
+                    cmd=ffmpeg_cmd
+                )
+            variant.status = "exported"
+        except FFmpegError as e:
+            variant.status, variant.error = "failed", str(e)
+        finally:
+            partial.unlink(missing_ok=True)
+            variant.seconds = time.monotonic() - variant_start
+        return variant
+
+    async def make_thumbnails() -> List[Path]:
+        if thumbnails <= 0:
+            return []
+        pattern = output_dir / f"{stem}_{digest[:12]}_thumb_%02d.jpg"
+        paths = [Path(str(pattern) % (i + 1)) for i in range(thumbnails)]
+        if all(path.exists() for path in paths):
+            return paths
+        rate = thumbnails / master.duration if master.duration > 0 else 1
+        try:
+            async with semaphore:
+                await run_ffmpeg(
+                    ["-i", str(master_path), "-vf", f"fps={rate:.6f},scale=320:-2",
+                     "-frames:v", str(thumbnails), "-q:v", "3", "-y", str(pattern)],
+                    cmd=ffmpeg_cmd
+                )
+        except FFmpegError:
+            pass  # Thumbnails are a nicety; keep whatever was written
+        return [path for path in paths if path.exists()]
+
+    *variants, thumbs = await asyncio.gather(*(export(name) for name in presets), make_thumbnails())
+    result.variants = list(variants)
+    result.thumbnails = thumbs
+    result.seconds = time.monotonic() - start
+    return result
@@ -0,0 +1,659 @@
+"""
+Video Job Tracker
+Tracks in-flight Sora / Veo video generation jobs with ONE background poller.
+
+Video tools submit the provider job and register it here instead of holding the
+MCP call open in their own polling loop. A single asyncio task polls every
+outstanding job, downloads finished videos and resolves anyone waiting on them.
+
+Used two ways by mcp_server.py:
+- Sync mode (default): submit, then `await tracker.wait(job_id)` for the result
+- Async mode (async_mode=True): submit returns a job_id immediately; agents collect
+  results later with get_video_job_status / fetch_video_job_result
+
+Providers register two coroutines:
+- check(job) -> ProviderStatus      (one status request to the provider)
+- finalize(job) -> None             (download the video, set job.output_path / job.result_text)
+
+Poll spacing adapts per job (see PollSchedule): it follows the job's age against the
+provider's recent completion times and honours Retry-After hints from the provider.
+tracker.stats() reports polls spent per completed video.
+
+A failed status check is not a failed video: checks report 429s, 5xx and network
+errors as still running (see transient_check_status) and the job is polled again with
+exponential backoff. Only a definitive provider answer or max_wait fails the job.
+
+Durability (see JobJournal): every submission and outcome is appended to
+MARKETING_TEAM/memory/video_jobs.jsonl. If the server dies mid-poll, the provider
+still finishes (and bills) the clip; on the next start tracker.recover() resumes the
+unfinished jobs so the video is still downloaded. Each MCP session runs its own server
+process on the same journal, so every line records the process that owns the job and
+recover() only takes over jobs whose owner has exited.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Collection, Deque, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+# Job states
+RUNNING = "running"
+DOWNLOADING = "downloading"
+COMPLETED = "completed"
+FAILED = "failed"
+
+DEFAULT_JOURNAL_PATH = Path(__file__).parent.parent / "memory" / "video_jobs.jsonl"
+
+
+@dataclass
+class ProviderStatus:
+    """Result of one provider status check."""
+    state: str                      # "running", "completed" or "failed"
+    progress: Optional[int] = None  # 0-100 when the provider reports it
+    error: Optional[str] = None     # With state "running": the status check failed transiently
+    retry_after: Optional[float] = None  # Seconds the provider asked us to wait (Retry-After)
+
+
+def transient_check_status(outcome: Any) -> Optional[ProviderStatus]:
+    """
+    "Still running" for a status check whose outcome (exception or HTTP response) is
+    transient: 429 / 5xx / timeouts / dropped connections. None if it is definitive.
+    """
+    from rate_limits import classify  # rate_limits imports this module
+
+    retryable, status, retry_after = classify(outcome)
+    if not retryable:
+        return None
+    reason = f"HTTP {status}" if status is not None else type(outcome).__name__
+    return ProviderStatus("running", error=f"status check failed ({reason})", retry_after=retry_after)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header value (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+@dataclass
+class VideoJob:
+    """One submitted provider job and its outcome."""
+    job_id: str
+    provider: str
+    provider_job_id: str
+    filename: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    handle: Any = None              # In-memory provider object (e.g. Veo operation), never serialized
+    status: str = RUNNING
+    progress: Optional[int] = None
+    submitted_at: float = field(default_factory=time.time)
+    completed_at: Optional[float] = None
+    polls: int = 0
+    check_errors: int = 0           # Consecutive transient status-check failures
+    output_path: Optional[str] = None
+    result_text: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (COMPLETED, FAILED)
+
+    def elapsed(self) -> float:
+        end = self.completed_at or time.time()
+        return end - self.submitted_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "provider": self.provider,
+            "provider_job_id": self.provider_job_id,
+            "filename": self.filename,
+            "status": self.status,
+            "progress": self.progress,
+            "elapsed_seconds": round(self.elapsed(), 1),
+            "polls": self.polls,
+            "check_errors": self.check_errors,
+            "output_path": self.output_path,
+            "error": self.error,
+        }
+
+    def to_record(self) -> Dict[str, Any]:
+        """Journal line: everything needed to resume the job in a new process."""
+        return {
+            "job_id": self.job_id,
+            "provider": self.provider,
+            "provider_job_id": self.provider_job_id,
+            "filename": self.filename,
+            "metadata": self.metadata,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "completed_at": self.completed_at,
+            "output_path": self.output_path,
+            "error": self.error,
+        }
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        import ctypes
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Alive, owned by another user
+    return True
+
+
+class JobJournal:
+    """
+    Append-only JSONL log of video job states (one line per submission or outcome).
+
+    The latest line per job_id wins. Every line carries the owner (host:pid) of the
+    process driving the job. Appends, compaction and claims
+    hold an exclusive lock on a sidecar .lock file, so the Sora tool module and any
+    number of MCP server processes can share one file without losing lines.
+    compact() rewrites it with the latest state per job, keeping every unfinished job
+    and the most recent keep_finished finished ones.
+    """
+
+    def __init__(self, path: Optional[Path] = None, keep_finished: int = 200):
+        self.path = Path(path or os.getenv("MARKETING_VIDEO_JOURNAL") or DEFAULT_JOURNAL_PATH)
+        self.keep_finished = keep_finished
+        self._lock = threading.Lock()
+        self._lock_path = self.path.with_name(self.path.name + ".lock")
+
+    @property
+    def owner(self) -> str:
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def orphaned(self, record: Dict[str, Any]) -> bool:
+        """True when the process that owns this record's job has exited."""
+        owner = record.get("owner")
+        if not owner:
+            return True  # Written before jobs had owners
+        host, _, pid = owner.rpartition(":")
+        if host != socket.gethostname():
+            return False  # Cannot check another machine's processes
+        return int(pid) != os.getpid() and not _pid_alive(int(pid))
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive across threads (threading.Lock) and processes (lock file)."""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._lock_path, "a+b") as f:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                    else:
+                        f.seek(0)
+                        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def append(self, job: VideoJob):
+        line = json.dumps({**job.to_record(), "owner": self.owner}, default=str) + "\n"
+        with self._locked():
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Latest record per job_id (a torn last line from a crash is skipped)."""
+        records: Dict[str, Dict[str, Any]] = {}
+        if not self.path.exists():
+            return records
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    records[record["job_id"]] = record
+                except (ValueError, KeyError, TypeError):
+                    continue
+        return records
+
+    def compact(self) -> Dict[str, Dict[str, Any]]:
+        """Rewrite the journal with one line per kept job; returns the kept records."""
+        with self._locked():
+            return self._compact()
+
+    def claim_orphans(self, providers: Collection[str]) -> List[Dict[str, Any]]:
+        """
+        Compact, then take ownership of unfinished jobs for these providers whose owner
+        has exited. Runs under the journal lock, so two servers starting together never
+        claim the same job; returns the claimed records.
+        """
+        with self._locked():
+            kept = self._compact(claim=lambda r: (
+                r.get("status") not in (COMPLETED, FAILED)
+                and r.get("provider") in providers
+                and self.orphaned(r)
+            ))
+            return [r for r in kept.values() if r.get("owner") == self.owner and r.pop("claimed", False)]
+
+    def _compact(self, claim: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Dict[str, Dict[str, Any]]:
+        records = self.load()
+        finished = sorted(
+            (r for r in records.values() if r.get("status") in (COMPLETED, FAILED)),
+            key=lambda r: r.get("completed_at") or 0
+        )
+        dropped = {r["job_id"] for r in finished[:max(len(finished) - self.keep_finished, 0)]}
+        kept = {job_id: r for job_id, r in records.items() if job_id not in dropped}
+        if not records:
+            return kept
+
+        tmp_path = self.path.with_suffix(".jsonl.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in kept.values():
+                if claim is not None and claim(record):
+                    record.update(owner=self.owner, claimed=True)
+                f.write(json.dumps({k: v for k, v in record.items() if k != "claimed"}, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        return kept
+
+
+class PollSchedule:
+    """
+    Adaptive poll spacing for one provider.
+
+    Learns the provider's typical completion time from recently finished jobs and
+    spaces each job's polls by its age:
+    - Before the early completions (25th percentile): halve the remaining gap each poll
+    - Inside the typical window (up to the 90th percentile): poll every base_interval
+    - Overdue, or no history yet: back off in proportion to age, up to max_interval
+
+    A Retry-After from the provider always wins if it asks for a longer wait.
+    """
+
+    MIN_HISTORY = 3        # Completed jobs needed before the distribution is trusted
+    AGE_FACTOR = 0.25      # Without history, wait a quarter of the job's age
+
+    def __init__(self, base_interval: float, max_interval: Optional[float] = None, history: int = 50):
+        self.base_interval = base_interval
+        self.max_interval = max(max_interval or base_interval * 6, base_interval)
+        self.durations: Deque[float] = deque(maxlen=history)
+
+    def record(self, seconds: float):
+        """Record how long a finished job took to complete on the provider."""
+        self.durations.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if len(self.durations) < self.MIN_HISTORY:
+            return None
+        ordered = sorted(self.durations)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def typical(self) -> Optional[float]:
+        """Median completion time, once enough jobs have finished."""
+        if len(self.durations) < self.MIN_HISTORY:
+            return None
+        return statistics.median(self.durations)
+
+    def next_delay(self, age: float, retry_after: Optional[float] = None) -> float:
+        """Seconds until a job of this age should be polled again."""
+        early = self.percentile(0.25)
+        late = self.percentile(0.9)
+
+        if early is None:
+            delay = age * self.AGE_FACTOR
+        elif age < early:
+            delay = (early - age) / 2
+        elif age <= late:
+            delay = self.base_interval
+        else:
+            delay = (age - late) / 2
+
+        delay = min(max(delay, self.base_interval), self.max_interval)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+@dataclass
+class _ProviderSpec:
+    check: Callable[[VideoJob], Awaitable[ProviderStatus]]
+    finalize: Callable[[VideoJob], Awaitable[None]]
+    schedule: PollSchedule
+    max_wait: Optional[float]
+    completed: int = 0
+    failed: int = 0
+    polls: int = 0
+    completed_polls: int = 0
+    retry_after_waits: int = 0
+    check_errors: int = 0
+
+
+class VideoJobTracker:
+    """Registry of video jobs plus the single background poller that drives them."""
+
+    def __init__(self, journal: Optional[JobJournal] = None):
+        self.journal = journal
+        self._recovered: List[str] = []
+        self._providers: Dict[str, _ProviderSpec] = {}
+        self._jobs: Dict[str, VideoJob] = {}
+        self._next_poll: Dict[str, float] = {}
+        self._max_wait: Dict[str, float] = {}
+        self._waiters: Dict[str, asyncio.Future] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._poller: Optional[asyncio.Task] = None
+        self._finalizers: set = set()
+
+    # ------------------------------------------------------------------
+    # Registration / submission
+    # ------------------------------------------------------------------
+
+    def register_provider(
+        self,
+        name: str,
+        check: Callable[[VideoJob], Awaitable[ProviderStatus]],
+        finalize: Callable[[VideoJob], Awaitable[None]],
+        poll_interval: float = 5.0,
+        max_wait: Optional[float] = None,
+        max_interval: Optional[float] = None
+    ):
+        """
+        Register how to poll and finalize jobs for a provider ("sora", "veo").
+
+        Args:
+            poll_interval: Shortest gap between polls of one job (seconds)
+            max_wait: Fail jobs still running after this many seconds (None = no limit)
+            max_interval: Longest gap between polls of one job (default: 6 x poll_interval)
+        """
+        self._providers[name] = _ProviderSpec(
+            check, finalize, PollSchedule(poll_interval, max_interval), max_wait
+        )
+
+    def submit(
+        self,
+        provider: str,
+        provider_job_id: str,
+        filename: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        handle: Any = None,
+        max_wait: Optional[float] = None
+    ) -> VideoJob:
+        """
+        Track a job the provider has already accepted. Must be called from a running event loop.
+
+        max_wait overrides the provider's timeout for this job only.
+        """
+        if provider not in self._providers:
+            raise ValueError(f"Unknown video provider '{provider}'")
+
+        job = VideoJob(
+            job_id=f"{provider}-{uuid.uuid4().hex[:12]}",
+            provider=provider,
+            provider_job_id=provider_job_id,
+            filename=filename,
+            metadata=metadata or {},
+            handle=handle
+        )
+        self._jobs[job.job_id] = job
+        if max_wait is not None:
+            self._max_wait[job.job_id] = max_wait
+        self._journal(job)
+        self._next_poll[job.job_id] = time.monotonic() + self._providers[provider].schedule.next_delay(0.0)
+        self._ensure_poller()
+        self._wakeup.set()
+        return job
+
+    def recover(self) -> List[VideoJob]:
+        """
+        Resume unfinished jobs from the journal (call once at startup, inside the event loop).
+
+        Only orphaned jobs are taken over (see JobJournal.claim_orphans): jobs another
+        live server process is still polling are left to it. Recovered jobs keep their
+        job_id, are marked metadata["recovered"] = True so finalizers know nobody is
+        waiting on them, and are polled right away with no timeout: the provider's own
+        status decides when they finish or fail. Jobs for providers this tracker has
+        not registered stay in the journal.
+        """
+        if self.journal is None:
+            return []
+
+        recovered = []
+        for record in self.journal.claim_orphans(self._providers):
+            if record["job_id"] in self._jobs:
+                continue
+            job = VideoJob(
+                job_id=record["job_id"],
+                provider=record["provider"],
+                provider_job_id=record["provider_job_id"],
+                filename=record["filename"],
+                metadata={**(record.get("metadata") or {}), "recovered": True},
+                submitted_at=record.get("submitted_at") or time.time()
+            )
+            self._jobs[job.job_id] = job
+            self._max_wait[job.job_id] = None
+            self._next_poll[job.job_id] = time.monotonic()
+            self._recovered.append(job.job_id)
+            recovered.append(job)
+
+        if recovered:
+            self._ensure_poller()
+            self._wakeup.set()
+        return recovered
+
+    def recovered_jobs(self) -> List[VideoJob]:
+        """Jobs resumed from the journal by recover() in this process."""
+        return [self._jobs[job_id] for job_id in self._recovered]
+
+    def get(self, job_id: str) -> Optional[VideoJob]:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> List[VideoJob]:
+        return list(self._jobs.values())
+
+    def active_job(self, request_key: str) -> Optional[VideoJob]:
+        """Unfinished job submitted with metadata["request_key"] == request_key (see single_flight.py)."""
+        for job in self._jobs.values():
+            if not job.done and job.metadata.get("request_key") == request_key:
+                return job
+        return None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-provider poll counters, including polls spent per completed video."""
+        stats = {}
+        for name, spec in sorted(self._providers.items()):
+            typical = spec.schedule.typical()
+            stats[name] = {
+                "active": sum(1 for job in self._jobs.values() if job.provider == name and not job.done),
+                "completed": spec.completed,
+                "failed": spec.failed,
+                "polls": spec.polls,
+                "polls_per_completed_video": (
+                    round(spec.completed_polls / spec.completed, 2) if spec.completed else None
+                ),
+                "retry_after_waits": spec.retry_after_waits,
+                "check_errors": spec.check_errors,
+                "typical_completion_seconds": round(typical, 1) if typical is not None else None,
+            }
+        return stats
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> VideoJob:
+        """Wait until a job completes or fails (raises asyncio.TimeoutError on timeout)."""
+        job = self._jobs[job_id]
+        if job.done:
+            return job
+
+        waiter = self._waiters.get(job_id)
+        if waiter is None:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters[job_id] = waiter
+
+        await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        return job
+
+    # ------------------------------------------------------------------
+    # Background poller
+    # ------------------------------------------------------------------
+
+    def _ensure_poller(self):
+        if self._poller is None or self._poller.done():
+            self._wakeup = asyncio.Event()
+            self._poller = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            pending = [job_id for job_id in self._next_poll if not self._jobs[job_id].done]
+            if not pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            now = time.monotonic()
+            due = [job_id for job_id in pending if self._next_poll[job_id] <= now]
+
+            if due:
+                await asyncio.gather(*(self._poll(self._jobs[job_id]) for job_id in due))
+                continue
+
+            # Sleep until the next job is due, or until a new job is submitted
+            delay = min(self._next_poll[job_id] for job_id in pending) - now
+            # (asyncio.wait, not wait_for: on 3.11 a wait_for cancelled from aclose() could hang)
+            self._wakeup.clear()
+            wakeup = asyncio.ensure_future(self._wakeup.wait())
+            try:
+                await asyncio.wait({wakeup}, timeout=delay)
+            finally:
+                wakeup.cancel()
+
+    async def _poll(self, job: VideoJob):
+        spec = self._providers[job.provider]
+
+        max_wait = self._max_wait.get(job.job_id, spec.max_wait)
+        if max_wait is not None and job.elapsed() > max_wait:
+            self._fail(job, f"Video generation timed out after {int(max_wait)} seconds")
+            return
+
+        try:
+            status = await spec.check(job)
+        except Exception as e:
+            self._fail(job, str(e))
+            return
+
+        job.polls += 1
+        spec.polls += 1
+        if status.state != "running" or not status.error:
+            job.check_errors = 0
+        if status.progress is not None:
+            job.progress = status.progress
+
+        if status.state == COMPLETED:
+            job.status = DOWNLOADING
+            spec.schedule.record(job.elapsed())
+            del self._next_poll[job.job_id]
+            task = asyncio.get_running_loop().create_task(self._finalize(job, spec))
+            self._finalizers.add(task)
+            task.add_done_callback(self._finalizers.discard)
+        elif status.state == FAILED:
+            self._fail(job, status.error or "Video generation failed")
+        else:
+            delay = spec.schedule.next_delay(job.elapsed(), status.retry_after)
+            if status.retry_after is not None and delay == status.retry_after:
+                spec.retry_after_waits += 1
+            if status.error:
+                job.check_errors += 1
+                spec.check_errors += 1
+                backoff = min(spec.schedule.base_interval * 2 ** job.check_errors, spec.schedule.max_interval)
+                delay = max(delay, backoff)
+                print(f"⚠️  {job.job_id}: {status.error}, checking again in {delay:.1f}s", file=sys.stderr)
+            self._next_poll[job.job_id] = time.monotonic() + delay
+
+    async def _finalize(self, job: VideoJob, spec: _ProviderSpec):
+        try:
+            await spec.finalize(job)
+        except Exception as e:
+            self._fail(job, str(e))
+            return
+
+        job.status = COMPLETED
+        job.progress = 100
+        job.completed_at = time.time()
+        spec.completed += 1
+        spec.completed_polls += job.polls
+        self._max_wait.pop(job.job_id, None)
+        self._journal(job)
+        self._resolve(job)
+
+    def _fail(self, job: VideoJob, error: str):
+        job.status = FAILED
+        job.error = error
+        job.completed_at = time.time()
+        self._providers[job.provider].failed += 1
+        self._next_poll.pop(job.job_id, None)
+        self._max_wait.pop(job.job_id, None)
+        self._journal(job)
+        self._resolve(job)
+
+    def _journal(self, job: VideoJob):
+        if self.journal is None:
+            return
+        try:
+            self.journal.append(job)
+        except (OSError, TypeError, ValueError) as e:
+            # Losing durability must never fail the video itself
+            print(f"⚠️  Video job journal write failed: {e}", file=sys.stderr)
+
+    def _resolve(self, job: VideoJob):
+        waiter = self._waiters.pop(job.job_id, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(job)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def aclose(self):
+        """Stop the poller (called on MCP server shutdown)."""
+        tasks = list(self._finalizers)
+        if self._poller is not None:
+            tasks.append(self._poller)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._poller = None
+        self._wakeup = None
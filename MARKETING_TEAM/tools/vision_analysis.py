@@ -0,0 +1,327 @@
+"""
+GPT-4o Vision Analysis (cached)
+Shared image analysis for Sora image-to-video, Veo UGC and analyze_ugc_image.
+
+One product photo is typically reused across many UGC styles and platforms, so the
+same image used to be re-encoded and re-sent to GPT-4o Vision for every video.
+Analyses are now cached persistently, keyed by the image's SHA-256 plus the
+analysis prompt version: a new photo, or a reworded prompt, is analysed afresh.
+
+Location: MARKETING_TEAM/outputs/.cache/vision_analyses.json
+
+Hits only bump last-use in memory; the file is written by put() and flush(), after
+merging in entries other server processes saved meanwhile. analyze_image does the
+file I/O in a worker thread so it never blocks the event loop.
+
+Eviction:
+- Entries older than MARKETING_VISION_CACHE_TTL_DAYS are ignored and dropped (default: 30)
+- Beyond MARKETING_VISION_CACHE_MAX_ENTRIES, least-recently-used entries are dropped (default: 1000)
+
+Remote image URLs are analysed without caching (their bytes are never fetched locally).
+
+Near-duplicate reuse is opt-in (MARKETING_VISION_NEAR_DUPLICATES=1, or
+reuse_near_duplicates=True): given an image_dedup.ImageDedupIndex, an image that is a
+perceptual near-duplicate of an already analysed one reuses that analysis. The hashes
+are greyscale, so the same product in another colour can match; such reuses are
+reported as NEAR_DUPLICATE (and counted as near_duplicate_hits), never as cache hits,
+and are not stored under the new image's digest.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from rate_limits import rate_limiter
+
+
+# Analysis prompts. Bump the version whenever the wording changes so stale
+# descriptions produced by the old prompt are not served from the cache.
+ANALYSIS_PROMPTS = {
+    "product": (
+        "product-v1",
+        "Describe this product in detail for video generation: include colors, shapes, textures, "
+        "materials, design elements, and overall composition. Focus on visual characteristics that "
+        "would help maintain consistency in a video."
+    ),
+    "ugc_scene": (
+        "ugc_scene-v1",
+        "Describe what is in the image. Describe the environment and the human who is the focus of "
+        "the image, as well as what the human is holding."
+    ),
+}
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".gif"}
+
+# Where an analyze_image description came from
+ANALYZED = "analyzed"              # New GPT-4o Vision request (paid)
+CACHED = "cached"                  # Exact image digest already analysed
+NEAR_DUPLICATE = "near_duplicate"  # Borrowed from a perceptually similar image
+
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent / "outputs" / ".cache" / "vision_analyses.json"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _mime_type(image_path: Path) -> str:
+    image_format = image_path.suffix.lower().replace('.', '')
+    if image_format == 'jpg':
+        image_format = 'jpeg'
+    return f"image/{image_format}" if image_format else (mimetypes.guess_type(str(image_path))[0] or "image/png")
+
+
+class VisionAnalysisCache:
+    """Persistent image-digest -> description cache with TTL and LRU eviction."""
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_CACHE_PATH,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None
+    ):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else _env_int("MARKETING_VISION_CACHE_TTL_DAYS", 30) * 86400
+        self.max_entries = max_entries if max_entries is not None else _env_int("MARKETING_VISION_CACHE_MAX_ENTRIES", 1000)
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dirty = False
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.near_duplicate_hits = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key_for(image_bytes: bytes, prompt: str) -> str:
+        return VisionAnalysisCache.key_for_digest(hashlib.sha256(image_bytes).hexdigest(), prompt)
+
+    @staticmethod
+    def key_for_digest(sha256: str, prompt: str) -> str:
+        return f"{sha256}:{ANALYSIS_PROMPTS[prompt][0]}"
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def _save(self):
+        """Merge entries saved by other processes since our load, then write atomically."""
+        entries = self._load()
+        for key, saved in self._read().items():
+            entry = entries.get(key)
+            if entry is None:
+                entries[key] = saved
+            else:
+                entry["last_used"] = max(entry["last_used"], saved.get("last_used", 0))
+        self._evict(time.time())
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(temp_path, self.path)
+        self._dirty = False
+
+    def flush(self):
+        """Persist last-use times bumped by hits since the last write (e.g. on shutdown)."""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def _expired(self, entry: Dict[str, Any], now: float) -> bool:
+        return now - entry["created"] > self.ttl_seconds
+
+    def get(self, key: str, record: bool = True) -> Optional[str]:
+        """Cached description (last use is bumped in memory only; see flush)."""
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(key)
+            now = time.time()
+
+            if entry is None or self._expired(entry, now):
+                self.misses += record
+                return None
+
+            entry["last_used"] = now
+            self._dirty = True
+            self.hits += record
+            return entry["description"]
+
+    def put(self, key: str, description: str, source: Optional[str] = None):
+        with self._lock:
+            now = time.time()
+            self._load()[key] = {"description": description, "source": source, "created": now, "last_used": now}
+            self._save()
+
+    def _evict(self, now: float):
+        entries = self._entries
+        for stale in [k for k, entry in entries.items() if self._expired(entry, now)]:
+            del entries[stale]
+            self.evictions += 1
+        overflow = len(entries) - self.max_entries
+        if overflow > 0:
+            for old in sorted(entries, key=lambda k: entries[k]["last_used"])[:overflow]:
+                del entries[old]
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "near_duplicate_hits": self.near_duplicate_hits,
+            "evictions": self.evictions,
+            "entries": len(self._entries) if self._entries is not None else len(self._read()),
+        }
+
+
+analysis_cache = VisionAnalysisCache()
+
+
+async def _describe(openai_client, image_url: str, prompt: str) -> str:
+    response = await rate_limiter.call(
+        "openai", "gpt-4o", openai_client.chat.completions.create,
+        model="gpt-4o",
+        messages=[
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": ANALYSIS_PROMPTS[prompt][1]
+                    },
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": image_url,
+                            "detail": "high"
+                        }
+                    }
+                ]
+            }
+        ],
+        max_tokens=300
+    )
+    return response.choices[0].message.content.strip()
+
+
+async def analyze_image(
+    openai_client,
+    image: str,
+    prompt: str = "product",
+    cache: Optional[VisionAnalysisCache] = None,
+    dedup=None,
+    reuse_near_duplicates: Optional[bool] = None
+) -> Tuple[str, str]:
+    """
+    Describe an image with GPT-4o Vision, reusing a cached analysis when possible.
+
+    Args:
+        openai_client: AsyncOpenAI client
+        image: Local image path or remote image URL
+        prompt: Analysis prompt name ("product" or "ugc_scene")
+        cache: Analysis cache (default: module-wide analysis_cache)
+        dedup: Optional image_dedup.ImageDedupIndex, used only with reuse_near_duplicates
+        reuse_near_duplicates: Serve a near-duplicate image's analysis
+                               (default: MARKETING_VISION_NEAR_DUPLICATES, off)
+
+    Returns:
+        (description, source): source is ANALYZED, CACHED or NEAR_DUPLICATE
+    """
+    if prompt not in ANALYSIS_PROMPTS:
+        raise ValueError(f"Unknown analysis prompt '{prompt}'. Available: {', '.join(ANALYSIS_PROMPTS)}")
+    cache = cache or analysis_cache
+    if reuse_near_duplicates is None:
+        reuse_near_duplicates = _env_int("MARKETING_VISION_NEAR_DUPLICATES", 0) > 0
+
+    image_path = Path(image)
+    if not image_path.exists():
+        # Remote URL: GPT-4o fetches it, nothing local to hash
+        return await _describe(openai_client, image, prompt), ANALYZED
+
+    image_bytes = await asyncio.to_thread(image_path.read_bytes)
+    key = VisionAnalysisCache.key_for(image_bytes, prompt)
+    description = await asyncio.to_thread(cache.get, key)   # First use loads the file
+    if description is not None:
+        return description, CACHED
+
+    if reuse_near_duplicates:
+        # Not stored under this image's digest: a wrong match must not become an exact hit
+        description = await _near_duplicate_analysis(image_bytes, prompt, cache, dedup)
+        if description is not None:
+            return description, NEAR_DUPLICATE
+
+    image_data = base64.b64encode(image_bytes).decode('utf-8')
+    description = await _describe(openai_client, f"data:{_mime_type(image_path)};base64,{image_data}", prompt)
+    await asyncio.to_thread(cache.put, key, description, image_path.name)
+    return description, ANALYZED
+
+
+async def _near_duplicate_analysis(image_bytes: bytes, prompt: str, cache: VisionAnalysisCache, dedup) -> Optional[str]:
+    """Cached analysis of a perceptually near-identical image, if any."""
+    if dedup is None or not dedup.available:
+        return None
+    try:
+        matches = await asyncio.to_thread(dedup.lookup, image_bytes)
+    except Exception:  # Undecodable image: just analyse it
+        return None
+    for match in matches:
+        description = cache.get(VisionAnalysisCache.key_for_digest(match.sha256, prompt), record=False)
+        if description is not None:
+            cache.near_duplicate_hits += 1
+            return description
+    return None
+
+
+async def warm_cache(
+    openai_client,
+    folder: str,
+    prompt: str = "product",
+    cache: Optional[VisionAnalysisCache] = None,
+    concurrency: int = 4
+) -> Dict[str, Any]:
+    """
+    Pre-analyse every image in a folder (e.g. a product photo library).
+
+    Already-cached images are skipped, so re-running only pays for new photos.
+
+    Returns:
+        {"analyzed": n, "cached": n, "failed": {filename: error}}
+    """
+    folder_path = Path(folder)
+    if not folder_path.is_dir():
+        raise ValueError(f"Folder not found: {folder}")
+
+    images = sorted(p for p in folder_path.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+    semaphore = asyncio.Semaphore(concurrency)
+    summary = {"analyzed": 0, "cached": 0, "failed": {}}
+
+    async def warm_one(image_path: Path):
+        async with semaphore:
+            try:
+                _, source = await analyze_image(
+                    openai_client, str(image_path), prompt, cache, reuse_near_duplicates=False
+                )
+            except Exception as e:
+                summary["failed"][image_path.name] = str(e)
+                return
+        summary["analyzed" if source == ANALYZED else "cached"] += 1
+
+    await asyncio.gather(*(warm_one(image_path) for image_path in images))
+    return summary
@@ -0,0 +1,99 @@
+"""
+Asset catalog tests
+
+Tests that MARKETING_TEAM generated assets are cataloged in SQLite and found again by
+prompt text and filters through search_assets
+"""
+
+import asyncio
+import base64
+import json
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add MARKETING_TEAM tools to path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root / "MARKETING_TEAM" / "tools"))
+
+from asset_catalog import AssetCatalog
+
+
+def _asset(tmp_path, name: str) -> Path:
+    path = tmp_path / name
+    path.write_bytes(b"data")
+    return path
+
+
+class TestAssetCatalog:
+
+    def test_text_search_ranked_and_filtered(self, tmp_path):
+        """Test prompt text finds the best match first and filters narrow the results"""
+        catalog = AssetCatalog(tmp_path / "assets.db")
+        catalog.record(_asset(tmp_path, "mug.mp4"), "video", prompt="Ceramic coffee mug unboxing on a kitchen table",
+                       style="Unboxing", platform="TikTok", product="Mug", duration=8)
+        catalog.record(_asset(tmp_path, "mug_ig.mp4"), "video", prompt="Coffee mug testimonial",
+                       style="testimonial", platform="instagram", product="Mug")
+        catalog.record(_asset(tmp_path, "mug.png"), "image", prompt="Coffee mug product shot")
+        catalog.record(_asset(tmp_path, "shoe.mp4"), "video", prompt="Running shoes on a trail", product="Shoe")
+
+        hits = catalog.search("coffee mug unboxing kitchen", kind="video")
+
+        assert [Path(a.path).name for a in hits][:2] == ["mug.mp4", "mug_ig.mp4"]
+        assert hits[0].duration == 8.0
+        assert [Path(a.path).name for a in catalog.search(platform="tiktok", style="UNBOXING")] == ["mug.mp4"]
+        assert [Path(a.path).name for a in catalog.search(product="shoe")] == ["shoe.mp4"]
+        assert catalog.search("mug", since=time.time() + 60) == []
+        assert catalog.stats()["assets"] == 4
+
+    def test_rerecord_replaces_row_and_missing_files_dropped(self, tmp_path):
+        """Test recording a path again updates its text index, and deleted files leave the catalog"""
+        catalog = AssetCatalog(tmp_path / "assets.db")
+        path = _asset(tmp_path, "ad.mp4")
+        catalog.record(path, "video", prompt="Sunrise over a lake")
+        catalog.record(path, "video", prompt="City skyline at night", resolution="1080p")
+
+        assert catalog.search("sunrise") == []
+        [asset] = catalog.search("skyline")
+        assert asset.extra == {"resolution": "1080p"}
+
+        path.unlink()
+        assert catalog.search("skyline") == []
+        assert catalog.stats()["assets"] == 0
+
+
+class TestSearchAssetsTool:
+
+    def test_generated_image_found_by_search_assets(self, monkeypatch, tmp_path):
+        """Test a GPT-4o image is cataloged at generation time and returned by search_assets"""
+        pytest.importorskip("mcp")
+        pytest.importorskip("dotenv")
+        import mcp_server
+
+        async def generate(**kwargs):
+            return SimpleNamespace(data=[SimpleNamespace(b64_json=base64.b64encode(b"png").decode(), url=None)])
+
+        fake = SimpleNamespace(images=SimpleNamespace(generate=generate))
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        monkeypatch.setattr(mcp_server.clients, "openai", lambda api_key: fake)
+        monkeypatch.setattr(mcp_server, "image_cache", mcp_server.ImageResultCache(tmp_path / "cache"))
+        monkeypatch.setattr(mcp_server, "asset_catalog", mcp_server.AssetCatalog(tmp_path / "assets.db"))
+        monkeypatch.setattr(mcp_server, "image_dedup", mcp_server.ImageDedupIndex(tmp_path / "image_hashes.jsonl"))
+
+        async def scenario():
+            await mcp_server.generate_gpt4o_image_mcp(
+                prompt="Matcha latte in a glass cup", aspect_ratio="1:1", detail="high", filename="latte"
+            )
+            return await mcp_server.registry.call("search_assets", {"query": "latte", "kind": "image"})
+
+        result = json.loads(asyncio.run(scenario())[0].text)
+
+        assert result["results"] == 1
+        asset = result["assets"][0]
+        assert Path(asset["path"]).name == "latte.png"
+        assert asset["tool"] == "generate_gpt4o_image"
+        assert asset["cost"] == 0.04
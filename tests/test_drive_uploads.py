@@ -0,0 +1,200 @@
+"""
+Drive upload tests
+
+Tests that MARKETING_TEAM batch uploads use Drive's resumable protocol concurrently and
+resume from the committed offset when a chunk fails, against a local fake Drive endpoint
+"""
+
+import asyncio
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("httpx")
+
+# Add MARKETING_TEAM tools to path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root / "MARKETING_TEAM" / "tools"))
+
+from upload_to_drive import CHUNK_ALIGNMENT, upload_many
+
+CHUNK = CHUNK_ALIGNMENT
+
+
+class FakeDrive:
+    """Minimal Drive v3 resumable upload endpoint."""
+
+    def __init__(self, fail_chunks=(), chunk_delay=0.0):
+        self.sessions = {}
+        self.files = {}
+        self.fail_chunks = set(fail_chunks)   # (file_name, offset) pairs answered with 503 once
+        self.chunk_delay = chunk_delay
+        self.active = 0
+        self.peak_active = 0
+        self.lock = threading.Lock()
+        drive = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def reply(self, status, body=None, headers=None):
+                data = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                assert "uploadType=resumable" in self.path
+                if self.headers["Authorization"] != "Bearer test-token":
+                    return self.reply(401, {"error": "unauthorized"})
+                session = uuid.uuid4().hex
+                drive.sessions[session] = {
+                    "name": body["name"], "parents": body["parents"], "data": bytearray(),
+                    "total": int(self.headers["X-Upload-Content-Length"])
+                }
+                self.reply(200, headers={"Location": f"http://127.0.0.1:{drive.port}/session/{session}"})
+
+            def do_PUT(self):
+                session = drive.sessions[self.path.rsplit("/", 1)[1]]
+                chunk = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                content_range = self.headers["Content-Range"]
+                match = re.match(r"bytes (\d+)-(\d+)/(\d+)", content_range)
+                if match:
+                    offset = int(match.group(1))
+                    if (session["name"], offset) in drive.fail_chunks:
+                        drive.fail_chunks.discard((session["name"], offset))
+                        return self.reply(503, {"error": "backend error"})
+                    with drive.lock:
+                        drive.active += 1
+                        drive.peak_active = max(drive.peak_active, drive.active)
+                    time.sleep(drive.chunk_delay)
+                    with drive.lock:
+                        drive.active -= 1
+                    assert offset == len(session["data"])
+                    session["data"] += chunk
+                if len(session["data"]) < session["total"]:
+                    headers = {"Range": f"bytes=0-{len(session['data']) - 1}"} if session["data"] else {}
+                    return self.reply(308, headers=headers)
+                file_id = uuid.uuid4().hex[:12]
+                drive.files[session["name"]] = bytes(session["data"])
+                self.reply(200, {"id": file_id, "name": session["name"],
+                                 "webViewLink": f"https://drive.example/{file_id}"})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.port = self.server.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}/upload/drive/v3/files"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _file(tmp_path, name: str, size: int) -> Path:
+    path = tmp_path / name
+    path.write_bytes(os.urandom(size))
+    return path
+
+
+class TestUploadMany:
+
+    def test_concurrent_uploads_byte_exact(self, tmp_path):
+        """Test several files upload in parallel, chunked, with per-file and batch throughput"""
+        paths = [_file(tmp_path, f"clip_{i}.mp4", CHUNK * 2 + 1000 * i) for i in range(4)]
+        progress = []
+
+        with FakeDrive(chunk_delay=0.05) as drive:
+            batch = asyncio.run(upload_many(
+                paths, folder_id="folder-1", concurrency=4, chunk_size=CHUNK,
+                token_provider=lambda: "test-token", upload_url=drive.url,
+                on_progress=lambda done, total, result: progress.append((done, total))
+            ))
+
+        assert all(result.ok for result in batch.results)
+        assert [result.file_name for result in batch.results] == [p.name for p in paths]
+        for path in paths:
+            assert drive.files[path.name] == path.read_bytes()
+        assert drive.peak_active > 1
+        assert all(s["parents"] == ["folder-1"] for s in drive.sessions.values())
+        assert batch.bytes == sum(p.stat().st_size for p in paths)
+        assert batch.throughput_mbps > 0 and batch.results[0].throughput_mbps > 0
+        assert sorted(progress) == [(n, 4) for n in range(1, 5)]
+
+    def test_failed_chunk_resumes_from_committed_offset(self, tmp_path):
+        """Test a 503 on a middle chunk is retried from the server's offset, not from zero"""
+        path = _file(tmp_path, "deck.pptx", CHUNK * 3 + 17)
+
+        with FakeDrive(fail_chunks={("Launch Deck.pptx", CHUNK)}) as drive:
+            batch = asyncio.run(upload_many(
+                [{"file_path": str(path), "file_name": "Launch Deck.pptx"}], folder_id="folder-1",
+                chunk_size=CHUNK, token_provider=lambda: "test-token", upload_url=drive.url
+            ))
+
+        [result] = batch.results
+        assert result.ok
+        assert result.chunk_retries == 1
+        assert result.web_view_link.startswith("https://drive.example/")
+        assert drive.files["Launch Deck.pptx"] == path.read_bytes()
+
+    def test_token_fetched_off_the_event_loop(self, tmp_path):
+        """Test a slow token refresh runs in a worker thread while the loop keeps serving"""
+        path = _file(tmp_path, "banner.png", CHUNK + 10)
+        threads = []
+
+        def slow_token():
+            threads.append(threading.current_thread())
+            time.sleep(0.05)   # e.g. an OAuth refresh round trip
+            return "test-token"
+
+        async def scenario(url):
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.005)
+
+            task = asyncio.ensure_future(ticker())
+            batch = await upload_many([path], folder_id="folder-1", chunk_size=CHUNK,
+                                      token_provider=slow_token, upload_url=url)
+            task.cancel()
+            return batch, ticks
+
+        with FakeDrive() as drive:
+            batch, ticks = asyncio.run(scenario(drive.url))
+
+        assert batch.results[0].ok
+        assert threading.main_thread() not in threads
+        assert ticks >= len(threads) * 5
+
+    def test_errors_reported_per_file(self, tmp_path):
+        """Test a rejected token and a missing file fail their own entries without retries forever"""
+        path = _file(tmp_path, "ad.mp4", 1000)
+
+        with FakeDrive() as drive:
+            batch = asyncio.run(upload_many(
+                [path, tmp_path / "missing.mp4"], folder_id="folder-1",
+                max_retries=2, token_provider=lambda: "expired", upload_url=drive.url
+            ))
+
+        unauthorized, missing = batch.results
+        assert not unauthorized.ok and "2 retries" in unauthorized.error
+        assert not missing.ok and "File not found" in missing.error
+        assert batch.bytes == 0
@@ -0,0 +1,86 @@
+"""
+Email template tests
+
+Tests that MARKETING_TEAM email templates are compiled once, reloaded when
+email_templates.json changes, and rendered in batches by render_many
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+# Add MARKETING_TEAM tools to path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root / "MARKETING_TEAM" / "tools"))
+
+import email_template_renderer
+from email_template_renderer import CompiledTemplate, convert_plaintext_to_html, render_email_html, render_many
+
+
+def _write_templates(path: Path, header: str):
+    path.write_text(json.dumps({
+        "default_template": "branded_light",
+        "templates": {"branded_light": {
+            "name": "Branded Light", "description": "", "use_cases": [],
+            "html_template": f"<h1>{header}</h1>{{{{BODY_CONTENT}}}}<footer>{{{{CTA_SECTION}}}}</footer>"
+        }},
+        "cta_templates": {"branded_light": '<a href="{{CTA_LINK}}">{{CTA_TEXT}}</a>'}
+    }), encoding="utf-8")
+
+
+class TestCompiledTemplate:
+
+    def test_render_and_bind(self):
+        """Test placeholders are filled in one pass and bind leaves the unfilled ones"""
+        compiled = CompiledTemplate.compile("<p>{{A}}</p>{{B}}<i>{{A}}</i>{{UNKNOWN}}")
+
+        assert compiled.render(A="x", B="y") == "<p>x</p>y<i>x</i>{{UNKNOWN}}"
+        bound = compiled.bind(B="y", UNKNOWN="")
+        assert bound.render(A="z") == "<p>z</p>y<i>z</i>"
+        assert len(bound.parts) == 5
+
+    def test_plaintext_conversion(self):
+        """Test uppercase lines are bolded and line / paragraph breaks become <br>"""
+        html = convert_plaintext_to_html("Hi,\n\nNEWS 2025\nline one\n\n\n123")
+
+        assert html == "Hi,<br><br><strong>NEWS 2025</strong><br>line one<br><br><br>123"
+
+
+class TestTemplateCache:
+
+    def test_reloaded_when_file_changes(self, monkeypatch, tmp_path):
+        """Test edits to email_templates.json are picked up without restarting"""
+        path = tmp_path / "email_templates.json"
+        monkeypatch.setattr(email_template_renderer, "TEMPLATES_PATH", str(path))
+        _write_templates(path, "Old header")
+        loads = []
+        real_load = json.load
+        monkeypatch.setattr(email_template_renderer.json, "load", lambda f: loads.append(1) or real_load(f))
+
+        first = render_email_html("Hello", cta_text="Go", cta_link="https://example.com")
+        render_email_html("Hello again")
+        _write_templates(path, "New header")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        second = render_email_html("Hello")
+
+        assert first == '<h1>Old header</h1>Hello<footer><a href="https://example.com">Go</a></footer>'
+        assert second == "<h1>New header</h1>Hello<footer></footer>"
+        assert len(loads) == 2
+
+
+class TestRenderMany:
+
+    def test_matches_single_renders(self):
+        """Test batch output equals render_email_html for shared and per-email CTAs"""
+        bodies = [f"Hi Customer {i},\n\nRESULTS\nReach: {i * 100}" for i in range(50)]
+        items = [{"body": "Hi Ana", "cta_text": "Open", "cta_link": "https://example.com/ana"}, {"body": "Hi Bo"}]
+
+        assert render_many(bodies, "branded_dark", "View", "https://example.com") == [
+            render_email_html(body, "branded_dark", "View", "https://example.com") for body in bodies
+        ]
+        assert render_many(items, "professional") == [
+            render_email_html("Hi Ana", "professional", "Open", "https://example.com/ana"),
+            render_email_html("Hi Bo", "professional"),
+        ]
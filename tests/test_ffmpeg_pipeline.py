@@ -0,0 +1,147 @@
+"""
+FFmpeg pipeline tests
+
+Tests that MARKETING_TEAM stitching probes clips, normalises only mismatched ones and
+runs ffmpeg asynchronously (fake ffmpeg/ffprobe executables stand in for the real ones)
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add MARKETING_TEAM tools to path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root / "MARKETING_TEAM" / "tools"))
+
+from ffmpeg_pipeline import FFmpegError, normalise_args, parse_probe, plan_normalisation, run_ffmpeg, stitch
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="fake ffmpeg executables are POSIX scripts")
+
+
+def _probe_json(width=1080, height=1920, audio=True, duration=4.0):
+    streams = [{
+        "codec_type": "video", "codec_name": "h264", "width": width, "height": height,
+        "pix_fmt": "yuv420p", "r_frame_rate": "30/1", "time_base": "1/15360"
+    }]
+    if audio:
+        streams.append({"codec_type": "audio", "codec_name": "aac", "sample_rate": "48000", "channels": 2})
+    return {"streams": streams, "format": {"duration": str(duration)}}
+
+
+def _script(path: Path, body: str) -> str:
+    path.write_text(f"#!{sys.executable}\nimport sys, os, json, time\n{body}")
+    path.chmod(0o755)
+    return str(path)
+
+
+def _fake_tools(tmp_path):
+    """ffprobe reads <clip>.json; ffmpeg logs its arguments and writes the output file."""
+    log = tmp_path / "ffmpeg_calls.jsonl"
+    ffprobe = _script(tmp_path / "ffprobe", "print(open(sys.argv[-1] + '.json').read())\n")
+    ffmpeg = _script(tmp_path / "ffmpeg", (
+        f"open({str(log)!r}, 'a').write(json.dumps(sys.argv[1:]) + '\\n')\n"
+        "if '-f' in sys.argv and 'concat' in sys.argv:\n"
+        "    assert all(os.path.exists(l.split(\"'\")[1]) for l in open(sys.argv[sys.argv.index('-i') + 1]))\n"
+        "print('out_time_us=2000000', flush=True)\n"
+        "print('progress=end', flush=True)\n"
+        "open(sys.argv[-1], 'wb').write(b'mp4')\n"
+    ))
+    return ffmpeg, ffprobe, log
+
+
+class TestPlanning:
+
+    def test_majority_layout_is_target_and_only_outliers_normalised(self, tmp_path):
+        """Test the most common stream layout wins and only differing clips are re-encoded"""
+        infos = [
+            parse_probe(tmp_path / "a.mp4", _probe_json()),
+            parse_probe(tmp_path / "b.mp4", _probe_json(width=720, height=1280)),
+            parse_probe(tmp_path / "c.mp4", _probe_json()),
+            parse_probe(tmp_path / "d.mp4", _probe_json(audio=False)),
+        ]
+
+        target, mismatched = plan_normalisation(infos)
+
+        assert (target.width, target.height, target.sample_rate) == (1080, 1920, 48000)
+        assert mismatched == [1, 3]
+
+    def test_normalise_args_scale_and_add_silent_audio(self, tmp_path):
+        """Test a silent, smaller clip is scaled to the target and given a silent track"""
+        target = parse_probe(tmp_path / "a.mp4", _probe_json())
+        clip = parse_probe(tmp_path / "b.mp4", _probe_json(width=720, height=1280, audio=False))
+
+        args = normalise_args(clip, target, tmp_path / "b_norm.mp4")
+
+        assert "anullsrc=channel_layout=stereo:sample_rate=48000" in args
+        assert "scale=1080:1920" in args[args.index("-vf") + 1]
+        assert args[args.index("-video_track_timescale") + 1] == "15360"
+        assert args[args.index("-c:v") + 1] == "libx264"
+
+
+class TestRunFFmpeg:
+
+    def test_progress_parsed_and_failure_raises_with_stderr(self, tmp_path):
+        """Test -progress output becomes a 0-1 fraction and a failing run raises FFmpegError"""
+        ok = _script(tmp_path / "ok", "print('out_time_us=1000000', flush=True)\nprint('out_time_ms=4000000', flush=True)\n")
+        bad = _script(tmp_path / "bad", "sys.stderr.write('Invalid data found\\n')\nsys.exit(1)\n")
+        progress = []
+
+        asyncio.run(run_ffmpeg([], duration=4.0, on_progress=progress.append, cmd=ok))
+
+        assert progress == [0.25, 1.0]
+        with pytest.raises(FFmpegError, match="Invalid data found"):
+            asyncio.run(run_ffmpeg([], cmd=bad))
+
+    def test_cancel_kills_ffmpeg(self, tmp_path):
+        """Test cancelling the awaiting task kills the ffmpeg process promptly"""
+        pid_file = tmp_path / "pid"
+        slow = _script(tmp_path / "slow", f"open({str(pid_file)!r}, 'w').write(str(os.getpid()))\ntime.sleep(30)\n")
+
+        async def scenario():
+            task = asyncio.ensure_future(run_ffmpeg([], cmd=slow))
+            while not pid_file.exists() or not pid_file.read_text():
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        start = time.monotonic()
+        asyncio.run(scenario())
+
+        assert time.monotonic() - start < 10
+        with pytest.raises(ProcessLookupError):
+            os.kill(int(pid_file.read_text()), 0)
+
+
+class TestStitch:
+
+    def test_only_mismatched_clip_reencoded_then_lossless_concat(self, tmp_path):
+        """Test one odd clip is normalised, the join is -c copy and temp files are removed"""
+        ffmpeg, ffprobe, log = _fake_tools(tmp_path)
+        clips = []
+        for name, probe in (("a", _probe_json()), ("b", _probe_json(width=720, height=1280)), ("c", _probe_json())):
+            clip = tmp_path / f"{name}.mp4"
+            clip.write_bytes(b"mp4")
+            Path(f"{clip}.json").write_text(json.dumps(probe))
+            clips.append(clip)
+        (tmp_path / "out").mkdir()
+        progress = []
+
+        result = asyncio.run(stitch(
+            clips, tmp_path / "out" / "ad.mp4", on_progress=progress.append,
+            ffmpeg_cmd=ffmpeg, ffprobe_cmd=ffprobe
+        ))
+
+        calls = [json.loads(line) for line in log.read_text().splitlines()]
+        assert result.normalised == ["b.mp4"]
+        assert not result.full_reencode
+        assert len(calls) == 2
+        assert calls[0][calls[0].index("-i") + 1] == str(clips[1])
+        assert calls[1][calls[1].index("-c") + 1] == "copy"
+        assert progress[-1] == 1.0
+        assert [p.name for p in (tmp_path / "out").iterdir()] == ["ad.mp4"]
@@ -0,0 +1,188 @@
+"""
+Gmail bulk send tests
+
+Tests that MARKETING_TEAM mail-merge sends go out as bounded, concurrent Gmail batch
+requests with per-recipient merge fields, one shared attachment encoding, and
+per-recipient status
+"""
+
+import base64
+import email
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add MARKETING_TEAM tools to path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root / "MARKETING_TEAM" / "tools"))
+
+import send_email_with_attachment
+from send_email_with_attachment import merge_fields, send_bulk
+
+
+class FakeHttpError(Exception):
+    def __init__(self, status, message=""):
+        super().__init__(f"<HttpError {status}: {message}>")
+        self.resp = SimpleNamespace(status=status)
+
+
+class FakeGmail:
+    """Gmail service stand-in: records batches and answers each send through the callback."""
+
+    def __init__(self, failures=None, delay=0.05, reset_after=None):
+        self.failures = dict(failures or {})   # email -> list of exceptions to raise, in order
+        self.reset_after = reset_after         # Connection drops after this many answers per batch
+        self.delay = delay
+        self.batches = []
+        self.sent = {}
+        self.active = 0
+        self.peak_active = 0
+        self.lock = threading.Lock()
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def send(self, userId, body):
+        return SimpleNamespace(raw=body["raw"])
+
+    def new_batch_http_request(self, callback):
+        service = self
+        calls = []
+
+        class Batch:
+            def add(self, request, request_id):
+                calls.append((request_id, request))
+
+            def execute(self, http=None):
+                service.batches.append(len(calls))
+                with service.lock:
+                    service.active += 1
+                    service.peak_active = max(service.peak_active, service.active)
+                time.sleep(service.delay)
+                with service.lock:
+                    service.active -= 1
+                for answered, (request_id, request) in enumerate(calls):
+                    if answered == service.reset_after:
+                        raise ConnectionResetError("Connection reset by peer")
+                    message = email.message_from_bytes(base64.urlsafe_b64decode(request.raw))
+                    queued = service.failures.get(message["to"])
+                    if queued:
+                        callback(request_id, None, queued.pop(0))
+                        continue
+                    service.sent[message["to"]] = message
+                    callback(request_id, {"id": f"msg-{message['to']}"}, None)
+
+        return Batch()
+
+
+def _parts(message):
+    alternative, *attachments = message.get_payload()
+    text, html = alternative.get_payload()
+    return text.get_payload(decode=True).decode(), html.get_payload(decode=True).decode(), attachments
+
+
+class TestMergeFields:
+
+    def test_fills_placeholders_and_reports_missing(self):
+        """Test {{field}} placeholders are filled and a missing field raises KeyError"""
+        assert merge_fields("Hi {{ first_name }}, re {{company}}", {"first_name": "Ana", "company": "Acme"}) == "Hi Ana, re Acme"
+        try:
+            merge_fields("Hi {{first_name}}", {})
+        except KeyError as e:
+            assert e.args == ("first_name",)
+        else:
+            raise AssertionError("missing field not reported")
+
+
+class TestSendBulk:
+
+    def test_batched_concurrent_merge_with_shared_attachment(self, monkeypatch, tmp_path):
+        """Test 25 recipients go out in bounded batches, merged, with the attachment encoded once"""
+        attachment = tmp_path / "report.pdf"
+        attachment.write_bytes(b"%PDF-1.4 quarterly results" * 100)
+        encodes = []
+        real_part = send_email_with_attachment._attachment_part
+        monkeypatch.setattr(send_email_with_attachment, "_attachment_part",
+                            lambda path: encodes.append(path) or real_part(path))
+        recipients = [{"email": f"user{i}@example.com", "first_name": f"User{i}"} for i in range(25)]
+        service = FakeGmail()
+        finished = []
+
+        result = send_bulk(
+            recipients, subject="Q3 report for {{first_name}}", body="Hi {{first_name}},\n\nReport attached.",
+            attachment_path=str(attachment), template="plain", batch_size=10, concurrency=2,
+            service=service, http_factory=object, on_result=finished.append
+        )
+
+        assert result.sent == 25 and result.failed == 0
+        assert sorted(service.batches) == [5, 10, 10]
+        assert service.peak_active == 2
+        assert len(encodes) == 1
+        assert [r.message_id for r in result.results] == [f"msg-user{i}@example.com" for i in range(25)]
+        assert len(finished) == 25
+
+        message = service.sent["user7@example.com"]
+        text, html, [part] = _parts(message)
+        assert message["subject"] == "Q3 report for User7"
+        assert text.startswith("Hi User7,") and "User7" in html
+        assert part.get_payload(decode=True) == attachment.read_bytes()
+
+    def test_shared_service_transport_is_not_used_concurrently(self):
+        """Test batches run one at a time when there is no per-thread transport"""
+        service = FakeGmail()
+
+        result = send_bulk(
+            [f"user{i}@example.com" for i in range(30)], subject="Hello", body="Hi",
+            template="plain", batch_size=10, concurrency=3, service=service
+        )
+
+        assert result.sent == 30
+        assert service.batches == [10, 10, 10]
+        assert service.peak_active == 1
+
+    def test_per_recipient_status_with_retries(self):
+        """Test rate-limited recipients are retried, while bad addresses and missing fields fail alone"""
+        service = FakeGmail(failures={
+            "busy@example.com": [FakeHttpError(429, "rateLimitExceeded")],
+            "bad@example.com": [FakeHttpError(400, "Invalid To header")],
+        }, delay=0)
+
+        result = send_bulk(
+            [{"email": "busy@example.com", "first_name": "Bo"}, {"email": "bad@example.com", "first_name": "Di"},
+             {"email": "ok@example.com", "first_name": "Cy"}, {"email": "noname@example.com"}],
+            subject="Hello {{first_name}}", body="Hi {{first_name}}", template="plain",
+            max_retries=2, service=service
+        )
+
+        busy, bad, ok, noname = result.results
+        assert (busy.status, busy.attempts) == ("sent", 2)
+        assert bad.status == "failed" and "400" in bad.error and bad.attempts == 1
+        assert ok.status == "sent"
+        assert noname.status == "failed" and "first_name" in noname.error and noname.attempts == 0
+        assert (result.sent, result.failed) == (2, 2)
+
+    def test_unconfirmed_sends_fail_without_resend(self):
+        """Test 5xx, transport errors and a dropped batch are reported as unknown, never resent"""
+        service = FakeGmail(failures={
+            "flaky@example.com": [FakeHttpError(503, "backendError")],
+            "quota@example.com": [FakeHttpError(403, "userRateLimitExceeded")],
+            "lost@example.com": [TimeoutError("timed out")],
+        }, delay=0, reset_after=3)
+
+        result = send_bulk(
+            ["flaky@example.com", "quota@example.com", "lost@example.com", "late@example.com"],
+            subject="Hello", body="Hi", template="plain", max_retries=2, service=service
+        )
+
+        flaky, quota, lost, late = result.results
+        assert quota.status == "sent" and quota.attempts == 2
+        for recipient in (flaky, lost, late):
+            assert recipient.status == "failed" and recipient.attempts == 1
+            assert recipient.error.startswith(send_email_with_attachment.UNKNOWN_DELIVERY)
+        assert "late@example.com" not in service.sent
+        assert service.batches == [4, 1]
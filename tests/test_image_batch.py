@@ -0,0 +1,140 @@
+"""
+Batch image generation tests
+
+Tests that MARKETING_TEAM's generate_image_batch merges, bounds and reports image requests
+"""
+
+import asyncio
+import base64
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add MARKETING_TEAM tools to path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root / "MARKETING_TEAM" / "tools"))
+
+pytest.importorskip("mcp")
+pytest.importorskip("dotenv")
+
+import mcp_server
+from image_cache import ImageResultCache
+
+
+@pytest.fixture
+def gpt4o(monkeypatch, tmp_path):
+    calls = []
+    in_flight = {"now": 0, "peak": 0}
+
+    async def generate(**kwargs):
+        calls.append(kwargs)
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        try:
+            await asyncio.sleep(0.02)
+            if "fail" in kwargs["prompt"]:
+                raise RuntimeError("content policy violation")
+            data = [
+                SimpleNamespace(b64_json=base64.b64encode(f"{kwargs['prompt']}-{i}".encode()).decode(), url=None)
+                for i in range(kwargs["n"])
+            ]
+            return SimpleNamespace(data=data)
+        finally:
+            in_flight["now"] -= 1
+
+    fake = SimpleNamespace(images=SimpleNamespace(generate=generate))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("MARKETING_OPENAI_CONCURRENCY", "2")
+    monkeypatch.setattr(mcp_server.clients, "openai", lambda api_key: fake)
+    monkeypatch.setattr(mcp_server, "image_cache", ImageResultCache(tmp_path / "cache"))
+    monkeypatch.setattr(mcp_server, "asset_catalog", mcp_server.AssetCatalog(tmp_path / "assets.db"))
+    monkeypatch.setattr(mcp_server, "image_dedup", mcp_server.ImageDedupIndex(tmp_path / "image_hashes.jsonl"))
+
+    def run(items, **kwargs):
+        result = asyncio.run(mcp_server.generate_image_batch_mcp(items=items, **kwargs))
+        return json.loads(result[0].text)
+
+    return run, calls, in_flight
+
+
+class TestGenerateImageBatch:
+
+    def test_identical_prompts_merge_into_multi_image_request(self, gpt4o):
+        """Test variants of one prompt and size share a single n>1 provider request"""
+        run, calls, _ = gpt4o
+
+        result = run([
+            {"prompt": "Red mug", "variants": 3, "filename": "mug"},
+            {"prompt": "Red  mug", "filename": "mug_extra"},
+            {"prompt": "Red mug", "aspect_ratio": "2:3", "filename": "mug_tall"}
+        ])
+
+        assert result["status"] == "success"
+        assert result["provider_requests"] == 2
+        assert sorted(call["n"] for call in calls) == [1, 4]
+        assert result["images_saved"] == 5
+        assert Path("MARKETING_TEAM/outputs/images/mug_v3.png").exists()
+
+    def test_partial_failure_reported_per_item(self, gpt4o):
+        """Test one failing request fails only its item and the batch still completes"""
+        run, _, _ = gpt4o
+
+        result = run([{"prompt": "Blue bottle"}, {"prompt": "fail please"}, {"prompt": "Green bag"}])
+
+        assert result["status"] == "partial"
+        assert result["images_saved"] == 2
+        assert result["images_failed"] == 1
+        statuses = {item["prompt"]: item for item in result["items"]}
+        assert statuses["fail please"]["status"] == "failed"
+        assert "content policy violation" in statuses["fail please"]["errors"][0]
+        assert statuses["Green bag"]["image_paths"][0].endswith("batch_03.png")
+
+    def test_fan_out_bounded_by_provider_semaphore(self, gpt4o):
+        """Test distinct prompts run concurrently but never beyond the provider limit"""
+        run, calls, in_flight = gpt4o
+
+        run([{"prompt": f"Shot {i}"} for i in range(6)])
+
+        assert len(calls) == 6
+        assert in_flight["peak"] == 2
+
+    def test_repeat_batch_served_from_cache(self, gpt4o):
+        """Test a repeated batch needs no provider requests"""
+        run, calls, _ = gpt4o
+
+        run([{"prompt": "Red mug", "variants": 2}])
+        repeat = run([{"prompt": "Red mug", "variants": 2}])
+
+        assert len(calls) == 1
+        assert repeat["provider_requests"] == 0
+        assert repeat["cache_hits"] == 2
+        assert repeat["cost_usd"] == 0.0
+
+    def test_save_failure_fails_only_its_image(self, gpt4o, monkeypatch):
+        """Test an unwritable image or a cache error is reported without aborting the batch"""
+        run, calls, _ = gpt4o
+        write_bytes = Path.write_bytes
+
+        def flaky_write(path, data):
+            if path.name == "broken.png":
+                raise OSError("disk full")
+            return write_bytes(path, data)
+
+        def broken_put(*args, **kwargs):
+            raise OSError("cache unavailable")
+
+        monkeypatch.setattr(Path, "write_bytes", flaky_write)
+        monkeypatch.setattr(mcp_server.image_cache, "put", broken_put)
+
+        result = run([{"prompt": "Blue bottle", "filename": "broken"}, {"prompt": "Green bag", "filename": "bag"}])
+
+        assert len(calls) == 2
+        assert result["status"] == "partial"
+        statuses = {item["prompt"]: item for item in result["items"]}
+        assert "disk full" in statuses["Blue bottle"]["errors"][0]
+        assert statuses["Green bag"]["status"] == "success"
+        assert Path("MARKETING_TEAM/outputs/images/bag.png").exists()
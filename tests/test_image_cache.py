@@ -0,0 +1,167 @@
+"""
+Image result cache tests
+
+Tests that repeated MARKETING_TEAM image requests are served from the on-disk cache
+"""
+
+import asyncio
+import base64
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add MARKETING_TEAM tools to path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root / "MARKETING_TEAM" / "tools"))
+
+from image_cache import ImageResultCache
+
+
+class TestImageResultCache:
+
+    def test_key_normalises_prompt_whitespace(self):
+        """Test reformatted prompts share a key while different params do not"""
+        key = ImageResultCache.key_for("generate_gpt4o_image", "gpt-image-1", "A red  mug\n on a desk", size="1024x1024")
+        same = ImageResultCache.key_for("generate_gpt4o_image", "gpt-image-1", " A red mug on a desk ", size="1024x1024")
+        other = ImageResultCache.key_for("generate_gpt4o_image", "gpt-image-1", "A red mug on a desk", size="1024x1536")
+
+        assert key == same
+        assert key != other
+
+    def test_put_then_get_counts_hit_and_miss(self, tmp_path):
+        """Test a stored image is returned on the next lookup and survives a reload"""
+        cache = ImageResultCache(tmp_path)
+
+        assert cache.get("abc") is None
+        cache.put("abc", b"png-bytes", "image/png")
+        cached = ImageResultCache(tmp_path).get("abc")
+
+        assert cached.read() == b"png-bytes"
+        assert cached.path.suffix == ".png"
+        assert cache.stats()["misses"] == 1
+
+    def test_lru_eviction_respects_size_bound(self, tmp_path):
+        """Test least-recently-used images are evicted once the cache exceeds max_bytes"""
+        cache = ImageResultCache(tmp_path, max_bytes=25)
+        cache.put("old", b"x" * 10)
+        cache.put("used", b"y" * 10)
+        cache.get("old")                # "old" is now more recently used than "used"
+        cache.put("new", b"z" * 10)
+
+        assert cache.get("used") is None
+        assert cache.get("old") is not None
+        assert cache.get("new") is not None
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["bytes"] == 20
+
+    def test_hits_stay_in_memory_and_processes_share_the_bound(self, tmp_path):
+        """Test hits do not rewrite the index, and entries another process stored still count"""
+        first, second = ImageResultCache(tmp_path, max_bytes=25), ImageResultCache(tmp_path, max_bytes=25)
+        first.put("a", b"x" * 10)
+        second.get("missing")           # Loads its index before "a" exists on disk
+        index_written = (tmp_path / "index.json").stat().st_mtime_ns
+
+        assert first.get("a") is not None
+        assert (tmp_path / "index.json").stat().st_mtime_ns == index_written
+
+        second.put("b", b"y" * 10)
+        second.put("c", b"z" * 10)      # 30 bytes across both processes: the LRU entry goes
+
+        assert sorted(p.name for p in tmp_path.glob("*.png")) == ["b.png", "c.png"]
+        assert ImageResultCache(tmp_path).stats()["bytes"] == 20
+
+    def test_index_rebuilt_from_blobs(self, tmp_path):
+        """Test a missing or stale index.json is rebuilt from the image files on disk"""
+        cache = ImageResultCache(tmp_path)
+        cache.put("a", b"png-bytes", "image/png")
+        cache.get("a")
+        cache.flush()
+        (tmp_path / "orphan.jpg").write_bytes(b"jpeg-bytes")
+        (tmp_path / "index.json").unlink()
+
+        reloaded = ImageResultCache(tmp_path)
+
+        assert reloaded.get("orphan").mime_type == "image/jpeg"
+        assert reloaded.stats()["bytes"] == len(b"png-bytes") + len(b"jpeg-bytes")
+
+    def test_concurrent_worker_thread_calls(self, tmp_path):
+        """Test puts and gets from many worker threads (as the MCP server runs them) keep one consistent index"""
+        cache = ImageResultCache(tmp_path)
+
+        async def scenario():
+            await asyncio.gather(*(
+                asyncio.to_thread(cache.put, f"key{i}", f"png-{i}".encode()) for i in range(20)
+            ))
+            return await asyncio.gather(*(asyncio.to_thread(cache.get, f"key{i}") for i in range(20)))
+
+        hits = asyncio.run(scenario())
+
+        assert [hit.read() for hit in hits] == [f"png-{i}".encode() for i in range(20)]
+        assert len(json.loads((tmp_path / "index.json").read_text())) == 20
+
+    def test_invalid_mode_rejected(self):
+        """Test only use / refresh / bypass are accepted"""
+        with pytest.raises(ValueError):
+            ImageResultCache.check_mode("sometimes")
+
+
+class TestImageToolCaching:
+
+    @pytest.fixture
+    def gpt4o(self, monkeypatch, tmp_path):
+        pytest.importorskip("mcp")
+        pytest.importorskip("dotenv")
+        import mcp_server
+
+        calls = []
+
+        async def generate(**kwargs):
+            calls.append(kwargs)
+            data = base64.b64encode(f"image-{len(calls)}".encode()).decode()
+            return SimpleNamespace(data=[SimpleNamespace(b64_json=data, url=None)])
+
+        fake = SimpleNamespace(images=SimpleNamespace(generate=generate))
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        monkeypatch.setattr(mcp_server.clients, "openai", lambda api_key: fake)
+        monkeypatch.setattr(mcp_server, "image_cache", ImageResultCache(tmp_path / "cache"))
+        monkeypatch.setattr(mcp_server, "asset_catalog", mcp_server.AssetCatalog(tmp_path / "assets.db"))
+        monkeypatch.setattr(mcp_server, "image_dedup", mcp_server.ImageDedupIndex(tmp_path / "image_hashes.jsonl"))
+
+        def run(**kwargs):
+            result = asyncio.run(mcp_server.generate_gpt4o_image_mcp(
+                prompt="Coffee mug product shot", aspect_ratio="1:1", detail="high", **kwargs
+            ))
+            return json.loads(result[0].text)
+
+        return run, calls
+
+    def test_repeat_request_served_from_cache(self, gpt4o):
+        """Test the second identical request skips the provider and reports a hit"""
+        run, calls = gpt4o
+
+        first = run(filename="mug_a")
+        second = run(filename="mug_b")
+
+        assert len(calls) == 1
+        assert first["cache"]["status"] == "miss"
+        assert second["cache"]["status"] == "hit"
+        assert second["cache"]["hits"] == 1
+        assert second["cost_usd"] == 0.0
+        assert Path(second["image_path"]).read_bytes() == b"image-1"
+
+    def test_refresh_and_bypass_modes(self, gpt4o):
+        """Test refresh regenerates into the cache while bypass leaves it untouched"""
+        run, calls = gpt4o
+
+        run(filename="mug", cache="bypass")
+        refreshed = run(filename="mug", cache="refresh")
+        reused = run(filename="mug")
+
+        assert len(calls) == 2
+        assert refreshed["cache"]["status"] == "refresh"
+        assert reused["cache"]["status"] == "hit"
+        assert Path(reused["image_path"]).read_bytes() == b"image-2"
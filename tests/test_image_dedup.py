@@ -0,0 +1,151 @@
+"""
+Image dedup tests
+
+Tests that MARKETING_TEAM perceptual hashes find near-duplicate images through the
+BK-tree index, and that near-duplicates reuse an earlier GPT-4o Vision analysis
+"""
+
+import asyncio
+import hashlib
+import random
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+# Add MARKETING_TEAM tools to path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root / "MARKETING_TEAM" / "tools"))
+
+from image_dedup import BKTree, ImageDedupIndex, ImageFingerprint, dhash_pixels, hamming, phash_pixels
+from vision_analysis import ANALYZED, NEAR_DUPLICATE, VisionAnalysisCache, analyze_image
+
+
+def _scene(height: int, width: int, seed: int):
+    """Synthetic product shot: a few soft blobs of light on a dark background."""
+    y, x = np.mgrid[0:height, 0:width] / max(height, width)
+    rng = np.random.default_rng(seed)
+    image = np.zeros((height, width))
+    for _ in range(6):
+        cy, cx, radius, brightness = rng.random(4)
+        image += brightness * 255 * np.exp(-((y - cy) ** 2 + (x - cx) ** 2) / (0.02 + 0.05 * radius))
+    return image
+
+
+def _fingerprint(path: Path, pixels) -> ImageFingerprint:
+    path.write_bytes(pixels.tobytes())
+    return ImageFingerprint(str(path), hashlib.sha256(path.read_bytes()).hexdigest(),
+                            phash_pixels(pixels), dhash_pixels(pixels))
+
+
+class _PixelIndex(ImageDedupIndex):
+    """Index whose queries are pixel arrays (no Pillow decode needed)."""
+
+    def __init__(self, path, pixels_by_bytes):
+        super().__init__(path)
+        self.available = True
+        self.pixels_by_bytes = pixels_by_bytes
+
+    def lookup(self, data):
+        pixels = self.pixels_by_bytes[data]
+        return self.find(ImageFingerprint("<query>", "", phash_pixels(pixels), dhash_pixels(pixels)))
+
+
+class TestPerceptualHashes:
+
+    def test_resized_noisy_copy_matches_and_other_scene_does_not(self):
+        """Test a rescaled, re-exposed, noisy copy stays within a few bits; a new scene is far"""
+        original = _scene(480, 640, seed=1)
+        copy = _scene(240, 320, seed=1) + np.random.default_rng(5).normal(0, 4, (240, 320)) + 10
+        other = _scene(480, 640, seed=2)
+
+        for hash_pixels in (phash_pixels, dhash_pixels):
+            assert hamming(hash_pixels(original), hash_pixels(copy)) <= 4
+            assert hamming(hash_pixels(original), hash_pixels(other)) > 16
+
+    def test_bk_tree_matches_brute_force(self):
+        """Test BK-tree radius search returns exactly the brute-force matches, closest first"""
+        rng = random.Random(7)
+        hashes = [rng.getrandbits(64) for _ in range(2000)]
+        base = hashes[0]
+        hashes += [base ^ (1 << bit) ^ (1 << (bit + 7)) for bit in range(20)]  # 2 bits from base
+        tree = BKTree()
+        for index, value in enumerate(hashes):
+            tree.add(value, index)
+
+        found = tree.search(base, 6)
+
+        expected = sorted((hamming(base, value), index) for index, value in enumerate(hashes) if hamming(base, value) <= 6)
+        assert sorted(found) == expected
+        assert [distance for distance, _ in found] == sorted(distance for distance, _ in found)
+
+
+class TestImageDedupIndex:
+
+    def test_near_duplicate_found_after_reload(self, tmp_path):
+        """Test the index persists, skips the query's own path, and follows re-saved paths"""
+        index = ImageDedupIndex(tmp_path / "hashes.jsonl")
+        mug = _fingerprint(tmp_path / "mug.raw", _scene(480, 640, seed=1))
+        shoe = _fingerprint(tmp_path / "shoe.raw", _scene(480, 640, seed=2))
+        index.add(mug)
+        index.add(shoe)
+
+        reloaded = ImageDedupIndex(tmp_path / "hashes.jsonl")
+        query = _fingerprint(tmp_path / "mug_v2.raw", _scene(240, 320, seed=1) + 8)
+        [match] = reloaded.find(query)
+
+        assert Path(match.path).name == "mug.raw"
+        assert match.sha256 == mug.sha256
+        assert reloaded.find(mug) == []   # Only itself
+
+        reloaded.add(_fingerprint(tmp_path / "mug.raw", _scene(480, 640, seed=3)))   # Overwritten with a new image
+        assert reloaded.find(query) == []
+
+
+class TestNearDuplicateAnalysis:
+
+    def test_near_duplicate_reuses_cached_analysis(self, tmp_path):
+        """Test an opted-in near-identical image is served the earlier analysis, reported as such"""
+        requests = []
+
+        async def create(**kwargs):
+            requests.append(kwargs)
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="A red ceramic mug"))])
+
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        original, variant, other = _scene(480, 640, 1), _scene(240, 320, 1) + 6, _scene(480, 640, 2)
+        paths = {}
+        for name, pixels in (("mug.png", original), ("mug_v2.png", variant), ("shoe.png", other)):
+            paths[name] = tmp_path / name
+            paths[name].write_bytes(pixels.tobytes())
+        index = _PixelIndex(tmp_path / "hashes.jsonl", {
+            paths[name].read_bytes(): pixels
+            for name, pixels in (("mug.png", original), ("mug_v2.png", variant), ("shoe.png", other))
+        })
+        index.add(_fingerprint(paths["mug.png"], original))
+        cache = VisionAnalysisCache(tmp_path / "vision.json")
+
+        async def scenario():
+            await analyze_image(client, str(paths["mug.png"]), cache=cache, dedup=index)
+            default = await analyze_image(client, str(paths["mug_v2.png"]), cache=VisionAnalysisCache(
+                tmp_path / "other.json"), dedup=index)
+            reused = await analyze_image(client, str(paths["mug_v2.png"]), cache=cache, dedup=index,
+                                         reuse_near_duplicates=True)
+            again = await analyze_image(client, str(paths["mug_v2.png"]), cache=cache, dedup=index,
+                                        reuse_near_duplicates=True)
+            fresh = await analyze_image(client, str(paths["shoe.png"]), cache=cache, dedup=index,
+                                        reuse_near_duplicates=True)
+            return default, reused, again, fresh
+
+        default, reused, again, fresh = asyncio.run(scenario())
+
+        assert default[1] == ANALYZED            # Off unless opted in
+        assert reused == ("A red ceramic mug", NEAR_DUPLICATE)
+        assert again[1] == NEAR_DUPLICATE        # Never promoted to an exact cache hit
+        assert fresh[1] == ANALYZED
+        assert len(requests) == 3
+        assert cache.stats()["near_duplicate_hits"] == 2
+        assert cache.stats()["hits"] == 0
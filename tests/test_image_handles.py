@@ -0,0 +1,194 @@
+"""
+Image handle registry tests
+
+Tests that MARKETING_TEAM's Nano Banana images reach Veo by handle, without sharing one global slot
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add MARKETING_TEAM tools to path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root / "MARKETING_TEAM" / "tools"))
+
+from image_handles import ImageHandleRegistry
+from rate_limits import RateLimiter
+
+
+class TestImageHandleRegistry:
+
+    def test_put_get_and_unknown_handle(self):
+        """Test each image gets its own handle and unknown handles miss"""
+        registry = ImageHandleRegistry(max_entries=4, max_bytes=1024)
+
+        first = registry.put(b"first", "image/png")
+        second = registry.put(b"second", "image/jpeg")
+
+        assert first != second
+        assert registry.get(first).data == b"first"
+        assert registry.get(second).mime_type == "image/jpeg"
+        assert registry.get("img_missing") is None
+        assert registry.stats()["misses"] == 1
+
+    def test_lru_eviction_by_count_and_bytes(self):
+        """Test least recently used images are evicted past either bound"""
+        registry = ImageHandleRegistry(max_entries=2, max_bytes=10)
+
+        a = registry.put(b"aaaa")
+        b = registry.put(b"bbbb")
+        registry.get(a)                    # a is now most recently used
+        c = registry.put(b"cc")            # count bound: evicts b
+
+        assert registry.get(b) is None
+        assert registry.get(a) is not None
+
+        d = registry.put(b"dddddddd")      # byte bound: keeps only the newest
+        assert registry.get(a) is None and registry.get(c) is None
+        assert registry.get(d).bytes == 8
+        assert registry.stats()["evictions"] == 3
+
+
+class _FakeGenaiClient:
+    """google-genai stand-in: each image call returns distinct bytes, videos are recorded."""
+
+    def __init__(self):
+        self.images = 0
+        self.video_images = []
+        self.models = SimpleNamespace(
+            generate_content=self._generate_content,
+            generate_videos=self._generate_videos
+        )
+        self.operations = SimpleNamespace(get=self._get_operation)
+
+    def _generate_content(self, **kwargs):
+        self.images += 1
+        part = SimpleNamespace(inline_data=SimpleNamespace(data=f"png-{self.images}".encode(), mime_type="image/png"))
+        return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+
+    def _generate_videos(self, **kwargs):
+        self.video_images.append(kwargs["image"])
+        return SimpleNamespace(name=f"operations/{len(self.video_images)}", done=False, response=None)
+
+    def _get_operation(self, operation):
+        response = SimpleNamespace(generated_videos=[SimpleNamespace(video=SimpleNamespace())])
+        return SimpleNamespace(name=operation.name, done=True, error=None, response=response)
+
+
+class TestNanoBananaToVeoHandles:
+
+    @pytest.fixture
+    def server(self, monkeypatch, tmp_path):
+        pytest.importorskip("mcp")
+        pytest.importorskip("dotenv")
+        import mcp_server
+
+        async def save_video(client, api_key, video, output_path):
+            pass
+
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+        monkeypatch.setattr(mcp_server, "GOOGLE_GENAI_AVAILABLE", True)
+        monkeypatch.setattr(mcp_server, "types", SimpleNamespace(
+            GenerateVideosConfig=SimpleNamespace,
+            GenerateContentConfig=SimpleNamespace,
+            ImageConfig=SimpleNamespace,
+            Image=SimpleNamespace
+        ), raising=False)
+        fake = _FakeGenaiClient()
+        monkeypatch.setattr(mcp_server.clients, "genai", lambda api_key: fake)
+        monkeypatch.setattr(mcp_server, "image_cache", mcp_server.ImageResultCache(tmp_path / "cache"))
+        monkeypatch.setattr(mcp_server.video_jobs, "journal", mcp_server.JobJournal(tmp_path / "video_jobs.jsonl"))
+        monkeypatch.setattr(mcp_server, "asset_catalog", mcp_server.AssetCatalog(tmp_path / "assets.db"))
+        monkeypatch.setattr(mcp_server, "image_dedup", mcp_server.ImageDedupIndex(tmp_path / "image_hashes.jsonl"))
+        monkeypatch.setattr(mcp_server, "image_handles", ImageHandleRegistry())
+        # Own buckets: Veo's low RPM burst must not be spent for later test modules
+        monkeypatch.setattr(mcp_server, "rate_limiter", RateLimiter())
+        monkeypatch.setattr(mcp_server, "_save_veo_video", save_video)
+        schedule = mcp_server.video_jobs._providers["veo_ugc"].schedule
+        monkeypatch.setattr(schedule, "base_interval", 0.01)
+        monkeypatch.setattr(schedule, "max_interval", 0.05)
+        return mcp_server, fake
+
+    def test_parallel_pipelines_keep_their_own_image(self, server):
+        """Test two generations get distinct handles and each Veo call uses its own bytes"""
+        mcp_server, fake = server
+
+        async def pipeline(name):
+            result = await mcp_server.generate_nano_banana_image_mcp(
+                prompt=f"{name} product shot", aspect_ratio="9:16", filename=name
+            )
+            handle = result[0].text.split("**Image handle:** ")[1].split("\n")[0]
+            return handle, mcp_server.image_handles.get(handle).data
+
+        async def scenario():
+            generated = await asyncio.gather(pipeline("serum"), pipeline("balm"))
+            # Videos created in reverse order: the second image must not leak into the first
+            for handle, _ in reversed(generated):
+                result = await mcp_server.generate_veo_ugc_from_image_mcp(
+                    image_path=None, ugc_style="testimonial", platform="tiktok", seconds="8",
+                    product_name="Serum", filename=handle, auto_analyze_image=False, image_handle=handle
+                )
+                assert result[0].text.startswith("✅"), result[0].text
+            await mcp_server.video_jobs.aclose()
+            return generated
+
+        generated = asyncio.run(scenario())
+
+        (first_handle, first_bytes), (second_handle, second_bytes) = generated
+        assert first_handle != second_handle
+        assert first_bytes != second_bytes
+        assert [image.imageBytes for image in fake.video_images] == [second_bytes, first_bytes]
+
+    def test_unknown_handle_reported(self, server):
+        """Test an evicted or unknown handle returns an error instead of a stale image"""
+        mcp_server, fake = server
+
+        result = asyncio.run(mcp_server.generate_veo_ugc_from_image_mcp(
+            image_path=None, ugc_style="testimonial", platform="tiktok", seconds="8",
+            product_name="Serum", filename="clip", image_handle="img_missing"
+        ))
+
+        assert "unknown or was evicted" in result[0].text
+        assert fake.video_images == []
+
+    def test_ugc_video_saved_before_job_is_journaled_complete(self, server, monkeypatch):
+        """Test the clip is on disk before the journal says done, and a failed save is never COMPLETED"""
+        mcp_server, fake = server
+        journaled_at_save = []
+
+        async def save_video(client, api_key, video, output_path):
+            journaled_at_save.append({r["status"] for r in mcp_server.video_jobs.journal.load().values()})
+            if output_path.stem == "broken":
+                raise OSError("disk full")
+            output_path.write_bytes(b"mp4")
+
+        monkeypatch.setattr(mcp_server, "_save_veo_video", save_video)
+
+        async def scenario():
+            results = []
+            for filename in ("clip", "broken"):
+                image = await mcp_server.generate_nano_banana_image_mcp(
+                    prompt=f"{filename} product shot", aspect_ratio="9:16", filename=filename
+                )
+                handle = image[0].text.split("**Image handle:** ")[1].split("\n")[0]
+                results.append(await mcp_server.generate_veo_ugc_from_nano_banana(
+                    image_handle=handle, ugc_style="testimonial", platform="tiktok", seconds="8",
+                    product_name="Serum", filename=filename
+                ))
+            await mcp_server.video_jobs.aclose()
+            return results
+
+        saved, broken = asyncio.run(scenario())
+
+        assert journaled_at_save == [{"running"}, {"running", "completed"}]
+        saved_path = saved[0].text.split("**Saved to:** ")[1].split("\n")[0]
+        assert Path(saved_path).read_bytes() == b"mp4"
+        assert "disk full" in broken[0].text
+        statuses = sorted(r["status"] for r in mcp_server.video_jobs.journal.load().values())
+        assert statuses == ["completed", "failed"]
+        [video] = mcp_server.asset_catalog.search(kind="video")
+        assert video.tool == "generate_veo_ugc_from_nano_banana"
@@ -0,0 +1,125 @@
+"""
+MCP server concurrency tests
+
+Tests that blocking google-genai calls do not stall other marketing tool calls
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add MARKETING_TEAM tools to path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root / "MARKETING_TEAM" / "tools"))
+
+pytest.importorskip("mcp")
+pytest.importorskip("dotenv")
+
+import mcp_server
+
+
+PROVIDER_DELAY = 0.3  # Seconds each stubbed SDK call blocks its thread
+
+
+class _FakeVideo:
+    def save(self, path):
+        time.sleep(PROVIDER_DELAY)
+        Path(path).write_bytes(b"mp4")
+
+
+class _FakeGenaiClient:
+    """Synchronous google-genai stand-in whose calls block like the real SDK."""
+
+    def __init__(self):
+        self.models = SimpleNamespace(
+            generate_videos=self._generate_videos,
+            generate_content=self._generate_content
+        )
+        self.operations = SimpleNamespace(get=self._get_operation)
+        self.files = SimpleNamespace(download=self._download)
+
+    def _generate_videos(self, **kwargs):
+        time.sleep(PROVIDER_DELAY)
+        return SimpleNamespace(name=f"operations/{kwargs['prompt']}", done=False, response=None)
+
+    def _get_operation(self, operation):
+        time.sleep(PROVIDER_DELAY)
+        response = SimpleNamespace(generated_videos=[SimpleNamespace(video=_FakeVideo())])
+        return SimpleNamespace(name=operation.name, done=True, error=None, response=response)
+
+    def _download(self, file):
+        time.sleep(PROVIDER_DELAY)
+
+    def _generate_content(self, **kwargs):
+        time.sleep(PROVIDER_DELAY)
+        part = SimpleNamespace(inline_data=SimpleNamespace(data=b"png", mime_type="image/png"))
+        return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+
+
+@pytest.fixture
+def stub_genai(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(mcp_server, "GOOGLE_GENAI_AVAILABLE", True)
+    monkeypatch.setattr(mcp_server, "types", SimpleNamespace(
+        GenerateVideosConfig=SimpleNamespace,
+        GenerateContentConfig=SimpleNamespace,
+        ImageConfig=SimpleNamespace
+    ), raising=False)
+    fake = _FakeGenaiClient()
+    monkeypatch.setattr(mcp_server.clients, "genai", lambda api_key: fake)
+    monkeypatch.setattr(mcp_server, "image_cache", mcp_server.ImageResultCache(tmp_path / "cache"))
+    monkeypatch.setattr(mcp_server.video_jobs, "journal", mcp_server.JobJournal(tmp_path / "video_jobs.jsonl"))
+    monkeypatch.setattr(mcp_server, "asset_catalog", mcp_server.AssetCatalog(tmp_path / "assets.db"))
+    monkeypatch.setattr(mcp_server, "image_dedup", mcp_server.ImageDedupIndex(tmp_path / "image_hashes.jsonl"))
+    schedule = mcp_server.video_jobs._providers["veo"].schedule
+    monkeypatch.setattr(schedule, "base_interval", 0.01)
+    monkeypatch.setattr(schedule, "max_interval", 0.05)
+    return fake
+
+
+class TestBlockingCallsOffEventLoop:
+
+    def test_two_veo_jobs_and_image_job_run_concurrently(self, stub_genai):
+        """Test two Veo videos and a Nano Banana image overlap instead of serialising"""
+
+        async def scenario():
+            heartbeats = 0
+
+            async def heartbeat():
+                nonlocal heartbeats
+                while True:
+                    await asyncio.sleep(0.02)
+                    heartbeats += 1
+
+            ticker = asyncio.create_task(heartbeat())
+            start = time.monotonic()
+            results = await asyncio.gather(
+                mcp_server.generate_veo_text_to_video_mcp(
+                    prompt="clip-a", seconds="4", orientation="portrait",
+                    resolution="720p", filename="clip_a"
+                ),
+                mcp_server.generate_veo_text_to_video_mcp(
+                    prompt="clip-b", seconds="4", orientation="portrait",
+                    resolution="720p", filename="clip_b"
+                ),
+                mcp_server.generate_nano_banana_image_mcp(
+                    prompt="product shot", aspect_ratio="9:16", filename="product"
+                )
+            )
+            elapsed = time.monotonic() - start
+            ticker.cancel()
+            await mcp_server.video_jobs.aclose()
+            return results, elapsed, heartbeats
+
+        results, elapsed, heartbeats = asyncio.run(scenario())
+
+        assert all(r[0].text.startswith("✅") for r in results), [r[0].text for r in results]
+        # Each Veo job makes 4 blocking calls; serially 2 jobs + 1 image would take 9 x delay
+        assert elapsed < 6 * PROVIDER_DELAY
+        # The event loop kept servicing other coroutines while SDK calls blocked
+        assert heartbeats >= int(elapsed / 0.02) // 2
@@ -0,0 +1,62 @@
+"""
+MCP server cold start tests
+
+Tests that MARKETING_TEAM's MCP server starts without importing provider SDKs
+and stays within its startup-time budget
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+repo_root = Path(__file__).parent.parent
+tools_dir = repo_root / "MARKETING_TEAM" / "tools"
+
+pytest.importorskip("mcp")
+pytest.importorskip("dotenv")
+
+# Imported on first use of their tools, never at startup
+PROVIDER_SDKS = ["openai", "google.genai", "google.oauth2", "google_auth_oauthlib", "googleapiclient"]
+
+# Seconds to import mcp_server in a fresh interpreter (override on slow machines)
+STARTUP_BUDGET = float(os.getenv("MARKETING_STARTUP_BUDGET_SECONDS", "1.5"))
+
+
+def _cold_import() -> dict:
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        "import mcp_server\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {PROVIDER_SDKS!r} if m in sys.modules]}}))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=tools_dir, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestColdStart:
+
+    def test_provider_sdks_not_imported_at_startup(self):
+        """Test importing the server leaves OpenAI, google-genai and Drive SDKs unloaded"""
+        assert _cold_import()["loaded"] == []
+
+    def test_startup_within_budget(self):
+        """Test the server imports within the startup budget (best of three runs)"""
+        best = min(_cold_import()["seconds"] for _ in range(3))
+        assert best < STARTUP_BUDGET, f"mcp_server import took {best:.2f}s (budget {STARTUP_BUDGET}s)"
+
+    def test_profile_startup_reports_breakdown(self):
+        """Test --profile-startup prints the cold start time and per-package breakdown"""
+        result = subprocess.run(
+            [sys.executable, "mcp_server.py", "--profile-startup"],
+            cwd=tools_dir, capture_output=True, text=True, check=True
+        )
+
+        assert result.stderr.startswith("Cold start: ")
+        assert "mcp" in result.stderr
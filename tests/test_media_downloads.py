@@ -0,0 +1,159 @@
+"""
+Streaming media download tests
+
+Tests that MARKETING_TEAM video downloads stream to disk, resume and stay within budget
+"""
+
+import asyncio
+import hashlib
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Add MARKETING_TEAM tools to path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root / "MARKETING_TEAM" / "tools"))
+
+httpx = pytest.importorskip("httpx")
+
+from media_downloads import ByteBudget, DownloadError, _expected_total, stream_download
+
+
+VIDEO = bytes(range(256)) * 4096  # 1 MiB fake MP4
+
+
+class _VideoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    range_requests = []
+    drop_first = False
+
+    def do_GET(self):
+        if self.path.startswith("/missing"):
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        range_header = self.headers.get("Range")
+        type(self).range_requests.append(range_header)
+
+        if range_header:
+            start = int(range_header.split("=")[1].rstrip("-"))
+            body = VIDEO[start:]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(VIDEO) - 1}/{len(VIDEO)}")
+        else:
+            body = VIDEO
+            self.send_response(200)
+
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        if type(self).drop_first:
+            # Simulate a dropped connection halfway through the first response
+            type(self).drop_first = False
+            self.wfile.write(body[: len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def video_server():
+    _VideoHandler.range_requests = []
+    _VideoHandler.drop_first = False
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _VideoHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _download(url, destination, **kwargs):
+    async def scenario():
+        async with httpx.AsyncClient() as client:
+            return await stream_download(client, url, destination, **kwargs)
+    return asyncio.run(scenario())
+
+
+class TestStreamDownload:
+
+    def test_streams_to_destination_with_checksum(self, video_server, tmp_path):
+        """Test the video lands at its final path with no temp file left behind"""
+        destination = tmp_path / "clip.mp4"
+
+        result = _download(f"{video_server}/clip.mp4", destination, checksum=True, chunk_size=64 * 1024)
+
+        assert destination.read_bytes() == VIDEO
+        assert result.bytes == len(VIDEO)
+        assert result.sha256 == hashlib.sha256(VIDEO).hexdigest()
+        assert list(tmp_path.iterdir()) == [destination]
+
+    def test_resumes_with_range_after_disconnect(self, video_server, tmp_path):
+        """Test a dropped connection resumes from the bytes already on disk"""
+        _VideoHandler.drop_first = True
+        destination = tmp_path / "clip.mp4"
+
+        result = _download(f"{video_server}/clip.mp4", destination, chunk_size=64 * 1024)
+
+        assert destination.read_bytes() == VIDEO
+        assert result.resumes == 1
+        assert _VideoHandler.range_requests[0] is None
+        assert _VideoHandler.range_requests[1].startswith("bytes=")
+        assert _VideoHandler.range_requests[1] != "bytes=0-"
+
+    def test_checksum_mismatch_discards_file(self, video_server, tmp_path):
+        """Test a checksum mismatch raises and leaves neither the file nor a temp file"""
+        destination = tmp_path / "clip.mp4"
+
+        with pytest.raises(DownloadError, match="Checksum mismatch"):
+            _download(f"{video_server}/clip.mp4", destination, expected_sha256="0" * 64)
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_http_error_raises(self, video_server, tmp_path):
+        """Test non-2xx responses surface the status code"""
+        with pytest.raises(DownloadError, match="Failed to download video: 404"):
+            _download(f"{video_server}/missing.mp4", tmp_path / "clip.mp4")
+
+    def test_concurrent_downloads_share_memory_budget(self, video_server, tmp_path):
+        """Test parallel downloads never hold more chunk memory than the budget"""
+        chunk_size = 64 * 1024
+        budget = ByteBudget(limit=2 * chunk_size)
+
+        async def scenario():
+            async with httpx.AsyncClient() as client:
+                return await asyncio.gather(*(
+                    stream_download(
+                        client, f"{video_server}/clip.mp4", tmp_path / f"clip_{i}.mp4",
+                        budget=budget, chunk_size=chunk_size
+                    )
+                    for i in range(5)
+                ))
+
+        results = asyncio.run(scenario())
+
+        assert all(result.bytes == len(VIDEO) for result in results)
+        assert budget.peak <= budget.limit
+        assert budget.in_use == 0
+
+    def test_unknown_or_malformed_total_means_unknown_size(self):
+        """Test a '*' or malformed Content-Range total is treated as unknown, not an error"""
+        def response(**headers):
+            return httpx.Response(206, headers=headers)
+
+        assert _expected_total(response(**{"content-range": "bytes 100-199/1000"}), 100) == 1000
+        assert _expected_total(response(**{"content-range": "bytes 100-199/*", "content-length": "100"}), 100) is None
+        assert _expected_total(response(**{"content-range": "bytes 100-199/abc"}), 100) is None
+        assert _expected_total(response(**{"content-length": "oops"}), 0) is None
+        assert _expected_total(response(**{"content-length": "100"}), 50) == 150
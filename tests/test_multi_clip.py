@@ -0,0 +1,112 @@
+"""
+Multi-clip generation tests
+
+Tests that MARKETING_TEAM multi-clip videos generate their clips concurrently with per-clip retries
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add MARKETING_TEAM tools to path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root / "MARKETING_TEAM" / "tools"))
+
+from multi_clip import clip_key, generate_clips
+
+
+CLIP_DELAY = 0.1  # Seconds each stubbed clip takes to generate
+
+
+def _fake_sora(failures=None):
+    """Clip generator stub: clip i fails failures[i] times, then writes its file."""
+    failures = dict(failures or {})
+    calls = []
+    in_flight = {"now": 0, "peak": 0}
+
+    async def generate(index, path):
+        calls.append(index)
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        try:
+            await asyncio.sleep(CLIP_DELAY)
+            if failures.get(index, 0) > 0:
+                failures[index] -= 1
+                raise RuntimeError(f"clip {index} blocked")
+            path.write_bytes(b"mp4")
+        finally:
+            in_flight["now"] -= 1
+
+    return generate, calls, in_flight
+
+
+class TestGenerateClips:
+
+    def test_clips_generated_concurrently_in_order(self, tmp_path):
+        """Test N clips take about one clip's latency and come back in segment order"""
+        generate, calls, _ = _fake_sora()
+        paths = [tmp_path / f"ad_clip_{i}.mp4" for i in range(4)]
+        progress = []
+
+        start = time.monotonic()
+        clips = asyncio.run(generate_clips(
+            paths, generate, max_concurrent=4,
+            on_progress=lambda done, total, clip: progress.append((done, total))
+        ))
+        elapsed = time.monotonic() - start
+
+        assert elapsed < 2.5 * CLIP_DELAY
+        assert [clip.path for clip in clips] == paths
+        assert all(clip.status == "generated" for clip in clips)
+        assert progress == [(1, 4), (2, 4), (3, 4), (4, 4)]
+
+    def test_failed_clip_retried_alone(self, tmp_path):
+        """Test a failed clip is retried without regenerating the finished ones"""
+        generate, calls, _ = _fake_sora(failures={2: 1})
+        paths = [tmp_path / f"ad_clip_{i}.mp4" for i in range(4)]
+
+        clips = asyncio.run(generate_clips(paths, generate, max_concurrent=4, max_attempts=2))
+
+        assert all(clip.ok for clip in clips)
+        assert sorted(calls) == [0, 1, 2, 2, 3]
+        assert clips[2].attempts == 2
+
+    def test_exhausted_retries_reported_and_clips_reused_on_rerun(self, tmp_path):
+        """Test a clip failing every attempt is reported, and a rerun only makes that clip"""
+        generate, calls, _ = _fake_sora(failures={1: 5})
+        paths = [tmp_path / f"ad_clip_{i}.mp4" for i in range(3)]
+
+        first = asyncio.run(generate_clips(paths, generate, max_attempts=2))
+
+        assert [clip.status for clip in first] == ["generated", "failed", "generated"]
+        assert first[1].error == "clip 1 blocked"
+
+        rerun, rerun_calls, _ = _fake_sora()
+        second = asyncio.run(generate_clips(paths, rerun))
+
+        assert [clip.status for clip in second] == ["reused", "generated", "reused"]
+        assert rerun_calls == [1]
+
+    def test_concurrency_limit_respected(self, tmp_path):
+        """Test no more than max_concurrent clips are generated at once"""
+        generate, _, in_flight = _fake_sora()
+        paths = [tmp_path / f"ad_clip_{i}.mp4" for i in range(6)]
+
+        asyncio.run(generate_clips(paths, generate, max_concurrent=2))
+
+        assert in_flight["peak"] == 2
+
+    def test_changed_segment_not_reused(self, tmp_path):
+        """Test clips named by clip_key are reused only for an identical request"""
+        segment = {"prompt": "Hook scene. Golden hour", "seconds": "8", "orientation": "portrait"}
+        edited = {**segment, "prompt": "New hook scene. Golden hour"}
+        assert clip_key(segment) == clip_key(dict(reversed(list(segment.items()))))
+        assert len({clip_key(segment), clip_key(edited), clip_key({**segment, "orientation": "landscape"})}) == 3
+
+        generate, _, _ = _fake_sora()
+        asyncio.run(generate_clips([tmp_path / f"ad_clip_1_{clip_key(segment)}.mp4"], generate))
+        rerun, rerun_calls, _ = _fake_sora()
+        [clip] = asyncio.run(generate_clips([tmp_path / f"ad_clip_1_{clip_key(edited)}.mp4"], rerun))
+
+        assert clip.status == "generated" and rerun_calls == [0]
@@ -0,0 +1,261 @@
+"""
+Perplexity research tests
+
+Tests that MARKETING_TEAM Perplexity research reuses cached responses, runs
+multi-query briefs concurrently with merged, deduplicated citations, and streams
+reports incrementally
+"""
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("dotenv")
+httpx = pytest.importorskip("httpx")
+
+# Add MARKETING_TEAM tools to path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root / "MARKETING_TEAM" / "tools"))
+
+from perplexity_research import (
+    PerplexityClient, ResponseCache, format_research_output, merge_citations, normalise_citation,
+    renumber_citations
+)
+from rate_limits import RateLimiter
+
+CITATIONS = {
+    "seo trends": ["https://www.example.com/seo/?utm_source=x", "https://blog.test/a"],
+    "email benchmarks": ["https://example.com/seo", "https://stats.test/email#top"],
+    "webinar rates": ["https://stats.test/email", "https://webinars.test/report"],
+}
+
+
+class FakePerplexity:
+    """Chat completions stand-in answering each query with its canned citations."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.queries = []
+        self.streamed = []      # Chunks actually produced by the server, per stream
+        self.stream_closed = False
+        self.active = 0
+        self.peak_active = 0
+
+    def reply(self, query, model):
+        return {
+            "choices": [{"message": {"content": f"Report on {query} [1][2]"}}],
+            "citations": CITATIONS.get(query, []),
+            "related_questions": [f"What next for {query}?", "What is the budget impact?"],
+            "usage": {"total_tokens": 100},
+            "model": model,
+        }
+
+    async def handle(self, request):
+        payload = json.loads(request.content)
+        query = payload["messages"][-1]["content"]
+        self.queries.append((query, payload["search_recency_filter"]))
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        if query == "broken":
+            return httpx.Response(400, text="bad request")
+        if payload["stream"]:
+            return httpx.Response(200, headers={"Content-Type": "text/event-stream"},
+                                  content=self.events(self.reply(query, payload["model"])))
+        return httpx.Response(200, json=self.reply(query, payload["model"]))
+
+    async def events(self, reply):
+        """SSE stream: the report in 10 word chunks, citations on every chunk, usage at the end."""
+        words = [f"word{i} " for i in range(100)]
+        chunks = [words[i:i + 10] for i in range(0, len(words), 10)]
+        try:
+            for index, chunk in enumerate(chunks):
+                last = index == len(chunks) - 1
+                event = {
+                    "choices": [{"delta": {"content": "".join(chunk)}, "finish_reason": "stop" if last else None}],
+                    "citations": reply["citations"],
+                }
+                if last:
+                    event.update(related_questions=reply["related_questions"], usage=reply["usage"])
+                self.streamed.append(index)
+                yield f"data: {json.dumps(event)}\n\n".encode()
+                await asyncio.sleep(0.01)
+            yield b"data: [DONE]\n\n"
+        finally:
+            self.stream_closed = True
+
+    def handle_sync(self, request):
+        payload = json.loads(request.content)
+        query = payload["messages"][-1]["content"]
+        self.queries.append((query, payload["search_recency_filter"]))
+        return httpx.Response(200, json=self.reply(query, payload["model"]))
+
+    def client(self, cache=None):
+        return PerplexityClient(
+            api_key="test-key",
+            cache=cache or ResponseCache(ttl=60, max_entries=16),
+            limiter=RateLimiter(limits={"perplexity": (6000, 8)}, max_retries=0),
+            transport=httpx.MockTransport(self.handle_sync),
+            async_transport=httpx.MockTransport(self.handle),
+        )
+
+
+class TestResponseCache:
+
+    def test_repeat_query_served_from_cache_until_ttl(self):
+        """Test reformatted repeats hit the cache, other recency misses, expired entries refetch"""
+        fake = FakePerplexity()
+        client = fake.client(cache=ResponseCache(ttl=0.2, max_entries=16))
+
+        first = client.research_sync("seo trends", search_recency="month")
+        repeat = asyncio.run(client.research("  seo   trends ", search_recency="month"))
+        other = client.research_sync("seo trends", search_recency="week")
+        time.sleep(0.25)
+        expired = client.research_sync("seo trends", search_recency="month")
+
+        assert first["success"] and not first["cached"]
+        assert repeat["cached"] and repeat["content"] == first["content"]
+        assert not other["cached"] and not expired["cached"]
+        assert fake.queries == [("seo trends", "month"), ("seo trends", "week"), ("seo trends", "month")]
+
+    def test_lru_bound_and_failures_not_cached(self):
+        """Test the cache keeps at most max_entries and never stores failed responses"""
+        cache = ResponseCache(ttl=60, max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.put(key, {"success": True, "content": key})
+
+        assert cache.get("a") is None
+        assert cache.get("c")["content"] == "c"
+
+        fake = FakePerplexity()
+        client = fake.client()
+        asyncio.run(client.research("broken"))
+        failed = asyncio.run(client.research("broken"))
+        assert failed["status_code"] == 400 and not failed["cached"]
+        assert len(fake.queries) == 2
+
+
+class TestResearchMany:
+
+    def test_concurrent_queries_with_merged_citations(self):
+        """Test a brief runs in parallel, duplicates share one request, citations merge by URL"""
+        fake = FakePerplexity(delay=0.1)
+        client = fake.client()
+        queries = ["seo trends", "email benchmarks", "webinar rates", "seo trends", "broken"]
+
+        start = time.monotonic()
+        brief = asyncio.run(client.research_many(queries))
+        elapsed = time.monotonic() - start
+
+        assert elapsed < 0.35   # Serially: 4 requests x 0.1 s
+        assert fake.peak_active == 4
+        assert sorted(q for q, _ in fake.queries) == ["broken", "email benchmarks", "seo trends", "webinar rates"]
+        assert (brief["succeeded"], brief["failed"]) == (4, 1)
+        assert brief["citations"] == [
+            "https://www.example.com/seo/?utm_source=x", "https://blog.test/a",
+            "https://stats.test/email#top", "https://webinars.test/report",
+        ]
+        assert [r["citation_numbers"] for r in brief["results"]] == [[1, 2], [1, 3], [3, 4], [1, 2], []]
+        assert [r["query"] for r in brief["results"]] == queries
+        assert brief["related_questions"].count("What is the budget impact?") == 1
+
+    def test_sync_brief_inside_running_loop(self):
+        """Test research_many_sync works from within an event loop and matches research_many"""
+        fake = FakePerplexity()
+        client = fake.client()
+        queries = ["seo trends", "email benchmarks", "seo trends"]
+
+        async def called_from_a_tool():
+            return client.research_many_sync(queries)
+
+        brief = asyncio.run(called_from_a_tool())
+
+        assert (brief["succeeded"], brief["failed"]) == (3, 0)
+        assert sorted(q for q, _ in fake.queries) == ["email benchmarks", "seo trends"]
+        assert [r["citation_numbers"] for r in brief["results"]] == [[1, 2], [1, 3], [1, 2]]
+
+    def test_stale_async_client_closed_on_loop_change(self):
+        """Test a client left over from a finished event loop is closed, not leaked"""
+        client = FakePerplexity().client()
+
+        first = asyncio.run(client.research("seo trends"))
+        stale = client._async_http
+
+        async def second_loop():
+            result = await client.research("email benchmarks")
+            await asyncio.sleep(0)
+            return result
+
+        second = asyncio.run(second_loop())
+
+        assert first["success"] and second["success"]
+        assert stale.is_closed and client._async_http is not stale
+
+    def test_citation_normalisation(self):
+        """Test host case, www., tracking params, fragments and trailing slashes are ignored"""
+        assert normalise_citation("HTTP://WWW.Example.com/a/?utm_medium=x&id=3#frag") == "https://example.com/a?id=3"
+        merged, mapping = merge_citations([{"citations": ["https://a.test/x"]}, {"citations": None}, {}])
+        assert merged == ["https://a.test/x"] and mapping == [[1], [], []]
+
+    def test_citation_markers_renumbered_into_merged_list(self):
+        """Test [n] markers point at the merged sources, swapped numbers included, unknown ones kept"""
+        assert renumber_citations("A [1][2], B [2], C [3].", [2, 1]) == "A [2][1], B [1], C [3]."
+        assert renumber_citations("No sources [1]", []) == "No sources [1]"
+
+
+class TestResearchStream:
+
+    @staticmethod
+    def collect(fake, query, **kwargs):
+        """Consume a stream; returns (deltas, final result, chunks the server had sent at the first delta)."""
+        client = fake.client()
+
+        async def run():
+            deltas, sent_at_first_delta = [], None
+            async for event in client.research_stream(query, **kwargs):
+                if event["type"] == "result":
+                    return deltas, event["result"], sent_at_first_delta
+                deltas.append(event["delta"])
+                if sent_at_first_delta is None:
+                    sent_at_first_delta = len(fake.streamed)
+
+        return client, asyncio.run(run())
+
+    def test_deltas_arrive_incrementally_then_cached(self):
+        """Test content is yielded before the stream ends and the full report lands in the cache"""
+        fake = FakePerplexity()
+
+        client, (deltas, result, sent_at_first_delta) = self.collect(fake, "seo trends", model="sonar-reasoning")
+
+        assert sent_at_first_delta == 1          # First chunk surfaced while 9 were still unsent
+        assert len(deltas) == 10
+        assert result["content"] == "".join(deltas) == "".join(f"word{i} " for i in range(100))
+        assert result["citations"] == CITATIONS["seo trends"]
+        assert result["usage"] == {"total_tokens": 100} and not result["partial"]
+        assert asyncio.run(client.research("seo trends", model="sonar-reasoning"))["cached"]
+
+    def test_stop_early_closes_stream(self):
+        """Test max_chars ends the stream early with a partial, uncached result that still formats"""
+        fake = FakePerplexity()
+
+        client, (deltas, result, _) = self.collect(fake, "email benchmarks", max_chars=150)
+
+        assert len(deltas) == 3 and len(fake.streamed) < 10
+        assert fake.stream_closed
+        assert result["partial"] and result["success"]
+        assert result["citations"] == CITATIONS["email benchmarks"]   # Those sent so far
+        rendered = format_research_output(result)
+        assert "RESEARCH RESULTS (PARTIAL)" in rendered and "[1] https://example.com/seo" in rendered
+        assert not asyncio.run(client.research("email benchmarks"))["cached"]
+
+    def test_error_status_reported(self):
+        """Test a rejected streaming request ends with an error result and no deltas"""
+        _, (deltas, result, _) = self.collect(FakePerplexity(), "broken")
+
+        assert deltas == [] and result["status_code"] == 400
+        assert format_research_output(result).startswith("[ERROR]")
@@ -0,0 +1,101 @@
+"""
+Provider client registry tests
+
+Tests that MARKETING_TEAM pooled clients reuse connections and count pool usage
+"""
+
+import asyncio
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Add MARKETING_TEAM tools to path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root / "MARKETING_TEAM" / "tools"))
+
+httpx = pytest.importorskip("httpx")
+
+from provider_clients import ProviderClients
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"status": "ok"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestProviderClients:
+
+    def test_http_client_is_shared_per_provider(self):
+        """Test the same pooled client is returned for repeated lookups"""
+        registry = ProviderClients(http2=False)
+
+        async def scenario():
+            first = registry.http("openai")
+            second = registry.http("openai")
+            other = registry.http("gemini")
+            await registry.aclose()
+            return first, second, other
+
+        first, second, other = asyncio.run(scenario())
+
+        assert first is second
+        assert first is not other
+        assert registry.stats()["openai"]["clients_created"] == 1
+        assert registry.stats()["openai"]["client_reuses"] == 1
+
+    def test_keepalive_connections_counted(self, local_server):
+        """Test repeated requests reuse one connection and count as pool hits"""
+        registry = ProviderClients(http2=False)
+
+        async def scenario():
+            client = registry.http("openai")
+            for _ in range(3):
+                response = await client.get(f"{local_server}/v1/videos/abc")
+                assert response.status_code == 200
+            await registry.aclose()
+
+        asyncio.run(scenario())
+
+        stats = registry.stats()["openai"]
+        assert stats["requests"] == 3
+        assert stats["new_connections"] == 1
+        assert stats["pool_hits"] == 2
+
+    def test_closed_client_is_recreated(self):
+        """Test a client is rebuilt after the registry is closed"""
+        registry = ProviderClients(http2=False)
+
+        async def scenario():
+            first = registry.http("openai")
+            await registry.aclose()
+            second = registry.http("openai")
+            await registry.aclose()
+            return first, second
+
+        first, second = asyncio.run(scenario())
+
+        assert first is not second
+        assert registry.stats()["openai"]["clients_created"] == 2
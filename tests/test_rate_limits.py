@@ -0,0 +1,197 @@
+"""
+Provider rate limit tests
+
+Tests pacing, jittered retries and Retry-After handling for MARKETING_TEAM provider calls
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add MARKETING_TEAM tools to path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root / "MARKETING_TEAM" / "tools"))
+
+from rate_limits import RateLimiter, TokenBucket, classify
+
+
+class _StatusError(Exception):
+    """Stand-in for an SDK error carrying an HTTP status (like openai.APIStatusError)."""
+
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        headers = {"retry-after": retry_after} if retry_after is not None else {}
+        self.response = SimpleNamespace(status_code=status_code, headers=headers)
+
+
+def _flaky(failures):
+    """Async callable raising each of failures in turn, then returning "ok"."""
+    calls = []
+
+    async def call():
+        calls.append(len(calls))
+        if len(calls) <= len(failures):
+            raise failures[len(calls) - 1]
+        return "ok"
+
+    return call, calls
+
+
+def _limiter(**limits):
+    return RateLimiter(limits={"test": (6000, 4), **limits}, max_retries=3, base_delay=0.01, max_delay=0.05)
+
+
+class TestTokenBucket:
+
+    def test_burst_then_paced(self):
+        """Test a full bucket serves its burst immediately, then spaces requests at the rate"""
+        now = [0.0]
+        bucket = TokenBucket(requests_per_minute=60, burst=2, clock=lambda: now[0])
+
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(1.0)
+        now[0] = 5.0
+        assert bucket.reserve() == 0
+
+    def test_pause_holds_every_caller(self):
+        """Test a pause (e.g. after a 429) delays callers even with tokens available"""
+        now = [0.0]
+        bucket = TokenBucket(requests_per_minute=600, clock=lambda: now[0])
+
+        bucket.pause(3.0)
+
+        assert bucket.reserve() == pytest.approx(3.0)
+
+
+class TestClassify:
+
+    def test_status_and_retry_after(self):
+        """Test 429 / 5xx retry with Retry-After, 4xx does not"""
+        assert classify(_StatusError(429, "7")) == (True, 429, 7.0)
+        assert classify(_StatusError(503)) == (True, 503, None)
+        assert classify(_StatusError(400)) == (False, 400, None)
+
+    def test_responses_and_transient_errors(self):
+        """Test returned responses and connection errors are classified too"""
+        assert classify(SimpleNamespace(status_code=502, headers={}))[0] is True
+        assert classify(SimpleNamespace(status_code=200, headers={}))[0] is False
+        assert classify(ConnectionResetError("reset"))[0] is True
+        assert classify(ValueError("bad prompt"))[0] is False
+
+
+class TestRateLimiter:
+
+    def test_retries_rate_limit_then_succeeds(self):
+        """Test 429 and 503 are retried and counted"""
+        limiter = _limiter()
+        call, calls = _flaky([_StatusError(429, "0.01"), _StatusError(503)])
+
+        assert asyncio.run(limiter.call("test", None, call)) == "ok"
+
+        stats = limiter.stats()["test"]
+        assert len(calls) == 3
+        assert stats["retries"] == 2
+        assert stats["rate_limited"] == 1
+        assert stats["server_errors"] == 1
+
+    def test_client_error_not_retried(self):
+        """Test a 400 surfaces immediately"""
+        limiter = _limiter()
+        call, calls = _flaky([_StatusError(400)])
+
+        with pytest.raises(_StatusError):
+            asyncio.run(limiter.call("test", None, call))
+        assert len(calls) == 1
+
+    def test_last_response_returned_after_retries(self):
+        """Test a response that keeps failing is handed back for the caller to report"""
+        limiter = _limiter()
+        responses = []
+
+        async def post():
+            responses.append(SimpleNamespace(status_code=500, headers={}))
+            return responses[-1]
+
+        result = asyncio.run(limiter.call("test", None, post))
+
+        assert result.status_code == 500
+        assert len(responses) == 4
+        assert limiter.stats()["test"]["gave_up"] == 1
+
+    def test_retry_after_beats_backoff(self):
+        """Test a longer Retry-After wins over the jittered delay, capped at max_delay"""
+        limiter = RateLimiter(limits={}, base_delay=0.1, max_delay=30)
+
+        assert limiter.backoff(0, retry_after=5) >= 5
+        assert limiter.backoff(0, retry_after=500) == 30
+        assert 0 <= limiter.backoff(2) <= 0.4
+
+    def test_model_limit_overrides_provider_and_caps_concurrency(self):
+        """Test provider:model limits apply and cap requests in flight"""
+        limiter = _limiter(**{"test:slow-model": (6000, 2)})
+        in_flight = {"now": 0, "peak": 0}
+
+        async def generate():
+            in_flight["now"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            await asyncio.sleep(0.02)
+            in_flight["now"] -= 1
+
+        async def scenario():
+            await asyncio.gather(*(limiter.call("test", "slow-model", generate) for _ in range(6)))
+
+        asyncio.run(scenario())
+
+        assert in_flight["peak"] == 2
+        assert "test:slow-model" in limiter.stats()
+        assert limiter.limit_for("test", "other-model").key == "test"
+
+    def test_sync_call_retries_connection_errors(self):
+        """Test the blocking variant (requests-based clients) retries transient failures"""
+        limiter = _limiter()
+        attempts = []
+
+        def post(url, json=None):
+            attempts.append(url)
+            if len(attempts) == 1:
+                raise ConnectionError("connection reset")
+            return SimpleNamespace(status_code=200, headers={})
+
+        response = limiter.call_sync("test", None, post, "https://api.example/chat", json={"q": 1})
+
+        assert response.status_code == 200
+        assert len(attempts) == 2
+
+    def test_submit_never_resends_a_create_that_may_have_landed(self):
+        """Test billed creates retry 429s and connect failures but not timeouts or 5xx"""
+        class ConnectError(Exception):
+            pass
+
+        class ReadTimeout(Exception):
+            pass
+
+        class APIConnectionError(Exception):
+            pass
+
+        wrapped = APIConnectionError("connection error")
+        wrapped.__cause__ = ConnectError("refused")
+        retried, retried_calls = _flaky([_StatusError(429), wrapped])
+        assert asyncio.run(_limiter().submit("test", None, retried)) == "ok"
+        assert len(retried_calls) == 3
+
+        for failure in (ReadTimeout("read timed out"), _StatusError(503), TimeoutError()):
+            create, calls = _flaky([failure])
+            with pytest.raises(type(failure)):
+                asyncio.run(_limiter().submit("test", None, create))
+            assert len(calls) == 1
+
+        posts = []
+        response = _limiter().submit_sync(
+            "test", None, lambda: posts.append(1) or SimpleNamespace(status_code=502, headers={})
+        )
+        assert response.status_code == 502 and len(posts) == 1
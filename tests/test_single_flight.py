@@ -0,0 +1,146 @@
+"""
+Single-flight coalescing tests
+
+Tests that identical in-flight MARKETING_TEAM generation requests share one provider job
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add MARKETING_TEAM tools to path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root / "MARKETING_TEAM" / "tools"))
+
+from single_flight import SingleFlight
+
+
+def _slow_job(runs, result="video.mp4", delay=0.05):
+    async def job():
+        runs.append(result)
+        await asyncio.sleep(delay)
+        return result
+    return job
+
+
+class TestSingleFlight:
+
+    def test_duplicates_share_one_run(self):
+        """Test concurrent identical requests run once and all get the result"""
+        flight = SingleFlight()
+        runs = []
+
+        async def scenario():
+            key = SingleFlight.key_for("generate_sora_video", {"prompt": "Red mug", "seconds": "8"})
+            other = SingleFlight.key_for("generate_sora_video", {"prompt": "Blue mug", "seconds": "8"})
+            return await asyncio.gather(
+                *(flight.do(key, "generate_sora_video", _slow_job(runs)) for _ in range(5)),
+                flight.do(other, "generate_sora_video", _slow_job(runs, "blue.mp4"))
+            )
+
+        results = asyncio.run(scenario())
+
+        assert results == ["video.mp4"] * 5 + ["blue.mp4"]
+        assert len(runs) == 2
+        stats = flight.stats()
+        assert stats["tools"]["generate_sora_video"]["coalesced"] == 4
+        assert stats["in_flight"] == 0
+
+    def test_key_normalises_prompt_and_omitted_arguments(self):
+        """Test reformatted prompts and omitted optional arguments share a key"""
+        key = SingleFlight.key_for("t", {"prompt": "Red  mug\n", "icp": None})
+
+        assert key == SingleFlight.key_for("t", {"prompt": "Red mug"})
+        assert key != SingleFlight.key_for("t", {"prompt": "Red mug", "seconds": "8"})
+        assert key != SingleFlight.key_for("other", {"prompt": "Red mug"})
+
+    def test_leader_giving_up_does_not_cancel_duplicates(self):
+        """Test a timed-out first caller leaves the shared job running for the retry"""
+        flight = SingleFlight()
+        runs = []
+
+        async def scenario():
+            leader = asyncio.create_task(flight.do("k", "t", _slow_job(runs, delay=0.1)))
+            await asyncio.sleep(0.01)
+            leader.cancel()           # Client-side timeout on the first call
+            return await flight.do("k", "t", _slow_job(runs))
+
+        assert asyncio.run(scenario()) == "video.mp4"
+        assert len(runs) == 1
+
+    def test_registry_coalesces_only_opted_in_tools(self):
+        """Test ToolRegistry coalesces tools registered with coalesce=True"""
+        pytest.importorskip("mcp")
+        from mcp.types import TextContent
+        from tool_registry import ToolRegistry
+
+        runs = []
+
+        async def handler(prompt):
+            runs.append(prompt)
+            await asyncio.sleep(0.05)
+            return [TextContent(type="text", text=prompt)]
+
+        registry = ToolRegistry()
+        schema = {"type": "object", "properties": {"prompt": {"type": "string"}}, "required": ["prompt"]}
+        registry.register(name="video", description="", input_schema=schema, handler=handler, coalesce=True)
+        registry.register(name="caption", description="", input_schema=schema, handler=handler)
+
+        async def scenario():
+            await asyncio.gather(*(registry.call("video", {"prompt": "a"}) for _ in range(3)))
+            await asyncio.gather(*(registry.call("caption", {"prompt": "b"}) for _ in range(3)))
+
+        asyncio.run(scenario())
+
+        assert runs == ["a", "b", "b", "b"]
+        assert registry.single_flight.stats()["tools"]["video"] == {"leaders": 1, "coalesced": 2, "attached_to_job": 0}
+
+
+class TestVideoJobAttach:
+
+    def test_async_retry_attaches_to_running_veo_job(self, monkeypatch, tmp_path):
+        """Test an identical async request returns the running job instead of a new one"""
+        pytest.importorskip("mcp")
+        pytest.importorskip("dotenv")
+        import mcp_server
+
+        submitted = []
+
+        def generate_videos(**kwargs):
+            submitted.append(kwargs["prompt"])
+            return SimpleNamespace(name=f"operations/{len(submitted)}", done=False, response=None)
+
+        fake = SimpleNamespace(
+            models=SimpleNamespace(generate_videos=generate_videos),
+            operations=SimpleNamespace(get=lambda operation: operation)   # Never finishes
+        )
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+        monkeypatch.setattr(mcp_server, "GOOGLE_GENAI_AVAILABLE", True)
+        monkeypatch.setattr(mcp_server, "types", SimpleNamespace(GenerateVideosConfig=SimpleNamespace), raising=False)
+        monkeypatch.setattr(mcp_server.clients, "genai", lambda api_key: fake)
+        monkeypatch.setattr(mcp_server.video_jobs, "journal", mcp_server.JobJournal(tmp_path / "video_jobs.jsonl"))
+        monkeypatch.setattr(mcp_server, "asset_catalog", mcp_server.AssetCatalog(tmp_path / "assets.db"))
+        monkeypatch.setattr(mcp_server, "image_dedup", mcp_server.ImageDedupIndex(tmp_path / "image_hashes.jsonl"))
+        monkeypatch.setattr(mcp_server.registry, "single_flight", SingleFlight())
+
+        arguments = {"prompt": "Sunrise over a lake", "filename": "lake", "async_mode": True}
+
+        async def scenario():
+            first = await mcp_server.registry.call("generate_veo_text_to_video", arguments)
+            retry = await mcp_server.registry.call("generate_veo_text_to_video", {**arguments, "prompt": "Sunrise over  a lake"})
+            other = await mcp_server.registry.call("generate_veo_text_to_video", {**arguments, "filename": "lake_2"})
+            await mcp_server.video_jobs.aclose()
+            return [json.loads(result[0].text)["job_id"] for result in (first, retry, other)]
+
+        first, retry, other = asyncio.run(scenario())
+
+        assert first == retry
+        assert other != first
+        assert len(submitted) == 2
+        tools = mcp_server.registry.single_flight.stats()["tools"]
+        assert tools["generate_veo_text_to_video"]["attached_to_job"] == 1
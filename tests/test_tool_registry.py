@@ -0,0 +1,121 @@
+"""
+Tool registry tests
+
+Tests table-driven dispatch, cached tool listing and compiled argument validation
+for the MARKETING_TEAM MCP server
+"""
+
+import asyncio
+import inspect
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add MARKETING_TEAM tools to path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root / "MARKETING_TEAM" / "tools"))
+
+pytest.importorskip("mcp")
+
+from mcp.types import TextContent
+from tool_registry import ToolRegistry, compile_validator
+
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "prompt": {"type": "string"},
+        "seconds": {"type": "string", "enum": ["4", "8"], "default": "4"},
+        "wait": {"type": "boolean", "default": False},
+        "timeout_seconds": {"type": "integer", "default": 300}
+    },
+    "required": ["prompt"]
+}
+
+
+def _registry(calls):
+    async def handler(prompt, seconds, wait, timeout_seconds):
+        calls.append((prompt, seconds, wait, timeout_seconds))
+        return [TextContent(type="text", text="ok")]
+
+    registry = ToolRegistry()
+    registry.register(name="make_clip", description="Make a clip", input_schema=SCHEMA, handler=handler)
+    return registry
+
+
+class TestCompileValidator:
+
+    def test_accepts_valid_arguments(self):
+        """Test a well-formed call passes"""
+        assert compile_validator(SCHEMA)({"prompt": "cat", "seconds": "8", "timeout_seconds": 10}) is None
+
+    def test_rejects_missing_wrong_type_and_enum(self):
+        """Test required, type and enum violations are reported"""
+        validate = compile_validator(SCHEMA)
+
+        assert "prompt" in validate({})
+        assert "must be string" in validate({"prompt": 5})
+        assert "must be one of" in validate({"prompt": "cat", "seconds": "6"})
+        assert "must be integer" in validate({"prompt": "cat", "timeout_seconds": True})
+
+
+class TestToolRegistry:
+
+    def test_dispatch_applies_schema_defaults(self):
+        """Test omitted arguments get the schema defaults and unknown keys are dropped"""
+        calls = []
+        registry = _registry(calls)
+
+        result = asyncio.run(registry.call("make_clip", {"prompt": "cat", "extra": 1}))
+
+        assert result[0].text == "ok"
+        assert calls == [("cat", "4", False, 300)]
+
+    def test_invalid_call_never_reaches_handler(self):
+        """Test bad arguments fail before the handler (and its provider call) runs"""
+        calls = []
+        registry = _registry(calls)
+
+        result = asyncio.run(registry.call("make_clip", {"prompt": "cat", "seconds": "6"}))
+
+        assert result[0].text.startswith("❌ Invalid arguments for make_clip")
+        assert calls == []
+        assert registry.stats()["make_clip"] == {"calls": 0, "rejected": 1}
+
+    def test_unknown_tool(self):
+        """Test unknown tool names are reported"""
+        result = asyncio.run(ToolRegistry().call("nope", {}))
+        assert result[0].text == "❌ Unknown tool: nope"
+
+    def test_list_tools_cached_until_key_changes(self):
+        """Test the Tool list is reused, and dynamic schemas rebuilt when the key changes"""
+        styles = ["testimonial"]
+        registry = ToolRegistry()
+        registry.register(
+            name="ugc",
+            description="UGC",
+            input_schema=lambda: {"type": "object", "properties": {"style": {"type": "string", "enum": list(styles)}}},
+            handler=None
+        )
+
+        first = registry.list_tools(cache_key=1)
+        assert registry.list_tools(cache_key=1) is first
+
+        styles.append("unboxing")
+        rebuilt = registry.list_tools(cache_key=2)
+        assert rebuilt is not first
+        assert rebuilt[0].inputSchema["properties"]["style"]["enum"] == ["testimonial", "unboxing"]
+
+
+class TestServerRegistry:
+
+    def test_every_tool_handler_accepts_its_schema(self):
+        """Test each registered handler takes exactly the arguments its schema declares"""
+        pytest.importorskip("dotenv")
+        import mcp_server
+
+        for tool in mcp_server.registry.list_tools(cache_key=mcp_server.ugc_templates.version):
+            handler = mcp_server.registry._specs[tool.name].handler
+            parameters = set(inspect.signature(handler).parameters)
+            assert set(tool.inputSchema["properties"]) <= parameters, tool.name
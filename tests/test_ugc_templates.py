@@ -0,0 +1,120 @@
+"""
+UGC template store tests
+
+Tests that MARKETING_TEAM UGC templates are indexed once, rendered lazily and hot reloaded
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add MARKETING_TEAM tools to path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root / "MARKETING_TEAM" / "tools"))
+
+from ugc_templates import UGCTemplateStore, DEFAULT_UGC_TEMPLATES
+
+
+def _write_templates(path, tiktok_text, mtime=None):
+    path.write_text(json.dumps({
+        "base_templates": {
+            "version": "1.0",
+            "testimonial": {
+                "platform_optimized": {
+                    "tiktok": tiktok_text,
+                    "instagram": "IG testimonial for {product_name}",
+                    "facebook": "FB testimonial"
+                },
+                "execution_approach": "Selfie to camera"
+            }
+        },
+        "expert_optimized_templates": {
+            "pov": {"platform_optimized": {"tiktok": "POV: {product_name}"}},
+            "broken": {"execution_approach": "no platform text"}
+        }
+    }), encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+class TestUGCTemplateStore:
+
+    def test_defaults_when_file_missing(self, tmp_path):
+        """Test built-in templates are served and rendered when the JSON file is absent"""
+        store = UGCTemplateStore(tmp_path / "missing.json")
+
+        text = store.render("testimonial", "tiktok", product_name="Glow Serum")
+
+        assert store.source == "defaults"
+        assert len(store.styles()) == len(DEFAULT_UGC_TEMPLATES)
+        assert "talking to camera about Glow Serum," in text
+        assert "{product_name}" not in text
+
+    def test_indexes_base_and_expert_templates(self, tmp_path):
+        """Test styles with platform text are indexed and malformed ones skipped"""
+        path = tmp_path / "ugc_prompt_templates.json"
+        _write_templates(path, "TikTok testimonial for {product_name}")
+        store = UGCTemplateStore(path)
+
+        assert store.styles() == ["pov", "testimonial"]
+        assert store.get("testimonial").execution_approach == "Selfie to camera"
+        assert store.get("pov").source == "expert"
+        with pytest.raises(ValueError, match="Unknown UGC style 'broken'"):
+            store.get("broken")
+
+    def test_renders_only_requested_template(self, tmp_path):
+        """Test templates compile lazily, once per style and platform"""
+        path = tmp_path / "ugc_prompt_templates.json"
+        _write_templates(path, "TikTok testimonial for {product_name}")
+        store = UGCTemplateStore(path)
+
+        store.render("testimonial", "tiktok", product_name="A")
+        store.render("testimonial", "tiktok", product_name="B")
+
+        assert store.stats()["compiled"] == 1
+        # Missing platform text falls back to the TikTok template
+        assert store.render("pov", "facebook", product_name="Mug") == "POV: Mug"
+
+    def test_reloads_when_file_changes(self, tmp_path):
+        """Test edits to the template file are picked up without restarting"""
+        path = tmp_path / "ugc_prompt_templates.json"
+        _write_templates(path, "Old text for {product_name}", mtime=1_000_000_000_000_000_000)
+        store = UGCTemplateStore(path)
+        assert store.render("testimonial", "tiktok", product_name="Mug") == "Old text for Mug"
+
+        _write_templates(path, "New text for {product_name}", mtime=1_000_000_005_000_000_000)
+
+        assert store.render("testimonial", "tiktok", product_name="Mug") == "New text for Mug"
+        assert store.stats()["loads"] == 2
+
+    def test_invalid_edit_keeps_last_good_templates(self, tmp_path):
+        """Test a half-written template file does not break prompt building"""
+        path = tmp_path / "ugc_prompt_templates.json"
+        _write_templates(path, "Good text for {product_name}", mtime=1_000_000_000_000_000_000)
+        store = UGCTemplateStore(path)
+        store.styles()
+
+        path.write_text("{ not json", encoding="utf-8")
+        os.utime(path, ns=(1_000_000_005_000_000_000, 1_000_000_005_000_000_000))
+
+        assert store.render("testimonial", "tiktok", product_name="Mug") == "Good text for Mug"
+
+    def test_sora_prompt_sections(self, tmp_path):
+        """Test the Sora prompt combines template, product details and execution"""
+        path = tmp_path / "ugc_prompt_templates.json"
+        _write_templates(path, "TikTok testimonial for {product_name}")
+        store = UGCTemplateStore(path)
+
+        prompt = store.render_sora_prompt(
+            "testimonial", "tiktok", "Glow Serum",
+            icp="Women 25-35", additional_instructions="Mention the price"
+        )
+
+        assert prompt.startswith("UGC-STYLE VIDEO (TESTIMONIAL):\n\nTikTok testimonial for Glow Serum\n\n")
+        assert "TARGET AUDIENCE: Women 25-35" in prompt
+        assert "EXECUTION: Selfie to camera" in prompt
+        assert "KEY FEATURES" not in prompt
+        assert prompt.endswith("ADDITIONAL INSTRUCTIONS:\nMention the price\n")
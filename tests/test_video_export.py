@@ -0,0 +1,109 @@
+"""
+Video export tests
+
+Tests that MARKETING_TEAM platform variants are transcoded in parallel and cached by
+master hash + preset (fake ffmpeg/ffprobe executables stand in for the real ones)
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+# Add MARKETING_TEAM tools to path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root / "MARKETING_TEAM" / "tools"))
+
+from ffmpeg_pipeline import parse_probe
+from video_export import PRESETS, cache_key, export_variants, variant_args
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="fake ffmpeg executables are POSIX scripts")
+
+TRANSCODE_DELAY = 0.5  # Seconds each fake transcode takes
+
+MASTER_PROBE = {
+    "streams": [
+        {"codec_type": "video", "codec_name": "h264", "width": 1920, "height": 1080},
+        {"codec_type": "audio", "codec_name": "aac", "sample_rate": "48000", "channels": 2},
+    ],
+    "format": {"duration": "75.0"},
+}
+
+
+def _fake_tools(tmp_path):
+    """ffprobe prints MASTER_PROBE; ffmpeg logs its output, sleeps on transcodes and writes the file(s)."""
+    log = tmp_path / "ffmpeg_outputs.txt"
+    ffprobe = tmp_path / "ffprobe"
+    ffprobe.write_text(f"#!{sys.executable}\nprint({json.dumps(json.dumps(MASTER_PROBE))})\n")
+    ffmpeg = tmp_path / "ffmpeg"
+    ffmpeg.write_text(
+        f"#!{sys.executable}\nimport sys, time\n"
+        "out = sys.argv[-1]\n"
+        f"open({str(log)!r}, 'a').write(out + '\\n')\n"
+        f"if '-c:v' in sys.argv: time.sleep({TRANSCODE_DELAY})\n"
+        "outs = [out % (i + 1) for i in range(int(sys.argv[sys.argv.index('-frames:v') + 1]))] if '%' in out else [out]\n"
+        "for path in outs: open(path, 'wb').write(b'data')\n"
+    )
+    for script in (ffprobe, ffmpeg):
+        script.chmod(0o755)
+    return str(ffmpeg), str(ffprobe), log
+
+
+class TestPresets:
+
+    def test_cache_key_tracks_master_and_preset(self):
+        """Test the cache key changes with the master's content or any preset setting"""
+        key = cache_key("abc", PRESETS["reels"])
+
+        assert key == cache_key("abc", PRESETS["reels"])
+        assert key != cache_key("abd", PRESETS["reels"])
+        assert key != cache_key("abc", replace(PRESETS["reels"], video_bitrate="4M"))
+
+    def test_variant_args_crop_trim_and_loudness(self, tmp_path):
+        """Test a long landscape master is cropped to 9:16, trimmed and loudness-normalised"""
+        master = parse_probe(tmp_path / "master.mp4", MASTER_PROBE)
+
+        shorts = variant_args(master, PRESETS["shorts"], tmp_path / "out.mp4")
+        tiktok = variant_args(master, PRESETS["tiktok"], tmp_path / "out.mp4")
+
+        assert "crop=1080:1920" in shorts[shorts.index("-vf") + 1]
+        assert shorts[shorts.index("-t") + 1] == "60"
+        assert "-t" not in tiktok
+        assert shorts[shorts.index("-af") + 1].startswith("loudnorm=I=-14.0")
+
+
+class TestExportVariants:
+
+    def test_variants_transcoded_in_parallel_then_cached(self, tmp_path):
+        """Test presets transcode concurrently, and a repeat export reuses every output"""
+        ffmpeg, ffprobe, log = _fake_tools(tmp_path)
+        master = tmp_path / "ad.mp4"
+        master.write_bytes(b"master video")
+        presets = ["tiktok", "reels", "shorts", "linkedin"]
+
+        start = time.monotonic()
+        first = asyncio.run(export_variants(
+            master, presets, tmp_path / "exports", thumbnails=3,
+            max_parallel=4, ffmpeg_cmd=ffmpeg, ffprobe_cmd=ffprobe
+        ))
+        elapsed = time.monotonic() - start
+        calls = len(log.read_text().splitlines())
+
+        assert elapsed < 3 * TRANSCODE_DELAY      # Serially: at least 4 * TRANSCODE_DELAY
+        assert [v.preset for v in first.variants] == presets
+        assert all(v.status == "exported" and v.path.exists() and v.poster.exists() for v in first.variants)
+        assert len(first.thumbnails) == 3
+        assert not list((tmp_path / "exports").glob("*.part.mp4"))
+
+        second = asyncio.run(export_variants(
+            master, presets, tmp_path / "exports", thumbnails=3,
+            ffmpeg_cmd=ffmpeg, ffprobe_cmd=ffprobe
+        ))
+
+        assert all(v.status == "cached" for v in second.variants)
+        assert len(log.read_text().splitlines()) == calls
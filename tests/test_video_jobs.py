@@ -0,0 +1,383 @@
+"""
+Video job tracker tests
+
+Tests that MARKETING_TEAM video jobs are driven by one background poller
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add MARKETING_TEAM tools to path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root / "MARKETING_TEAM" / "tools"))
+
+import video_jobs
+from video_jobs import (
+    VideoJobTracker, JobJournal, PollSchedule, ProviderStatus, COMPLETED, FAILED, parse_retry_after,
+    transient_check_status
+)
+
+
+def _fake_provider(polls_until_done, fail=False):
+    """Provider stub: reports running N times, then completed (or failed)."""
+    remaining = {}
+
+    async def check(job):
+        remaining.setdefault(job.job_id, polls_until_done)
+        remaining[job.job_id] -= 1
+        if remaining[job.job_id] > 0:
+            return ProviderStatus("running", progress=50)
+        if fail:
+            return ProviderStatus(FAILED, error="provider rejected job")
+        return ProviderStatus(COMPLETED)
+
+    async def finalize(job):
+        job.output_path = f"/tmp/{job.filename}"
+        job.result_text = f"done {job.filename}"
+
+    return check, finalize
+
+
+def _exited_pid() -> int:
+    """Pid of a process that has already exited (a crashed server)."""
+    return int(subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                              capture_output=True, text=True, check=True).stdout)
+
+
+def _submit_and_die(journal_path, pid, monkeypatch, provider="veo", provider_job_id="operations/abc"):
+    """Journal a running job as if submitted by server process pid, which then stops."""
+    tracker = VideoJobTracker(journal=JobJournal(journal_path))
+    tracker.register_provider(provider, *_fake_provider(polls_until_done=10_000), poll_interval=0.01)
+
+    async def crash():
+        job = tracker.submit(provider, provider_job_id, "clip.mp4", metadata={"seconds": "8"})
+        await asyncio.sleep(0.05)
+        await tracker.aclose()
+        return job
+
+    with monkeypatch.context() as m:
+        m.setattr(video_jobs.os, "getpid", lambda: pid)
+        return asyncio.run(crash())
+
+
+class TestVideoJobTracker:
+
+    def test_sync_wait_returns_finalized_result(self):
+        """Test waiting on a job returns it after the poller finalizes it"""
+        tracker = VideoJobTracker()
+        check, finalize = _fake_provider(polls_until_done=3)
+        tracker.register_provider("sora", check, finalize, poll_interval=0.01)
+
+        async def scenario():
+            job = tracker.submit("sora", "video_123", "clip.mp4")
+            job = await tracker.wait(job.job_id, timeout=5)
+            await tracker.aclose()
+            return job
+
+        job = asyncio.run(scenario())
+
+        assert job.status == COMPLETED
+        assert job.polls == 3
+        assert job.result_text == "done clip.mp4"
+        assert job.progress == 100
+
+    def test_many_jobs_share_one_poller(self):
+        """Test fan-out: submits return immediately and all jobs finish"""
+        tracker = VideoJobTracker()
+        check, finalize = _fake_provider(polls_until_done=2)
+        tracker.register_provider("veo", check, finalize, poll_interval=0.01)
+
+        async def scenario():
+            jobs = [tracker.submit("veo", f"op_{i}", f"clip_{i}.mp4") for i in range(20)]
+            assert all(job.status == "running" for job in jobs)
+            poller = tracker._poller
+            await asyncio.gather(*(tracker.wait(job.job_id, timeout=5) for job in jobs))
+            assert tracker._poller is poller
+            await tracker.aclose()
+            return jobs
+
+        jobs = asyncio.run(scenario())
+
+        assert all(job.status == COMPLETED for job in jobs)
+
+    def test_provider_failure_is_reported(self):
+        """Test a provider-reported failure resolves waiters with the error"""
+        tracker = VideoJobTracker()
+        check, finalize = _fake_provider(polls_until_done=1, fail=True)
+        tracker.register_provider("sora", check, finalize, poll_interval=0.01)
+
+        async def scenario():
+            job = tracker.submit("sora", "video_456", "clip.mp4")
+            job = await tracker.wait(job.job_id, timeout=5)
+            await tracker.aclose()
+            return job
+
+        job = asyncio.run(scenario())
+
+        assert job.status == FAILED
+        assert job.error == "provider rejected job"
+
+    def test_max_wait_times_out_job(self):
+        """Test jobs exceeding max_wait are failed instead of polled forever"""
+        tracker = VideoJobTracker()
+        check, finalize = _fake_provider(polls_until_done=10_000)
+        tracker.register_provider("sora", check, finalize, poll_interval=0.01, max_wait=0.05)
+
+        async def scenario():
+            job = tracker.submit("sora", "video_789", "clip.mp4")
+            job = await tracker.wait(job.job_id, timeout=5)
+            await tracker.aclose()
+            return job
+
+        job = asyncio.run(scenario())
+
+        assert job.status == FAILED
+        assert "timed out" in job.error
+
+    def test_unknown_provider_rejected(self):
+        """Test submitting to an unregistered provider raises"""
+        tracker = VideoJobTracker()
+
+        async def scenario():
+            tracker.submit("runway", "x", "clip.mp4")
+
+        with pytest.raises(ValueError):
+            asyncio.run(scenario())
+
+    def test_retry_after_delays_next_poll(self):
+        """Test a provider Retry-After hint is honoured before polling again"""
+        tracker = VideoJobTracker()
+        calls = []
+
+        async def check(job):
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                return ProviderStatus("running", retry_after=0.3)
+            return ProviderStatus(COMPLETED)
+
+        async def finalize(job):
+            job.result_text = "done"
+
+        tracker.register_provider("sora", check, finalize, poll_interval=0.01, max_interval=0.02)
+
+        async def scenario():
+            job = tracker.submit("sora", "video_rl", "clip.mp4")
+            job = await tracker.wait(job.job_id, timeout=5)
+            await tracker.aclose()
+            return job
+
+        job = asyncio.run(scenario())
+
+        assert job.status == COMPLETED
+        assert calls[1] - calls[0] >= 0.3
+        assert tracker.stats()["sora"]["retry_after_waits"] == 1
+
+    def test_transient_check_failures_keep_job_running(self):
+        """Test 5xx answers and network errors on a status check back off instead of failing the job"""
+        tracker = VideoJobTracker()
+        outcomes = [TimeoutError("read timed out"), SimpleNamespace(status_code=503, headers={}),
+                    SimpleNamespace(status_code=200, headers={})]
+
+        async def check(job):
+            outcome = outcomes.pop(0)
+            try:
+                if isinstance(outcome, Exception):
+                    raise outcome
+            except Exception as e:
+                status = transient_check_status(e)
+                if status is None:
+                    raise
+                return status
+            return transient_check_status(outcome) or ProviderStatus(COMPLETED)
+
+        async def finalize(job):
+            job.result_text = "done"
+
+        tracker.register_provider("sora", check, finalize, poll_interval=0.01, max_interval=0.05)
+
+        async def scenario():
+            job = tracker.submit("sora", "video_flaky", "clip.mp4")
+            job = await tracker.wait(job.job_id, timeout=5)
+            await tracker.aclose()
+            return job
+
+        job = asyncio.run(scenario())
+
+        assert job.status == COMPLETED and job.polls == 3
+        assert job.check_errors == 0
+        assert tracker.stats()["sora"]["check_errors"] == 2
+
+    def test_definitive_check_errors_fail_job(self):
+        """Test only non-transient answers (e.g. 404) are classified as definitive"""
+        assert transient_check_status(SimpleNamespace(status_code=404, headers={})) is None
+        assert transient_check_status(ValueError("bad payload")) is None
+        rate_limited = transient_check_status(SimpleNamespace(status_code=429, headers={"retry-after": "12"}))
+        assert (rate_limited.state, rate_limited.retry_after) == ("running", 12.0)
+
+    def test_stats_report_polls_per_completed_video(self):
+        """Test polls spent per completed video are exposed per provider"""
+        tracker = VideoJobTracker()
+        check, finalize = _fake_provider(polls_until_done=3)
+        tracker.register_provider("veo", check, finalize, poll_interval=0.01, max_interval=0.01)
+
+        async def scenario():
+            jobs = [tracker.submit("veo", f"op_{i}", f"clip_{i}.mp4") for i in range(4)]
+            await asyncio.gather(*(tracker.wait(job.job_id, timeout=5) for job in jobs))
+            await tracker.aclose()
+
+        asyncio.run(scenario())
+
+        stats = tracker.stats()["veo"]
+        assert stats["completed"] == 4
+        assert stats["polls"] == 12
+        assert stats["polls_per_completed_video"] == 3
+        assert stats["typical_completion_seconds"] is not None
+
+
+
+class TestJobJournal:
+
+    def test_unfinished_job_resumed_after_restart(self, tmp_path, monkeypatch):
+        """Test a job whose server died mid-poll is resumed, finalized and journaled"""
+        journal_path = tmp_path / "video_jobs.jsonl"
+        lost = _submit_and_die(journal_path, _exited_pid(), monkeypatch)
+
+        second = VideoJobTracker(journal=JobJournal(journal_path))
+        second.register_provider("veo", *_fake_provider(polls_until_done=2), poll_interval=0.01, max_wait=0.01)
+
+        async def restart():
+            recovered = second.recover()
+            assert [job.job_id for job in recovered] == [lost.job_id]
+            job = await second.wait(lost.job_id, timeout=5)
+            await second.aclose()
+            return job
+
+        job = asyncio.run(restart())
+
+        assert job.status == COMPLETED       # Provider max_wait does not apply to recovered jobs
+        assert job.metadata == {"seconds": "8", "recovered": True}
+        assert second.recovered_jobs() == [job]
+        assert JobJournal(journal_path).load()[job.job_id]["status"] == COMPLETED
+
+    def test_jobs_of_live_servers_are_not_taken_over(self, tmp_path, monkeypatch):
+        """Test recover() only claims orphaned jobs, and a claimed job is not claimed twice"""
+        journal_path = tmp_path / "video_jobs.jsonl"
+        live = _submit_and_die(journal_path, os.getppid(), monkeypatch, provider_job_id="operations/live")
+        orphan = _submit_and_die(journal_path, _exited_pid(), monkeypatch, provider_job_id="operations/orphan")
+
+        def restart():
+            tracker = VideoJobTracker(journal=JobJournal(journal_path))
+            tracker.register_provider("veo", *_fake_provider(polls_until_done=10_000), poll_interval=10)
+
+            async def scenario():
+                recovered = tracker.recover()
+                await tracker.aclose()
+                return [job.job_id for job in recovered]
+
+            return asyncio.run(scenario())
+
+        first = restart()
+        other_pid = _exited_pid()
+        with monkeypatch.context() as m:
+            m.setattr(video_jobs.os, "getpid", lambda: other_pid)   # A second server starting alongside
+            second = restart()
+
+        assert first == [orphan.job_id]
+        assert second == []       # The first restart (this process) now owns the orphan
+        records = JobJournal(journal_path).load()
+        assert records[live.job_id]["owner"].endswith(f":{os.getppid()}")
+        assert records[orphan.job_id]["owner"].endswith(f":{os.getpid()}")
+
+    def test_concurrent_appends_survive_compaction(self, tmp_path):
+        """Test lines appended by other processes while compacting are never lost"""
+        journal_path = tmp_path / "video_jobs.jsonl"
+        script = (
+            "import sys; sys.path.insert(0, sys.argv[1])\n"
+            "from video_jobs import JobJournal, VideoJob\n"
+            "journal = JobJournal(sys.argv[2])\n"
+            "for i in range(100):\n"
+            "    journal.append(VideoJob(f'{sys.argv[3]}-{i}', 'sora', f'video_{i}', 'clip.mp4'))\n"
+        )
+        tools = str(repo_root / "MARKETING_TEAM" / "tools")
+        writers = [subprocess.Popen([sys.executable, "-c", script, tools, str(journal_path), f"w{n}"])
+                   for n in range(3)]
+        journal = JobJournal(journal_path)
+        while any(writer.poll() is None for writer in writers):
+            journal.compact()
+        assert all(writer.wait() == 0 for writer in writers)
+
+        assert len(journal.load()) == 300
+
+    def test_compact_keeps_unfinished_and_skips_torn_lines(self, tmp_path):
+        """Test compaction keeps the latest state per job and drops old finished jobs"""
+        journal = JobJournal(tmp_path / "video_jobs.jsonl", keep_finished=1)
+        tracker = VideoJobTracker(journal=journal)
+        tracker.register_provider("sora", *_fake_provider(polls_until_done=1), poll_interval=0.01)
+
+        async def scenario():
+            done = []
+            for i in range(3):
+                done.append(tracker.submit("sora", f"video_{i}", f"clip_{i}.mp4"))
+                await tracker.wait(done[-1].job_id, timeout=5)
+            await tracker.aclose()
+            tracker.register_provider("sora", *_fake_provider(polls_until_done=10_000), poll_interval=10)
+            running = tracker.submit("sora", "video_running", "clip.mp4")
+            await tracker.aclose()
+            return done, running
+
+        done, running = asyncio.run(scenario())
+        with open(journal.path, "a") as f:
+            f.write('{"job_id": "torn')
+
+        kept = journal.compact()
+
+        assert set(kept) == {done[-1].job_id, running.job_id}
+        assert kept[running.job_id]["status"] == "running"
+        assert len(journal.path.read_text().splitlines()) == 2
+
+class TestPollSchedule:
+
+    def test_backs_off_with_age_before_history(self):
+        """Test polls spread out as a job ages when no completion history exists"""
+        schedule = PollSchedule(base_interval=5.0, max_interval=30.0)
+
+        assert schedule.next_delay(0.0) == 5.0
+        assert schedule.next_delay(60.0) == 15.0
+        assert schedule.next_delay(600.0) == 30.0
+
+    def test_follows_typical_completion_window(self):
+        """Test sparse polls before typical completion, base rate inside it, backoff after"""
+        schedule = PollSchedule(base_interval=5.0, max_interval=30.0)
+        for seconds in (90, 100, 110, 120, 130):
+            schedule.record(seconds)
+
+        assert schedule.next_delay(0.0) == 30.0      # Far from done: capped long wait
+        assert schedule.next_delay(80.0) == 10.0     # Closing half the gap to ~100s
+        assert schedule.next_delay(115.0) == 5.0     # Inside the window: base interval
+        assert schedule.next_delay(200.0) == 30.0    # Overdue: backed off
+        assert schedule.typical() == 110
+
+    def test_retry_after_wins_when_longer(self):
+        """Test Retry-After overrides the adaptive delay only when it asks for longer"""
+        schedule = PollSchedule(base_interval=5.0, max_interval=30.0)
+
+        assert schedule.next_delay(0.0, retry_after=45.0) == 45.0
+        assert schedule.next_delay(0.0, retry_after=1.0) == 5.0
+
+    def test_parse_retry_after(self):
+        """Test Retry-After parsing for delta-seconds, HTTP-date and junk values"""
+        future = datetime.now(timezone.utc) + timedelta(seconds=120)
+
+        assert parse_retry_after("7") == 7.0
+        assert 100 < parse_retry_after(format_datetime(future, usegmt=True)) <= 120
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
@@ -0,0 +1,145 @@
+"""
+Vision analysis cache tests
+
+Tests that MARKETING_TEAM GPT-4o Vision analyses are reused by image digest
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add MARKETING_TEAM tools to path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root / "MARKETING_TEAM" / "tools"))
+
+from vision_analysis import ANALYZED, CACHED, VisionAnalysisCache, analyze_image, warm_cache
+
+
+class _FakeVisionClient:
+    """AsyncOpenAI stand-in recording every GPT-4o Vision request."""
+
+    def __init__(self):
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        self.requests.append(kwargs)
+        message = SimpleNamespace(content=f" description {len(self.requests)} ")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+@pytest.fixture
+def product_images(tmp_path):
+    folder = tmp_path / "products"
+    folder.mkdir()
+    (folder / "mug.png").write_bytes(b"mug-pixels")
+    (folder / "mug_copy.jpg").write_bytes(b"mug-pixels")   # Same bytes, different name
+    (folder / "bottle.png").write_bytes(b"bottle-pixels")
+    (folder / "notes.txt").write_text("not an image")
+    return folder
+
+
+class TestVisionAnalysisCache:
+
+    def test_repeat_analysis_served_from_cache(self, product_images, tmp_path):
+        """Test the same image bytes are analyzed once, even under another filename"""
+        client = _FakeVisionClient()
+        cache = VisionAnalysisCache(tmp_path / "vision.json")
+
+        async def scenario():
+            first = await analyze_image(client, str(product_images / "mug.png"), cache=cache)
+            second = await analyze_image(client, str(product_images / "mug_copy.jpg"), cache=cache)
+            return first, second
+
+        first, second = asyncio.run(scenario())
+
+        assert first == ("description 1", ANALYZED)
+        assert second == ("description 1", CACHED)
+        assert len(client.requests) == 1
+        assert cache.stats()["hits"] == 1
+
+    def test_prompt_version_is_part_of_key(self, product_images, tmp_path):
+        """Test a different analysis prompt is not served the other prompt's description"""
+        client = _FakeVisionClient()
+        cache = VisionAnalysisCache(tmp_path / "vision.json")
+        image = str(product_images / "mug.png")
+
+        async def scenario():
+            await analyze_image(client, image, prompt="product", cache=cache)
+            return await analyze_image(client, image, prompt="ugc_scene", cache=cache)
+
+        description, source = asyncio.run(scenario())
+
+        assert source == ANALYZED
+        assert len(client.requests) == 2
+        assert "human" in client.requests[1]["messages"][0]["content"][0]["text"]
+
+    def test_cache_persists_across_instances(self, product_images, tmp_path):
+        """Test analyses survive a server restart"""
+        image = str(product_images / "mug.png")
+        asyncio.run(analyze_image(_FakeVisionClient(), image, cache=VisionAnalysisCache(tmp_path / "vision.json")))
+
+        client = _FakeVisionClient()
+        _, source = asyncio.run(analyze_image(client, image, cache=VisionAnalysisCache(tmp_path / "vision.json")))
+
+        assert source == CACHED
+        assert client.requests == []
+
+    def test_ttl_and_lru_eviction(self, tmp_path):
+        """Test expired entries miss and the oldest-used entries are dropped past max_entries"""
+        cache = VisionAnalysisCache(tmp_path / "vision.json", ttl_seconds=60, max_entries=2)
+        cache.put("a", "first")
+        cache._entries["a"]["created"] = time.time() - 120
+
+        assert cache.get("a") is None
+
+        cache.put("b", "second")
+        cache.put("c", "third")
+        cache.get("b")
+        cache.put("d", "fourth")
+
+        assert cache.get("c") is None
+        assert cache.get("b") == "second"
+        assert cache.get("d") == "fourth"
+
+    def test_hits_not_written_and_processes_do_not_lose_entries(self, tmp_path):
+        """Test a hit leaves the file alone, and two cache instances keep each other's entries"""
+        first, second = VisionAnalysisCache(tmp_path / "vision.json"), VisionAnalysisCache(tmp_path / "vision.json")
+        first.put("a", "mug")
+        second.get("missing")           # Loaded before "a" was saved
+        written = (tmp_path / "vision.json").stat().st_mtime_ns
+
+        assert first.get("a") == "mug"
+        assert (tmp_path / "vision.json").stat().st_mtime_ns == written
+
+        second.put("b", "bottle")
+        first.flush()
+
+        reloaded = VisionAnalysisCache(tmp_path / "vision.json")
+        assert (reloaded.get("a"), reloaded.get("b")) == ("mug", "bottle")
+
+    def test_remote_url_is_not_cached(self, tmp_path):
+        """Test URLs are passed straight to GPT-4o without caching"""
+        client = _FakeVisionClient()
+        cache = VisionAnalysisCache(tmp_path / "vision.json")
+
+        asyncio.run(analyze_image(client, "https://example.com/mug.png", cache=cache))
+
+        assert client.requests[0]["messages"][0]["content"][1]["image_url"]["url"] == "https://example.com/mug.png"
+        assert cache.stats()["entries"] == 0
+
+    def test_warm_cache_for_folder(self, product_images, tmp_path):
+        """Test warming analyzes each distinct image once and skips cached ones on re-run"""
+        client = _FakeVisionClient()
+        cache = VisionAnalysisCache(tmp_path / "vision.json")
+
+        first = asyncio.run(warm_cache(client, str(product_images), cache=cache, concurrency=1))
+        second = asyncio.run(warm_cache(client, str(product_images), cache=cache))
+
+        assert first == {"analyzed": 2, "cached": 1, "failed": {}}
+        assert second == {"analyzed": 0, "cached": 3, "failed": {}}
+        assert len(client.requests) == 2